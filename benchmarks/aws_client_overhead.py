@@ -0,0 +1,101 @@
+"""
+AWS Client Overhead Benchmark
+
+ツール呼び出しごとに boto3.client() を作成する場合（変更前）と、
+共有クライアント get_client() を使い回す場合（変更後）の1呼び出しあたりのオーバーヘッドを比較
+
+使い方:
+    # クライアントの取得のみを計測（AWSには接続しない）
+    python benchmarks/aws_client_overhead.py
+
+    # 実際のS3へのHeadObjectを含めて計測（HTTP接続の再利用の効果も含む）
+    python benchmarks/aws_client_overhead.py --bucket my-bucket --key path/to/object
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import boto3
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp_server.common.s3_utils import clear_aws_clients, get_client  # noqa: E402
+
+
+def _measure(call: Callable[[], None], iterations: int) -> List[float]:
+    """callをiterations回実行し、1回ごとの所要時間（ミリ秒）を返す"""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def _summarize(durations: List[float]) -> Dict[str, float]:
+    ordered = sorted(durations)
+    return {
+        "mean": statistics.mean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def run(iterations: int, bucket: Optional[str] = None, key: Optional[str] = None):
+    """変更前後の1呼び出しあたりのオーバーヘッドを計測して表示"""
+    if bucket is None:
+        # 認証情報の解決は行うが、AWSには接続しない
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    def per_call_client():
+        client = boto3.client("s3")
+        if bucket is not None:
+            client.head_object(Bucket=bucket, Key=key)
+
+    def shared_client():
+        client = get_client("s3")
+        if bucket is not None:
+            client.head_object(Bucket=bucket, Key=key)
+
+    # ウォームアップ（モジュールの読み込み・サービス定義のキャッシュ）
+    clear_aws_clients()
+    per_call_client()
+    shared_client()
+
+    results = {
+        "boto3.client() per call": _summarize(_measure(per_call_client, iterations)),
+        "get_client() shared": _summarize(_measure(shared_client, iterations)),
+    }
+
+    target = f"HeadObject s3://{bucket}/{key}" if bucket else "client acquisition only"
+    print(f"AWS client overhead ({target}, {iterations} iterations)")
+    print(f"{'':<28}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, summary in results.items():
+        print(f"{name:<28}{summary['mean']:>10.3f}{summary['p50']:>10.3f}{summary['p95']:>10.3f}")
+
+    before = results["boto3.client() per call"]["mean"]
+    after = results["get_client() shared"]["mean"]
+    print(f"Per-call overhead saved: {before - after:.3f} ms ({before / after:.1f}x faster)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call AWS client overhead")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per variant")
+    parser.add_argument("--bucket", help="S3 bucket for HeadObject (omit to stay offline)")
+    parser.add_argument("--key", help="S3 object key for HeadObject")
+    args = parser.parse_args()
+    if args.bucket and not args.key:
+        parser.error("--key is required with --bucket")
+
+    run(args.iterations, args.bucket, args.key)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,114 @@ MLOps MCP Server Entry Point
 MCPサーバーを起動するエントリーポイント。
 """
 
+import argparse
+import asyncio
 import logging
 import sys
+import time
 
+from .metrics_endpoint import start_metrics_server
 from .server import MLOpsServer
+from .transport import MCPProtocolHandler, serve_stdio, start_tcp_server, start_unix_server
 
 # ロギング設定
+# stdioトランスポートでは標準出力をMCPメッセージ専用にするため、ログは標準エラー出力へ
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
+    handlers=[logging.StreamHandler(sys.stderr)],
 )
 
 logger = logging.getLogger(__name__)
 
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(prog="python -m mcp_server", description="MLOps MCP Server")
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="起動時に全Capabilityをロードし、Capabilityごとのインポート時間を出力する",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "tcp", "unix"],
+        default="stdio",
+        help="MCPトランスポート (デフォルト: stdio)",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="tcp: 待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=8765, help="tcp: 待ち受けポート")
+    parser.add_argument(
+        "--socket-path", default="/tmp/mlops-mcp.sock", help="unix: ソケットファイルのパス"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Prometheus形式の /metrics のポート (デフォルト: MLOPS_METRICS_PORT。未設定なら無効)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="初期化と起動レポートの出力のみ行い、リスナーを起動せずに終了する",
+    )
+    return parser.parse_args(argv)
+
+
+async def serve(server: MLOpsServer, args: argparse.Namespace):
+    """指定されたトランスポートでリクエストの処理を開始"""
+    handler = MCPProtocolHandler(server)
+
+    metrics_port = args.metrics_port or server.config.metrics_port
+    if metrics_port:
+        # リスナーはイベントループの終了まで動作する
+        await start_metrics_server(server.metrics, server.config.metrics_host, metrics_port)
+
+    if args.transport == "stdio":
+        # 標準入力が閉じられるまで処理
+        await serve_stdio(handler)
+        return
+
+    if args.transport == "tcp":
+        listener = await start_tcp_server(handler, args.host, args.port)
+    else:
+        listener = await start_unix_server(handler, args.socket_path)
+
+    async with listener:
+        await listener.serve_forever()
+
+
+def log_startup_report(server: MLOpsServer, started_at: float):
+    """起動時間とCapabilityごとのインポートコストを出力"""
+    total_ms = (time.perf_counter() - started_at) * 1000
+    report = server.get_startup_report()
+
+    logger.info(
+        f"Startup time: {total_ms:.1f} ms "
+        f"(tool registration: {report['startup_time_ms']:.1f} ms)"
+    )
+    for name, info in report["capabilities"].items():
+        if info["loaded"]:
+            logger.info(f"  - {name}: import {info['import_time_ms']:.1f} ms")
+        else:
+            logger.info(f"  - {name}: not loaded (lazy)")
+
+
+def main(argv=None):
     """MCPサーバーのメインエントリーポイント"""
+    started_at = time.perf_counter()
+    args = parse_args(argv)
+
     try:
         logger.info("Starting MLOps MCP Server...")
 
         # サーバーインスタンスの作成
         server = MLOpsServer()
 
+        # Capabilityの事前ロード（指定時のみ）
+        if args.preload:
+            server.preload_capabilities()
+
         # サーバー情報の表示
         info = server.get_server_info()
         logger.info(f"Server Info: {info}")
@@ -37,11 +122,21 @@ def main():
         for tool in tools:
             logger.info(f"  - {tool['name']}: {tool['description']}")
 
+        log_startup_report(server, started_at)
+
         logger.info("MLOps MCP Server started successfully")
-        logger.info("Server is ready to accept tool calls")
 
-        # 実際の実装ではここでMCPプロトコルのリスナーを起動
-        # 現時点では初期化のみで終了
+        if args.dry_run:
+            return 0
+
+        logger.info(f"Server is ready to accept tool calls ({args.transport})")
+        try:
+            asyncio.run(serve(server, args))
+        except KeyboardInterrupt:
+            logger.info("Shutting down MLOps MCP Server...")
+        finally:
+            server.shutdown(wait=False)
+
         return 0
 
     except Exception as e:
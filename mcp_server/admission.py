@@ -0,0 +1,188 @@
+"""
+Admission Control
+
+ツール実行の同時実行数制限と待ち行列。
+
+ツール単位・Capability単位で同時に実行できる呼び出し数を制限し、
+上限に達している場合は一定数まで待ち行列で待機させます。
+待ち行列も満杯の場合は待たずに ServerBusyError（再試行までの目安秒数付き）を送出します。
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from .common.exceptions import ServerBusyError
+
+logger = logging.getLogger(__name__)
+
+# 実行時間の移動平均の重み（新しい観測値）
+_DURATION_SMOOTHING = 0.3
+
+
+class ConcurrencyLimiter:
+    """
+    同時実行数の上限と上限付き待ち行列を持つセマフォ
+
+    待機はFIFO順です。1つのイベントループ上で使用してください。
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, default_retry_after: float):
+        """
+        Args:
+            name: 制限の対象（ツール名またはCapability名）
+            limit: 同時実行数の上限
+            queue_size: 上限到達時に待機できる呼び出し数
+            default_retry_after: 実行時間の実績がない場合の再試行までの目安秒数
+        """
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.default_retry_after = default_retry_after
+
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._avg_duration: Optional[float] = None
+
+    @property
+    def waiting(self) -> int:
+        """待機中の呼び出し数"""
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """現在の待ち行列が捌けるまでの目安秒数"""
+        if self._avg_duration is None:
+            return self.default_retry_after
+        rounds = math.ceil((self.waiting + 1) / self.limit)
+        return max(1.0, math.ceil(self._avg_duration * rounds))
+
+    async def acquire(self):
+        """
+        実行枠を確保（上限到達時は待機）
+
+        Raises:
+            ServerBusyError: 待ち行列が満杯の場合
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise ServerBusyError(
+                f"Server busy: {self.name} is at its concurrency limit "
+                f"({self.active} running, {self.waiting} queued)",
+                retry_after=self.retry_after(),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 枠を譲り受けた直後にキャンセルされた場合は次の待機者に渡す
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        """実行枠を解放し、次の待機者に渡す"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # 枠はそのまま待機者に引き継ぐ（activeは変化しない）
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def record_duration(self, seconds: float):
+        """実行時間を記録（再試行までの目安の算出に使用）"""
+        if self._avg_duration is None:
+            self._avg_duration = seconds
+        else:
+            self._avg_duration += _DURATION_SMOOTHING * (seconds - self._avg_duration)
+
+    def stats(self) -> Dict[str, Any]:
+        """現在の実行数・待機数・拒否数"""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "queue_size": self.queue_size,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    """
+    ツール単位・Capability単位の同時実行数制限
+
+    ツールの実行枠 → Capabilityの実行枠の順に確保します（順序を固定してデッドロックを防ぐ）。
+    """
+
+    def __init__(
+        self,
+        tool_limits: Dict[str, int],
+        capability_limits: Dict[str, int],
+        queue_size: int,
+        default_retry_after: float,
+    ):
+        self._tool_limiters = {
+            name: ConcurrencyLimiter(name, limit, queue_size, default_retry_after)
+            for name, limit in tool_limits.items()
+        }
+        self._capability_limiters = {
+            name: ConcurrencyLimiter(name, limit, queue_size, default_retry_after)
+            for name, limit in capability_limits.items()
+        }
+
+    def _limiters_for(self, tool_name: str) -> List[ConcurrencyLimiter]:
+        capability_name = tool_name.split(".", 1)[0]
+        limiters = []
+        if tool_name in self._tool_limiters:
+            limiters.append(self._tool_limiters[tool_name])
+        if capability_name in self._capability_limiters:
+            limiters.append(self._capability_limiters[capability_name])
+        return limiters
+
+    @asynccontextmanager
+    async def admit(self, tool_name: str) -> AsyncIterator[None]:
+        """
+        ツールの実行枠を確保するコンテキストマネージャー
+
+        Raises:
+            ServerBusyError: いずれかの待ち行列が満杯の場合
+        """
+        acquired: List[ConcurrencyLimiter] = []
+        try:
+            for limiter in self._limiters_for(tool_name):
+                await limiter.acquire()
+                acquired.append(limiter)
+
+            start = time.monotonic()
+            try:
+                yield
+            finally:
+                duration = time.monotonic() - start
+                for limiter in acquired:
+                    limiter.record_duration(duration)
+
+        finally:
+            for limiter in reversed(acquired):
+                limiter.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """制限ごとの現在の実行数・待機数・拒否数"""
+        return {
+            "tools": {name: limiter.stats() for name, limiter in self._tool_limiters.items()},
+            "capabilities": {
+                name: limiter.stats() for name, limiter in self._capability_limiters.items()
+            },
+        }
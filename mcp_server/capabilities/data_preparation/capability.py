@@ -7,6 +7,8 @@ Data Preparation Capability Implementation
 import logging
 from typing import Any, Callable, Dict
 
+from ..schema import build_tool_schemas
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +20,7 @@ class DataPreparationCapability:
     - load_dataset: S3からデータセット読み込み
     - validate_data: データバリデーション
     - preprocess_supervised: 教師あり学習用前処理
+    - profile_dataset: 列ごとの異なり数・分位点・ヒストグラムのスケッチ
     """
 
     def __init__(self):
@@ -27,12 +30,13 @@ class DataPreparationCapability:
 
     def _register_tools(self) -> Dict[str, Callable]:
         """ツールの登録"""
-        from .tools import load_dataset, preprocess_supervised, validate_data
+        from .tools import load_dataset, preprocess_supervised, profile_dataset, validate_data
 
         return {
             "load_dataset": load_dataset.load_dataset,
             "validate_data": validate_data.validate_data,
             "preprocess_supervised": preprocess_supervised.preprocess_supervised,
+            "profile_dataset": profile_dataset.profile_dataset,
         }
 
     def get_tools(self) -> Dict[str, Callable]:
@@ -41,51 +45,9 @@ class DataPreparationCapability:
 
     def get_tool_schemas(self) -> Dict[str, Dict[str, Any]]:
         """
-        各ツールのスキーマを返す
+        各ツールのスキーマを返す（ツール関数のシグネチャ・docstringから生成）
 
         Returns:
             ツール名をキーとしたスキーマ辞書
         """
-        return {
-            "load_dataset": {
-                "name": "load_dataset",
-                "description": "S3からデータセットを読み込む",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "bucket": {"type": "string", "description": "S3バケット名"},
-                        "key": {"type": "string", "description": "S3オブジェクトキー"},
-                    },
-                    "required": ["bucket", "key"],
-                },
-            },
-            "validate_data": {
-                "name": "validate_data",
-                "description": "データのバリデーションを実行",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "data": {
-                            "type": "object",
-                            "description": "検証するデータ",
-                        },
-                    },
-                    "required": ["data"],
-                },
-            },
-            "preprocess_supervised": {
-                "name": "preprocess_supervised",
-                "description": "教師あり学習用のデータ前処理",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "data": {"type": "object", "description": "前処理するデータ"},
-                        "target_column": {
-                            "type": "string",
-                            "description": "ターゲット列名",
-                        },
-                    },
-                    "required": ["data", "target_column"],
-                },
-            },
-        }
+        return build_tool_schemas(self._tools)
@@ -4,4 +4,4 @@ Data Preparation Tools
 データ前処理用のツール群
 """
 
-__all__ = ["load_dataset", "validate_data", "preprocess_supervised"]
+__all__ = ["load_dataset", "validate_data", "preprocess_supervised", "profile_dataset"]
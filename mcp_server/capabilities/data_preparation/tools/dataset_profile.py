@@ -0,0 +1,277 @@
+"""
+Dataset Profile
+
+データセットのプロファイル（行数・列の型・欠損値の数・メモリ使用量）を
+データセット全体をメモリに保持せずに集計するユーティリティ。
+
+load_dataset の profile_only モードと validate_data で使います。scan_dataset は
+データセットをArrowのレコードバッチごとに1回だけ走査し、各バッチを複数の集計器
+（DatasetProfile、バリデーションルール等）に渡します。Parquetはフッターの行数・
+null数からデータページを読まずに集計できます。列の型はDataFrameに読み込んだ場合の
+pandasの型名、メモリ使用量は memory_usage(deep=True) の推定値です。
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from mcp_server.common.progress import report_progress
+from mcp_server.common.s3_utils import iter_batches, read_dataset
+from mcp_server.common.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Arrowのストリーミングリーダーが使えない場合にpandasで読み込むチャンクの行数
+FALLBACK_CHUNK_ROWS = 100_000
+
+# pandasのobject型の1要素あたりのバイト数（ポインタと sys.getsizeof の値）
+_POINTER_BYTES = 8
+_PY_STR_BYTES = 49  # 空のASCII文字列（これに文字数を加える）
+_PY_UCS2_EXTRA_BYTES = 25  # 非ASCII（UCS-2）の文字列のヘッダーのASCIIとの差（これに2×文字数を加える）
+_PY_FLOAT_BYTES = 24  # 欠損値（NaN）
+_PY_OBJECT_BYTES = 32  # 文字列以外のオブジェクト（日付・真偽値等）の目安
+
+
+class DatasetProfile:
+    """
+    チャンクごとに集計するデータセットのプロファイル
+
+    バッチごとに型が異なる列（欠損を含むバッチの整数の列等）は、pandasで全体を
+    読み込んだ場合と同じく共通の型（float64、または object）に揃えます。
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.dtypes: Dict[str, str] = {}
+        self.missing_values: Dict[str, int] = {}
+        self.memory_bytes = 0
+
+    def add_batch(self, batch: pa.RecordBatch):
+        """Arrowのレコードバッチを集計"""
+        self.rows += batch.num_rows
+        for name, array in zip(batch.schema.names, batch.columns):
+            missing = array.null_count
+            if pa.types.is_floating(array.type):
+                # pandasの isnull() と同じくNaNも欠損として数える
+                missing += pc.sum(pc.is_nan(array)).as_py() or 0
+            dtype = pandas_dtype(array.type, array.null_count > 0)
+            self._add_column(name, dtype, missing)
+            self.memory_bytes += _estimated_bytes(
+                array.type, dtype, len(array), array.null_count, _payload_bytes(array)
+            )
+
+    def add_parquet_metadata(self, metadata: Any, columns: Optional[List[str]] = None) -> bool:
+        """
+        Parquetのフッター（pyarrow.parquet.FileMetaData）の行数・null数を集計
+
+        Args:
+            metadata: フッター
+            columns: 集計する列（Noneの場合は全列）
+
+        Returns:
+            集計した場合True（null数の統計情報がない列がある場合は集計せずにFalse）
+
+        Raises:
+            ValueError: 存在しない列
+        """
+        schema = metadata.schema.to_arrow_schema()
+        names = columns if columns is not None else schema.names
+        missing_columns = [name for name in names if schema.get_field_index(name) < 0]
+        if missing_columns:
+            raise ValueError(f"Columns not found in dataset: {', '.join(missing_columns)}")
+
+        nulls = {name: 0 for name in names}
+        payload = {name: 0 for name in names}
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            for index in range(row_group.num_columns):
+                chunk = row_group.column(index)
+                # ネストした列（"a.list.element" 等）は最上位の列に集計する
+                name = chunk.path_in_schema.split(".", 1)[0]
+                if name not in nulls:
+                    continue
+                statistics = chunk.statistics
+                if statistics is None or not statistics.has_null_count:
+                    return False
+                nulls[name] += statistics.null_count
+                # エンコード前（圧縮前）のサイズを値のバイト数の目安にする
+                payload[name] += chunk.total_uncompressed_size
+
+        rows = metadata.num_rows
+        self.rows += rows
+        for name in names:
+            data_type = schema.field(name).type
+            dtype = pandas_dtype(data_type, nulls[name] > 0)
+            # Parquetのnull数にはNaNは含まれない
+            self._add_column(name, dtype, nulls[name])
+            self.memory_bytes += _estimated_bytes(
+                data_type, dtype, rows, nulls[name], payload[name]
+            )
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """load_dataset の dataset_info と同じ形式の辞書"""
+        return {
+            "rows": self.rows,
+            "columns": len(self.dtypes),
+            "column_names": list(self.dtypes),
+            "dtypes": dict(self.dtypes),
+            "memory_usage_mb": self.memory_bytes / 1024 / 1024,
+            "missing_values": dict(self.missing_values),
+        }
+
+    def _add_column(self, name: str, dtype: str, missing: int):
+        self.dtypes[name] = merge_dtypes(self.dtypes.get(name), dtype)
+        self.missing_values[name] = self.missing_values.get(name, 0) + int(missing)
+
+
+def scan_dataset(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    file_format: str,
+    create_collectors: Callable[[], List[Any]],
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Any]] = None,
+) -> Tuple[List[Any], str]:
+    """
+    データセットを1回走査し、各レコードバッチを全ての集計器に渡す
+
+    メモリに保持するのは1つのバッチのみです。CSV・JSON Linesで後のブロックの値が
+    最初のブロックから推定した型に変換できない場合は、集計器を作り直して
+    pandasのチャンク（Arrowに変換）で走査し直します。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー（プレフィックス・マニフェストも可）
+        file_format: ファイルフォーマット（csv, parquet, json, jsonl）
+        create_collectors: add_batch(batch) を持つ集計器のリストを作成する関数
+        columns: 読み込む列
+        filters: 行の条件（Parquetのみ）
+
+    Returns:
+        (集計器のリスト, 走査方法 "arrow_stream" / "pandas_chunks")
+    """
+    fmt = file_format.lower()
+    with span("dataset.scan", {"mlops.scan_method": "arrow_stream"}):
+        collectors = create_collectors()
+        batches = iter_batches(
+            s3_client, bucket, key, file_format, columns=columns, filters=filters
+        )
+        rows = 0
+        while True:
+            try:
+                batch = next(batches)
+            except StopIteration:
+                return collectors, "arrow_stream"
+            except pa.ArrowInvalid as e:
+                if fmt not in ("csv", "jsonl"):
+                    raise
+                logger.info(f"Column types of {key} change within the file ({e}); using pandas")
+                break
+            _add_batch(collectors, batch)
+            rows += batch.num_rows
+            report_progress("parse", rows, message=f"Scanned {rows:,} rows")
+
+    with span("dataset.scan", {"mlops.scan_method": "pandas_chunks"}):
+        collectors = create_collectors()
+        chunks = read_dataset(
+            s3_client, bucket, key, file_format, chunksize=FALLBACK_CHUNK_ROWS, columns=columns
+        )
+        rows = 0
+        for chunk in chunks:
+            _add_batch(collectors, pa.RecordBatch.from_pandas(chunk, preserve_index=False))
+            rows += len(chunk)
+            report_progress("parse", rows, message=f"Scanned {rows:,} rows")
+        return collectors, "pandas_chunks"
+
+
+def _add_batch(collectors: List[Any], batch: pa.RecordBatch):
+    for collector in collectors:
+        collector.add_batch(batch)
+
+
+def pandas_dtype(data_type: pa.DataType, has_nulls: bool) -> str:
+    """
+    Arrowの型の列をpandasに変換した場合の型名
+
+    Args:
+        data_type: Arrowの型
+        has_nulls: 欠損を含むか（欠損のある整数はfloat64、真偽値はobjectになる）
+    """
+    if pa.types.is_null(data_type):
+        # 全ての値が欠損の列はpandasではfloat64（NaN）
+        return "float64"
+    if pa.types.is_integer(data_type) and has_nulls:
+        return "float64"
+    if pa.types.is_boolean(data_type) and has_nulls:
+        return "object"
+    if pa.types.is_dictionary(data_type):
+        return "category"
+    if pa.types.is_date(data_type):
+        # 日付の列はpandasではdatetime.dateのobject
+        return "object"
+    try:
+        return str(pd.api.types.pandas_dtype(data_type.to_pandas_dtype()))
+    except (NotImplementedError, TypeError):
+        return "object"
+
+
+def merge_dtypes(current: Optional[str], dtype: str) -> str:
+    """チャンクごとの型名を、全体を読み込んだ場合の型名に揃える"""
+    if current is None or current == dtype:
+        return dtype
+    try:
+        left, right = np.dtype(current), np.dtype(dtype)
+    except TypeError:
+        return "object"
+    if left.kind in "iuf" and right.kind in "iuf":
+        return str(np.result_type(left, right))
+    return "object"
+
+
+def _payload_bytes(array: Any) -> int:
+    """
+    文字列の列はPythonの文字列の本体のバイト数（空のASCII文字列の大きさを除く）の合計、
+    それ以外の列はArrowのバッファのサイズ
+    """
+    if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        return array.nbytes
+    chars = pc.utf8_length(array)
+    # ASCIIのみの文字列は1文字1バイト、それ以外（日本語等）は2バイト+ヘッダーの差分
+    sizes = pc.if_else(
+        pc.equal(chars, pc.binary_length(array)),
+        chars,
+        pc.add(pc.multiply(chars, 2), _PY_UCS2_EXTRA_BYTES),
+    )
+    return pc.sum(sizes).as_py() or 0
+
+
+def _estimated_bytes(
+    data_type: pa.DataType, dtype: str, rows: int, nulls: int, payload: int
+) -> int:
+    """
+    pandasに変換した場合のメモリ使用量（deep=True）の推定値
+
+    object型の文字列は要素ごとに sys.getsizeof を数える代わりに、空の文字列の大きさ
+    （49バイト）に本体のバイト数（payload。フッターからの推定ではエンコード前のサイズ）を加えます。
+    """
+    if dtype == "category":
+        return payload
+    if dtype != "object":
+        try:
+            return rows * np.dtype(dtype).itemsize
+        except TypeError:
+            # タイムゾーン付きの日時等（8バイト）
+            return rows * 8
+    values = rows - nulls
+    if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        element_bytes = _PY_STR_BYTES * values + payload
+    else:
+        element_bytes = _PY_OBJECT_BYTES * values
+    return _POINTER_BYTES * rows + element_bytes + _PY_FLOAT_BYTES * nulls
@@ -0,0 +1,701 @@
+"""
+Dataset Sketch
+
+データセット全体をメモリに保持せずに、列ごとの異なり数・分位点・ヒストグラムを
+近似するマージ可能なスケッチ。
+
+正確な nunique()/quantile() はデータセット全体（またはその値の集合）を必要としますが、
+スケッチは固定サイズの要約で、チャンク・パートごとに作成したものをマージしても
+全体を1回で集計した場合と同じ結果になります。
+
+- 異なり数: HyperLogLog（2^12個のレジスター。標準誤差 約1.6%）
+- 分位点: t-digest（マージ型。両端ほど細かいセントロイドで近似）
+- ヒストグラム: 幅が2のべき乗の固定ビン（範囲が広がると隣接するビンを統合して幅を倍にする）
+
+分位点・ヒストグラム・平均等は数値の列（欠損値・NaN・無限大を除く）のみ作成します。
+DatasetSketch は scan_dataset の集計器として使用でき、to_bytes() でgzip圧縮したJSONの
+アーティファクトに変換します。
+"""
+
+import base64
+import gzip
+import json
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from mcp_server.common.s3_utils import (
+    download_object,
+    get_s3_etag,
+    list_dataset_parts,
+    map_dataset_parts,
+    s3_objects_unchanged,
+)
+from mcp_server.common.tracing import span
+
+from .dataset_profile import merge_dtypes, pandas_dtype, scan_dataset
+
+logger = logging.getLogger(__name__)
+
+# アーティファクトの形式のバージョン（互換性のない変更で上げる）
+SKETCH_FORMAT_VERSION = 1
+
+DEFAULT_HLL_PRECISION = 12
+DEFAULT_TDIGEST_COMPRESSION = 200
+DEFAULT_HISTOGRAM_BINS = 32
+
+# 要約に含める分位点
+SUMMARY_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class HyperLogLog:
+    """
+    異なり数を推定するHyperLogLog
+
+    値の64ビットのハッシュの上位 precision ビットでレジスターを選び、残りのビットの
+    先頭の0の数+1の最大値を記録します。マージはレジスターごとの最大値です。
+    """
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        """値の64ビットのハッシュ（uint64）を追加"""
+        if len(hashes) == 0:
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes << np.uint64(p)
+        # 残りのビットの先頭の0の数+1 を最上位の1のビットの位置から求める
+        # （float64への丸めで位置が64になる場合は63とする。全て0の場合は 64-p+1）
+        nonzero = rest > 0
+        bit = np.zeros(len(rest))
+        bit[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64)))
+        rank = np.where(nonzero, 64 - np.minimum(bit, 63), 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """異なり数の推定値（少ない場合は線形カウンティングで補正）"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class TDigest:
+    """
+    分位点を近似するt-digest（マージ型）
+
+    値・セントロイドを平均の順に並べ、k1スケール関数 k(q) = δ/2π·asin(2q-1) の
+    1単位に収まる隣接するものを1つのセントロイドにまとめます。セントロイドの数は
+    おおよそ compression/2 以下です。
+    """
+
+    def __init__(self, compression: int = DEFAULT_TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def total(self) -> float:
+        return float(self.weights.sum())
+
+    def add(self, values: np.ndarray):
+        """値（float64。NaNを含まない）を追加"""
+        if len(values):
+            self._compress(values, np.ones(len(values)))
+
+    def merge(self, other: "TDigest"):
+        if len(other.means):
+            self._compress(other.means, other.weights)
+
+    def quantiles(self, qs: np.ndarray, minimum: float, maximum: float) -> np.ndarray:
+        """
+        分位点の推定値
+
+        Args:
+            qs: 分位（0〜1）の配列
+            minimum: 最小値（正確な値）
+            maximum: 最大値（正確な値）
+        """
+        total = self.total
+        # 各セントロイドの中心の累積重みの間を線形補間する
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[minimum], self.means, [maximum]])
+        return np.interp(np.asarray(qs) * total, positions, values)
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1)
+        groups = np.floor(k - k[0])
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+
+class FixedBinHistogram:
+    """
+    幅が2のべき乗の固定数のビンによるヒストグラム
+
+    ビン i は [(start + i)·2^exponent, (start + i + 1)·2^exponent) です。値の範囲が
+    ビンの数に収まらない場合は幅を倍にして隣接するビンを統合するため、チャンクごとに
+    範囲が異なるヒストグラムも境界を揃えて正確にマージできます。
+    """
+
+    def __init__(self, bins: int = DEFAULT_HISTOGRAM_BINS, min_exponent: Optional[int] = None):
+        """
+        Args:
+            bins: ビンの数
+            min_exponent: ビンの幅の指数の下限（整数の列は0として幅を1以上にする）
+        """
+        self.bins = bins
+        self.min_exponent = min_exponent
+        self.exponent: Optional[int] = None
+        self.start = 0
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def add(self, values: np.ndarray):
+        """値（float64。有限の値のみ）を追加"""
+        if len(values) == 0:
+            return
+        self._fit(float(values.min()), float(values.max()))
+        index = np.floor(values / self.width).astype(np.int64) - self.start
+        self.counts += np.bincount(np.clip(index, 0, self.bins - 1), minlength=self.bins)
+
+    def merge(self, other: "FixedBinHistogram"):
+        if other.bins != self.bins:
+            raise ValueError("Cannot merge histograms with different numbers of bins")
+        if other.exponent is None:
+            return
+        if self.min_exponent is None or other.min_exponent is None:
+            self.min_exponent = None
+        # 値のあるビンの下端（ビンに含まれる値）の範囲を収める
+        used = np.flatnonzero(other.counts)
+        self._fit(
+            (other.start + used[0]) * other.width,
+            (other.start + used[-1]) * other.width,
+            other.exponent,
+        )
+        index = (other.start + used) // (1 << (self.exponent - other.exponent)) - self.start
+        np.add.at(self.counts, index, other.counts[used])
+
+    @property
+    def width(self) -> float:
+        return math.ldexp(1.0, self.exponent)
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """値のあるビンの範囲の境界と度数"""
+        used = np.flatnonzero(self.counts)
+        if len(used) == 0:
+            return {"edges": [], "counts": []}
+        first, last = used[0], used[-1]
+        edges = (self.start + np.arange(first, last + 2)) * self.width
+        return {"edges": edges.tolist(), "counts": self.counts[first : last + 1].tolist()}
+
+    def _fit(self, lower: float, upper: float, exponent: Optional[int] = None):
+        """[lower, upper] がビンに収まるまで幅を広げる（ビンの境界は変えずに統合する）"""
+        if self.exponent is not None:
+            used = np.flatnonzero(self.counts)
+            lower = min(lower, (self.start + used[0]) * self.width)
+            upper = max(upper, (self.start + used[-1]) * self.width)
+        candidates = [exponent, self.exponent, self.min_exponent]
+        if upper > lower:
+            candidates.append(math.ceil(math.log2((upper - lower) / self.bins)))
+        new_exponent = max((e for e in candidates if e is not None), default=0)
+        while (
+            math.floor(upper / math.ldexp(1.0, new_exponent))
+            - math.floor(lower / math.ldexp(1.0, new_exponent))
+            >= self.bins
+        ):
+            new_exponent += 1
+
+        new_start = math.floor(lower / math.ldexp(1.0, new_exponent))
+        if self.exponent is None:
+            self.exponent, self.start = new_exponent, new_start
+            return
+        if new_exponent == self.exponent and new_start == self.start:
+            return
+        used = np.flatnonzero(self.counts)
+        index = (self.start + used) // (1 << (new_exponent - self.exponent)) - new_start
+        counts = np.zeros(self.bins, dtype=np.int64)
+        np.add.at(counts, index, self.counts[used])
+        self.exponent, self.start, self.counts = new_exponent, new_start, counts
+
+
+class ColumnSketch:
+    """1列のスケッチ（件数・欠損値の数・異なり数、数値の列は分位点・ヒストグラム等も）"""
+
+    def __init__(self, histogram_bins: int, precision: int, compression: int):
+        self.histogram_bins = histogram_bins
+        self.dtype: Optional[str] = None
+        self.count = 0
+        self.missing = 0
+        self.distinct = HyperLogLog(precision)
+        self.compression = compression
+        # 数値の列のみ（最初の数値のバッチで作成）
+        self.digest: Optional[TDigest] = None
+        self.histogram: Optional[FixedBinHistogram] = None
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        # 有限の値の件数・平均・偏差平方和（バッチ間でマージ可能な形で数値的に安定に集計）
+        self.finite = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add_array(self, array: Any):
+        """Arrowの配列を追加"""
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        self.dtype = merge_dtypes(self.dtype, pandas_dtype(array.type, array.null_count > 0))
+
+        valid = array.drop_null()
+        if not _is_numeric(array.type):
+            self.count += len(valid)
+            self.missing += len(array) - len(valid)
+            self.distinct.add_hashes(_hash_values(valid))
+            return
+
+        if pa.types.is_integer(array.type):
+            # 整数は値のままハッシュする（2**53を超えるIDもfloat64に丸めずに区別する）
+            integers = valid.cast(pa.int64(), safe=False).to_numpy(zero_copy_only=False)
+            hashes = pd.util.hash_array(integers)
+            values = integers.astype(np.float64)
+        else:
+            # +0.0 で -0.0 を 0.0 に揃える
+            values = valid.cast(pa.float64(), safe=False).to_numpy(zero_copy_only=False) + 0.0
+            # pandasの isnull() と同じくNaNも欠損として数える
+            values = values[~np.isnan(values)]
+            hashes = _hash_floats(values)
+        self.count += len(values)
+        self.missing += len(array) - len(values)
+        self.distinct.add_hashes(hashes)
+        self._add_numeric(values[np.isfinite(values)], pa.types.is_integer(array.type))
+
+    def merge(self, other: "ColumnSketch"):
+        self.dtype = merge_dtypes(self.dtype, other.dtype) if other.dtype else self.dtype
+        self.count += other.count
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        if other.digest is None:
+            return
+        if self.digest is None:
+            self.digest = TDigest(self.compression)
+            self.histogram = FixedBinHistogram(self.histogram_bins, other.histogram.min_exponent)
+        self.digest.merge(other.digest)
+        self.histogram.merge(other.histogram)
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._merge_moments(other.finite, other.mean, other.m2)
+
+    def summary(self) -> Dict[str, Any]:
+        """列の要約（異なり数・分位点は推定値）"""
+        result: Dict[str, Any] = {
+            "dtype": self.dtype,
+            "count": self.count,
+            "missing": self.missing,
+            "distinct_count": min(self.distinct.estimate(), self.count),
+        }
+        if self.digest is None:
+            return result
+        quantiles = self.digest.quantiles(np.array(SUMMARY_QUANTILES), self.minimum, self.maximum)
+        result.update(
+            {
+                "min": self.minimum,
+                "max": self.maximum,
+                "mean": self.mean,
+                # pandasの std() と同じく不偏標準偏差
+                "std": math.sqrt(self.m2 / (self.finite - 1)) if self.finite > 1 else 0.0,
+                "quantiles": {
+                    f"p{round(q * 100):02d}": float(value)
+                    for q, value in zip(SUMMARY_QUANTILES, quantiles)
+                },
+                "histogram": self.histogram.to_dict(),
+            }
+        )
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """アーティファクトに保存する形式"""
+        data: Dict[str, Any] = {
+            "dtype": self.dtype,
+            "count": self.count,
+            "missing": self.missing,
+            "hll": _encode_array(self.distinct.registers),
+        }
+        if self.digest is not None:
+            data.update(
+                {
+                    "min": self.minimum,
+                    "max": self.maximum,
+                    "finite": self.finite,
+                    "mean": self.mean,
+                    "m2": self.m2,
+                    "tdigest": {
+                        "means": _encode_array(self.digest.means),
+                        "weights": _encode_array(self.digest.weights),
+                    },
+                    "histogram": {
+                        "exponent": self.histogram.exponent,
+                        "min_exponent": self.histogram.min_exponent,
+                        "start": self.histogram.start,
+                        "counts": _encode_array(self.histogram.counts),
+                    },
+                }
+            )
+        return data
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], histogram_bins: int, precision: int, compression: int
+    ) -> "ColumnSketch":
+        sketch = cls(histogram_bins, precision, compression)
+        sketch.dtype = data["dtype"]
+        sketch.count = data["count"]
+        sketch.missing = data["missing"]
+        sketch.distinct.registers = _decode_array(data["hll"], np.uint8)
+        if "tdigest" in data:
+            sketch.minimum, sketch.maximum = data["min"], data["max"]
+            sketch.finite, sketch.mean, sketch.m2 = data["finite"], data["mean"], data["m2"]
+            sketch.digest = TDigest(compression)
+            sketch.digest.means = _decode_array(data["tdigest"]["means"], np.float64)
+            sketch.digest.weights = _decode_array(data["tdigest"]["weights"], np.float64)
+            histogram = data["histogram"]
+            sketch.histogram = FixedBinHistogram(histogram_bins, histogram["min_exponent"])
+            sketch.histogram.exponent = histogram["exponent"]
+            sketch.histogram.start = histogram["start"]
+            sketch.histogram.counts = _decode_array(histogram["counts"], np.int64)
+        return sketch
+
+    def _add_numeric(self, values: np.ndarray, is_integer: bool):
+        if len(values) == 0:
+            return
+        if self.digest is None:
+            self.digest = TDigest(self.compression)
+            self.histogram = FixedBinHistogram(self.histogram_bins, 0 if is_integer else None)
+        elif not is_integer:
+            self.histogram.min_exponent = None
+        self.digest.add(values)
+        self.histogram.add(values)
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        mean = float(values.mean())
+        self._merge_moments(len(values), mean, float(np.sum((values - mean) ** 2)))
+
+    def _merge_moments(self, count: int, mean: float, m2: float):
+        """件数・平均・偏差平方和を合成（Chanらの方法）"""
+        total = self.finite + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.finite * count / total
+        self.finite = total
+
+
+class DatasetSketch:
+    """
+    データセットの列ごとのスケッチ
+
+    scan_dataset の集計器（add_batch）として使用し、パートごとに作成したものは
+    merge() で1つにまとめます。sources には集計したS3オブジェクトの
+    (バケット, キー, ETag) を記録し、アーティファクトの再利用時の確認に使います。
+    """
+
+    def __init__(
+        self,
+        histogram_bins: int = DEFAULT_HISTOGRAM_BINS,
+        precision: int = DEFAULT_HLL_PRECISION,
+        compression: int = DEFAULT_TDIGEST_COMPRESSION,
+    ):
+        if histogram_bins < 2:
+            raise ValueError(f"Invalid number of histogram bins {histogram_bins}. Must be >= 2")
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Invalid HyperLogLog precision {precision}. Must be 4-18")
+        if compression < 10:
+            raise ValueError(f"Invalid t-digest compression {compression}. Must be >= 10")
+        self.histogram_bins = histogram_bins
+        self.precision = precision
+        self.compression = compression
+        self.rows = 0
+        self.columns: Dict[str, ColumnSketch] = {}
+        self.sources: List[List[Optional[str]]] = []
+        self.options: Dict[str, Any] = {}
+
+    def add_batch(self, batch: pa.RecordBatch):
+        """Arrowのレコードバッチを集計"""
+        self.rows += batch.num_rows
+        for name, array in zip(batch.schema.names, batch.columns):
+            self._column(name).add_array(array)
+
+    def merge(self, other: "DatasetSketch") -> "DatasetSketch":
+        """
+        他のスケッチ（別のチャンク・パート）をマージ
+
+        Raises:
+            ValueError: パラメーター（ビンの数・精度）が異なる場合
+        """
+        parameters = (self.histogram_bins, self.precision, self.compression)
+        if parameters != (other.histogram_bins, other.precision, other.compression):
+            raise ValueError("Cannot merge dataset sketches built with different parameters")
+        self.rows += other.rows
+        for name, column in other.columns.items():
+            self._column(name).merge(column)
+        self.sources.extend(other.sources)
+        return self
+
+    def summary(self, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        列ごとの要約
+
+        Args:
+            columns: 要約する列（Noneの場合は全列）
+
+        Raises:
+            ValueError: スケッチにない列
+        """
+        names = columns if columns is not None else list(self.columns)
+        missing_columns = [name for name in names if name not in self.columns]
+        if missing_columns:
+            raise ValueError(f"Columns not found in sketch: {', '.join(missing_columns)}")
+        return {
+            "rows": self.rows,
+            "columns": {name: self.columns[name].summary() for name in names},
+        }
+
+    def to_bytes(self) -> bytes:
+        """アーティファクト（gzip圧縮したJSON）に変換"""
+        document = {
+            "format_version": SKETCH_FORMAT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "parameters": {
+                "histogram_bins": self.histogram_bins,
+                "hll_precision": self.precision,
+                "tdigest_compression": self.compression,
+            },
+            "options": self.options,
+            "sources": self.sources,
+            "rows": self.rows,
+            "columns": {name: column.to_dict() for name, column in self.columns.items()},
+        }
+        return gzip.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> "DatasetSketch":
+        """
+        アーティファクトからスケッチを復元
+
+        Raises:
+            ValueError: 不正なアーティファクト・未対応の形式のバージョン
+        """
+        try:
+            document = json.loads(gzip.decompress(content))
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Invalid dataset sketch artifact: {e}") from e
+        version = document.get("format_version")
+        if version != SKETCH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported dataset sketch format version: {version}")
+
+        parameters = document["parameters"]
+        sketch = cls(
+            parameters["histogram_bins"],
+            parameters["hll_precision"],
+            parameters["tdigest_compression"],
+        )
+        sketch.rows = document["rows"]
+        sketch.options = document.get("options", {})
+        sketch.sources = document.get("sources", [])
+        for name, data in document["columns"].items():
+            sketch.columns[name] = ColumnSketch.from_dict(
+                data, sketch.histogram_bins, sketch.precision, sketch.compression
+            )
+        return sketch
+
+    def _column(self, name: str) -> ColumnSketch:
+        if name not in self.columns:
+            self.columns[name] = ColumnSketch(self.histogram_bins, self.precision, self.compression)
+        return self.columns[name]
+
+
+def sketch_artifact_key(key: str) -> str:
+    """
+    データセットのスケッチのアーティファクトのキー
+
+    データセットと同じディレクトリ（プレフィックスの場合はその直下）に、
+    名前が"_"で始まるファイルとして保存します（シャードのパートとしては扱われない）。
+        data/train.csv → data/_train.csv.sketch.json.gz
+        data/shards/ → data/shards/_sketch.json.gz
+    """
+    if key.endswith("/"):
+        return f"{key}_sketch.json.gz"
+    directory, _, name = key.rpartition("/")
+    return f"{directory}/_{name}.sketch.json.gz" if directory else f"_{name}.sketch.json.gz"
+
+
+def build_dataset_sketch(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    file_format: str,
+    columns: Optional[List[str]] = None,
+    histogram_bins: int = DEFAULT_HISTOGRAM_BINS,
+) -> DatasetSketch:
+    """
+    データセットを走査してスケッチを作成
+
+    パートごとに scan_dataset でスケッチを作成し（シャード化されたデータセットは並列）、
+    マージします。各パートのETagは走査の前に取得して sources に記録します。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー（プレフィックス・マニフェストも可）
+        file_format: ファイルフォーマット（csv, parquet, json, jsonl）
+        columns: 集計する列（Noneの場合は全列）
+        histogram_bins: ヒストグラムのビンの数
+
+    Returns:
+        マージしたスケッチ
+    """
+    # パラメーターを走査の前に検証する
+    DatasetSketch(histogram_bins)
+
+    def sketch_part(part_bucket: str, part_key: str) -> DatasetSketch:
+        etag = get_s3_etag(s3_client, part_bucket, part_key)
+        (sketch,), _ = scan_dataset(
+            s3_client,
+            part_bucket,
+            part_key,
+            file_format,
+            lambda: [DatasetSketch(histogram_bins)],
+            columns,
+        )
+        sketch.sources = [[part_bucket, part_key, etag]]
+        return sketch
+
+    attributes = {"aws.s3.bucket": bucket, "aws.s3.key": key}
+    with span("dataset.sketch", attributes) as current:
+        sketches = map_dataset_parts(s3_client, bucket, key, sketch_part)
+        sketch = sketches[0]
+        for other in sketches[1:]:
+            sketch.merge(other)
+        current.set_attribute("mlops.parts", len(sketches))
+    sketch.options = {"file_format": file_format.lower(), "columns": columns}
+    return sketch
+
+
+def load_dataset_sketch(s3_client: Any, bucket: str, key: str) -> Optional[DatasetSketch]:
+    """
+    データセットの隣に保存されたスケッチを読み込む
+
+    スケッチの作成後にデータセットのパートの一覧・ETagが変わっていないことを
+    確認します（パートごとのHEADリクエストのみで、データは読みません）。
+
+    Returns:
+        スケッチ（ない場合・データセットが変更された場合・壊れている場合はNone）
+    """
+    artifact_key = sketch_artifact_key(key)
+    if get_s3_etag(s3_client, bucket, artifact_key) is None:
+        return None
+    try:
+        sketch = DatasetSketch.from_bytes(download_object(s3_client, bucket, artifact_key))
+    except (KeyError, ValueError) as e:
+        logger.warning(f"Ignoring dataset sketch s3://{bucket}/{artifact_key}: {e}")
+        return None
+
+    parts = [
+        [part_bucket, part_key]
+        for part_bucket, part_key in list_dataset_parts(s3_client, bucket, key)
+    ]
+    if parts != [source[:2] for source in sketch.sources]:
+        logger.info(f"Parts of s3://{bucket}/{key} changed since the sketch was built")
+        return None
+    if not s3_objects_unchanged([tuple(source) for source in sketch.sources]):
+        logger.info(f"s3://{bucket}/{key} changed since the sketch was built")
+        return None
+    return sketch
+
+
+def save_dataset_sketch(s3_client: Any, bucket: str, key: str, sketch: DatasetSketch) -> str:
+    """
+    スケッチをデータセットの隣に保存
+
+    Returns:
+        保存したアーティファクトのS3 URI
+    """
+    artifact_key = sketch_artifact_key(key)
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=artifact_key,
+        Body=sketch.to_bytes(),
+        ContentType="application/gzip",
+    )
+    return f"s3://{bucket}/{artifact_key}"
+
+
+def _is_numeric(data_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_decimal(data_type)
+    )
+
+
+def _hash_floats(values: np.ndarray) -> np.ndarray:
+    """
+    浮動小数点数の64ビットのハッシュ
+
+    整数の値（2.0 等）は整数の列と同じく int64 の値でハッシュするため、パートごとに型が
+    異なる列（整数・浮動小数点）でも同じ値は同じハッシュになります。
+    """
+    hashes = pd.util.hash_array(values)
+    integral = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 2.0**63)
+    if integral.any():
+        hashes[integral] = pd.util.hash_array(values[integral].astype(np.int64))
+    return hashes
+
+
+def _hash_values(array: Any) -> np.ndarray:
+    """欠損値を除いた配列の値の64ビットのハッシュ"""
+    if pa.types.is_temporal(array.type):
+        # 日時は値（整数）でハッシュする
+        array = array.cast(pa.int64()) if array.type.bit_width == 64 else array.cast(pa.int32())
+    elif not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        try:
+            array = array.cast(pa.string())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # 入れ子の型等はJSONの表記でハッシュする
+            values = [json.dumps(value, sort_keys=True, default=str) for value in array.to_pylist()]
+            return pd.util.hash_array(np.array(values, dtype=object))
+    return pd.util.hash_array(array.to_numpy(zero_copy_only=False))
+
+
+def _encode_array(values: np.ndarray) -> str:
+    """numpyの配列をリトルエンディアンのバイト列（base64）に変換"""
+    return base64.b64encode(values.astype(values.dtype.newbyteorder("<")).tobytes()).decode("ascii")
+
+
+def _decode_array(data: str, dtype: Any) -> np.ndarray:
+    values = np.frombuffer(base64.b64decode(data), dtype=np.dtype(dtype).newbyteorder("<"))
+    # 書き込み可能な配列にする（マージでレジスター等を更新するため）
+    return values.astype(dtype)
@@ -4,30 +4,46 @@ Load Dataset Tool
 S3からデータセットを読み込むツール
 """
 
-import io
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
-import boto3
-import pandas as pd
 from botocore.exceptions import ClientError
 
+from mcp_server.common.progress import report_progress
+from mcp_server.common.s3_utils import get_client, read_dataset, read_parquet_metadata
+from mcp_server.common.tracing import span
+
+from .dataset_profile import DatasetProfile, scan_dataset
+
 logger = logging.getLogger(__name__)
 
 
-def load_dataset(s3_uri: str, file_format: str = "csv") -> Dict[str, Any]:
+def load_dataset(
+    s3_uri: str,
+    file_format: str = "csv",
+    columns: List[str] = None,
+    filters: List[List[Any]] = None,
+    profile_only: bool = False,
+) -> Dict[str, Any]:
     """
     S3からデータセットを読み込む
 
     Args:
-        s3_uri: S3 URI (例: s3://bucket-name/path/to/file.csv)
-        file_format: ファイルフォーマット (csv, parquet, json)
+        s3_uri: S3 URI (例: s3://bucket-name/path/to/file.csv。末尾が/のプレフィックス・
+            マニフェストを指定するとシャード化されたデータセットの全パートを読み込む)
+        file_format: ファイルフォーマット (csv, parquet, json, jsonl)
+        columns: 読み込む列（省略時は全列。Parquetでは指定した列のみを取得）
+        filters: 行の条件（Parquetのみ。[列, 演算子, 値] のリスト。
+            例: [["date", ">=", "2024-01-01"]]。条件に合わない行グループは取得しない）
+        profile_only: Trueの場合はDataFrameを作らずに、データセットを1回走査して
+            行数・型・欠損値の数・メモリ使用量（推定値）のみを集計する
+            （Parquetは filters 未指定時、フッターの統計情報から集計しデータページを読まない）
 
     Returns:
         読み込んだデータセット情報
 
     Raises:
-        ValueError: 無効なS3 URIまたはファイルフォーマット
+        ValueError: 無効なS3 URI・ファイルフォーマット・列・条件
         ClientError: S3アクセスエラー
     """
     logger.info(f"Loading dataset from {s3_uri} (format: {file_format})")
@@ -44,33 +60,26 @@ def load_dataset(s3_uri: str, file_format: str = "csv") -> Dict[str, Any]:
     bucket, key = parts
 
     try:
-        # S3からデータを読み込み
-        s3_client = boto3.client("s3")
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        file_content = response["Body"].read()
-
-        # ファイルフォーマットに応じて読み込み
-        if file_format.lower() == "csv":
-            df = pd.read_csv(io.BytesIO(file_content))
-        elif file_format.lower() == "parquet":
-            df = pd.read_parquet(io.BytesIO(file_content))
-        elif file_format.lower() == "json":
-            df = pd.read_json(io.BytesIO(file_content))
+        # S3からデータをダウンロードしながら読み込み
+        s3_client = get_client("s3")
+        if profile_only:
+            dataset_info = _profile_dataset(s3_client, bucket, key, file_format, columns, filters)
         else:
-            raise ValueError(
-                f"Unsupported file format: {file_format}. "
-                f"Supported formats: csv, parquet, json"
+            df = read_dataset(
+                s3_client, bucket, key, file_format, columns=columns, filters=filters
             )
-
-        # データセット情報を収集
-        dataset_info = {
-            "rows": len(df),
-            "columns": len(df.columns),
-            "column_names": df.columns.tolist(),
-            "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
-            "memory_usage_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
-            "missing_values": df.isnull().sum().to_dict(),
-        }
+            report_progress("parse", len(df), message=f"Parsed {len(df):,} rows")
+
+            # データセット情報を収集
+            with span("dataset.profile"):
+                dataset_info = {
+                    "rows": len(df),
+                    "columns": len(df.columns),
+                    "column_names": df.columns.tolist(),
+                    "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+                    "memory_usage_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
+                    "missing_values": df.isnull().sum().to_dict(),
+                }
 
         logger.info(
             f"Successfully loaded dataset: {dataset_info['rows']} rows, "
@@ -84,6 +93,7 @@ def load_dataset(s3_uri: str, file_format: str = "csv") -> Dict[str, Any]:
             "bucket": bucket,
             "key": key,
             "file_format": file_format,
+            "profile_only": profile_only,
             "dataset_info": dataset_info,
             # データ本体は返さない（大きすぎる可能性があるため）
             # 必要に応じて別のツールでアクセス
@@ -98,3 +108,34 @@ def load_dataset(s3_uri: str, file_format: str = "csv") -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Failed to load dataset: {str(e)}", exc_info=True)
         raise
+
+
+def _profile_dataset(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    file_format: str,
+    columns: Optional[List[str]],
+    filters: Optional[List[List[Any]]],
+) -> Dict[str, Any]:
+    """
+    DataFrameを作らずにデータセットの情報を集計（profile_only）
+
+    Parquetはフッターの行数・null数から集計します（NaNは欠損に含まれません）。
+    それ以外は scan_dataset でレコードバッチごとに集計します。
+
+    Returns:
+        dataset_info（集計方法 profile_method を含む）
+    """
+    if file_format.lower() == "parquet" and not filters:
+        with span("dataset.profile", {"mlops.profile_method": "parquet_footer"}):
+            profile = DatasetProfile()
+            footers = read_parquet_metadata(s3_client, bucket, key)
+            if all(profile.add_parquet_metadata(footer, columns) for footer in footers):
+                return {**profile.to_dict(), "profile_method": "parquet_footer"}
+        logger.info(f"Parquet footer of {key} has no null counts; scanning data pages")
+
+    (profile,), method = scan_dataset(
+        s3_client, bucket, key, file_format, lambda: [DatasetProfile()], columns, filters
+    )
+    return {**profile.to_dict(), "profile_method": method}
@@ -4,14 +4,31 @@ Preprocess Supervised Learning Data Tool
 教師あり学習用のデータ前処理ツール
 """
 
-import io
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Literal
 
-import boto3
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
+
+from mcp_server.common.arrow_utils import (
+    drop_missing,
+    encode_labels,
+    feature_frame,
+    fill_missing,
+    is_categorical,
+)
+from mcp_server.common.progress import report_progress
+from mcp_server.common.s3_utils import (
+    S3MultipartWriter,
+    get_client,
+    read_table,
+    upload_parallel,
+)
+from mcp_server.common.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +39,7 @@ def preprocess_supervised(
     file_format: str = "csv",
     test_size: float = 0.2,
     normalize: bool = True,
-    handle_missing: str = "drop",
+    handle_missing: Literal["drop", "mean", "median", "mode"] = "drop",
     encode_categorical: bool = True,
     output_s3_uri: str = None,
 ) -> Dict[str, Any]:
@@ -30,9 +47,10 @@ def preprocess_supervised(
     教師あり学習用のデータ前処理を実行
 
     Args:
-        s3_uri: S3 URI (例: s3://bucket-name/path/to/file.csv)
+        s3_uri: S3 URI (例: s3://bucket-name/path/to/file.csv。末尾が/のプレフィックス・
+            マニフェストを指定するとシャード化されたデータセットの全パートを読み込む)
         target_column: ターゲット列名
-        file_format: ファイルフォーマット (csv, parquet, json)
+        file_format: ファイルフォーマット (csv, parquet, json, jsonl)
         test_size: テストデータの割合 (0.0-1.0)
         normalize: 数値変数を正規化するか
         handle_missing: 欠損値の処理方法 (drop, mean, median, mode)
@@ -40,142 +58,149 @@ def preprocess_supervised(
         output_s3_uri: 出力先S3 URI (Noneの場合は自動生成)
 
     Returns:
-        前処理結果
+        前処理結果（ターゲットが欠損していたため除外した行数は dropped_missing_target_rows）
 
     Note:
         実装済みの前処理:
-        - 欠損値処理
-        - カテゴリ変数エンコーディング
+        - 欠損値処理（ターゲットが欠損している行は handle_missing に関わらず除外）
+        - カテゴリ変数エンコーディング（日付・日時の列はpandasで読み込んだ場合と同じ
+          文字列でエンコード。ターゲットは文字列の場合のみエンコード）
         - 数値変数の正規化/標準化
         - 特徴量とターゲットの分割
         - Train/Test split
     """
     logger.info(f"Preprocessing data for supervised learning (target: {target_column})")
 
-    # S3から実際のデータを再読み込み（pandasで処理するため）
+    # S3から実際のデータを再読み込み（Arrowテーブルで処理するため）
     parts = s3_uri[5:].split("/", 1)
     bucket, key = parts
 
-    s3_client = boto3.client("s3")
-    response = s3_client.get_object(Bucket=bucket, Key=key)
-    file_content = response["Body"].read()
-
-    if file_format.lower() == "csv":
-        df = pd.read_csv(io.BytesIO(file_content))
-    elif file_format.lower() == "parquet":
-        df = pd.read_parquet(io.BytesIO(file_content))
-    elif file_format.lower() == "json":
-        df = pd.read_json(io.BytesIO(file_content))
-    else:
-        raise ValueError(f"Unsupported file format: {file_format}")
+    s3_client = get_client("s3")
+    # データ読み込み（pyarrowのマルチスレッドのリーダーでダウンロードしながら解析）
+    table = read_table(s3_client, bucket, key, file_format)
+    report_progress("parse", table.num_rows, message=f"Parsed {table.num_rows:,} rows")
 
     # ターゲット列の存在確認
-    if target_column not in df.columns:
+    if target_column not in table.column_names:
         raise ValueError(
             f"Target column '{target_column}' not found in dataset. "
-            f"Available columns: {df.columns.tolist()}"
+            f"Available columns: {table.column_names}"
         )
 
-    logger.info(f"Original dataset shape: {df.shape}")
+    logger.info(f"Original dataset shape: {(table.num_rows, table.num_columns)}")
 
     # 1. 欠損値処理
-    initial_rows = len(df)
-    if handle_missing == "drop":
-        df = df.dropna()
-        logger.info(f"Dropped {initial_rows - len(df)} rows with missing values")
-    elif handle_missing == "mean":
-        numeric_cols = df.select_dtypes(include=["number"]).columns
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
-    elif handle_missing == "median":
-        numeric_cols = df.select_dtypes(include=["number"]).columns
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-    elif handle_missing == "mode":
-        for col in df.columns:
-            df[col] = df[col].fillna(
-                df[col].mode()[0] if not df[col].mode().empty else None
-            )
+    with span("preprocess.handle_missing", {"mlops.strategy": handle_missing}):
+        initial_rows = table.num_rows
+        if handle_missing == "drop":
+            table = drop_missing(table)
+            logger.info(f"Dropped {initial_rows - table.num_rows} rows with missing values")
+        elif handle_missing in ("mean", "median", "mode"):
+            table = fill_missing(table, handle_missing)
+
+        # ターゲットが欠損している行は学習に使えないため除外（"nan" というクラスにしない）
+        target_missing = pc.is_null(table.column(target_column), nan_is_null=True)
+        dropped_targets = pc.sum(target_missing).as_py() or 0
+        if dropped_targets:
+            table = table.filter(pc.invert(target_missing))
+            logger.warning(f"Dropped {dropped_targets} rows with missing target values")
 
     # 2. 特徴量とターゲットの分割
-    X = df.drop(columns=[target_column])
-    y = df[target_column]
+    features = table.drop_columns([target_column])
+    target = table.column(target_column)
 
-    # 3. カテゴリ変数のエンコーディング
+    # 3. カテゴリ変数のエンコーディング（文字列のままArrow上で番号に変換）
     categorical_cols = []
     label_encoders = {}
 
     if encode_categorical:
-        categorical_cols = X.select_dtypes(include=["object"]).columns.tolist()
-        for col in categorical_cols:
-            le = LabelEncoder()
-            X[col] = le.fit_transform(X[col].astype(str))
-            label_encoders[col] = {
-                "classes": le.classes_.tolist(),
-            }
+        categorical_cols = [
+            field.name for field in features.schema if is_categorical(field.type)
+        ]
+        with span("preprocess.encode_categorical", {"mlops.columns": len(categorical_cols)}):
+            for col in categorical_cols:
+                codes, classes = encode_labels(features.column(col))
+                index = features.schema.get_field_index(col)
+                features = features.set_column(index, col, codes)
+                label_encoders[col] = {
+                    "classes": classes,
+                }
         logger.info(f"Encoded {len(categorical_cols)} categorical columns")
 
-    # ターゲットがカテゴリの場合もエンコード
-    target_encoder = None
-    if y.dtype == "object":
-        target_encoder = LabelEncoder()
-        y = target_encoder.fit_transform(y)
-        logger.info(
-            f"Encoded target column with {len(target_encoder.classes_)} classes"
+    # ターゲットが文字列の場合もエンコード（日付・日時のターゲットはそのまま）
+    target_classes = None
+    if (
+        pa.types.is_string(target.type)
+        or pa.types.is_large_string(target.type)
+        or pa.types.is_dictionary(target.type)
+    ):
+        target, target_classes = encode_labels(target)
+        logger.info(f"Encoded target column with {len(target_classes)} classes")
+
+    y = target.to_numpy()
+
+    # 4. Train/Test split（行番号を分割し、特徴量・ターゲットから同じ行を取り出す）
+    with span("preprocess.train_test_split"):
+        train_rows, test_rows = train_test_split(
+            np.arange(features.num_rows), test_size=test_size, random_state=42
         )
+    y_train, y_test = y[train_rows], y[test_rows]
 
-    # 4. Train/Test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=42
-    )
-
-    logger.info(f"Split dataset: train={len(X_train)}, test={len(X_test)}")
+    logger.info(f"Split dataset: train={len(train_rows)}, test={len(test_rows)}")
 
     # 5. 数値変数の正規化/標準化
     scaler = None
     if normalize:
+        # 特徴量は1つの配列にまとめる（scikit-learnの処理にはコピーせずに渡す）
+        X = feature_frame(features)
+        X_train, X_test = X.iloc[train_rows], X.iloc[test_rows]
         scaler = StandardScaler()
-        X_train = pd.DataFrame(
-            scaler.fit_transform(X_train),
-            columns=X_train.columns,
-            index=X_train.index,
-        )
-        X_test = pd.DataFrame(
-            scaler.transform(X_test),
-            columns=X_test.columns,
-            index=X_test.index,
-        )
+        with span("preprocess.standard_scaler"):
+            X_train = pd.DataFrame(
+                scaler.fit_transform(X_train),
+                columns=X_train.columns,
+                index=X_train.index,
+            )
+            X_test = pd.DataFrame(
+                scaler.transform(X_test),
+                columns=X_test.columns,
+                index=X_test.index,
+            )
         logger.info("Applied StandardScaler normalization")
+    else:
+        # 正規化しない場合は列ごとの型（整数・エンコードした番号等）のまま保存する
+        X_train = features.take(train_rows).to_pandas()
+        X_test = features.take(test_rows).to_pandas()
 
     # 6. S3に保存
     if output_s3_uri is None:
-        # 自動生成: 元のパスに "-processed" を追加
-        base_key = key.rsplit(".", 1)[0]
+        # 自動生成: 元のパス（プレフィックスの場合は末尾の"/"を除く）に "-processed" を追加
+        base_key = key.rstrip("/") if key.endswith("/") else key.rsplit(".", 1)[0]
         output_s3_uri = f"s3://{bucket}/{base_key}-processed/"
 
     output_parts = output_s3_uri[5:].rstrip("/").split("/", 1)
     output_bucket = output_parts[0]
     output_prefix = output_parts[1] if len(output_parts) > 1 else ""
 
-    # 各データセットを保存
-    for name, data_x, data_y in [
-        ("train", X_train, y_train),
-        ("test", X_test, y_test),
-    ]:
+    def save_split(name: str, data_x: pd.DataFrame, data_y: Any):
         # 特徴量とターゲットを結合
         combined = data_x.copy()
         combined[target_column] = data_y
 
-        # CSV形式で保存
-        csv_buffer = io.StringIO()
-        combined.to_csv(csv_buffer, index=False)
-
-        s3_client.put_object(
-            Bucket=output_bucket,
-            Key=f"{output_prefix}/{name}.csv",
-            Body=csv_buffer.getvalue(),
-        )
-        logger.info(
-            f"Saved {name} dataset to s3://{output_bucket}/{output_prefix}/{name}.csv"
-        )
+        # CSV形式で保存（書き出しながらパート単位でアップロード）
+        output_key = f"{output_prefix}/{name}.csv"
+        with span("pandas.to_csv", {"mlops.dataset": name, "mlops.rows": len(combined)}):
+            with S3MultipartWriter(s3_client, output_bucket, output_key) as writer:
+                combined.to_csv(writer, index=False)
+        logger.info(f"Saved {name} dataset to s3://{output_bucket}/{output_key}")
+
+    # 各データセットを並列に保存
+    upload_parallel(
+        [
+            lambda: save_split("train", X_train, y_train),
+            lambda: save_split("test", X_test, y_test),
+        ]
+    )
 
     # 骨格実装: ダミー結果を返す
     return {
@@ -185,14 +210,13 @@ def preprocess_supervised(
             "target_column": target_column,
             "num_features": len(X_train.columns),
             "feature_names": X_train.columns.tolist(),
-            "num_samples": len(df),
+            "num_samples": table.num_rows,
+            "dropped_missing_target_rows": dropped_targets,
             "train_samples": len(X_train),
             "test_samples": len(X_test),
             "categorical_columns": categorical_cols,
             "normalized": normalize,
-            "target_classes": target_encoder.classes_.tolist()
-            if target_encoder
-            else None,
+            "target_classes": target_classes,
             "output_s3_uri": output_s3_uri,
         },
     }
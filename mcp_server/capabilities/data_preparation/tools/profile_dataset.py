@@ -0,0 +1,113 @@
+"""
+Profile Dataset Tool
+
+データセットの列ごとの異なり数・分位点・ヒストグラムをスケッチで集計するツール
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from mcp_server.common.s3_utils import get_client
+
+from .dataset_sketch import (
+    DEFAULT_HISTOGRAM_BINS,
+    DatasetSketch,
+    build_dataset_sketch,
+    load_dataset_sketch,
+    save_dataset_sketch,
+    sketch_artifact_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def profile_dataset(
+    s3_uri: str,
+    file_format: str = "csv",
+    columns: List[str] = None,
+    histogram_bins: int = DEFAULT_HISTOGRAM_BINS,
+    refresh: bool = False,
+    save: bool = True,
+) -> Dict[str, Any]:
+    """
+    データセットの列ごとの異なり数・分位点・ヒストグラムを集計
+
+    データセットを1回走査してマージ可能なスケッチ（HyperLogLog・t-digest・固定ビンの
+    ヒストグラム）を作成し、データセットの隣（data/train.csv なら
+    data/_train.csv.sketch.json.gz）に保存します。保存済みのスケッチは、作成後に
+    データセットが変更されていなければ再走査せずに使用します。
+
+    Args:
+        s3_uri: S3 URI (例: s3://bucket-name/path/to/file.csv。末尾が/のプレフィックス・
+            マニフェストを指定するとパートごとに並列に集計してマージする)
+        file_format: ファイルフォーマット (csv, parquet, json, jsonl)
+        columns: 集計する列（省略時は全列）
+        histogram_bins: ヒストグラムのビンの数（幅は2のべき乗。値のあるビンは半分以上）
+        refresh: Trueの場合は保存済みのスケッチを使わずに走査し直す
+        save: Trueの場合は作成したスケッチをデータセットの隣に保存する
+
+    Returns:
+        列ごとの要約（異なり数・分位点は推定値。数値の列は最小値・最大値・平均・
+        標準偏差・分位点・ヒストグラムを含む）
+
+    Raises:
+        ValueError: 無効なS3 URI・ファイルフォーマット・列・ビンの数
+        ClientError: S3アクセスエラー
+    """
+    logger.info(f"Profiling dataset {s3_uri} (format: {file_format})")
+
+    if not s3_uri.startswith("s3://"):
+        raise ValueError(f"Invalid S3 URI: {s3_uri}. Must start with 's3://'")
+    parts = s3_uri[5:].split("/", 1)
+    if len(parts) != 2:
+        raise ValueError(f"Invalid S3 URI format: {s3_uri}")
+    bucket, key = parts
+
+    s3_client = get_client("s3")
+    sketch = None
+    if not refresh:
+        sketch = _reusable_sketch(
+            load_dataset_sketch(s3_client, bucket, key), file_format, columns, histogram_bins
+        )
+    reused = sketch is not None
+
+    sketch_uri = f"s3://{bucket}/{sketch_artifact_key(key)}" if reused else None
+    if sketch is None:
+        sketch = build_dataset_sketch(s3_client, bucket, key, file_format, columns, histogram_bins)
+        if save:
+            sketch_uri = save_dataset_sketch(s3_client, bucket, key, sketch)
+
+    summary = sketch.summary(columns)
+    logger.info(
+        f"Profiled dataset: {summary['rows']} rows, {len(summary['columns'])} columns "
+        f"(sketch {'reused' if reused else 'built'})"
+    )
+    return {
+        "status": "success",
+        "message": f"Dataset profiled from {s3_uri}",
+        "s3_uri": s3_uri,
+        "file_format": file_format,
+        "sketch_uri": sketch_uri,
+        "reused_sketch": reused,
+        "rows": summary["rows"],
+        "columns": summary["columns"],
+    }
+
+
+def _reusable_sketch(
+    sketch: Optional[DatasetSketch],
+    file_format: str,
+    columns: Optional[List[str]],
+    histogram_bins: int,
+) -> Optional[DatasetSketch]:
+    """保存済みのスケッチが同じフォーマット・ビンの数で、指定した列を全て含む場合に返す"""
+    if sketch is None:
+        return None
+    if sketch.options.get("file_format") != file_format.lower():
+        return None
+    if sketch.histogram_bins != histogram_bins:
+        return None
+    if sketch.options.get("columns") is not None:
+        if columns is None or not set(columns) <= set(sketch.columns):
+            return None
+    return sketch
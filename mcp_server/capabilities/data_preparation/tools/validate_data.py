@@ -7,6 +7,12 @@ Validate Data Tool
 import logging
 from typing import Any, Dict, List
 
+from mcp_server.common.s3_utils import get_client
+from mcp_server.common.tracing import span
+
+from .dataset_profile import DatasetProfile, scan_dataset
+from .validation_rules import RuleEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,29 +21,53 @@ def validate_data(
     file_format: str = "csv",
     required_columns: List[str] = None,
     max_missing_ratio: float = 0.5,
+    rules: List[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     データのバリデーションを実行
 
     Args:
         s3_uri: S3 URI (例: s3://bucket-name/path/to/file.csv)
-        file_format: ファイルフォーマット (csv, parquet, json)
+        file_format: ファイルフォーマット (csv, parquet, json, jsonl)
         required_columns: 必須カラムのリスト (Noneの場合はチェックしない)
         max_missing_ratio: 許容する欠損値の割合 (0.0-1.0)
+        rules: バリデーションルールのリスト（例: [{"type": "range", "column": "age",
+            "min": 0}]）。種類は range, allowed_values, regex, unique, not_null,
+            compare, coercible。severityが "warning" のルールの違反は警告になる
 
     Returns:
         バリデーション結果
 
     Raises:
-        ValueError: バリデーションエラー
+        ValueError: 無効なS3 URI・ファイルフォーマット・ルール
     """
     logger.info(f"Validating data from {s3_uri}")
 
-    # load_datasetツールを使用してデータを読み込み
-    from .load_dataset import load_dataset
+    if rules:
+        # プロファイルと全ルールの評価を、データセットの1回の走査でまとめて行う
+        if not s3_uri.startswith("s3://"):
+            raise ValueError(f"Invalid S3 URI: {s3_uri}. Must start with 's3://'")
+        parts = s3_uri[5:].split("/", 1)
+        if len(parts) != 2:
+            raise ValueError(f"Invalid S3 URI format: {s3_uri}")
+        bucket, key = parts
+        RuleEngine(rules)  # 走査の前にルールを検証
+        (profile, engine), scan_method = scan_dataset(
+            get_client("s3"),
+            bucket,
+            key,
+            file_format,
+            lambda: [DatasetProfile(), RuleEngine(rules)],
+        )
+        dataset_info = profile.to_dict()
+    else:
+        # load_datasetツールのプロファイル（DataFrameを作らない）を使用
+        from .load_dataset import load_dataset
 
-    load_result = load_dataset(s3_uri=s3_uri, file_format=file_format)
-    dataset_info = load_result["dataset_info"]
+        with span("data_preparation.load_dataset"):
+            load_result = load_dataset(s3_uri=s3_uri, file_format=file_format, profile_only=True)
+        dataset_info = load_result["dataset_info"]
+        engine = None
 
     validation_results = {
         "is_valid": True,
@@ -112,7 +142,32 @@ def validate_data(
         "memory_mb": round(dataset_info["memory_usage_mb"], 2),
     }
 
-    # 5. サマリー
+    # 5. ルールチェック
+    if engine is not None:
+        rule_results = engine.results()
+        for result in rule_results:
+            if result["passed"]:
+                continue
+            if "error" in result:
+                message = f"Rule '{result['name']}' could not be evaluated: {result['error']}"
+            else:
+                message = (
+                    f"Rule '{result['name']}' failed: {result['violations']} violations "
+                    f"({result['violation_ratio'] * 100:.2f}%)"
+                )
+            if result["severity"] == "warning":
+                validation_results["warnings"].append(message)
+            else:
+                validation_results["is_valid"] = False
+                validation_results["errors"].append(message)
+        validation_results["checks"]["rules"] = {
+            "scan_method": scan_method,
+            "passed": sum(result["passed"] for result in rule_results),
+            "failed": sum(not result["passed"] for result in rule_results),
+            "results": rule_results,
+        }
+
+    # 6. サマリー
     logger.info(
         f"Validation completed: valid={validation_results['is_valid']}, "
         f"errors={len(validation_results['errors'])}, "
@@ -0,0 +1,342 @@
+"""
+Validation Rules
+
+validate_data の宣言的なバリデーションルール。
+
+ルールは辞書（JSON）で指定し、作成時にArrowの列演算（pyarrow.compute）に変換します。
+RuleEngine はレコードバッチごとに全ルールの違反（真偽値のマスク）をまとめて計算するため、
+データセットの走査は1回で済みます。欠損値はnot_null以外のルールでは違反としません。
+regex はRE2の部分一致です（全体に一致させる場合は ^...$ を指定）。
+
+ルールの例:
+    {"type": "range", "column": "age", "min": 0, "max": 120}
+    {"type": "allowed_values", "column": "status", "values": ["active", "inactive"]}
+    {"type": "regex", "column": "email", "pattern": "^[^@]+@[^@]+$"}
+    {"type": "unique", "columns": ["user_id", "date"]}
+    {"type": "not_null", "column": "user_id"}
+    {"type": "compare", "left": "start_date", "op": "<=", "right": "end_date"}
+    {"type": "coercible", "column": "price", "dtype": "float"}
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+RULE_TYPES = ("range", "allowed_values", "regex", "unique", "not_null", "compare", "coercible")
+
+# ルールごとに返す違反の例の数（デフォルト）
+DEFAULT_MAX_SAMPLES = 5
+
+# compare の演算子 → pyarrowの比較関数
+_COMPARE_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "==": pc.equal,
+    "!=": pc.not_equal,
+    "<": pc.less,
+    "<=": pc.less_equal,
+    ">": pc.greater,
+    ">=": pc.greater_equal,
+}
+
+# coercible で文字列の列を検査する正規表現（pandasの to_numeric で変換できる表記）
+_COERCIBLE_PATTERNS = {
+    "int": r"^\s*[+-]?\d+\s*$",
+    "float": r"(?i)^\s*([+-]?(\d+(\.\d*)?|\.\d+)(e[+-]?\d+)?|[+-]?(inf|infinity)|nan)\s*$",
+    "bool": r"(?i)^\s*(true|false|1|0|yes|no)\s*$",
+}
+COERCIBLE_DTYPES = ("int", "float", "bool", "datetime")
+
+
+class Rule:
+    """
+    1つのバリデーションルール
+
+    violations() でレコードバッチの各行が違反か（True）を返します。
+    unique は行をまたいで判定するため、RuleEngine がキーごとの出現回数を数えます。
+    バッチごとに重複を除いてから数えるため、メモリ使用量は行数ではなくキーの異なり数に
+    比例します（欠損を含むキーは対象外）。
+    """
+
+    def __init__(self, spec: Dict[str, Any], index: int):
+        """
+        Args:
+            spec: ルールの辞書
+            index: ルールの番号（名前の省略時に使用）
+
+        Raises:
+            ValueError: 不正なルール
+        """
+        if not isinstance(spec, dict):
+            raise ValueError(f"Rule #{index} must be an object, got {type(spec).__name__}")
+        self.spec = spec
+        self.type = spec.get("type")
+        if self.type not in RULE_TYPES:
+            raise ValueError(
+                f"Unsupported rule type '{self.type}' in rule #{index}. "
+                f"Supported types: {', '.join(RULE_TYPES)}"
+            )
+        if self.type == "compare":
+            self.columns = [self._require("left"), self._require("right")]
+        elif self.type == "unique":
+            columns = spec.get("columns") or [self._require("column")]
+            self.columns = [columns] if isinstance(columns, str) else list(columns)
+        else:
+            self.columns = [self._require("column")]
+        self.name = spec.get("name") or f"{self.type}:{','.join(self.columns)}"
+        self.severity = spec.get("severity", "error")
+        if self.severity not in ("error", "warning"):
+            raise ValueError(f"Invalid severity '{self.severity}' in rule '{self.name}'")
+        self._check = self._compile()
+
+    def violations(self, batch: pa.RecordBatch) -> pa.Array:
+        """レコードバッチの各行が違反か（欠損値は違反としない）"""
+        return pc.fill_null(self._check(batch), False)
+
+    def _require(self, field: str) -> Any:
+        if field not in self.spec:
+            raise ValueError(f"Rule '{self.type}' requires '{field}': {self.spec}")
+        return self.spec[field]
+
+    def _compile(self) -> Callable[[pa.RecordBatch], Any]:
+        """ルールをレコードバッチ → 違反のマスクの関数に変換"""
+        spec = self.spec
+        column = self.columns[0]
+
+        if self.type == "not_null":
+            return lambda batch: pc.is_null(batch.column(column), nan_is_null=True)
+
+        if self.type == "range":
+            if spec.get("min") is None and spec.get("max") is None:
+                raise ValueError(f"Rule '{self.name}' requires 'min' and/or 'max'")
+            inclusive = spec.get("inclusive", True)
+
+            def check_range(batch: pa.RecordBatch) -> Any:
+                values = batch.column(column)
+                outside = None
+                for bound, op in (
+                    ("min", pc.less if inclusive else pc.less_equal),
+                    ("max", pc.greater if inclusive else pc.greater_equal),
+                ):
+                    if spec.get(bound) is None:
+                        continue
+                    mask = op(values, _scalar(spec[bound], values.type))
+                    outside = mask if outside is None else pc.or_(outside, mask)
+                return outside
+
+            return check_range
+
+        if self.type == "allowed_values":
+            allowed = self._require("values")
+            if not isinstance(allowed, list):
+                raise ValueError(f"Rule '{self.name}' requires a list of 'values'")
+
+            def check_allowed(batch: pa.RecordBatch) -> Any:
+                values = batch.column(column)
+                value_set = pa.array(allowed)
+                try:
+                    value_set = value_set.cast(values.type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                    # 型が異なる場合は文字列として比較
+                    values, value_set = _as_string(values), _as_string(value_set)
+                return pc.and_(pc.is_valid(values), pc.invert(pc.is_in(values, value_set)))
+
+            return check_allowed
+
+        if self.type == "regex":
+            pattern = self._require("pattern")
+            _check_pattern(pattern, self.name)
+            return lambda batch: pc.invert(
+                pc.match_substring_regex(_as_string(batch.column(column)), pattern)
+            )
+
+        if self.type == "compare":
+            op = spec.get("op")
+            if op not in _COMPARE_OPS:
+                raise ValueError(
+                    f"Invalid operator '{op}' in rule '{self.name}'. "
+                    f"Supported operators: {', '.join(_COMPARE_OPS)}"
+                )
+            left, right = self.columns
+            return lambda batch: pc.invert(
+                _COMPARE_OPS[op](batch.column(left), batch.column(right))
+            )
+
+        if self.type == "coercible":
+            dtype = self._require("dtype")
+            if dtype not in COERCIBLE_DTYPES:
+                raise ValueError(
+                    f"Invalid dtype '{dtype}' in rule '{self.name}'. "
+                    f"Supported dtypes: {', '.join(COERCIBLE_DTYPES)}"
+                )
+            date_format = spec.get("format", "%Y-%m-%d")
+            return lambda batch: _not_coercible(batch.column(column), dtype, date_format)
+
+        # unique は行をまたいで判定するため、バッチごとの違反はない（RuleEngine._add_keys で数える）
+        return lambda batch: pa.nulls(batch.num_rows, pa.bool_())
+
+
+class RuleEngine:
+    """
+    全ルールをレコードバッチごとにまとめて評価し、ルールごとの違反数と例を集計
+
+    DatasetProfile と同じく add_batch でバッチを受け取るため、1回の走査で
+    プロファイルとバリデーションを同時に行えます。
+    """
+
+    def __init__(self, specs: List[Dict[str, Any]], max_samples: int = DEFAULT_MAX_SAMPLES):
+        """
+        Args:
+            specs: ルールの辞書のリスト
+            max_samples: ルールごとに返す違反の例の数
+
+        Raises:
+            ValueError: 不正なルール
+        """
+        self.rules = [Rule(spec, index) for index, spec in enumerate(specs)]
+        self.max_samples = max_samples
+        self.rows = 0
+        self._violations = [0] * len(self.rules)
+        self._samples: List[List[Dict[str, Any]]] = [[] for _ in self.rules]
+        self._errors: List[Optional[str]] = [None] * len(self.rules)
+        # unique のキー（値のタプル）ごとの出現回数（異なり数に比例するメモリのみ保持）
+        self._keys: List[Dict[tuple, int]] = [{} for _ in self.rules]
+
+    def add_batch(self, batch: pa.RecordBatch):
+        """レコードバッチの全行を全ルールで評価"""
+        for index, rule in enumerate(self.rules):
+            if self._errors[index] is not None:
+                continue
+            missing = [column for column in rule.columns if column not in batch.schema.names]
+            if missing:
+                self._errors[index] = f"Columns not found in dataset: {', '.join(missing)}"
+                continue
+            if rule.type == "unique":
+                self._add_keys(index, batch)
+                continue
+            try:
+                mask = rule.violations(batch)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+                self._errors[index] = f"Rule cannot be applied to the column types: {e}"
+                continue
+            count = pc.sum(mask).as_py() or 0
+            if count:
+                self._violations[index] += count
+                self._add_samples(index, batch, mask)
+        self.rows += batch.num_rows
+
+    def results(self) -> List[Dict[str, Any]]:
+        """ルールごとの結果（名前・種類・列・合否・違反数・違反の例）"""
+        results = []
+        for index, rule in enumerate(self.rules):
+            samples = self._samples[index]
+            if rule.type == "unique" and self._errors[index] is None:
+                samples = self._duplicate_samples(index)
+            result = {
+                "name": rule.name,
+                "type": rule.type,
+                "columns": rule.columns,
+                "severity": rule.severity,
+                "passed": self._errors[index] is None and self._violations[index] == 0,
+                "violations": self._violations[index],
+                "violation_ratio": (
+                    round(self._violations[index] / self.rows, 4) if self.rows else 0.0
+                ),
+                "samples": samples,
+            }
+            if self._errors[index] is not None:
+                result["error"] = self._errors[index]
+            results.append(result)
+        return results
+
+    def _add_samples(self, index: int, batch: pa.RecordBatch, mask: Any):
+        """違反の例（行番号と値）を max_samples 件まで記録"""
+        samples = self._samples[index]
+        remaining = self.max_samples - len(samples)
+        if remaining <= 0:
+            return
+        rows = pc.indices_nonzero(mask)[:remaining]
+        values = batch.select(self.rules[index].columns).take(rows).to_pylist()
+        for row, value in zip(rows.to_pylist(), values):
+            samples.append({"row": self.rows + row, "values": _json_values(value)})
+
+    def _add_keys(self, index: int, batch: pa.RecordBatch):
+        """
+        unique のキーの出現回数にバッチを加え、重複（2回目以降の出現）を数える
+
+        バッチ内で重複を除いてから辞書に加えるため、保持するのはキーの異なり数分のみです。
+        pandasのチャンクから変換したバッチは型が異なることがある（1 と 1.0 等）が、
+        Pythonの値として比較するため同じキーとして数えます。
+        """
+        columns = self.rules[index].columns
+        keys = pa.Table.from_batches([batch.select(columns)])
+        for column in columns:
+            keys = keys.filter(pc.is_valid(keys.column(column)))
+        if keys.num_rows == 0:
+            return
+        counts = keys.group_by(columns).aggregate([([], "count_all")])
+        seen = self._keys[index]
+        values = zip(*(counts.column(column).to_pylist() for column in columns))
+        for key, count in zip(values, counts.column("count_all").to_pylist()):
+            previous = seen.get(key, 0)
+            seen[key] = previous + count
+            self._violations[index] += count if previous else count - 1
+
+    def _duplicate_samples(self, index: int) -> List[Dict[str, Any]]:
+        """重複したキーの例（出現回数と値）を max_samples 件まで返す"""
+        columns = self.rules[index].columns
+        samples = []
+        for key, count in self._keys[index].items():
+            if len(samples) >= self.max_samples:
+                break
+            if count > 1:
+                samples.append({"count": count, "values": _json_values(dict(zip(columns, key)))})
+        return samples
+
+
+def _scalar(value: Any, data_type: pa.DataType) -> Any:
+    """ルールの値（JSON）を列の型に変換（日時の列には "2024-01-01" 等の文字列も指定可能）"""
+    try:
+        return pa.scalar(value).cast(data_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return value
+
+
+def _as_string(values: Any) -> Any:
+    return values if pa.types.is_string(values.type) else pc.cast(values, pa.string())
+
+
+def _check_pattern(pattern: str, name: str):
+    """正規表現をRE2として検証（不正な場合は走査を始める前にエラー）"""
+    try:
+        pc.match_substring_regex(pa.array([""], pa.string()), pattern)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid regex in rule '{name}': {e}") from e
+
+
+def _not_coercible(values: Any, dtype: str, date_format: str) -> Any:
+    """値を指定した型に変換できない行（欠損はnull）"""
+    data_type = values.type
+    if dtype == "datetime":
+        if pa.types.is_temporal(data_type):
+            return pa.nulls(len(values), pa.bool_())
+        parsed = pc.strptime(_as_string(values), format=date_format, unit="s", error_is_null=True)
+        return pc.and_(pc.is_valid(values), pc.is_null(parsed))
+    if pa.types.is_integer(data_type) or pa.types.is_boolean(data_type):
+        return pa.nulls(len(values), pa.bool_())
+    if pa.types.is_floating(data_type):
+        if dtype == "float":
+            return pa.nulls(len(values), pa.bool_())
+        # 整数・真偽値には小数部のない値のみ変換できる（NaNは欠損として扱う）
+        return pc.and_(pc.invert(pc.is_nan(values)), pc.not_equal(pc.floor(values), values))
+    return pc.invert(pc.match_substring_regex(_as_string(values), _COERCIBLE_PATTERNS[dtype]))
+
+
+def _json_values(row: Dict[str, Any]) -> Dict[str, Any]:
+    """違反の例の値をJSONで返せる型にする（日時等は文字列）"""
+    return {
+        key: value if value is None or isinstance(value, (bool, int, float, str)) else str(value)
+        for key, value in row.items()
+    }
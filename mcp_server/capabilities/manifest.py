@@ -0,0 +1,202 @@
+"""
+Capability Manifest
+
+サーバー起動時に読み込む軽量なCapability/ツール定義。
+このモジュールは重い依存をインポートしないため、起動時に
+Capability本体（sklearn, pandas, boto3等）をロードせずにツール一覧を提供できます。
+入力スキーマはエントリーポイントが指すツール関数のシグネチャから生成されます。
+
+Capabilityにツールを追加した場合は、ここにも定義を追加してください。
+"""
+
+from ..registry import CapabilitySpec, ToolSpec
+
+CAPABILITY_MANIFEST = (
+    CapabilitySpec(
+        name="data_preparation",
+        module="mcp_server.capabilities.data_preparation.capability",
+        class_name="DataPreparationCapability",
+        tools=(
+            ToolSpec(
+                "load_dataset",
+                "mcp_server.capabilities.data_preparation.tools.load_dataset:load_dataset",
+                "S3からデータセットを読み込む",
+            ),
+            ToolSpec(
+                "validate_data",
+                "mcp_server.capabilities.data_preparation.tools.validate_data:validate_data",
+                "データのバリデーションを実行",
+            ),
+            ToolSpec(
+                "preprocess_supervised",
+                "mcp_server.capabilities.data_preparation.tools.preprocess_supervised:preprocess_supervised",
+                "教師あり学習用のデータ前処理",
+            ),
+            ToolSpec(
+                "profile_dataset",
+                "mcp_server.capabilities.data_preparation.tools.profile_dataset:profile_dataset",
+                "データセットの列ごとの異なり数・分位点・ヒストグラムを集計",
+            ),
+        ),
+    ),
+    CapabilitySpec(
+        name="ml_training",
+        module="mcp_server.capabilities.ml_training.capability",
+        class_name="MLTrainingCapability",
+        tools=(
+            ToolSpec(
+                "train_classification",
+                "mcp_server.capabilities.ml_training.tools.train_classification:train_classification",
+                "分類モデルを学習 (Random Forest, Logistic Regression, Neural Network)",
+            ),
+            ToolSpec(
+                "train_regression",
+                "mcp_server.capabilities.ml_training.tools.train_regression:train_regression",
+                "回帰モデルを学習 (Random Forest, Linear Regression, Ridge, Neural Network)",
+            ),
+            ToolSpec(
+                "train_clustering",
+                "mcp_server.capabilities.ml_training.tools.train_clustering:train_clustering",
+                "クラスタリングモデルを学習 (KMeans, DBSCAN, PCA)",
+            ),
+        ),
+    ),
+    CapabilitySpec(
+        name="ml_evaluation",
+        module="mcp_server.capabilities.ml_evaluation.capability",
+        class_name="MLEvaluationCapability",
+        tools=(
+            ToolSpec(
+                "evaluate_classification",
+                "mcp_server.capabilities.ml_evaluation.tools.evaluate_classification:evaluate_classification",
+                "分類モデルを評価 (accuracy, precision, recall, F1, confusion matrix)",
+            ),
+            ToolSpec(
+                "evaluate_regression",
+                "mcp_server.capabilities.ml_evaluation.tools.evaluate_regression:evaluate_regression",
+                "回帰モデルを評価 (R², MAE, MSE, RMSE)",
+            ),
+            ToolSpec(
+                "evaluate_clustering",
+                "mcp_server.capabilities.ml_evaluation.tools.evaluate_clustering:evaluate_clustering",
+                "クラスタリングモデルを評価 (silhouette score, Davies-Bouldin index)",
+            ),
+        ),
+    ),
+    CapabilitySpec(
+        name="model_registry",
+        module="mcp_server.capabilities.model_registry.capability",
+        class_name="ModelRegistryCapability",
+        tools=(
+            ToolSpec(
+                "register_model",
+                "mcp_server.capabilities.model_registry.tools.register_model:register_model",
+                "モデルをレジストリに登録 (metadata, tags付き)",
+            ),
+            ToolSpec(
+                "list_models",
+                "mcp_server.capabilities.model_registry.tools.list_models:list_models",
+                "登録されているモデルを一覧表示",
+            ),
+            ToolSpec(
+                "get_model",
+                "mcp_server.capabilities.model_registry.tools.get_model:get_model",
+                "モデル情報を取得",
+            ),
+            ToolSpec(
+                "update_model_status",
+                "mcp_server.capabilities.model_registry.tools.update_model_status:update_model_status",
+                "モデルのステータスを更新 (registered, staging, production, archived)",
+            ),
+            ToolSpec(
+                "delete_model",
+                "mcp_server.capabilities.model_registry.tools.delete_model:delete_model",
+                "モデルを削除",
+            ),
+        ),
+    ),
+    CapabilitySpec(
+        name="model_packaging",
+        module="mcp_server.capabilities.model_packaging.capability",
+        class_name="ModelPackagingCapability",
+        tools=(
+            ToolSpec(
+                "create_model_package",
+                "mcp_server.capabilities.model_packaging.tools.create_model_package:create_model_package",
+                "モデルをデプロイ可能なパッケージに変換 (tar.gz)",
+            ),
+            ToolSpec(
+                "create_dockerfile",
+                "mcp_server.capabilities.model_packaging.tools.create_dockerfile:create_dockerfile",
+                "モデル用のDockerfileを生成",
+            ),
+            ToolSpec(
+                "validate_package",
+                "mcp_server.capabilities.model_packaging.tools.validate_package:validate_package",
+                "モデルパッケージを検証",
+            ),
+            ToolSpec(
+                "generate_deployment_config",
+                "mcp_server.capabilities.model_packaging.tools.generate_deployment_config:generate_deployment_config",
+                "デプロイ設定を生成 (SageMaker, ECS, Lambda)",
+            ),
+            ToolSpec(
+                "extract_model_metadata",
+                "mcp_server.capabilities.model_packaging.tools.extract_model_metadata:extract_model_metadata",
+                "モデルからメタデータを抽出",
+            ),
+        ),
+    ),
+    CapabilitySpec(
+        name="model_deployment",
+        module="mcp_server.capabilities.model_deployment.capability",
+        class_name="ModelDeploymentCapability",
+        tools=(
+            ToolSpec(
+                "deploy_to_sagemaker",
+                "mcp_server.capabilities.model_deployment.tools.deploy_to_sagemaker:deploy_to_sagemaker",
+                "SageMakerエンドポイントにモデルをデプロイ",
+            ),
+            ToolSpec(
+                "update_endpoint_traffic",
+                "mcp_server.capabilities.model_deployment.tools.update_endpoint:update_endpoint_traffic",
+                "エンドポイントのトラフィック配分を更新（カナリアデプロイ）",
+            ),
+            ToolSpec(
+                "update_endpoint_capacity",
+                "mcp_server.capabilities.model_deployment.tools.update_endpoint:update_endpoint_capacity",
+                "エンドポイントのインスタンス数を更新",
+            ),
+            ToolSpec(
+                "configure_autoscaling",
+                "mcp_server.capabilities.model_deployment.tools.configure_autoscaling:configure_autoscaling",
+                "エンドポイントのオートスケーリングを設定",
+            ),
+            ToolSpec(
+                "delete_autoscaling",
+                "mcp_server.capabilities.model_deployment.tools.configure_autoscaling:delete_autoscaling",
+                "エンドポイントのオートスケーリング設定を削除",
+            ),
+            ToolSpec(
+                "monitor_endpoint",
+                "mcp_server.capabilities.model_deployment.tools.monitor_endpoint:monitor_endpoint",
+                "エンドポイントのステータスとメトリクスを監視",
+            ),
+            ToolSpec(
+                "health_check_endpoint",
+                "mcp_server.capabilities.model_deployment.tools.monitor_endpoint:health_check_endpoint",
+                "エンドポイントのヘルスチェックを実行",
+            ),
+            ToolSpec(
+                "delete_endpoint",
+                "mcp_server.capabilities.model_deployment.tools.delete_endpoint:delete_endpoint",
+                "エンドポイントを削除",
+            ),
+            ToolSpec(
+                "rollback_deployment",
+                "mcp_server.capabilities.model_deployment.tools.delete_endpoint:rollback_deployment",
+                "デプロイメントをロールバック",
+            ),
+        ),
+    ),
+)
@@ -8,12 +8,15 @@ import io
 import logging
 from typing import Any, Dict
 
-import boto3
 import joblib
 import pandas as pd
 from botocore.exceptions import ClientError
 from sklearn.metrics import davies_bouldin_score, silhouette_score
 
+from mcp_server.common.arrow_utils import feature_frame
+from mcp_server.common.s3_utils import download_object, get_client, read_table
+from mcp_server.common.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +30,7 @@ def evaluate_clustering(
 
     Args:
         model_s3_uri: モデルのS3 URI (.pkl)
-        test_data_s3_uri: テストデータのS3 URI
+        test_data_s3_uri: テストデータのS3 URI（プレフィックス・マニフェストも可）
         file_format: ファイルフォーマット (csv, parquet)
 
     Returns:
@@ -51,15 +54,15 @@ def evaluate_clustering(
         raise ValueError("Invalid S3 URI format: s3://bucket/key required")
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     # モデルのロード
     model_bucket, model_key = model_parts
 
     try:
-        model_response = s3_client.get_object(Bucket=model_bucket, Key=model_key)
-        model_content = model_response["Body"].read()
-        model = joblib.load(io.BytesIO(model_content))
+        model_content = download_object(s3_client, model_bucket, model_key)
+        with span("joblib.load", {"mlops.bytes": len(model_content)}):
+            model = joblib.load(io.BytesIO(model_content))
         logger.info(f"Loaded model from {model_s3_uri}")
 
     except ClientError as e:
@@ -70,35 +73,30 @@ def evaluate_clustering(
     data_bucket, data_key = data_parts
 
     try:
-        data_response = s3_client.get_object(Bucket=data_bucket, Key=data_key)
-        data_content = data_response["Body"].read()
-
-        # データ読み込み
-        if file_format.lower() == "csv":
-            df = pd.read_csv(io.BytesIO(data_content))
-        elif file_format.lower() == "parquet":
-            df = pd.read_parquet(io.BytesIO(data_content))
-        else:
-            raise ValueError(f"Unsupported file format: {file_format}")
+        # データ読み込み（pyarrowのマルチスレッドのリーダーでダウンロードしながら解析）
+        table = read_table(s3_client, data_bucket, data_key, file_format, formats=("csv", "parquet"))
 
-        logger.info(f"Loaded test data: {len(df)} samples, {len(df.columns)} features")
+        logger.info(f"Loaded test data: {table.num_rows} samples, {table.num_columns} features")
 
     except ClientError as e:
         logger.error(f"S3 access error for data: {e}")
         raise ValueError(f"Failed to load data from S3: {e}")
 
-    # 全データを特徴量として使用
-    X_test = df
+    # 全データを特徴量として使用（1つの配列にまとめ、scikit-learnにはコピーせずに渡す）
+    X_test = feature_frame(table)
+    del table
 
     # 予測（クラスタラベル）
     logger.info("Predicting cluster labels...")
 
     # モデルタイプに応じた予測
     if hasattr(model, "predict"):
-        labels = model.predict(X_test)
+        with span("model.predict", {"mlops.rows": len(X_test)}):
+            labels = model.predict(X_test)
     elif hasattr(model, "fit_predict"):
         # DBSCANの場合
-        labels = model.fit_predict(X_test)
+        with span("model.fit_predict", {"mlops.rows": len(X_test)}):
+            labels = model.fit_predict(X_test)
     else:
         raise ValueError("Model does not support prediction")
 
@@ -108,8 +106,10 @@ def evaluate_clustering(
     # 評価メトリクスの計算
     # シルエットスコア（-1が含まれる場合は計算できない）
     if -1 not in labels and n_clusters > 1:
-        silhouette = silhouette_score(X_test, labels)
-        davies_bouldin = davies_bouldin_score(X_test, labels)
+        with span("metrics.silhouette"):
+            silhouette = silhouette_score(X_test, labels)
+        with span("metrics.davies_bouldin"):
+            davies_bouldin = davies_bouldin_score(X_test, labels)
     else:
         silhouette = None
         davies_bouldin = None
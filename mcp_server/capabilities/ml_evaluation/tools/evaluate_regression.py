@@ -8,12 +8,14 @@ import io
 import logging
 from typing import Any, Dict
 
-import boto3
 import joblib
-import pandas as pd
 from botocore.exceptions import ClientError
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+from mcp_server.common.arrow_utils import feature_frame
+from mcp_server.common.s3_utils import download_object, get_client, read_table
+from mcp_server.common.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +29,7 @@ def evaluate_regression(
 
     Args:
         model_s3_uri: モデルのS3 URI (.pkl)
-        test_data_s3_uri: テストデータのS3 URI (前処理済みデータ)
+        test_data_s3_uri: テストデータのS3 URI (前処理済みデータ)（プレフィックス・マニフェストも可）
         file_format: ファイルフォーマット (csv, parquet)
 
     Returns:
@@ -51,15 +53,15 @@ def evaluate_regression(
         raise ValueError("Invalid S3 URI format: s3://bucket/key required")
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     # モデルのロード
     model_bucket, model_key = model_parts
 
     try:
-        model_response = s3_client.get_object(Bucket=model_bucket, Key=model_key)
-        model_content = model_response["Body"].read()
-        model = joblib.load(io.BytesIO(model_content))
+        model_content = download_object(s3_client, model_bucket, model_key)
+        with span("joblib.load", {"mlops.bytes": len(model_content)}):
+            model = joblib.load(io.BytesIO(model_content))
         logger.info(f"Loaded model from {model_s3_uri}")
 
     except ClientError as e:
@@ -70,35 +72,33 @@ def evaluate_regression(
     data_bucket, data_key = data_parts
 
     try:
-        data_response = s3_client.get_object(Bucket=data_bucket, Key=data_key)
-        data_content = data_response["Body"].read()
-
-        # データ読み込み
-        if file_format.lower() == "csv":
-            df = pd.read_csv(io.BytesIO(data_content))
-        elif file_format.lower() == "parquet":
-            df = pd.read_parquet(io.BytesIO(data_content))
-        else:
-            raise ValueError(f"Unsupported file format: {file_format}")
+        # データ読み込み（pyarrowのマルチスレッドのリーダーでダウンロードしながら解析）
+        table = read_table(s3_client, data_bucket, data_key, file_format, formats=("csv", "parquet"))
 
-        logger.info(f"Loaded test data: {len(df)} samples, {len(df.columns)} features")
+        logger.info(f"Loaded test data: {table.num_rows} samples, {table.num_columns} features")
 
     except ClientError as e:
         logger.error(f"S3 access error for data: {e}")
         raise ValueError(f"Failed to load data from S3: {e}")
 
     # 特徴量とターゲットの分離 (最後の列がターゲットと仮定)
-    X_test = df.iloc[:, :-1]
-    y_test = df.iloc[:, -1]
+    # 特徴量は1つの配列にまとめ、scikit-learnにはコピーせずに渡す
+    X_test = feature_frame(table.select(range(table.num_columns - 1)))
+    y_test = table.column(table.num_columns - 1).to_numpy()
+    del table
 
     # 予測
     logger.info("Making predictions...")
-    y_pred = model.predict(X_test)
+    with span("model.predict", {"mlops.rows": len(X_test)}):
+        y_pred = model.predict(X_test)
 
     # 評価メトリクスの計算
-    r2 = r2_score(y_test, y_pred)
-    mae = mean_absolute_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
+    with span("metrics.r2"):
+        r2 = r2_score(y_test, y_pred)
+    with span("metrics.mae"):
+        mae = mean_absolute_error(y_test, y_pred)
+    with span("metrics.mse"):
+        mse = mean_squared_error(y_test, y_pred)
     rmse = mse**0.5
 
     logger.info(f"Evaluation completed: R²={r2:.4f}, RMSE={rmse:.4f}")
@@ -0,0 +1,98 @@
+"""
+Cancellable Model Fitting
+
+キャンセルのチェックポイントと進捗報告付きのモデル学習
+"""
+
+import logging
+import math
+from typing import Any
+
+from sklearn.ensemble._forest import BaseForest
+
+from mcp_server.common.cancellation import check_cancelled, current_token
+from mcp_server.common.progress import report_progress
+from mcp_server.common.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# フォレストを何回に分けて学習するか（分割数ごとにキャンセルを確認）
+FOREST_FIT_ROUNDS = 10
+
+
+def fit_with_checkpoints(model: Any, X: Any, y: Any = None) -> Any:
+    """
+    キャンセルのチェックポイントを挟み、進捗を報告しながらモデルを学習
+
+    MCPサーバーからの呼び出し（キャンセルトークンあり）の場合:
+    - ランダムフォレスト: warm_startで木を分割して追加学習し、分割ごとに確認・報告
+      （乱数の引き方は一括学習と同じため、結果も一括学習と一致します）
+    - ニューラルネットワーク（MLP）: エポックごとに確認・報告
+    - その他: 学習の前後で確認
+
+    Args:
+        model: scikit-learnの推定器
+        X: 特徴量
+        y: ターゲット（教師なし学習ではNone）
+
+    Returns:
+        学習済みのモデル
+
+    Raises:
+        ToolCancelledError: 学習中にツール呼び出しがキャンセルされた場合
+    """
+    check_cancelled()
+    if current_token() is None:
+        # ツール呼び出し外では通常どおり一括で学習
+        return model.fit(X, y)
+
+    with span("model.fit", {"mlops.estimator": type(model).__name__, "mlops.rows": len(X)}):
+        if isinstance(model, BaseForest) and not model.warm_start:
+            _fit_forest(model, X, y)
+        elif hasattr(model, "_update_no_improvement_count"):
+            _fit_mlp(model, X, y)
+        else:
+            model.fit(X, y)
+
+    check_cancelled()
+    return model
+
+
+def _fit_forest(model: BaseForest, X: Any, y: Any):
+    """木をFOREST_FIT_ROUNDS回に分けて追加学習"""
+    n_estimators = model.n_estimators
+    step = max(1, math.ceil(n_estimators / FOREST_FIT_ROUNDS))
+    model.set_params(warm_start=True)
+    try:
+        for n in range(step, n_estimators + step, step):
+            model.set_params(n_estimators=min(n, n_estimators))
+            model.fit(X, y)
+            check_cancelled()
+            trained = len(model.estimators_)
+            report_progress(
+                "train", trained, n_estimators, message=f"Trained {trained}/{n_estimators} trees"
+            )
+    finally:
+        model.set_params(warm_start=False, n_estimators=n_estimators)
+
+
+def _fit_mlp(model: Any, X: Any, y: Any):
+    """エポック終了時の処理にチェックポイントと進捗報告を差し込んで学習"""
+    update_no_improvement_count = model._update_no_improvement_count
+
+    def checkpoint(*args, **kwargs):
+        check_cancelled()
+        report_progress(
+            "train",
+            model.n_iter_,
+            model.max_iter,
+            message=f"Epoch {model.n_iter_}/{model.max_iter} (loss {model.loss_:.4f})",
+        )
+        return update_no_improvement_count(*args, **kwargs)
+
+    # インスタンス属性で一時的に上書き（保存時のpickleに残さないよう必ず削除）
+    model._update_no_improvement_count = checkpoint
+    try:
+        model.fit(X, y)
+    finally:
+        del model._update_no_improvement_count
@@ -4,37 +4,46 @@ Train Clustering Model Tool
 クラスタリングモデル学習ツール
 """
 
-import io
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Literal
 
-import boto3
 import joblib
 import pandas as pd
 from botocore.exceptions import ClientError
 from sklearn.cluster import DBSCAN, KMeans
 from sklearn.decomposition import PCA
 
+from mcp_server.common.arrow_utils import feature_frame
+from mcp_server.common.cancellation import check_cancelled
+from mcp_server.common.progress import report_progress
+from mcp_server.common.s3_utils import S3MultipartWriter, get_client, read_table
+from mcp_server.common.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
 def train_clustering(
     train_data_s3_uri: str,
-    algorithm: str = "kmeans",
+    algorithm: Literal["kmeans", "dbscan", "pca"] = "kmeans",
     hyperparameters: Dict[str, Any] = None,
     model_output_s3_uri: str = None,
     file_format: str = "csv",
+    columns: List[str] = None,
+    filters: List[List[Any]] = None,
 ) -> Dict[str, Any]:
     """
     クラスタリングモデルを学習
 
     Args:
-        train_data_s3_uri: 学習データのS3 URI (前処理済みデータ)
+        train_data_s3_uri: 学習データのS3 URI (前処理済みデータ)（プレフィックス・マニフェストも可）
         algorithm: アルゴリズム (kmeans, dbscan, pca)
         hyperparameters: ハイパーパラメータ辞書
         model_output_s3_uri: モデル保存先S3 URI
         file_format: ファイルフォーマット (csv, parquet)
+        columns: 学習に使う列（Parquetでは指定した列のみを取得）
+        filters: 行の条件（Parquetのみ。[列, 演算子, 値] のリスト。
+            例: [["date", ">=", "2024-01-01"]]。条件に合わない行グループは取得しない）
 
     Returns:
         学習結果辞書
@@ -52,30 +61,32 @@ def train_clustering(
     bucket, key = parts
 
     # S3からデータ読み込み
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        file_content = response["Body"].read()
-
-        # データ読み込み
-        if file_format.lower() == "csv":
-            df = pd.read_csv(io.BytesIO(file_content))
-        elif file_format.lower() == "parquet":
-            df = pd.read_parquet(io.BytesIO(file_content))
-        else:
-            raise ValueError(f"Unsupported file format: {file_format}")
+        # データ読み込み（pyarrowのマルチスレッドのリーダーでダウンロードしながら解析）
+        table = read_table(
+            s3_client,
+            bucket,
+            key,
+            file_format,
+            formats=("csv", "parquet"),
+            columns=columns,
+            filters=filters,
+        )
 
         logger.info(
-            f"Loaded training data: {len(df)} samples, {len(df.columns)} features"
+            f"Loaded training data: {table.num_rows} samples, {table.num_columns} features"
         )
+        report_progress("parse", table.num_rows, message=f"Parsed {table.num_rows:,} rows")
 
     except ClientError as e:
         logger.error(f"S3 access error: {e}")
         raise ValueError(f"Failed to load data from S3: {e}")
 
-    # 全データを特徴量として使用
-    X_train = df
+    # 全データを特徴量として使用（1つの配列にまとめ、scikit-learnにはコピーせずに渡す）
+    X_train = feature_frame(table)
+    del table
 
     # ハイパーパラメータのデフォルト設定
     if hyperparameters is None:
@@ -106,34 +117,32 @@ def train_clustering(
 
     if algorithm == "pca":
         # PCAは変換
-        _transformed = model.fit_transform(X_train)  # noqa: F841
+        with span("model.fit_transform", {"mlops.rows": len(X_train)}):
+            _transformed = model.fit_transform(X_train)  # noqa: F841
         labels = None
         n_clusters = hyperparameters.get("n_components", 2)
         logger.info(f"PCA transformed data to {n_clusters} components")
     else:
         # クラスタリングはラベル予測
-        labels = model.fit_predict(X_train)
+        with span("model.fit_predict", {"mlops.rows": len(X_train)}):
+            labels = model.fit_predict(X_train)
         n_clusters = len(set(labels)) - (1 if -1 in labels else 0)  # -1はノイズ点（DBSCANの場合）
         logger.info(f"Found {n_clusters} clusters")
 
+    # 学習中にキャンセルされた場合は保存しない
+    check_cancelled()
+
     # モデルの保存
     if model_output_s3_uri:
-        # モデルをシリアライズ
-        model_buffer = io.BytesIO()
-        joblib.dump(model, model_buffer)
-        model_buffer.seek(0)
-
-        # S3に保存
         output_parts = model_output_s3_uri[5:].split("/", 1)
         output_bucket, output_key = output_parts
+        model_key = output_key if output_key.endswith(".pkl") else f"{output_key}/model.pkl"
 
-        s3_client.put_object(
-            Bucket=output_bucket,
-            Key=output_key
-            if output_key.endswith(".pkl")
-            else f"{output_key}/model.pkl",
-            Body=model_buffer.getvalue(),
-        )
+        # シリアライズしながらS3に保存（パート単位で並列にアップロード）
+        with span("joblib.dump") as dump:
+            with S3MultipartWriter(s3_client, output_bucket, model_key) as model_writer:
+                joblib.dump(model, model_writer)
+            dump.set_attribute("mlops.bytes", model_writer.bytes_written)
 
         # メタデータも保存
         metadata = {
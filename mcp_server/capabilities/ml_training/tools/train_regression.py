@@ -4,38 +4,49 @@ Train Regression Model Tool
 回帰モデル学習ツール
 """
 
-import io
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Literal
 
-import boto3
 import joblib
-import pandas as pd
 from botocore.exceptions import ClientError
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.neural_network import MLPRegressor
 
+from mcp_server.common.arrow_utils import feature_frame
+from mcp_server.common.progress import report_progress
+from mcp_server.common.s3_utils import S3MultipartWriter, get_client, read_table
+from mcp_server.common.tracing import span
+
+from .fit_utils import fit_with_checkpoints
+
 logger = logging.getLogger(__name__)
 
 
 def train_regression(
     train_data_s3_uri: str,
-    algorithm: str = "random_forest",
+    algorithm: Literal[
+        "random_forest", "linear_regression", "ridge", "neural_network"
+    ] = "random_forest",
     hyperparameters: Dict[str, Any] = None,
     model_output_s3_uri: str = None,
     file_format: str = "csv",
+    columns: List[str] = None,
+    filters: List[List[Any]] = None,
 ) -> Dict[str, Any]:
     """
     回帰モデルを学習
 
     Args:
-        train_data_s3_uri: 学習データのS3 URI (前処理済みデータ)
+        train_data_s3_uri: 学習データのS3 URI (前処理済みデータ)（プレフィックス・マニフェストも可）
         algorithm: アルゴリズム (random_forest, linear_regression, ridge, neural_network)
         hyperparameters: ハイパーパラメータ辞書
         model_output_s3_uri: モデル保存先S3 URI
         file_format: ファイルフォーマット (csv, parquet)
+        columns: 学習に使う列（最後の列をターゲットとして扱う。Parquetでは指定した列のみを取得）
+        filters: 行の条件（Parquetのみ。[列, 演算子, 値] のリスト。
+            例: [["date", ">=", "2024-01-01"]]。条件に合わない行グループは取得しない）
 
     Returns:
         学習結果辞書
@@ -53,31 +64,34 @@ def train_regression(
     bucket, key = parts
 
     # S3からデータ読み込み
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        file_content = response["Body"].read()
-
-        # データ読み込み
-        if file_format.lower() == "csv":
-            df = pd.read_csv(io.BytesIO(file_content))
-        elif file_format.lower() == "parquet":
-            df = pd.read_parquet(io.BytesIO(file_content))
-        else:
-            raise ValueError(f"Unsupported file format: {file_format}")
+        # データ読み込み（pyarrowのマルチスレッドのリーダーでダウンロードしながら解析）
+        table = read_table(
+            s3_client,
+            bucket,
+            key,
+            file_format,
+            formats=("csv", "parquet"),
+            columns=columns,
+            filters=filters,
+        )
 
         logger.info(
-            f"Loaded training data: {len(df)} samples, {len(df.columns)} features"
+            f"Loaded training data: {table.num_rows} samples, {table.num_columns} features"
         )
+        report_progress("parse", table.num_rows, message=f"Parsed {table.num_rows:,} rows")
 
     except ClientError as e:
         logger.error(f"S3 access error: {e}")
         raise ValueError(f"Failed to load data from S3: {e}")
 
     # 特徴量とターゲットの分離 (最後の列がターゲットと仮定)
-    X_train = df.iloc[:, :-1]
-    y_train = df.iloc[:, -1]
+    # 特徴量は1つの配列にまとめ、scikit-learnにはコピーせずに渡す
+    X_train = feature_frame(table.select(range(table.num_columns - 1)))
+    y_train = table.column(table.num_columns - 1).to_numpy()
+    del table
 
     # ハイパーパラメータのデフォルト設定
     if hyperparameters is None:
@@ -111,30 +125,24 @@ def train_regression(
 
     # モデル学習
     logger.info(f"Training {algorithm} model...")
-    model.fit(X_train, y_train)
+    fit_with_checkpoints(model, X_train, y_train)
 
     # 学習データでの評価 (R^2スコア)
-    train_score = model.score(X_train, y_train)
+    with span("model.score", {"mlops.rows": len(X_train)}):
+        train_score = model.score(X_train, y_train)
     logger.info(f"Training R^2 score: {train_score:.4f}")
 
     # モデルの保存
     if model_output_s3_uri:
-        # モデルをシリアライズ
-        model_buffer = io.BytesIO()
-        joblib.dump(model, model_buffer)
-        model_buffer.seek(0)
-
-        # S3に保存
         output_parts = model_output_s3_uri[5:].split("/", 1)
         output_bucket, output_key = output_parts
+        model_key = output_key if output_key.endswith(".pkl") else f"{output_key}/model.pkl"
 
-        s3_client.put_object(
-            Bucket=output_bucket,
-            Key=output_key
-            if output_key.endswith(".pkl")
-            else f"{output_key}/model.pkl",
-            Body=model_buffer.getvalue(),
-        )
+        # シリアライズしながらS3に保存（パート単位で並列にアップロード）
+        with span("joblib.dump") as dump:
+            with S3MultipartWriter(s3_client, output_bucket, model_key) as model_writer:
+                joblib.dump(model, model_writer)
+            dump.set_attribute("mlops.bytes", model_writer.bytes_written)
 
         # メタデータも保存
         metadata = {
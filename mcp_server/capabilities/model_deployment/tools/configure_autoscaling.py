@@ -7,9 +7,10 @@ Configure Auto Scaling Tool
 import logging
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,7 +60,7 @@ def configure_autoscaling(
         )
 
     # Application Auto Scalingクライアント
-    autoscaling_client = boto3.client("application-autoscaling")
+    autoscaling_client = get_client("application-autoscaling")
 
     # リソースID
     resource_id = f"endpoint/{endpoint_name}/variant/{variant_name}"
@@ -137,7 +138,7 @@ def delete_autoscaling(
     logger.info(f"Deleting autoscaling for endpoint: {endpoint_name}")
 
     # Application Auto Scalingクライアント
-    autoscaling_client = boto3.client("application-autoscaling")
+    autoscaling_client = get_client("application-autoscaling")
 
     # リソースID
     resource_id = f"endpoint/{endpoint_name}/variant/{variant_name}"
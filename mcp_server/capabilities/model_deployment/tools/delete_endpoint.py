@@ -7,9 +7,10 @@ Delete Endpoint Tool
 import logging
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,7 +33,7 @@ def delete_endpoint(
     logger.info(f"Deleting endpoint: {endpoint_name}")
 
     # SageMakerクライアント
-    sagemaker_client = boto3.client("sagemaker")
+    sagemaker_client = get_client("sagemaker")
 
     deleted_resources = []
 
@@ -109,7 +110,7 @@ def rollback_deployment(
     logger.info(f"Rolling back deployment for endpoint: {endpoint_name}")
 
     # SageMakerクライアント
-    sagemaker_client = boto3.client("sagemaker")
+    sagemaker_client = get_client("sagemaker")
 
     try:
         # 現在のエンドポイント情報を取得
@@ -8,9 +8,13 @@ import logging
 from datetime import datetime
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.cancellation import cancellable_sleep, check_cancelled
+from mcp_server.common.progress import report_progress
+from mcp_server.common.s3_utils import get_client
+from mcp_server.common.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,7 +47,7 @@ def deploy_to_sagemaker(
         raise ValueError("Invalid S3 URI: must start with 's3://'")
 
     # SageMakerクライアント
-    sagemaker_client = boto3.client("sagemaker")
+    sagemaker_client = get_client("sagemaker")
 
     # モデル名の生成
     if model_name is None:
@@ -74,7 +78,8 @@ def deploy_to_sagemaker(
 
         # 4. デプロイ完了待機（オプション）
         if wait_for_completion:
-            _wait_for_endpoint(sagemaker_client, endpoint_name)
+            with span("sagemaker.wait_for_endpoint", {"mlops.endpoint_name": endpoint_name}):
+                _wait_for_endpoint(sagemaker_client, endpoint_name)
             logger.info(f"Endpoint is in service: {endpoint_name}")
 
         return {
@@ -187,17 +192,28 @@ def _wait_for_endpoint(sagemaker_client, endpoint_name: str, timeout: int = 600)
     import time
 
     start_time = time.time()
+    last_status = None
 
     while time.time() - start_time < timeout:
+        # キャンセル・期限切れの場合はポーリングを中断（エンドポイントの作成自体は継続）
+        check_cancelled()
         response = sagemaker_client.describe_endpoint(EndpointName=endpoint_name)
         status = response["EndpointStatus"]
 
+        # 状態が遷移した時点で進捗を報告
+        if status != last_status:
+            elapsed = time.time() - start_time
+            report_progress(
+                "deploy", elapsed, timeout, message=f"Endpoint {endpoint_name}: {status}"
+            )
+            last_status = status
+
         if status == "InService":
             return
         elif status in ["Failed", "RollingBack"]:
             raise ValueError(f"Endpoint deployment failed with status: {status}")
 
         logger.info(f"Endpoint status: {status}, waiting...")
-        time.sleep(10)
+        cancellable_sleep(10)
 
     raise TimeoutError(f"Endpoint deployment timeout after {timeout} seconds")
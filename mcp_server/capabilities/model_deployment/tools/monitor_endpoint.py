@@ -9,9 +9,10 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,7 +35,7 @@ def monitor_endpoint(
     logger.info(f"Monitoring endpoint: {endpoint_name}")
 
     # SageMakerクライアント
-    sagemaker_client = boto3.client("sagemaker")
+    sagemaker_client = get_client("sagemaker")
 
     try:
         # エンドポイント情報を取得
@@ -103,7 +104,7 @@ def health_check_endpoint(
     logger.info(f"Health check for endpoint: {endpoint_name}")
 
     # SageMakerランタイムクライアント
-    runtime_client = boto3.client("sagemaker-runtime")
+    runtime_client = get_client("sagemaker-runtime")
 
     # テストペイロードの準備
     if test_payload is None:
@@ -162,7 +163,7 @@ def _get_endpoint_metrics(
 ) -> Dict[str, Any]:
     """エンドポイントのCloudWatchメトリクスを取得"""
     # CloudWatchクライアント
-    cloudwatch_client = boto3.client("cloudwatch")
+    cloudwatch_client = get_client("cloudwatch")
 
     # メトリクス取得期間
     end_time = datetime.utcnow()
@@ -7,9 +7,10 @@ Update Endpoint Tool
 import logging
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,7 +31,7 @@ def update_endpoint_traffic(
     logger.info(f"Updating traffic for endpoint: {endpoint_name}")
 
     # SageMakerクライアント
-    sagemaker_client = boto3.client("sagemaker")
+    sagemaker_client = get_client("sagemaker")
 
     try:
         # エンドポイント情報を取得
@@ -116,7 +117,7 @@ def update_endpoint_capacity(
         raise ValueError("Instance count must be at least 1")
 
     # SageMakerクライアント
-    sagemaker_client = boto3.client("sagemaker")
+    sagemaker_client = get_client("sagemaker")
 
     try:
         # 容量を更新
@@ -1 +1,15 @@
 """Model Packaging Tools"""
+
+from .create_dockerfile import create_dockerfile
+from .create_model_package import create_model_package
+from .extract_model_metadata import extract_model_metadata
+from .generate_deployment_config import generate_deployment_config
+from .validate_package import validate_package
+
+__all__ = [
+    "create_model_package",
+    "create_dockerfile",
+    "validate_package",
+    "generate_deployment_config",
+    "extract_model_metadata",
+]
@@ -5,14 +5,14 @@ Dockerfile作成ツール
 """
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Literal
 
 logger = logging.getLogger(__name__)
 
 
 def create_dockerfile(
     model_s3_uri: str,
-    framework: str = "sklearn",
+    framework: Literal["sklearn", "tensorflow", "pytorch"] = "sklearn",
     python_version: str = "3.11",
     base_image: str = None,
     optimize: bool = True,
@@ -10,18 +10,20 @@ import tarfile
 import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Literal
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+from mcp_server.common.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
 def create_model_package(
     model_s3_uri: str,
     package_name: str,
-    framework: str = "sklearn",
+    framework: Literal["sklearn", "tensorflow", "pytorch"] = "sklearn",
     python_version: str = "3.11",
     dependencies: Dict[str, str] = None,
     output_s3_uri: str = None,
@@ -55,7 +57,7 @@ def create_model_package(
         dependencies = _get_default_dependencies(framework)
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     model_bucket, model_key = model_parts
 
@@ -74,13 +76,16 @@ def create_model_package(
         package_dir = tmp_path / package_name
 
         # パッケージ構造を作成
-        _create_package_structure(
-            package_dir, model_s3_uri, framework, python_version, dependencies
-        )
+        with span("package.create_structure"):
+            _create_package_structure(
+                package_dir, model_s3_uri, framework, python_version, dependencies
+            )
 
         # tar.gzに圧縮
         package_file = tmp_path / f"{package_name}.tar.gz"
-        _create_tarball(package_dir, package_file)
+        with span("tarfile.create") as archive:
+            _create_tarball(package_dir, package_file)
+            archive.set_attribute("mlops.bytes", package_file.stat().st_size)
 
         # S3にアップロード
         if output_s3_uri is None:
@@ -98,7 +103,9 @@ def create_model_package(
             model_bucket = output_bucket
 
         try:
-            s3_client.upload_file(str(package_file), model_bucket, output_key)
+            # upload_fileは別スレッドで転送するため、AWS API呼び出しのスパンとは別に計測
+            with span("s3.upload_file", {"aws.s3.bucket": model_bucket, "aws.s3.key": output_key}):
+                s3_client.upload_file(str(package_file), model_bucket, output_key)
             logger.info(f"Uploaded package to {output_s3_uri}")
 
         except ClientError as e:
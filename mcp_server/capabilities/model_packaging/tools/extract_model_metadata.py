@@ -8,10 +8,12 @@ import io
 import logging
 from typing import Any, Dict
 
-import boto3
 import joblib
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import download_object, get_client
+from mcp_server.common.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,15 +40,15 @@ def extract_model_metadata(
         raise ValueError("Invalid S3 URI format: s3://bucket/key required")
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     model_bucket, model_key = model_parts
 
     # モデルファイルをダウンロードしてロード
     try:
-        response = s3_client.get_object(Bucket=model_bucket, Key=model_key)
-        model_content = response["Body"].read()
-        model = joblib.load(io.BytesIO(model_content))
+        model_content = download_object(s3_client, model_bucket, model_key)
+        with span("joblib.load", {"mlops.bytes": len(model_content)}):
+            model = joblib.load(io.BytesIO(model_content))
         logger.info("Model loaded successfully")
 
     except ClientError as e:
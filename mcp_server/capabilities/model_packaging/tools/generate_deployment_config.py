@@ -5,14 +5,14 @@ Generate Deployment Config Tool
 """
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Literal
 
 logger = logging.getLogger(__name__)
 
 
 def generate_deployment_config(
     model_s3_uri: str,
-    deployment_type: str = "sagemaker",
+    deployment_type: Literal["sagemaker", "ecs", "lambda"] = "sagemaker",
     instance_type: str = "ml.t3.medium",
     instance_count: int = 1,
     auto_scaling: bool = False,
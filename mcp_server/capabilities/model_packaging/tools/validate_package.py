@@ -4,7 +4,6 @@ Validate Package Tool
 パッケージ検証ツール
 """
 
-import io
 import json
 import logging
 import tarfile
@@ -12,9 +11,11 @@ import tempfile
 from pathlib import Path
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import download_to_file, get_client
+from mcp_server.common.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,17 +42,18 @@ def validate_package(
         raise ValueError("Invalid S3 URI format: s3://bucket/key required")
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     package_bucket, package_key = package_parts
 
-    # パッケージファイルをダウンロード
+    # パッケージファイルを一時ファイルにダウンロード（全体をメモリに保持しない）
+    package_file = tempfile.TemporaryFile()
     try:
-        response = s3_client.get_object(Bucket=package_bucket, Key=package_key)
-        package_content = response["Body"].read()
+        package_size = download_to_file(s3_client, package_bucket, package_key, package_file)
         logger.info(f"Downloaded package from {package_s3_uri}")
 
     except ClientError as e:
+        package_file.close()
         logger.error(f"S3 access error: {e}")
         raise ValueError(f"Package not found at S3 URI: {package_s3_uri}")
 
@@ -61,8 +63,10 @@ def validate_package(
 
         # tar.gzを展開
         try:
-            with tarfile.open(fileobj=io.BytesIO(package_content), mode="r:gz") as tar:
-                tar.extractall(tmp_path)
+            with span("tarfile.extract", {"mlops.bytes": package_size}), package_file:
+                package_file.seek(0)
+                with tarfile.open(fileobj=package_file, mode="r:gz") as tar:
+                    tar.extractall(tmp_path)
 
             logger.info("Package extracted successfully")
 
@@ -78,7 +82,8 @@ def validate_package(
             }
 
         # パッケージ内容を検証
-        validation_results = _validate_package_contents(tmp_path)
+        with span("package.validate_contents"):
+            validation_results = _validate_package_contents(tmp_path)
 
     logger.info("Package validation completed")
 
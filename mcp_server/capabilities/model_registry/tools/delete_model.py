@@ -7,9 +7,10 @@ Delete Model Tool
 import logging
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,7 +39,7 @@ def delete_model(
         raise ValueError("Invalid S3 URI format: s3://bucket/key required")
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     model_bucket, model_key = model_parts
 
@@ -6,17 +6,18 @@ List Models Tool
 
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Literal
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
 def list_models(
     registry_s3_uri: str,
-    status_filter: str = None,
+    status_filter: Literal["registered", "staging", "production", "archived"] = None,
 ) -> Dict[str, Any]:
     """
     登録されているモデルを一覧表示
@@ -41,7 +42,7 @@ def list_models(
     bucket, prefix = parts
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     # レジストリメタデータファイルを検索
     models = []
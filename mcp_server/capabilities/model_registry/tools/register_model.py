@@ -9,9 +9,10 @@ import logging
 from datetime import datetime
 from typing import Any, Dict
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,7 +57,7 @@ def register_model(
         tags = {}
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     # モデルの存在確認
     model_bucket, model_key = model_parts
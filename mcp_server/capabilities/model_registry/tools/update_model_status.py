@@ -7,17 +7,18 @@ Update Model Status Tool
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Literal
 
-import boto3
 from botocore.exceptions import ClientError
 
+from mcp_server.common.s3_utils import get_client
+
 logger = logging.getLogger(__name__)
 
 
 def update_model_status(
     model_s3_uri: str,
-    status: str,
+    status: Literal["registered", "staging", "production", "archived"],
 ) -> Dict[str, Any]:
     """
     モデルのステータスを更新
@@ -45,7 +46,7 @@ def update_model_status(
         raise ValueError("Invalid S3 URI format: s3://bucket/key required")
 
     # S3クライアント
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
 
     model_bucket, model_key = model_parts
 
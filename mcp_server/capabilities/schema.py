@@ -0,0 +1,331 @@
+"""
+Tool Schema Generation
+
+ツール関数のシグネチャ・型ヒント・docstringからJSON Schemaを生成します。
+
+ソースコードをASTとして解析するため、ツールモジュール（およびsklearn, pandas等の
+重い依存）をインポートせずにスキーマを生成できます。
+"""
+
+import ast
+import inspect
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# プロジェクトルート（mcp_serverパッケージの親ディレクトリ）
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# 型ヒント名 → JSON Schema型
+_SIMPLE_TYPES = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "dict": "object",
+    "Dict": "object",
+    "list": "array",
+    "List": "array",
+    "tuple": "array",
+    "Tuple": "array",
+}
+
+# JSON Schema型 → 許容するPython型（boolはintのサブクラスのため別扱い）
+_TYPE_CHECKS = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list, tuple),
+    "null": (type(None),),
+}
+
+# Literalの値のPython型 → JSON Schema型（boolはintより先に判定する）
+_LITERAL_TYPES = ((bool, "boolean"), (int, "integer"), (float, "number"), (str, "string"))
+
+_ARGS_ENTRY = re.compile(r"^(\w+)\s*(?:\([^)]*\))?:\s*(.*)$")
+
+
+def module_source_path(module: str) -> Path:
+    """ドット区切りのモジュール名からソースファイルのパスを返す（インポートしない）"""
+    return _PROJECT_ROOT.joinpath(*module.split(".")).with_suffix(".py")
+
+
+@lru_cache(maxsize=None)
+def _parse_module(source_path: str) -> Dict[str, ast.FunctionDef]:
+    """ソースファイルを解析し、トップレベル関数定義を返す"""
+    tree = ast.parse(Path(source_path).read_text(encoding="utf-8"), filename=source_path)
+    return {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+
+
+def _annotation_to_schema(node: Optional[ast.expr]) -> Tuple[Dict[str, Any], bool]:
+    """
+    型ヒントのASTをJSON Schemaに変換
+
+    Returns:
+        (スキーマ, Noneを許容するか)
+    """
+    if node is None:
+        return {}, False
+
+    # X | None
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        left, left_nullable = _annotation_to_schema(node.left)
+        right, right_nullable = _annotation_to_schema(node.right)
+        if _is_none(node.right):
+            return left, True
+        if _is_none(node.left):
+            return right, True
+        return {}, left_nullable or right_nullable
+
+    if _is_none(node):
+        return {"type": "null"}, True
+
+    if isinstance(node, ast.Name):
+        json_type = _SIMPLE_TYPES.get(node.id)
+        return ({"type": json_type} if json_type else {}), False
+
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
+        origin = node.value.id
+        if origin == "Optional":
+            schema, _ = _annotation_to_schema(node.slice)
+            return schema, True
+        if origin == "Union":
+            members = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+            non_null = [m for m in members if not _is_none(m)]
+            schema = _annotation_to_schema(non_null[0])[0] if len(non_null) == 1 else {}
+            return schema, len(non_null) < len(members)
+        if origin == "Literal":
+            return _literal_schema(node.slice), False
+        if origin in ("List", "list"):
+            items, _ = _annotation_to_schema(node.slice)
+            return ({"type": "array", "items": items} if items else {"type": "array"}), False
+        json_type = _SIMPLE_TYPES.get(origin)
+        return ({"type": json_type} if json_type else {}), False
+
+    return {}, False
+
+
+def _is_none(node: ast.expr) -> bool:
+    return isinstance(node, ast.Constant) and node.value is None
+
+
+def _literal_schema(node: ast.expr) -> Dict[str, Any]:
+    """Literal[...] の値を列挙したスキーマ（enum）"""
+    members = node.elts if isinstance(node, ast.Tuple) else [node]
+    try:
+        values = [ast.literal_eval(member) for member in members]
+    except ValueError:
+        return {}
+    schema: Dict[str, Any] = {"enum": values}
+    json_types = {
+        next((json_type for cls, json_type in _LITERAL_TYPES if isinstance(value, cls)), None)
+        for value in values
+    }
+    if len(json_types) == 1 and None not in json_types:
+        schema["type"] = json_types.pop()
+    return schema
+
+
+def _parse_docstring(docstring: str) -> Tuple[str, Dict[str, str]]:
+    """
+    docstringから概要と引数の説明（Args節）を取り出す
+
+    Returns:
+        (概要1行目, 引数名 → 説明)
+    """
+    lines = inspect.cleandoc(docstring or "").splitlines()
+    summary = lines[0].strip() if lines else ""
+
+    descriptions: Dict[str, str] = {}
+    in_args = False
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if stripped in ("Args:", "Arguments:", "Parameters:"):
+            in_args = True
+            continue
+        if not in_args:
+            continue
+        if not stripped:
+            current = None
+            continue
+        if not line.startswith(" "):
+            # 次の節（Returns: 等）
+            break
+
+        match = _ARGS_ENTRY.match(stripped)
+        if match and line.startswith("    ") and not line.startswith("     "):
+            current = match.group(1)
+            descriptions[current] = match.group(2).strip()
+        elif current:
+            descriptions[current] = f"{descriptions[current]} {stripped}".strip()
+
+    return summary, descriptions
+
+
+def _literal_default(node: ast.expr) -> Tuple[bool, Any]:
+    """デフォルト値がリテラルならその値を返す"""
+    try:
+        value = ast.literal_eval(node)
+    except ValueError:
+        return False, None
+    if isinstance(value, tuple):
+        value = list(value)
+    return True, value
+
+
+def build_input_schema(source_path: Path, function_name: str) -> Dict[str, Any]:
+    """
+    関数定義からツールの入力スキーマ（JSON Schema）を生成
+
+    Args:
+        source_path: 関数が定義されたソースファイル
+        function_name: 関数名
+
+    Returns:
+        JSON Schema (type: object)
+    """
+    functions = _parse_module(str(source_path))
+    if function_name not in functions:
+        raise ValueError(f"Function {function_name} not found in {source_path}")
+
+    func = functions[function_name]
+    _, descriptions = _parse_docstring(ast.get_docstring(func) or "")
+
+    args = func.args
+    positional = args.posonlyargs + args.args
+    defaults: List[Optional[ast.expr]] = [None] * (len(positional) - len(args.defaults))
+    defaults += list(args.defaults)
+    params = list(zip(positional, defaults)) + list(zip(args.kwonlyargs, args.kw_defaults))
+
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    for arg, default in params:
+        schema, nullable = _annotation_to_schema(arg.annotation)
+        schema = dict(schema)
+
+        if default is None:
+            required.append(arg.arg)
+        else:
+            has_literal, value = _literal_default(default)
+            if has_literal:
+                schema["default"] = value
+                # `x: str = None` は暗黙的にNoneを許容
+                nullable = nullable or value is None
+
+        if nullable and "type" in schema and schema["type"] != "null":
+            schema["type"] = [schema["type"], "null"]
+        if nullable and "enum" in schema and None not in schema["enum"]:
+            schema["enum"] = schema["enum"] + [None]
+
+        if arg.arg in descriptions:
+            schema["description"] = descriptions[arg.arg]
+
+        properties[arg.arg] = schema
+
+    input_schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": properties,
+        "required": required,
+    }
+    # **kwargs を受け付けない関数は未知の引数を拒否
+    if args.kwarg is None:
+        input_schema["additionalProperties"] = False
+    return input_schema
+
+
+def build_entry_point_schema(entry_point: str) -> Dict[str, Any]:
+    """
+    "module:function" 形式のエントリーポイントから入力スキーマを生成
+
+    モジュールはインポートされません。
+    """
+    module, _, function_name = entry_point.partition(":")
+    return build_input_schema(module_source_path(module), function_name)
+
+
+def build_tool_schemas(tools: Dict[str, Callable]) -> Dict[str, Dict[str, Any]]:
+    """
+    ツール関数の辞書から各ツールのスキーマを生成
+
+    Args:
+        tools: ツール名 → ツール関数
+
+    Returns:
+        ツール名をキーとしたスキーマ辞書
+    """
+    schemas = {}
+    for tool_name, tool_func in tools.items():
+        summary, _ = _parse_docstring(inspect.getdoc(tool_func) or "")
+        schemas[tool_name] = {
+            "name": tool_name,
+            "description": summary,
+            "parameters": build_input_schema(
+                Path(inspect.getsourcefile(tool_func)), tool_func.__name__
+            ),
+        }
+    return schemas
+
+
+def validate_arguments(schema: Dict[str, Any], arguments: Dict[str, Any]) -> List[str]:
+    """
+    引数を入力スキーマに照らして検証
+
+    Args:
+        schema: build_input_schemaで生成したスキーマ
+        arguments: ツールへの引数
+
+    Returns:
+        エラーメッセージのリスト（問題がなければ空）
+    """
+    if not isinstance(arguments, dict):
+        return ["arguments must be an object"]
+
+    errors = []
+    properties = schema.get("properties", {})
+
+    for name in schema.get("required", []):
+        if name not in arguments:
+            errors.append(f"missing required argument '{name}'")
+
+    for name, value in arguments.items():
+        if name not in properties:
+            if schema.get("additionalProperties", True) is False:
+                errors.append(f"unexpected argument '{name}'")
+            continue
+
+        expected = properties[name].get("type")
+        if expected is not None:
+            expected_types = expected if isinstance(expected, list) else [expected]
+            if not any(_matches_type(value, t) for t in expected_types):
+                errors.append(
+                    f"argument '{name}' must be {' or '.join(expected_types)}, "
+                    f"got {type(value).__name__}"
+                )
+                continue
+
+        allowed = properties[name].get("enum")
+        if allowed is not None and not any(_same_value(value, a) for a in allowed):
+            errors.append(
+                f"argument '{name}' must be one of "
+                f"{', '.join(map(repr, allowed))}, got {value!r}"
+            )
+
+    return errors
+
+
+def _same_value(value: Any, allowed: Any) -> bool:
+    """enumの値と一致するか（True と 1 のように型の異なる値は区別する）"""
+    return type(value) is type(allowed) and value == allowed
+
+
+def _matches_type(value: Any, json_type: str) -> bool:
+    if isinstance(value, bool) and json_type not in ("boolean",):
+        return False
+    return isinstance(value, _TYPE_CHECKS.get(json_type, (object,)))
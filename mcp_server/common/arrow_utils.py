@@ -0,0 +1,178 @@
+"""
+Arrow Utilities
+
+Arrowテーブル（s3_utils.read_table で読み込んだデータセット）の前処理と、
+scikit-learnに渡す特徴量への変換。
+
+文字列の列をPythonオブジェクト（pandasのobject型）に変換せずにArrow上で
+欠損値処理・ラベルエンコーディングを行い、数値の列は最後に1つの配列へ
+1回だけコピーします。scikit-learnはその配列をコピーせずに受け取ります。
+"""
+
+import logging
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+
+def is_categorical(data_type: pa.DataType) -> bool:
+    """
+    カテゴリ変数として扱う型か
+
+    pandasで読み込むとobject型になる列（文字列と、Parquetの日付・日時等）が対象です。
+    """
+    return (
+        pa.types.is_string(data_type)
+        or pa.types.is_large_string(data_type)
+        or pa.types.is_dictionary(data_type)
+        or pa.types.is_date(data_type)
+        or pa.types.is_timestamp(data_type)
+        or pa.types.is_time(data_type)
+    )
+
+
+def is_numeric(data_type: pa.DataType) -> bool:
+    """数値（整数・浮動小数点）の型か（pandasの select_dtypes("number") と同じく真偽値は含まない）"""
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+
+def feature_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    Arrowテーブルを特徴量のDataFrameに変換
+
+    全列が数値・真偽値の場合は、Fortran順（列優先）の2次元配列に各列のチャンクを
+    直接コピーし、その配列をコピーせずに1ブロックのDataFrameとして包みます。
+    scikit-learnは np.asarray(X) でこの配列をそのまま受け取るため、学習・予測・
+    スコア計算のたびに列を結合し直すことがありません。型が混在する列、欠損のある
+    整数・真偽値の列は共通の型（通常はfloat64、欠損はNaN）に揃えます。
+    それ以外の型の列を含む場合は Table.to_pandas() で変換します。
+
+    Args:
+        table: Arrowテーブル
+
+    Returns:
+        列名を保持したDataFrame（インデックスは0からの連番）
+    """
+    dtype = _common_numeric_dtype(table)
+    if dtype is None:
+        return table.to_pandas()
+
+    matrix = np.empty((table.num_rows, table.num_columns), dtype=dtype, order="F")
+    arrow_type = pa.from_numpy_dtype(dtype)
+    for index, column in enumerate(table.columns):
+        offset = 0
+        for chunk in column.chunks:
+            if chunk.type != arrow_type or chunk.null_count:
+                chunk = chunk.cast(arrow_type)
+            # 欠損のない数値のチャンクはコピーせずにビューとして取り出せる
+            matrix[offset : offset + len(chunk), index] = chunk.to_numpy(zero_copy_only=False)
+            offset += len(chunk)
+    return pd.DataFrame(matrix, columns=table.column_names, copy=False)
+
+
+def _common_numeric_dtype(table: pa.Table) -> Optional[np.dtype]:
+    """全列を格納できるnumpyの型（数値・真偽値以外の列を含む場合はNone）"""
+    if table.num_columns == 0:
+        return None
+    dtypes = []
+    for field, column in zip(table.schema, table.columns):
+        if not (is_numeric(field.type) or pa.types.is_boolean(field.type)):
+            return None
+        if column.null_count and not pa.types.is_floating(field.type):
+            dtypes.append(np.dtype(np.float64))
+        else:
+            dtypes.append(np.dtype(field.type.to_pandas_dtype()))
+    return np.result_type(*dtypes)
+
+
+def encode_labels(column: pa.ChunkedArray) -> Tuple[pa.ChunkedArray, List[str]]:
+    """
+    列を文字列としてラベルエンコード
+
+    sklearnの LabelEncoder で列を文字列に変換（astype(str)）してエンコードした場合と
+    同じ番号（クラスの文字列の昇順）を返します。欠損は "nan" というクラスになります。
+
+    Args:
+        column: エンコードする列
+
+    Returns:
+        (番号の列（int64）, クラスの一覧)
+    """
+    values = column if pa.types.is_string(column.type) else pc.cast(column, pa.string())
+    values = pc.fill_null(values, "nan")
+    classes = pc.unique(values)
+    classes = classes.take(pc.array_sort_indices(classes))
+    codes = pc.cast(pc.index_in(values, value_set=classes), pa.int64())
+    return codes, classes.to_pylist()
+
+
+def drop_missing(table: pa.Table) -> pa.Table:
+    """欠損値（nullとNaN）を含む行を除外（pandasの dropna() と同じ）"""
+    missing = None
+    for column in table.columns:
+        if not _has_missing(column):
+            continue
+        column_missing = pc.is_null(column, nan_is_null=True)
+        missing = column_missing if missing is None else pc.or_(missing, column_missing)
+    if missing is None:
+        return table
+    return table.filter(pc.invert(missing))
+
+
+def fill_missing(table: pa.Table, strategy: str) -> pa.Table:
+    """
+    欠損値（nullとNaN）を補完（pandasの fillna() と同じ値）
+
+    Args:
+        table: Arrowテーブル
+        strategy: 補完方法
+            mean / median: 数値の列を平均値・中央値で補完（整数の列はfloat64に変換）
+            mode: 全ての列を最頻値（同数の場合は最小の値）で補完
+
+    Returns:
+        補完したテーブル（全ての値が欠損している列はそのまま）
+    """
+    for index, field in enumerate(table.schema):
+        column = table.column(index)
+        if not _has_missing(column):
+            continue
+        if strategy in ("mean", "median"):
+            if not is_numeric(field.type):
+                continue
+            column = pc.cast(column, pa.float64())
+
+        missing = pc.is_null(column, nan_is_null=True)
+        values = pc.filter(column, pc.invert(missing))
+        if len(values) == 0:
+            continue
+        if strategy == "mean":
+            fill = pc.mean(values)
+        elif strategy == "median":
+            fill = pc.quantile(values, q=0.5)[0]
+        elif strategy == "mode":
+            fill = _mode(values)
+        else:
+            raise ValueError(f"Unsupported fill strategy: {strategy}")
+        table = table.set_column(index, field.name, pc.if_else(missing, fill, column))
+    return table
+
+
+def _has_missing(column: pa.ChunkedArray) -> bool:
+    if column.null_count:
+        return True
+    if pa.types.is_floating(column.type):
+        return pc.any(pc.is_nan(column)).as_py() or False
+    return False
+
+
+def _mode(values: Any) -> pa.Scalar:
+    """最頻値（同数の場合は最小の値。pandasの mode()[0] と同じ）"""
+    counts = pc.value_counts(values)
+    frequencies = counts.field("counts")
+    top = pc.equal(frequencies, pc.max(frequencies))
+    return pc.min(pc.filter(counts.field("values"), top))
@@ -0,0 +1,130 @@
+"""
+Cooperative Cancellation for MLOps MCP Server
+
+ツール実行のキャンセルと期限（デッドライン）。
+
+サーバーはツールの実行ごとに CancellationToken を作成し、ツールを実行する
+スレッド（またはプロセス）のコンテキストに設定します。ツールは長いループの中で
+check_cancelled() / cancellable_sleep() を呼び出し、キャンセル・期限切れの場合は
+例外で処理を中断してメモリ等を解放します（トークンが設定されていない場合は何もしません）。
+"""
+
+import contextvars
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .exceptions import DeadlineExceededError, ToolCancelledError
+
+_current_token: contextvars.ContextVar[Optional["CancellationToken"]] = contextvars.ContextVar(
+    "mlops_cancellation_token", default=None
+)
+
+
+class CancellationToken:
+    """
+    1回のツール実行のキャンセル状態と期限
+
+    期限はエポック秒（time.time()）で保持するため、プロセスプールの
+    ワーカーにも渡せます（その場合、キャンセル通知にはプロセス間で共有できる
+    Eventを指定してください）。
+    """
+
+    def __init__(self, deadline: Optional[float] = None, event: Any = None):
+        """
+        Args:
+            deadline: 期限（エポック秒）。Noneの場合は期限なし
+            event: キャンセル通知に使うEvent（省略時はthreading.Event）
+        """
+        self.deadline = deadline
+        self._event = event if event is not None else threading.Event()
+
+    @classmethod
+    def with_timeout(cls, timeout: Optional[float], event: Any = None) -> "CancellationToken":
+        """現在時刻からtimeout秒後を期限とするトークンを作成"""
+        deadline = time.time() + timeout if timeout is not None else None
+        return cls(deadline=deadline, event=event)
+
+    def cancel(self):
+        """キャンセルを通知"""
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """キャンセルされたか"""
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """期限までの残り秒数（期限なしの場合はNone）"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
+    def check(self):
+        """
+        キャンセル・期限切れを確認
+
+        Raises:
+            ToolCancelledError: キャンセルされた場合
+            DeadlineExceededError: 期限を過ぎた場合
+        """
+        if self._event.is_set():
+            raise ToolCancelledError("Tool call was cancelled")
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise DeadlineExceededError("Tool call deadline exceeded")
+
+    def sleep(self, seconds: float):
+        """
+        最大seconds秒待機（キャンセル・期限切れの時点で中断して例外を送出）
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._event.wait(seconds)
+        self.check()
+
+
+def current_token() -> Optional[CancellationToken]:
+    """現在のツール実行のトークン（ツール実行外ではNone）"""
+    return _current_token.get()
+
+
+def check_cancelled():
+    """
+    協調的なキャンセルのチェックポイント
+
+    Raises:
+        ToolCancelledError: 実行中のツール呼び出しがキャンセルされた場合
+        DeadlineExceededError: 実行中のツール呼び出しが期限を過ぎた場合
+    """
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def cancellable_sleep(seconds: float):
+    """
+    キャンセル可能なtime.sleep
+
+    ツール実行外（トークンなし）では通常のtime.sleepと同じです。
+    """
+    token = _current_token.get()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.sleep(seconds)
+
+
+def run_with_token(token: CancellationToken, func: Callable[[], Any]) -> Any:
+    """
+    トークンを設定したコンテキストで関数を実行
+
+    モジュールレベルの関数のため、プロセスプールにもそのまま渡せます。
+    """
+    token.check()
+    reset = _current_token.set(token)
+    try:
+        return func()
+    finally:
+        _current_token.reset(reset)
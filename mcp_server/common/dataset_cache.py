@@ -0,0 +1,196 @@
+"""
+Dataset Cache
+
+解析済みのデータセットをローカルのArrow IPCファイルとして保存し、mmapで開くキャッシュ。
+
+再学習のループ（Judge Agentの判定でリトライ）では、同じ前処理済みの train.csv を
+学習ツールが毎回ダウンロード・解析します。read_table は読み込んだArrowテーブルを
+非圧縮のArrow IPC（Feather V2）ファイルとして一度だけ保存し、以降の呼び出しでは
+ファイルをmmapで開いてコピーせずに返します。解析が不要になるだけでなく、
+プロセスプールの各ワーカーがデータセットの複製を持たずにページキャッシュを共有します。
+
+エントリはバケット/キー/ETagと読み込み条件（フォーマット・列・行の条件）ごとに作成します。
+ETagが変わったオブジェクトの古いエントリは参照されなくなり、上限サイズを超えた時点で
+最終アクセス日時（ヒット時に更新）が古いものから削除されます。一時ファイルに書き込んでから
+置き換えるため、複数のプロセスで同じディレクトリを共有できます。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATASET_SUFFIX = ".arrow"
+
+
+class DatasetCache:
+    """
+    解析済みのデータセットのArrow IPCファイルによるキャッシュ
+
+    スレッドセーフです。ヒット・ミスのカウンターはプロセスごとの値です。
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Args:
+            directory: キャッシュディレクトリ（存在しない場合は作成）
+            max_bytes: キャッシュの上限サイズ（これを超えるデータセットは保存しない）
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_mapped = 0
+
+    def open(self, bucket: str, key: str, etag: str, options: Dict[str, Any]) -> Optional[Any]:
+        """
+        保存済みのデータセットをmmapで開く
+
+        Args:
+            bucket: S3バケット名
+            key: S3オブジェクトキー
+            etag: オブジェクトの現在のETag
+            options: 読み込み条件（フォーマット・列・行の条件）
+
+        Returns:
+            ファイルを参照するArrowテーブル（ない場合・壊れている場合はNone）
+        """
+        import pyarrow as pa
+
+        path = self._path(bucket, key, etag, options)
+        try:
+            source = pa.memory_map(str(path), "r")
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+        try:
+            # 非圧縮のIPCファイルはバッファがmmapを直接参照する（コピーしない）
+            table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Failed to open materialized dataset {path.name}: {e}")
+            source.close()
+            self._remove(path)
+            self._count(hit=False)
+            return None
+
+        try:
+            # LRUの順序はファイルの更新日時で管理する
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(hit=True, size=source.size())
+        return table
+
+    def store(
+        self, bucket: str, key: str, etag: Optional[str], options: Dict[str, Any], table: Any
+    ) -> bool:
+        """
+        データセットをArrow IPCファイルとして保存
+
+        Args:
+            bucket: S3バケット名
+            key: S3オブジェクトキー
+            etag: 読み込んだオブジェクトのETag（不明な場合は保存しない）
+            options: 読み込み条件（フォーマット・列・行の条件）
+            table: 保存するArrowテーブル
+
+        Returns:
+            保存した場合True
+        """
+        import pyarrow as pa
+
+        if not etag or table.nbytes > self.max_bytes:
+            return False
+        path = self._path(bucket, key, etag, options)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        source = json.dumps({"bucket": bucket, "key": key, "etag": etag})
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"mlops.source": source.encode("utf-8")}
+        )
+        try:
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Failed to materialize s3://{bucket}/{key}: {e}")
+            self._remove(tmp_path)
+            return False
+        self._evict()
+        return True
+
+    def clear(self):
+        """全エントリを削除"""
+        for path, _, _ in self._scan():
+            self._remove(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """キャッシュのサイズとヒット・ミス・追い出しのカウンター"""
+        files = self._scan()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": str(self.directory),
+                "entries": len(files),
+                "bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "bytes_mapped": self.bytes_mapped,
+                "evictions": self.evictions,
+            }
+
+    def _count(self, hit: bool, size: int = 0):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_mapped += size
+            else:
+                self.misses += 1
+
+    def _evict(self):
+        """上限サイズに収まるまで最終アクセス日時が古いものから削除"""
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in sorted(files, key=lambda item: item[2]):
+            if total <= self.max_bytes:
+                break
+            # mmap中のプロセスはファイルを削除しても読み続けられる
+            self._remove(path)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def _scan(self) -> List[Tuple[Path, int, float]]:
+        """保存済みファイルの (パス, サイズ, 更新日時) の一覧（他のプロセスの書き込みも含む）"""
+        files = []
+        for path in self.directory.glob(f"*{DATASET_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _path(self, bucket: str, key: str, etag: str, options: Dict[str, Any]) -> Path:
+        identity = json.dumps([bucket, key, etag, options], sort_keys=True, default=str)
+        name = hashlib.sha256(identity.encode("utf-8")).hexdigest() + DATASET_SUFFIX
+        return self.directory / name
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
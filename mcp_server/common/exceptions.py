@@ -13,6 +13,35 @@ class ToolNotFoundError(MCPServerError):
     pass
 
 
+class ServerBusyError(MCPServerError):
+    """サーバービジー（同時実行数の上限と待ち行列が満杯）
+
+    retry_after 秒後を目安に再試行することで解決可能。
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ToolCancelledError(MCPServerError):
+    """ツール呼び出しのキャンセル
+
+    クライアントがリクエストをキャンセルした場合にスローされる。
+    """
+
+    pass
+
+
+class DeadlineExceededError(ToolCancelledError):
+    """ツール呼び出しの期限切れ
+
+    呼び出しに指定された期限（タイムアウト）を過ぎた場合にスローされる。
+    """
+
+    pass
+
+
 class ConfigurationError(MCPServerError):
     """設定エラー"""
 
@@ -29,3 +29,18 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
         logger.addHandler(handler)
 
     return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    モジュール用のロガーを取得
+
+    ハンドラーはエントリーポイント（__main__）で設定するため、ここでは追加しません。
+
+    Args:
+        name: ロガー名（通常は __name__）
+
+    Returns:
+        Logger
+    """
+    return logging.getLogger(name)
@@ -1,21 +1,402 @@
-"""CloudWatch Metrics統合"""
-from datetime import datetime
-from typing import Dict, List
+"""
+メトリクス
+
+- ToolMetrics: ツール呼び出しのレイテンシ・エラー数・実行中の数・待ち時間・S3転送量を
+  プロセス内で集計し、Prometheusのテキスト形式で出力（呼び出しごとのネットワーク通信なし）
+- MetricsPublisher: CloudWatch Metricsへのメトリクス送信（バッファリングしてバックグラウンドで
+  一括送信、またはEmbedded Metric Formatのログ行として出力）
+"""
 
-import boto3
+import bisect
+import json
+import math
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
 
 from .logger import get_logger
+from .s3_utils import get_client
 
 logger = get_logger(__name__)
 
+# MetricsPublisherの送信方法
+PUBLISH_MODE_CLOUDWATCH = "cloudwatch"
+PUBLISH_MODE_EMF = "emf"
+# put_metric_data 1回あたりのメトリクス数の上限
+PUT_METRIC_DATA_BATCH_LIMIT = 1000
+# EMFの1行あたりのメトリクス数・1メトリクスあたりの値の数の上限
+EMF_MAX_METRICS = 100
+EMF_MAX_VALUES = 100
+
+# (メトリクス名, 単位, ((ディメンション名, 値), ...))
+MetricKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+# レイテンシ・待ち時間のヒストグラムのバケット上限（秒）
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+    1800.0,
+    3600.0,
+)
+
+# 集計結果として出力する分位点
+SUMMARY_QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+# ツール呼び出しの結果の分類
+OUTCOME_SUCCESS = "success"
+OUTCOME_ERROR = "error"
+OUTCOME_BUSY = "busy"
+OUTCOME_CANCELLED = "cancelled"
+OUTCOME_DEADLINE_EXCEEDED = "deadline_exceeded"
+
+
+class Histogram:
+    """
+    累積バケット方式のヒストグラム（Prometheusのhistogramと同じ形式）
+
+    分位点はバケット内を線形補間して推定します（Prometheusのhistogram_quantileと同じ方式）。
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # 各バケット（最後は+Inf）に入った観測数（累積ではない）
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """観測値を追加"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位点の推定値（観測がない場合はNone）"""
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    # +Infバケットは補間できないため最大の上限を返す
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Prometheus形式の (le, 累積数) のリスト"""
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            result.append((_format_value(bound), cumulative))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class ToolMetrics:
+    """
+    ツール呼び出しのメトリクスのプロセス内集計
+
+    イベントループ上のcall_toolから記録され、/metricsエンドポイントや
+    get_server_info()から参照されます（スレッドセーフ）。
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._latency: Dict[str, Histogram] = {}
+        self._queue_wait: Dict[str, Histogram] = {}
+        self._calls: Dict[Tuple[str, str], int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._s3_bytes_read: Dict[str, int] = {}
+        self._s3_bytes_written: Dict[str, int] = {}
+        self._s3_cache_hits: Dict[str, int] = {}
+        self._s3_cache_misses: Dict[str, int] = {}
+
+    def call_started(self, tool_name: str):
+        """呼び出しの開始（実行中の数を加算）"""
+        with self._lock:
+            self._in_flight[tool_name] = self._in_flight.get(tool_name, 0) + 1
+
+    def call_finished(self, tool_name: str, duration_seconds: float, outcome: str):
+        """呼び出しの完了（レイテンシ・結果を記録し、実行中の数を減算）"""
+        with self._lock:
+            self._in_flight[tool_name] = self._in_flight.get(tool_name, 1) - 1
+            self._histogram(self._latency, tool_name).observe(duration_seconds)
+            key = (tool_name, outcome)
+            self._calls[key] = self._calls.get(key, 0) + 1
+
+    def record_queue_wait(self, tool_name: str, wait_seconds: float):
+        """同時実行数の制限による待ち時間を記録"""
+        with self._lock:
+            self._histogram(self._queue_wait, tool_name).observe(wait_seconds)
+
+    def record_s3_io(
+        self,
+        tool_name: str,
+        bytes_read: int,
+        bytes_written: int,
+        cache_hits: int = 0,
+        cache_misses: int = 0,
+    ):
+        """ツールがS3から読み込んだ・S3に書き込んだバイト数とディスクキャッシュのヒット・ミス数を記録"""
+        with self._lock:
+            self._s3_bytes_read[tool_name] = self._s3_bytes_read.get(tool_name, 0) + bytes_read
+            self._s3_bytes_written[tool_name] = (
+                self._s3_bytes_written.get(tool_name, 0) + bytes_written
+            )
+            if cache_hits or cache_misses:
+                self._s3_cache_hits[tool_name] = self._s3_cache_hits.get(tool_name, 0) + cache_hits
+                self._s3_cache_misses[tool_name] = (
+                    self._s3_cache_misses.get(tool_name, 0) + cache_misses
+                )
+
+    def _histogram(self, histograms: Dict[str, Histogram], tool_name: str) -> Histogram:
+        histogram = histograms.get(tool_name)
+        if histogram is None:
+            histogram = histograms[tool_name] = Histogram(self._buckets)
+        return histogram
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        ツールごとの集計（呼び出し数・エラー数・実行中の数・レイテンシの分位点・S3転送量・
+        S3ディスクキャッシュのヒット率）
+
+        Returns:
+            {ツール名: {"calls", "errors", "in_flight", "latency_ms": {"p50", "p95", "p99"},
+                        "queue_wait_ms": {...}, "s3_bytes_read", "s3_bytes_written",
+                        "s3_cache_hits", "s3_cache_misses", "s3_cache_hit_ratio"}}
+        """
+        with self._lock:
+            tools = set(self._latency) | set(self._in_flight) | set(self._s3_bytes_read)
+            result = {}
+            for tool_name in sorted(tools):
+                calls = {o: n for (t, o), n in self._calls.items() if t == tool_name}
+                cache_hits = self._s3_cache_hits.get(tool_name, 0)
+                cache_lookups = cache_hits + self._s3_cache_misses.get(tool_name, 0)
+                result[tool_name] = {
+                    "calls": sum(calls.values()),
+                    "errors": sum(n for o, n in calls.items() if o != OUTCOME_SUCCESS),
+                    "outcomes": calls,
+                    "in_flight": self._in_flight.get(tool_name, 0),
+                    "latency_ms": _quantiles_ms(self._latency.get(tool_name)),
+                    "queue_wait_ms": _quantiles_ms(self._queue_wait.get(tool_name)),
+                    "s3_bytes_read": self._s3_bytes_read.get(tool_name, 0),
+                    "s3_bytes_written": self._s3_bytes_written.get(tool_name, 0),
+                    "s3_cache_hits": cache_hits,
+                    "s3_cache_misses": self._s3_cache_misses.get(tool_name, 0),
+                    "s3_cache_hit_ratio": (
+                        round(cache_hits / cache_lookups, 4) if cache_lookups else None
+                    ),
+                }
+            return result
+
+    def render_prometheus(self) -> str:
+        """Prometheusのテキスト形式（version 0.0.4）で出力"""
+        lines: List[str] = []
+        with self._lock:
+            _render_histograms(
+                lines,
+                "mlops_tool_call_duration_seconds",
+                "Tool call latency in seconds",
+                self._latency,
+            )
+            _render_quantiles(
+                lines,
+                "mlops_tool_call_duration_quantile_seconds",
+                "Estimated tool call latency quantiles in seconds",
+                self._latency,
+            )
+            _render_histograms(
+                lines,
+                "mlops_tool_queue_wait_seconds",
+                "Time spent waiting for a concurrency slot in seconds",
+                self._queue_wait,
+            )
+
+            lines.append("# HELP mlops_tool_calls_total Tool calls by outcome")
+            lines.append("# TYPE mlops_tool_calls_total counter")
+            for (tool_name, outcome), count in sorted(self._calls.items()):
+                labels = _labels(tool=tool_name, outcome=outcome)
+                lines.append(f"mlops_tool_calls_total{labels} {count}")
+
+            lines.append("# HELP mlops_tool_calls_in_flight Tool calls currently running")
+            lines.append("# TYPE mlops_tool_calls_in_flight gauge")
+            for tool_name, count in sorted(self._in_flight.items()):
+                lines.append(f"mlops_tool_calls_in_flight{_labels(tool=tool_name)} {count}")
+
+            for name, help_text, values in (
+                ("mlops_s3_bytes_read_total", "Bytes read from S3", self._s3_bytes_read),
+                ("mlops_s3_bytes_written_total", "Bytes written to S3", self._s3_bytes_written),
+                (
+                    "mlops_s3_cache_hits_total",
+                    "S3 objects read from disk cache",
+                    self._s3_cache_hits,
+                ),
+                (
+                    "mlops_s3_cache_misses_total",
+                    "S3 objects downloaded with disk cache enabled",
+                    self._s3_cache_misses,
+                ),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for tool_name, count in sorted(values.items()):
+                    lines.append(f"{name}{_labels(tool=tool_name)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _quantiles_ms(histogram: Optional[Histogram]) -> Dict[str, Optional[float]]:
+    result = {}
+    for q in SUMMARY_QUANTILES:
+        value = histogram.quantile(q) if histogram is not None else None
+        result[f"p{int(q * 100)}"] = round(value * 1000, 3) if value is not None else None
+    return result
+
+
+def _render_histograms(
+    lines: List[str], name: str, help_text: str, histograms: Dict[str, Histogram]
+):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for tool_name, histogram in sorted(histograms.items()):
+        for le, count in histogram.cumulative_counts():
+            lines.append(f"{name}_bucket{_labels(tool=tool_name, le=le)} {count}")
+        lines.append(f"{name}_sum{_labels(tool=tool_name)} {_format_value(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(tool=tool_name)} {histogram.count}")
+
+
+def _render_quantiles(
+    lines: List[str], name: str, help_text: str, histograms: Dict[str, Histogram]
+):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} gauge")
+    for tool_name, histogram in sorted(histograms.items()):
+        for q in SUMMARY_QUANTILES:
+            value = histogram.quantile(q)
+            if value is not None:
+                labels = _labels(tool=tool_name, quantile=str(q))
+                lines.append(f"{name}{labels} {_format_value(value)}")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    """ラベル値のエスケープ（バックスラッシュ・ダブルクォート・改行）"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _MetricAggregate:
+    """フラッシュ間隔内の同じメトリクス（名前・単位・ディメンション）の集計"""
+
+    __slots__ = ("timestamp", "count", "sum", "min", "max", "values")
+
+    def __init__(self, timestamp: datetime):
+        self.timestamp = timestamp
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # EMFモードのみ個々の値を保持
+        self.values: List[float] = []
+
+    def add(self, value: float, keep_value: bool):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if keep_value:
+            self.values.append(value)
+
 
 class MetricsPublisher:
-    """CloudWatch Metricsへのメトリクス送信"""
+    """
+    CloudWatch Metricsへのメトリクス送信
+
+    put_metricはデータポイントをメモリ上で集計するだけで、送信はバックグラウンドの
+    スレッドで行います（呼び出し元のツールのレイテンシに送信時間を含めません）。
+
+    - cloudwatch モード: 同じメトリクス・ディメンションのデータポイントを統計セット
+      （SampleCount / Sum / Minimum / Maximum）にまとめ、put_metric_dataの上限
+      （PUT_METRIC_DATA_BATCH_LIMIT件）ごとに送信
+    - emf モード: Embedded Metric Format の構造化ログ行として出力（API呼び出しなし）
+
+    flush_interval秒ごと、またはバッファが上限に達した時点で送信します。
+    """
+
+    def __init__(
+        self,
+        config,
+        mode: str = PUBLISH_MODE_CLOUDWATCH,
+        flush_interval: float = 60.0,
+        max_buffered_points: int = 10000,
+        emf_output: Optional[TextIO] = None,
+    ):
+        """
+        Args:
+            config: サーバー設定（aws_regionを使用）
+            mode: 送信方法（"cloudwatch" または "emf"）
+            flush_interval: 送信間隔（秒）
+            max_buffered_points: 送信間隔を待たずに送信するデータポイント数
+            emf_output: EMFの出力先（省略時は標準エラー出力。標準出力はstdioトランスポートが使用）
+        """
+        if mode not in (PUBLISH_MODE_CLOUDWATCH, PUBLISH_MODE_EMF):
+            raise ValueError(f"Unknown metrics publish mode: {mode}")
 
-    def __init__(self, config):
         self.config = config
-        self.cloudwatch = boto3.client("cloudwatch", region_name=config.aws_region)
+        self.mode = mode
         self.namespace = "MLOps/UnifiedMCPServer"
+        self.flush_interval = flush_interval
+        self.max_buffered_points = max_buffered_points
+        self.emf_output = emf_output
+        self.cloudwatch = None
+        if mode == PUBLISH_MODE_CLOUDWATCH:
+            self.cloudwatch = get_client("cloudwatch", region_name=config.aws_region)
+
+        self._lock = threading.Lock()
+        # (メトリクス名, 単位, ディメンション) → 集計
+        self._buffer: Dict[MetricKey, _MetricAggregate] = {}
+        self._buffered_points = 0
+        # 送信を直列化（バックグラウンドの送信とflush()の同時実行を防ぐ）
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.published_points = 0
+        self.dropped_points = 0
 
     def put_metric(
         self,
@@ -24,24 +405,124 @@ class MetricsPublisher:
         unit: str = "None",
         dimensions: List[Dict[str, str]] = None,
     ):
-        """メトリクスを送信"""
-        try:
-            metric_data = {
-                "MetricName": metric_name,
-                "Value": value,
+        """メトリクスをバッファに追加（送信はバックグラウンドで行う）"""
+        key = (
+            metric_name,
+            unit,
+            tuple((d["Name"], d["Value"]) for d in dimensions or []),
+        )
+        with self._lock:
+            if self._closed:
+                logger.debug(f"Metrics publisher closed; dropped metric: {metric_name}")
+                return
+            aggregate = self._buffer.get(key)
+            if aggregate is None:
+                aggregate = self._buffer[key] = _MetricAggregate(datetime.utcnow())
+            aggregate.add(float(value), keep_value=self.mode == PUBLISH_MODE_EMF)
+            self._buffered_points += 1
+            full = (
+                self._buffered_points >= self.max_buffered_points
+                or len(self._buffer) >= PUT_METRIC_DATA_BATCH_LIMIT
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="mlops-metrics-publisher", daemon=True
+                )
+                self._thread.start()
+
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """バッファのメトリクスを送信（呼び出し元のスレッドで完了まで待つ）"""
+        with self._flush_lock:
+            with self._lock:
+                buffer, self._buffer = self._buffer, {}
+                points, self._buffered_points = self._buffered_points, 0
+            if not buffer:
+                return
+
+            try:
+                if self.mode == PUBLISH_MODE_EMF:
+                    self._write_emf(buffer)
+                else:
+                    self._put_metric_data(buffer)
+                self.published_points += points
+            except Exception:
+                self.dropped_points += points
+                logger.error(f"Failed to publish {points} metric data points", exc_info=True)
+
+    def close(self, timeout: float = 10.0):
+        """バックグラウンドの送信を停止し、残りのメトリクスを送信"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._wakeup.set()
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """送信状況"""
+        with self._lock:
+            buffered = self._buffered_points
+        return {
+            "mode": self.mode,
+            "buffered_points": buffered,
+            "published_points": self.published_points,
+            "dropped_points": self.dropped_points,
+        }
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _put_metric_data(self, buffer: Dict[MetricKey, _MetricAggregate]):
+        """統計セットにまとめたメトリクスをAPIの上限件数ごとに送信"""
+        metric_data = []
+        for (name, unit, dimensions), aggregate in buffer.items():
+            datum: Dict[str, Any] = {
+                "MetricName": name,
+                "Timestamp": aggregate.timestamp,
+                "StatisticValues": {
+                    "SampleCount": aggregate.count,
+                    "Sum": aggregate.sum,
+                    "Minimum": aggregate.min,
+                    "Maximum": aggregate.max,
+                },
                 "Unit": unit,
-                "Timestamp": datetime.utcnow(),
             }
-
             if dimensions:
-                metric_data["Dimensions"] = dimensions
+                datum["Dimensions"] = [{"Name": n, "Value": v} for n, v in dimensions]
+            metric_data.append(datum)
 
-            self.cloudwatch.put_metric_data(Namespace=self.namespace, MetricData=[metric_data])
+        for i in range(0, len(metric_data), PUT_METRIC_DATA_BATCH_LIMIT):
+            batch = metric_data[i : i + PUT_METRIC_DATA_BATCH_LIMIT]
+            self.cloudwatch.put_metric_data(Namespace=self.namespace, MetricData=batch)
+            logger.debug(f"Published {len(batch)} metrics to CloudWatch")
 
-            logger.debug(f"Published metric: {metric_name}={value}")
+    def _write_emf(self, buffer: Dict[MetricKey, _MetricAggregate]):
+        """ディメンションごとにEmbedded Metric Formatのログ行を出力"""
+        groups: Dict[Tuple[Tuple[str, str], ...], List[Tuple[str, str, List[float]]]] = {}
+        for (name, unit, dimensions), aggregate in buffer.items():
+            groups.setdefault(dimensions, []).append((name, unit, aggregate.values))
 
-        except Exception:
-            logger.error(f"Failed to publish metric: {metric_name}", exc_info=True)
+        output = self.emf_output if self.emf_output is not None else sys.stderr
+        timestamp = int(time.time() * 1000)
+        lines = []
+        for dimensions, metrics in groups.items():
+            for i in range(0, len(metrics), EMF_MAX_METRICS):
+                chunk = metrics[i : i + EMF_MAX_METRICS]
+                n_lines = max(math.ceil(len(values) / EMF_MAX_VALUES) for _, _, values in chunk)
+                for line_index in range(n_lines):
+                    lines.append(
+                        _emf_line(self.namespace, timestamp, dimensions, chunk, line_index)
+                    )
+
+        output.write("".join(line + "\n" for line in lines))
+        output.flush()
 
     def record_tool_execution(self, tool_name: str, duration_ms: float, success: bool):
         """ツール実行メトリクスを記録"""
@@ -72,3 +553,34 @@ class MetricsPublisher:
             unit="None",
             dimensions=[{"Name": "TaskType", "Value": task_type}],
         )
+
+
+def _emf_line(
+    namespace: str,
+    timestamp: int,
+    dimensions: Tuple[Tuple[str, str], ...],
+    metrics: List[Tuple[str, str, List[float]]],
+    line_index: int,
+) -> str:
+    """Embedded Metric Formatの1行（値はEMF_MAX_VALUES件ずつ分割したline_index番目）"""
+    record: Dict[str, Any] = {
+        "_aws": {
+            "Timestamp": timestamp,
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": namespace,
+                    "Dimensions": [[name for name, _ in dimensions]],
+                    "Metrics": [],
+                }
+            ],
+        }
+    }
+    directive = record["_aws"]["CloudWatchMetrics"][0]
+    for name, value in dimensions:
+        record[name] = value
+    for name, unit, values in metrics:
+        chunk = values[line_index * EMF_MAX_VALUES : (line_index + 1) * EMF_MAX_VALUES]
+        if chunk:
+            directive["Metrics"].append({"Name": name, "Unit": unit})
+            record[name] = chunk if len(chunk) > 1 else chunk[0]
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
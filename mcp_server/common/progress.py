@@ -0,0 +1,105 @@
+"""
+Progress Reporting for MLOps MCP Server
+
+ツール実行の進捗通知。
+
+サーバーは進捗の通知先が指定されたツール呼び出しごとに ProgressReporter を作成し、
+ツールを実行するスレッド（またはプロセス）のコンテキストに設定します。ツールは
+report_progress() でダウンロード済みバイト数・解析した行数・学習の進み具合・
+エンドポイントの状態遷移などを報告します（レポーターが設定されていない場合は何もしません）。
+"""
+
+import contextvars
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ProgressUpdate = Dict[str, Any]
+
+# 同じ段階の進捗を通知する最小間隔（秒）。段階の切り替わりと完了は常に通知
+MIN_REPORT_INTERVAL = 0.2
+
+_current_reporter: contextvars.ContextVar[Optional["ProgressReporter"]] = contextvars.ContextVar(
+    "mlops_progress_reporter", default=None
+)
+
+
+class ProgressReporter:
+    """
+    1回のツール実行の進捗の送信先
+
+    通知が多くなりすぎないよう、同じ段階の進捗はMIN_REPORT_INTERVAL秒ごとに間引きます。
+    emitにプロセス間で共有できるキューのputを指定すれば、プロセスプールのワーカーにも渡せます。
+    """
+
+    def __init__(
+        self, emit: Callable[[ProgressUpdate], Any], min_interval: float = MIN_REPORT_INTERVAL
+    ):
+        """
+        Args:
+            emit: 進捗（{"stage", "current", "total", "message"}）を受け取る関数
+            min_interval: 同じ段階の進捗を通知する最小間隔（秒）
+        """
+        self._emit = emit
+        self.min_interval = min_interval
+        self._last_stage: Optional[str] = None
+        self._last_time = 0.0
+
+    def report(
+        self,
+        stage: str,
+        current: float,
+        total: Optional[float] = None,
+        message: Optional[str] = None,
+    ):
+        """
+        進捗を報告
+
+        Args:
+            stage: 処理の段階（例: "download", "parse", "train", "deploy"）
+            current: 段階内の進捗（バイト数・行数・エポック数など）
+            total: 段階全体の量（不明な場合はNone）
+            message: 表示用メッセージ（省略時は段階と進捗から生成）
+        """
+        now = time.monotonic()
+        finished = total is not None and current >= total
+        if stage == self._last_stage and not finished and now - self._last_time < self.min_interval:
+            return
+        self._last_stage = stage
+        self._last_time = now
+
+        if message is None:
+            message = f"{stage}: {current}" + (f"/{total}" if total is not None else "")
+        try:
+            self._emit({"stage": stage, "current": current, "total": total, "message": message})
+        except Exception as e:
+            # 通知先が閉じていてもツールの実行は継続
+            logger.debug(f"Failed to report progress: {e}")
+
+
+def report_progress(
+    stage: str, current: float, total: Optional[float] = None, message: Optional[str] = None
+):
+    """
+    実行中のツール呼び出しの進捗を報告
+
+    ツール呼び出し外（レポーターなし）では何もしません。
+    """
+    reporter = _current_reporter.get()
+    if reporter is not None:
+        reporter.report(stage, current, total, message)
+
+
+def run_with_progress(reporter: ProgressReporter, func: Callable[[], Any]) -> Any:
+    """
+    レポーターを設定したコンテキストで関数を実行
+
+    モジュールレベルの関数のため、プロセスプールにもそのまま渡せます。
+    """
+    reset = _current_reporter.set(reporter)
+    try:
+        return func()
+    finally:
+        _current_reporter.reset(reset)
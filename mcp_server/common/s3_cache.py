@@ -0,0 +1,295 @@
+"""
+S3 Object Cache
+
+S3オブジェクトのローカルディスクキャッシュ。
+
+同じホスト上のパイプラインの各ステップ（学習・評価・メタデータ抽出・パッケージ作成）が
+同じデータセット・モデルを繰り返しダウンロードしないよう、オブジェクトの内容を
+バケット/キーごとにETagとともに保存します。読み込みのたびにETagで再検証する
+（S3RangeReaderが条件付きGET（IfNoneMatch）を送る）ため、更新されたオブジェクトの
+古い内容を返すことはありません。
+
+キャッシュファイルは1行目がメタデータ（JSON）、2行目以降がオブジェクトの内容です。
+一時ファイルに書き込んでから置き換えるため、プロセスプールのワーカーを含む複数の
+プロセスで同じディレクトリを共有できます。上限サイズを超えた場合は最終アクセス日時
+（ヒット時に更新）が古いものから削除します。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".s3obj"
+
+
+@dataclass
+class CachedObject:
+    """キャッシュ済みのS3オブジェクト"""
+
+    bucket: str
+    key: str
+    etag: str
+    content_type: Optional[str]
+    size: int
+    path: Path
+    # メタデータ行を読み終えた（内容の先頭に位置付けた）キャッシュファイル
+    file: BinaryIO
+
+
+class S3ObjectCache:
+    """
+    バケット/キー/ETagで検証するS3オブジェクトのディスクキャッシュ
+
+    スレッドセーフです。ヒット・ミスのカウンターはプロセスごとの値です
+    （ツールごとのヒット率はS3転送量と同様にワーカー側で計測されます）。
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Args:
+            directory: キャッシュディレクトリ（存在しない場合は作成）
+            max_bytes: キャッシュの上限サイズ（これを超えるオブジェクトは保存しない）
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+    def lookup(self, bucket: str, key: str) -> Optional[CachedObject]:
+        """
+        キャッシュ済みのオブジェクトを返す（ETagの再検証は呼び出し側で行う）
+
+        ファイルは開いたまま返すため、検証中に他のプロセスが置き換えても
+        確認したETagと異なる内容を読むことはありません。使わない場合は
+        CachedObject.file を閉じてください。
+
+        Returns:
+            キャッシュ済みのオブジェクト（ない場合・壊れている場合はNone）
+        """
+        path = self.directory / self._file_name(bucket, key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to open S3 cache file {path.name}: {e}")
+            return None
+
+        try:
+            header_line = f.readline()
+            header = json.loads(header_line)
+            valid = (header.get("bucket"), header.get("key")) == (bucket, key) and (
+                # 書き込みが途中のファイルは使わない
+                os.fstat(f.fileno()).st_size - len(header_line)
+                == header.get("size")
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read S3 cache file {path.name}: {e}")
+            valid = False
+        if not valid:
+            f.close()
+            return None
+        return CachedObject(
+            bucket=bucket,
+            key=key,
+            etag=header["etag"],
+            content_type=header.get("content_type"),
+            size=header["size"],
+            path=path,
+            file=f,
+        )
+
+    def record_hit(self, entry: CachedObject) -> BinaryIO:
+        """
+        ヒット（ETagの再検証で変更なし）を記録
+
+        Returns:
+            オブジェクトの内容の先頭に位置付けたファイル
+        """
+        try:
+            # LRUの順序はファイルの更新日時で管理する
+            os.utime(entry.path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            self.bytes_served += entry.size
+        return entry.file
+
+    def record_miss(self, stale: bool = False):
+        """
+        ミス（S3からダウンロード）を記録
+
+        Args:
+            stale: キャッシュ済みのETagが現在のオブジェクトと一致しなかった場合True
+        """
+        with self._lock:
+            self.misses += 1
+            if stale:
+                self.stale += 1
+
+    def writer(
+        self,
+        bucket: str,
+        key: str,
+        etag: Optional[str],
+        content_type: Optional[str],
+        size: Optional[int],
+    ) -> Optional["S3CacheWriter"]:
+        """
+        ダウンロード中のオブジェクトをキャッシュに書き込むライターを返す
+
+        Returns:
+            ライター（ETag・サイズが不明なオブジェクト、上限を超えるオブジェクトはNone）
+        """
+        if not etag or size is None or size > self.max_bytes:
+            return None
+        header = {
+            "bucket": bucket,
+            "key": key,
+            "etag": etag,
+            "content_type": content_type,
+            "size": size,
+        }
+        path = self.directory / self._file_name(bucket, key)
+        try:
+            return S3CacheWriter(self, path, header)
+        except OSError as e:
+            logger.warning(f"Failed to create S3 cache file for s3://{bucket}/{key}: {e}")
+            return None
+
+    def clear(self):
+        """全エントリを削除"""
+        for path, _, _ in self._scan():
+            self._remove(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """キャッシュのサイズとヒット・ミス・追い出しのカウンター"""
+        files = self._scan()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": str(self.directory),
+                "entries": len(files),
+                "bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "bytes_served": self.bytes_served,
+                "evictions": self.evictions,
+            }
+
+    def _commit(self, tmp_path: Path, path: Path):
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """上限サイズに収まるまで最終アクセス日時が古いものから削除"""
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in sorted(files, key=lambda item: item[2]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def _scan(self) -> List[Tuple[Path, int, float]]:
+        """キャッシュファイルの (パス, サイズ, 更新日時) の一覧（他のプロセスの書き込みも含む）"""
+        files = []
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    @staticmethod
+    def _file_name(bucket: str, key: str) -> str:
+        return hashlib.sha256(f"{bucket}/{key}".encode("utf-8")).hexdigest() + CACHE_SUFFIX
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3CacheWriter:
+    """
+    ダウンロードしながらキャッシュファイルを書き込む
+
+    全体を書き込んでcommit()した時点でキャッシュに登録されます。途中で読み込みを
+    やめた場合・書き込みに失敗した場合はdiscard()で一時ファイルを削除します。
+    """
+
+    def __init__(self, cache: S3ObjectCache, path: Path, header: Dict[str, Any]):
+        self._cache = cache
+        self._path = path
+        self._tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        self._size = header["size"]
+        self._written = 0
+        self._file: Optional[BinaryIO] = open(self._tmp_path, "wb")
+        self._file.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def write(self, data: bytes):
+        """内容の続きを書き込む（失敗した場合はキャッシュを諦めて一時ファイルを削除）"""
+        if self._file is None:
+            return
+        try:
+            self._file.write(data)
+            self._written += len(data)
+        except OSError as e:
+            logger.warning(f"Failed to write S3 cache file {self._path.name}: {e}")
+            self.discard()
+
+    def commit(self) -> bool:
+        """
+        書き込みを完了してキャッシュに登録
+
+        Returns:
+            登録した場合True（内容がメタデータのサイズと一致しない場合は登録しない）
+        """
+        if self._file is None:
+            return False
+        try:
+            self._file.close()
+            self._file = None
+            if self._written != self._size:
+                self.discard()
+                return False
+            self._cache._commit(self._tmp_path, self._path)
+            return True
+        except OSError as e:
+            logger.warning(f"Failed to commit S3 cache file {self._path.name}: {e}")
+            self.discard()
+            return False
+
+    def discard(self):
+        """書き込みを中止して一時ファイルを削除"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        self._cache._remove(self._tmp_path)
@@ -1,14 +1,237 @@
 """
 S3 Utility Functions for MLOps MCP Server
 
-S3操作のユーティリティ関数（Phase 1では骨格のみ）
+S3操作のユーティリティ関数と、全ツールで共有するAWSクライアント
 """
 
+import contextvars
+import io
+import json
 import logging
-from typing import Any, Dict
+import re
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .cancellation import check_cancelled
+from .dataset_cache import DatasetCache
+from .progress import report_progress, run_with_progress
+from .s3_cache import CachedObject, S3CacheWriter, S3ObjectCache
+from .tracing import install_aws_tracing_hooks, span
 
 logger = logging.getLogger(__name__)
 
+# 読み込んだS3オブジェクト: (バケット, キー, ETag)。ETagがNoneのものは「存在しない」ことを表す
+S3ObjectVersions = List[Tuple[str, str, Optional[str]]]
+
+# HEADで検証できるS3操作（それ以外のAWS API呼び出しがあった場合は追跡不能とする）
+_TRACKABLE_OPERATIONS = ("GetObject", "HeadObject")
+
+_current_tracker: contextvars.ContextVar[Optional["S3ReadTracker"]] = contextvars.ContextVar(
+    "mlops_s3_read_tracker", default=None
+)
+_current_io_counter: contextvars.ContextVar[Optional["S3IOCounter"]] = contextvars.ContextVar(
+    "mlops_s3_io_counter", default=None
+)
+_hooks_installed = False
+_io_hooks_installed = False
+_hooks_lock = threading.Lock()
+
+# read_body の1回あたりの読み込みサイズ
+READ_CHUNK_BYTES = 8 * 1024 * 1024
+# read_dataset でパーサーに渡すストリームのバッファサイズ
+STREAM_BUFFER_BYTES = 1024 * 1024
+
+# 並列ダウンロード（範囲指定GET）のデフォルト（サーバーはConfigの値で上書き）
+# パートサイズ以下のオブジェクトは1回のGETで読み込む
+DEFAULT_DOWNLOAD_PART_BYTES = 8 * 1024 * 1024
+DEFAULT_DOWNLOAD_CONCURRENCY = 8
+
+# 並列アップロード（マルチパートアップロード）のデフォルト（サーバーはConfigの値で上書き）
+# S3は最後以外のパートに5MiB以上を要求する。パートサイズ未満のデータは1回のPutObjectで保存する
+MIN_UPLOAD_PART_BYTES = 5 * 1024 * 1024
+DEFAULT_UPLOAD_PART_BYTES = 8 * 1024 * 1024
+DEFAULT_UPLOAD_CONCURRENCY = 4
+
+# シャード化されたデータセットの並列に読み込むパート数のデフォルト（サーバーはConfigの値で上書き）
+DEFAULT_DATASET_PART_CONCURRENCY = 8
+
+_transfer_settings: Dict[str, int] = {
+    "download_part_bytes": DEFAULT_DOWNLOAD_PART_BYTES,
+    "download_concurrency": DEFAULT_DOWNLOAD_CONCURRENCY,
+    "upload_part_bytes": DEFAULT_UPLOAD_PART_BYTES,
+    "upload_concurrency": DEFAULT_UPLOAD_CONCURRENCY,
+    "dataset_part_concurrency": DEFAULT_DATASET_PART_CONCURRENCY,
+}
+
+# S3オブジェクトのディスクキャッシュ（サーバー設定でディレクトリが指定された場合のみ）
+_object_cache: Optional[S3ObjectCache] = None
+# 解析済みのデータセットのキャッシュ（サーバー設定でディレクトリが指定された場合のみ）
+_dataset_cache: Optional[DatasetCache] = None
+
+# S3RandomAccessFile が最初に取得する末尾のバイト数（Parquetのフッターが収まることが多いサイズ）
+TAIL_BYTES = 64 * 1024
+
+# GetObjectの"ContentRange"（例: "bytes 0-8388607/123456789"）
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+# read_dataset が対応するファイルフォーマット（jsonlは1行1レコードのJSON Lines）
+DATASET_FORMATS = ("csv", "parquet", "json", "jsonl")
+
+# シャード化されたデータセットのマニフェストとみなすキーの末尾（末尾が"/"のキーはプレフィックス）
+MANIFEST_SUFFIXES = ("manifest", "manifest.json")
+
+# 共有AWSクライアントの接続設定のデフォルト（サーバーはConfigの値で上書き）
+# スレッドプールの全ワーカーが同じクライアントを使うため、botocoreのデフォルト（10）より大きくする
+DEFAULT_MAX_POOL_CONNECTIONS = 32
+DEFAULT_RETRY_MODE = "standard"
+DEFAULT_MAX_ATTEMPTS = 5
+
+_client_settings: Dict[str, Any] = {
+    "region_name": None,
+    "max_pool_connections": DEFAULT_MAX_POOL_CONNECTIONS,
+    "tcp_keepalive": True,
+    "retry_mode": DEFAULT_RETRY_MODE,
+    "max_attempts": DEFAULT_MAX_ATTEMPTS,
+}
+# (サービス名, リージョン) → 作成済みのクライアント
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def configure_aws_clients(config: Any) -> None:
+    """
+    共有AWSクライアントの接続設定をサーバー設定から反映
+
+    作成済みのクライアントは破棄され、次回のget_client()で新しい設定で作成されます。
+    並列ダウンロード・並列アップロードのパートサイズ・並列数、シャード化された
+    データセットの並列読み込み数と、S3オブジェクトのディスクキャッシュ、
+    解析済みのデータセットのキャッシュも設定します。
+    モジュールレベルの関数のため、プロセスプールのワーカーの初期化にもそのまま渡せます。
+
+    Args:
+        config: サーバー設定（aws_region, aws_max_pool_connections, aws_tcp_keepalive,
+            aws_retry_mode, aws_max_attempts, s3_download_part_bytes,
+            s3_download_concurrency, s3_upload_part_bytes, s3_upload_concurrency,
+            s3_cache_dir, s3_cache_max_bytes, dataset_cache_dir, dataset_cache_max_bytes,
+            dataset_part_concurrency を使用）
+    """
+    global _object_cache, _dataset_cache
+    _object_cache = (
+        S3ObjectCache(config.s3_cache_dir, config.s3_cache_max_bytes)
+        if config.s3_cache_dir
+        else None
+    )
+    _dataset_cache = (
+        DatasetCache(config.dataset_cache_dir, config.dataset_cache_max_bytes)
+        if config.dataset_cache_dir
+        else None
+    )
+    _transfer_settings.update(
+        download_part_bytes=config.s3_download_part_bytes,
+        download_concurrency=config.s3_download_concurrency,
+        upload_part_bytes=config.s3_upload_part_bytes,
+        upload_concurrency=config.s3_upload_concurrency,
+        dataset_part_concurrency=config.dataset_part_concurrency,
+    )
+    with _clients_lock:
+        _client_settings.update(
+            region_name=config.aws_region,
+            max_pool_connections=config.aws_max_pool_connections,
+            tcp_keepalive=config.aws_tcp_keepalive,
+            retry_mode=config.aws_retry_mode,
+            max_attempts=config.aws_max_attempts,
+        )
+        _clients.clear()
+
+
+def get_client(service_name: str, region_name: Optional[str] = None) -> Any:
+    """
+    共有のAWSクライアントを返す
+
+    サービス・リージョンごとに1度だけ作成して使い回すため、呼び出しのたびに
+    認証情報・エンドポイントを解決し直したり、HTTPの接続を張り直したりしません。
+    botocoreのクライアントはスレッドセーフなので、スレッドプールの全ワーカーで共有できます
+    （プロセスプールのワーカーはプロセスごとに作成します）。
+
+    Args:
+        service_name: サービス名（"s3", "sagemaker" 等）
+        region_name: リージョン（省略時はサーバー設定のリージョン）
+
+    Returns:
+        boto3のクライアント
+    """
+    if region_name is None:
+        region_name = _client_settings["region_name"]
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            import boto3
+            from botocore.config import Config as BotocoreConfig
+
+            # イベントフックは登録後に作成されたクライアントにのみ適用されるため、先に登録
+            install_s3_read_hooks()
+            install_s3_io_hooks()
+            install_aws_tracing_hooks()
+
+            client_config = BotocoreConfig(
+                max_pool_connections=_client_settings["max_pool_connections"],
+                tcp_keepalive=_client_settings["tcp_keepalive"],
+                retries={
+                    "mode": _client_settings["retry_mode"],
+                    "total_max_attempts": _client_settings["max_attempts"],
+                },
+            )
+            # boto3のデフォルトセッションはスレッドセーフではないため、作成はロック内で行う
+            client = boto3.client(service_name, region_name=region_name, config=client_config)
+            _clients[key] = client
+            logger.debug(f"Created AWS client: {service_name} ({region_name or 'default region'})")
+    return client
+
+
+def clear_aws_clients() -> None:
+    """作成済みの共有AWSクライアントを破棄（次回のget_client()で作成し直す）"""
+    with _clients_lock:
+        _clients.clear()
+
+
+def aws_client_info() -> Dict[str, Any]:
+    """共有AWSクライアントの接続設定と作成済みのクライアントの一覧"""
+    with _clients_lock:
+        clients = sorted(f"{service}@{region or 'default'}" for service, region in _clients)
+    return {**_client_settings, **_transfer_settings, "clients": clients}
+
+
+def s3_cache_info() -> Optional[Dict[str, Any]]:
+    """S3オブジェクトのディスクキャッシュのサイズとヒット率（無効な場合はNone）"""
+    cache = _object_cache
+    return cache.stats() if cache is not None else None
+
+
+def dataset_cache_info() -> Optional[Dict[str, Any]]:
+    """解析済みのデータセットのキャッシュのサイズとヒット率（無効な場合はNone）"""
+    cache = _dataset_cache
+    return cache.stats() if cache is not None else None
+
 
 def load_from_s3(bucket: str, key: str) -> Dict[str, Any]:
     """
@@ -19,14 +242,15 @@ def load_from_s3(bucket: str, key: str) -> Dict[str, Any]:
         key: S3オブジェクトキー
 
     Returns:
-        読み込んだデータ
-
-    Note:
-        Phase 1では骨格のみ。実装はPhase 2以降。
+        読み込んだデータ（"body": 内容のバイト列, "content_type", "etag"）
     """
     logger.info(f"Loading from S3: s3://{bucket}/{key}")
-    # TODO: boto3を使用した実装
-    raise NotImplementedError("S3 load not implemented yet")
+    with S3RangeReader(get_client("s3"), bucket, key) as reader:
+        return {
+            "body": reader.readall(),
+            "content_type": reader.content_type,
+            "etag": reader.etag,
+        }
 
 
 def save_to_s3(bucket: str, key: str, data: Any) -> bool:
@@ -36,14 +260,1856 @@ def save_to_s3(bucket: str, key: str, data: Any) -> bool:
     Args:
         bucket: S3バケット名
         key: S3オブジェクトキー
-        data: 保存するデータ
+        data: 保存するデータ（bytes・文字列はそのまま、それ以外はJSONとして保存）
 
     Returns:
         成功した場合True
-
-    Note:
-        Phase 1では骨格のみ。実装はPhase 2以降。
     """
     logger.info(f"Saving to S3: s3://{bucket}/{key}")
-    # TODO: boto3を使用した実装
-    raise NotImplementedError("S3 save not implemented yet")
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    elif not isinstance(data, (bytes, bytearray)):
+        data = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+    get_client("s3").put_object(Bucket=bucket, Key=key, Body=data)
+    return True
+
+
+class S3ReadTracker:
+    """
+    ツール実行中に読み込まれたS3オブジェクトとそのETagを記録
+
+    boto3のイベントフックで記録するため、ツール側の変更は不要です。
+    GetObject/HeadObject以外のAWS API呼び出し（ListObjects, SageMaker等）や
+    ETagが取得できない応答があった場合は、入力を検証できないものとして扱います。
+    """
+
+    def __init__(self):
+        self.objects: Dict[Tuple[str, str], Optional[str]] = {}
+        self.untrackable = False
+
+    def record(self, bucket: str, key: str, etag: Optional[str]):
+        """オブジェクトの読み込み（ETag=Noneは存在しないことの確認）を記録"""
+        previous = self.objects.get((bucket, key), etag)
+        if previous != etag:
+            # 実行中にオブジェクトが更新された
+            self.untrackable = True
+        self.objects[(bucket, key)] = etag
+
+    def snapshot(self) -> Optional[S3ObjectVersions]:
+        """
+        読み込んだオブジェクトの一覧を返す
+
+        Returns:
+            (バケット, キー, ETag) のリスト。入力を検証できない場合・S3を読んでいない場合はNone
+        """
+        if self.untrackable or not self.objects:
+            return None
+        return [(bucket, key, etag) for (bucket, key), etag in sorted(self.objects.items())]
+
+
+@contextmanager
+def track_s3_reads() -> Iterator[S3ReadTracker]:
+    """このコンテキスト内（同一スレッド）のS3読み込みを記録"""
+    install_s3_read_hooks()
+    tracker = S3ReadTracker()
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+def call_with_s3_tracking(
+    func: Callable, kwargs: Dict[str, Any]
+) -> Tuple[Any, Optional[S3ObjectVersions]]:
+    """
+    関数を実行し、結果と読み込んだS3オブジェクトを返す
+
+    モジュールレベルの関数のため、プロセスプールにもそのまま渡せます。
+    """
+    with track_s3_reads() as tracker:
+        result = func(**kwargs)
+    return result, tracker.snapshot()
+
+
+def install_s3_read_hooks():
+    """
+    boto3のデフォルトセッションにS3読み込み記録用のイベントフックを登録
+
+    フックは登録後に作成されたクライアントに適用されます。
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+
+    with _hooks_lock:
+        if not _hooks_installed:
+            import boto3
+
+            events = boto3._get_default_session().events
+            events.register("before-parameter-build", _remember_s3_object)
+            events.register("after-call", _record_s3_response)
+            _hooks_installed = True
+
+
+def _remember_s3_object(params=None, context=None, event_name="", **kwargs):
+    if _current_tracker.get() is None or context is None or not params:
+        return
+    if event_name.startswith("before-parameter-build.s3."):
+        context["mlops_s3_object"] = (
+            params.get("Bucket"),
+            params.get("Key"),
+            params.get("IfNoneMatch"),
+        )
+
+
+def _record_s3_response(http_response=None, parsed=None, context=None, event_name="", **kwargs):
+    tracker = _current_tracker.get()
+    if tracker is None:
+        return
+
+    service, _, operation = event_name[len("after-call.") :].partition(".")
+    s3_object = (context or {}).get("mlops_s3_object")
+    if service != "s3" or operation not in _TRACKABLE_OPERATIONS or s3_object is None:
+        tracker.untrackable = True
+        return
+
+    bucket, key, if_none_match = s3_object
+    status = getattr(http_response, "status_code", None)
+    etag = (parsed or {}).get("ETag")
+    if status == 404:
+        tracker.record(bucket, key, None)
+    elif status in (200, 206) and isinstance(etag, str):
+        tracker.record(bucket, key, etag)
+    elif status == 304 and if_none_match:
+        # ディスクキャッシュの再検証（キャッシュ済みの版のまま）
+        tracker.record(bucket, key, if_none_match)
+    else:
+        tracker.untrackable = True
+
+
+class S3IOStats(NamedTuple):
+    """ツール実行中のS3転送量とディスクキャッシュのヒット・ミス数"""
+
+    bytes_read: int
+    bytes_written: int
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+class S3IOCounter:
+    """ツール実行中にS3から読み込んだ・S3に書き込んだバイト数とディスクキャッシュのヒット・ミス数"""
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # 並列ダウンロードではパートごとのスレッドから加算される
+        self._lock = threading.Lock()
+
+    def add_read(self, size: int):
+        with self._lock:
+            self.bytes_read += size
+
+    def add_written(self, size: int):
+        with self._lock:
+            self.bytes_written += size
+
+    def add_cache_lookup(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def stats(self) -> S3IOStats:
+        with self._lock:
+            return S3IOStats(
+                self.bytes_read, self.bytes_written, self.cache_hits, self.cache_misses
+            )
+
+
+def call_with_s3_io_counting(func: Callable[[], Any]) -> Tuple[Any, S3IOStats]:
+    """
+    関数を実行し、結果とS3転送量（S3IOStats）を返す
+
+    GetObjectの応答サイズとPutObject/UploadPartの送信サイズをboto3のイベントフックで数えます。
+    ディスクキャッシュのヒット・ミスはS3RangeReaderが数えます。
+    モジュールレベルの関数のため、プロセスプールにもそのまま渡せます。
+    """
+    install_s3_io_hooks()
+    counter = S3IOCounter()
+    token = _current_io_counter.set(counter)
+    try:
+        result = func()
+    finally:
+        _current_io_counter.reset(token)
+    return result, counter.stats()
+
+
+def install_s3_io_hooks():
+    """
+    boto3のデフォルトセッションにS3転送量の計測用のイベントフックを登録
+
+    フックは登録後に作成されたクライアントに適用されます。
+    """
+    global _io_hooks_installed
+    if _io_hooks_installed:
+        return
+
+    with _hooks_lock:
+        if not _io_hooks_installed:
+            import boto3
+
+            events = boto3._get_default_session().events
+            events.register("after-call.s3.GetObject", _count_s3_read)
+            events.register("before-parameter-build.s3.PutObject", _count_s3_write)
+            events.register("before-parameter-build.s3.UploadPart", _count_s3_write)
+            _io_hooks_installed = True
+
+
+def _count_s3_read(parsed=None, **kwargs):
+    counter = _current_io_counter.get()
+    if counter is not None:
+        length = (parsed or {}).get("ContentLength")
+        if isinstance(length, int):
+            counter.add_read(length)
+
+
+def _count_s3_write(params=None, **kwargs):
+    counter = _current_io_counter.get()
+    if counter is not None and params:
+        counter.add_written(_body_size(params.get("Body")))
+
+
+def _count_cache_lookup(hit: bool):
+    counter = _current_io_counter.get()
+    if counter is not None:
+        counter.add_cache_lookup(hit)
+
+
+def _body_size(body: Any) -> int:
+    """PutObject/UploadPartのBody（bytes, str, ファイルライクオブジェクト）のサイズ"""
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        position = body.tell()
+        body.seek(0, 2)
+        size = body.tell() - position
+        body.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def get_s3_etag(s3_client: Any, bucket: str, key: str) -> Optional[str]:
+    """
+    HEADリクエストでオブジェクトの現在のETagを取得
+
+    Returns:
+        ETag（オブジェクトが存在しない場合はNone）
+    """
+    try:
+        return s3_client.head_object(Bucket=bucket, Key=key)["ETag"]
+    except Exception as e:
+        response = getattr(e, "response", None) or {}
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        if status == 404 or response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            return None
+        raise
+
+
+def s3_objects_unchanged(objects: S3ObjectVersions) -> bool:
+    """
+    記録時からS3オブジェクトが変更されていないかをHEADリクエストのみで確認
+
+    Returns:
+        全オブジェクトのETag（存在有無）が一致する場合True。確認できない場合はFalse
+    """
+    s3_client = get_client("s3")
+    try:
+        for bucket, key, etag in objects:
+            if get_s3_etag(s3_client, bucket, key) != etag:
+                logger.debug(f"S3 object changed: s3://{bucket}/{key}")
+                return False
+    except Exception as e:
+        logger.warning(f"Failed to check S3 object versions: {e}")
+        return False
+    return True
+
+
+def read_body(body: Any, chunk_size: int = READ_CHUNK_BYTES, total: Optional[int] = None) -> bytes:
+    """
+    GetObjectのBodyをチャンク単位で読み込む
+
+    チャンクごとにキャンセル・期限切れを確認し、ダウンロード済みのバイト数を
+    進捗として報告します。大きなオブジェクトのダウンロード中でもツール呼び出しの
+    キャンセルに速やかに応答します。
+
+    Args:
+        body: GetObjectレスポンスの"Body"（read(size)を持つストリーム）
+        chunk_size: 1回あたりの読み込みバイト数
+        total: オブジェクトのサイズ（GetObjectレスポンスの"ContentLength"）
+
+    Returns:
+        オブジェクトの内容
+
+    Raises:
+        ToolCancelledError: 読み込み中にツール呼び出しがキャンセルされた場合
+    """
+    chunks = []
+    downloaded = 0
+    with span("s3.read_body") as current:
+        while True:
+            check_cancelled()
+            chunk = body.read(chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            downloaded += len(chunk)
+            report_progress(
+                "download", downloaded, total, message=f"Downloaded {downloaded:,} bytes"
+            )
+        current.set_attribute("mlops.bytes", downloaded)
+    return b"".join(chunks)
+
+
+class S3RangeReader(io.RawIOBase):
+    """
+    S3オブジェクトを範囲指定GETで並列に先読みしながら、先頭から順に読み込むストリーム
+
+    最初のパートの応答でオブジェクトのサイズを確認し、パートサイズを超える場合は
+    残りのパートを最大 concurrency 個まで別スレッドで並列に取得します（1本のTCP接続の
+    スループットに制限されません）。読み出しは先頭から順に行うため、パーサーにそのまま渡せます。
+    メモリ上に保持するのは先読み中のパート（最大 concurrency + 1 個）のみです。
+
+    後続のパートは最初のパートのETagをIfMatchに指定して取得するため、読み込み中に
+    オブジェクトが更新された場合は異なる版が混ざらずにエラー（412）になります。
+
+    ディスクキャッシュが有効な場合、キャッシュ済みのオブジェクトは最初のGETに
+    IfNoneMatchでETagを指定して再検証し、変更がなければ（304）ローカルのファイルから
+    読み込みます。ダウンロードしたオブジェクトは読み込みながらキャッシュに書き込み、
+    最後まで読み込んだ時点で登録します。
+    read_body と同様に、読み込みごとにキャンセル・期限切れを確認し、ダウンロード済みの
+    バイト数を進捗として報告します。パートを取得するスレッドと、ストリームを読み込む
+    スレッド（pyarrowのリーダーのI/Oスレッド等）には作成時のコンテキスト
+    （キャンセル・トレース・S3読み込みの記録）を引き継ぎます。
+    """
+
+    def __init__(
+        self,
+        s3_client: Any,
+        bucket: str,
+        key: str,
+        part_bytes: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            s3_client: S3クライアント
+            bucket: S3バケット名
+            key: S3オブジェクトキー
+            part_bytes: 1回の範囲指定GETで取得するバイト数（省略時はサーバー設定）
+            concurrency: 並列に取得するパートの最大数（省略時はサーバー設定）
+
+        Raises:
+            ClientError: S3アクセスエラー
+        """
+        self._s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_bytes = part_bytes or _transfer_settings["download_part_bytes"]
+        self.concurrency = concurrency or _transfer_settings["download_concurrency"]
+        self.bytes_read = 0
+        self.parts = 1
+        self._pending: Deque[Future] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 読み出し中のパート: 最初のパートはストリーム、先読みしたパートはバイト列
+        self._stream: Any = None
+        self._buffer = b""
+        self._buffer_pos = 0
+        self.from_cache = False
+        self._cache_writer: Optional[S3CacheWriter] = None
+        # pyarrowのリーダーは自身のI/Oスレッドから読み込むため、作成時のコンテキストを保持
+        self._context = contextvars.copy_context()
+
+        cache = _object_cache
+        cached = cache.lookup(bucket, key) if cache is not None else None
+        try:
+            response = self._get_first_part(cached)
+        except BaseException:
+            if cached is not None:
+                cached.file.close()
+            raise
+
+        if response is None:
+            # キャッシュ済みの版から変更なし（304）
+            self._use_cached(cache, cached)
+            return
+
+        self.etag: Optional[str] = response.get("ETag")
+        self.content_type: Optional[str] = response.get("ContentType")
+        self._stream = response["Body"]
+        match = _CONTENT_RANGE.match(response.get("ContentRange") or "")
+        if match:
+            self.size: Optional[int] = int(match.group(3))
+            self._next_offset = int(match.group(2)) + 1
+        else:
+            # 範囲指定なしの応答（オブジェクト全体）
+            self.size = response.get("ContentLength")
+            self._next_offset = self.size or 0
+        if cache is not None:
+            if cached is not None:
+                cached.file.close()
+            cache.record_miss(stale=cached is not None)
+            _count_cache_lookup(hit=False)
+            self._cache_writer = cache.writer(bucket, key, self.etag, self.content_type, self.size)
+        self._prefetch()
+
+    def _get_first_part(self, cached: Optional[CachedObject]) -> Optional[Dict[str, Any]]:
+        """最初のパートを取得（キャッシュ済みの版から変更がない場合はNone）"""
+        return _get_if_modified(
+            self._s3_client, self.bucket, self.key, f"bytes=0-{self.part_bytes - 1}", cached
+        )
+
+    def _use_cached(self, cache: S3ObjectCache, cached: CachedObject):
+        """キャッシュファイルから読み込む"""
+        self.from_cache = True
+        self.etag = cached.etag
+        self.content_type = cached.content_type
+        self.size = cached.size
+        self._next_offset = cached.size
+        self._stream = cache.record_hit(cached)
+        _count_cache_lookup(hit=True)
+
+    def _prefetch(self):
+        """先読み中のパートがconcurrency個になるまで次のパートの取得を開始"""
+        while (
+            self.size is not None
+            and self._next_offset < self.size
+            and len(self._pending) < self.concurrency
+        ):
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix="mlops-s3-download"
+                )
+            end = min(self._next_offset + self.part_bytes, self.size) - 1
+            # コンテキストは同時に複数のスレッドで実行できないため、パートごとにコピー
+            context = self._context.copy()
+            self._pending.append(
+                self._executor.submit(context.run, self._get_part, self._next_offset, end)
+            )
+            self._next_offset = end + 1
+            self.parts += 1
+
+    def _get_part(self, start: int, end: int) -> bytes:
+        params = {"Bucket": self.bucket, "Key": self.key, "Range": f"bytes={start}-{end}"}
+        if self.etag:
+            params["IfMatch"] = self.etag
+        body = self._s3_client.get_object(**params)["Body"]
+        chunks = []
+        while True:
+            check_cancelled()
+            chunk = body.read(STREAM_BUFFER_BYTES)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _read_chunk(self, size: int) -> bytes:
+        """次の最大sizeバイトを返す（終端ではb""）"""
+        while True:
+            check_cancelled()
+            if self._stream is not None:
+                data = self._stream.read(min(size, READ_CHUNK_BYTES))
+                if data:
+                    break
+                self._close_stream()
+            elif self._buffer_pos < len(self._buffer):
+                # パート全体を読む場合はコピーせずにそのまま返す
+                data = self._buffer[self._buffer_pos : self._buffer_pos + size]
+                self._buffer_pos += len(data)
+                break
+            elif self._pending:
+                self._buffer = self._pending.popleft().result()
+                self._buffer_pos = 0
+                self._prefetch()
+            else:
+                if self._cache_writer is not None:
+                    # 最後まで読み込んだオブジェクトをキャッシュに登録
+                    self._cache_writer.commit()
+                    self._cache_writer = None
+                return b""
+
+        if self._cache_writer is not None:
+            self._cache_writer.write(data)
+        self.bytes_read += len(data)
+        report_progress(
+            "download", self.bytes_read, self.size, message=f"Downloaded {self.bytes_read:,} bytes"
+        )
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer).cast("B")
+        data = self._context.copy().run(self._read_chunk, len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        """残りをすべて読み込む（パート単位で連結）"""
+        chunks = []
+        while True:
+            data = self._context.copy().run(self._read_chunk, self.size or READ_CHUNK_BYTES)
+            if not data:
+                return b"".join(chunks)
+            chunks.append(data)
+
+    def _close_stream(self):
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+        self._stream = None
+
+    def close(self):
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            if self._stream is not None:
+                self._close_stream()
+            if self._cache_writer is not None:
+                # 途中までしか読み込んでいない
+                self._cache_writer.discard()
+                self._cache_writer = None
+            self._buffer = b""
+        super().close()
+
+
+def _get_if_modified(
+    s3_client: Any, bucket: str, key: str, byte_range: str, cached: Optional[CachedObject]
+) -> Optional[Dict[str, Any]]:
+    """
+    範囲指定GET（キャッシュ済みの場合はIfNoneMatch付き）
+
+    Returns:
+        GetObjectのレスポンス（キャッシュ済みの版から変更がない場合はNone）
+    """
+    from botocore.exceptions import ClientError
+
+    params = {"Bucket": bucket, "Key": key}
+    if cached is not None:
+        params["IfNoneMatch"] = cached.etag
+    try:
+        try:
+            return s3_client.get_object(Range=byte_range, **params)
+        except ClientError as e:
+            # 空のオブジェクトは範囲を指定できない
+            if e.response.get("Error", {}).get("Code") != "InvalidRange":
+                raise
+            return s3_client.get_object(**params)
+    except ClientError as e:
+        if cached is not None and e.response.get("Error", {}).get("Code") in ("304", "NotModified"):
+            return None
+        raise
+
+
+class S3RandomAccessFile(io.RawIOBase):
+    """
+    S3オブジェクトの読み込む範囲だけを範囲指定GETで取得する、シーク可能なファイル
+
+    Parquetのように必要な部分（フッターと、選択した列・行グループのチャンク）だけを
+    読むフォーマットをpyarrowにそのまま渡すために使います。最初に末尾の tail_bytes
+    バイトを1回のGETで取得してサイズ・ETagを確認し（フッターの読み込みはこの範囲で済む
+    ことが多い）、それ以外の範囲は読み込みのたびに、同じ版のみを対象に（IfMatch）取得します。
+
+    ディスクキャッシュに同じ版がある場合は、最初のGETで再検証（IfNoneMatch）した上で
+    ローカルのファイルを読みます。一部しか読まないため、ダウンロードした範囲は
+    キャッシュに登録しません。
+
+    pyarrowは自身のI/Oスレッドから読み込むため、作成時のコンテキスト
+    （キャンセル・トレース・S3読み込みの記録）をコピーして各GETを実行します。
+    """
+
+    def __init__(self, s3_client: Any, bucket: str, key: str, tail_bytes: int = TAIL_BYTES):
+        """
+        Args:
+            s3_client: S3クライアント
+            bucket: S3バケット名
+            key: S3オブジェクトキー
+            tail_bytes: 最初に取得する末尾のバイト数
+
+        Raises:
+            ClientError: S3アクセスエラー
+        """
+        self._s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.requests = 1
+        self.bytes_fetched = 0
+        self.from_cache = False
+        self._pos = 0
+        self._local: Optional[BinaryIO] = None
+        self._local_offset = 0
+        self._context = contextvars.copy_context()
+
+        cache = _object_cache
+        cached = cache.lookup(bucket, key) if cache is not None else None
+        try:
+            response = _get_if_modified(
+                s3_client, bucket, key, f"bytes=-{max(tail_bytes, 1)}", cached
+            )
+        except BaseException:
+            if cached is not None:
+                cached.file.close()
+            raise
+
+        if response is None:
+            # キャッシュ済みの版から変更なし（304）
+            self.from_cache = True
+            self.etag: Optional[str] = cached.etag
+            self.size: int = cached.size
+            self._local = cache.record_hit(cached)
+            self._local_offset = self._local.tell()
+            self._tail_start = self.size
+            self._tail = b""
+            _count_cache_lookup(hit=True)
+            return
+
+        if cache is not None:
+            if cached is not None:
+                cached.file.close()
+            cache.record_miss(stale=cached is not None)
+            _count_cache_lookup(hit=False)
+        self.etag = response.get("ETag")
+        self._tail = response["Body"].read()
+        self.bytes_fetched = len(self._tail)
+        match = _CONTENT_RANGE.match(response.get("ContentRange") or "")
+        if match:
+            self._tail_start = int(match.group(1))
+            self.size = int(match.group(3))
+        else:
+            # オブジェクト全体の応答（末尾の範囲より小さいオブジェクト）
+            self._tail_start = 0
+            self.size = len(self._tail)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        self._context.copy().run(check_cancelled)
+        end = self.size if size is None or size < 0 else min(self.size, self._pos + size)
+        if end <= self._pos:
+            return b""
+        if self._local is not None:
+            self._local.seek(self._local_offset + self._pos)
+            data = self._local.read(end - self._pos)
+        else:
+            data = b""
+            if self._pos < self._tail_start:
+                # コンテキストは同時に複数のスレッドで実行できないため、読み込みごとにコピー
+                data = self._context.copy().run(
+                    self._fetch, self._pos, min(end, self._tail_start) - 1
+                )
+            if end > self._tail_start:
+                tail_from = max(self._pos, self._tail_start) - self._tail_start
+                data += self._tail[tail_from : end - self._tail_start]
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer).cast("B")
+        data = self.read(len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        params = {"Bucket": self.bucket, "Key": self.key, "Range": f"bytes={start}-{end}"}
+        if self.etag:
+            params["IfMatch"] = self.etag
+        data = self._s3_client.get_object(**params)["Body"].read()
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        return data
+
+    def close(self):
+        if not self.closed:
+            if self._local is not None:
+                self._local.close()
+                self._local = None
+            self._tail = b""
+        super().close()
+
+
+def download_object(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    part_bytes: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> bytes:
+    """
+    S3オブジェクトを範囲指定GETで並列にダウンロードし、内容をバイト列で返す
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー
+        part_bytes: 1回の範囲指定GETで取得するバイト数（省略時はサーバー設定）
+        concurrency: 並列に取得するパートの最大数（省略時はサーバー設定）
+
+    Returns:
+        オブジェクトの内容
+
+    Raises:
+        ClientError: S3アクセスエラー
+        ToolCancelledError: ダウンロード中にツール呼び出しがキャンセルされた場合
+    """
+    return _download(s3_client, bucket, key, part_bytes, concurrency)[0]
+
+
+def _download(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    part_bytes: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Tuple[bytes, Optional[str]]:
+    """download_object と同じ（読み込んだ版のETagも返す）"""
+    attributes = {"aws.s3.bucket": bucket, "aws.s3.key": key}
+    with span("s3.download", attributes) as current:
+        with S3RangeReader(s3_client, bucket, key, part_bytes, concurrency) as reader:
+            data = reader.readall()
+            current.set_attribute("mlops.bytes", len(data))
+            current.set_attribute("mlops.parts", reader.parts)
+    return data, reader.etag
+
+
+def download_to_file(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    fileobj: BinaryIO,
+    part_bytes: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> int:
+    """
+    S3オブジェクトを範囲指定GETで並列にダウンロードし、ファイルに書き込む
+
+    オブジェクト全体をメモリに保持しないため、大きなパッケージ等を一時ファイルに
+    展開する場合に使います。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー
+        fileobj: 書き込み先（バイナリモードで開いたファイル）
+        part_bytes: 1回の範囲指定GETで取得するバイト数（省略時はサーバー設定）
+        concurrency: 並列に取得するパートの最大数（省略時はサーバー設定）
+
+    Returns:
+        書き込んだバイト数
+    """
+    attributes = {"aws.s3.bucket": bucket, "aws.s3.key": key}
+    with span("s3.download", attributes) as current:
+        with S3RangeReader(s3_client, bucket, key, part_bytes, concurrency) as reader:
+            written = 0
+            while True:
+                data = reader._read_chunk(READ_CHUNK_BYTES)
+                if not data:
+                    break
+                fileobj.write(data)
+                written += len(data)
+            current.set_attribute("mlops.bytes", written)
+            current.set_attribute("mlops.parts", reader.parts)
+    return written
+
+
+class S3MultipartWriter(io.RawIOBase):
+    """
+    書き込まれたデータをパートに分け、マルチパートアップロードで並列にS3へ保存するストリーム
+
+    パートサイズ分のデータが溜まるたびに、そのパートのUploadPartを別スレッドで開始します
+    （最大 concurrency 個まで並列。それ以上は先行するパートの完了を待ちます）。
+    CSVの書き出しやjoblib.dumpの出力をそのまま渡せるため、出力全体を1つのバイト列・
+    文字列としてメモリ上に作る必要がありません。保持するのは書き込み中のパートと
+    アップロード中のパート（最大 concurrency + 1 個）のみです。
+
+    正常に閉じた時点でアップロードを完了します（CompleteMultipartUpload）。
+    データがパートサイズに満たない場合は、マルチパートアップロードを使わずに
+    1回のPutObjectで保存します。withブロックが例外で終了した場合・アップロードに
+    失敗した場合はマルチパートアップロードを中止し、S3にオブジェクトを作成しません。
+    パートをアップロードするスレッドには呼び出し元のコンテキスト
+    （キャンセル・トレース・S3転送量の計測）を引き継ぎます。
+    """
+
+    def __init__(
+        self,
+        s3_client: Any,
+        bucket: str,
+        key: str,
+        part_bytes: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        **put_options: Any,
+    ):
+        """
+        Args:
+            s3_client: S3クライアント
+            bucket: S3バケット名
+            key: S3オブジェクトキー
+            part_bytes: 1回のUploadPartで送るバイト数（省略時はサーバー設定、5MiB以上）
+            concurrency: 並列にアップロードするパートの最大数（省略時はサーバー設定）
+            **put_options: PutObject/CreateMultipartUploadに渡す追加のパラメータ
+                （ContentType等）
+
+        Raises:
+            ValueError: part_bytesが5MiB未満の場合
+        """
+        self._s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_bytes = part_bytes or _transfer_settings["upload_part_bytes"]
+        self.concurrency = concurrency or _transfer_settings["upload_concurrency"]
+        self._put_options = put_options
+        self.bytes_written = 0
+        self.parts = 0
+        self.upload_id: Optional[str] = None
+        self._buffer = bytearray()
+        self._futures: List[Future] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._aborted = False
+        if self.part_bytes < MIN_UPLOAD_PART_BYTES:
+            self.abort()
+            raise ValueError(f"part_bytes must be at least {MIN_UPLOAD_PART_BYTES} bytes")
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        if self.closed:
+            raise ValueError("write to closed S3MultipartWriter")
+        size = len(memoryview(data).cast("B"))
+        self._buffer += data
+        self.bytes_written += size
+        if len(self._buffer) >= self.part_bytes:
+            while len(self._buffer) >= self.part_bytes:
+                part = bytes(self._buffer[: self.part_bytes])
+                del self._buffer[: self.part_bytes]
+                self._submit_part(part)
+            report_progress(
+                "upload", self.bytes_written, None, message=f"Uploaded {self.bytes_written:,} bytes"
+            )
+        return size
+
+    def _submit_part(self, part: bytes):
+        """パートのアップロードを開始（並列数の上限に達している場合は空きを待つ）"""
+        check_cancelled()
+        if self.upload_id is None:
+            response = self._s3_client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, **self._put_options
+            )
+            self.upload_id = response["UploadId"]
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="mlops-s3-upload"
+            )
+
+        in_flight = [future for future in self._futures if not future.done()]
+        if len(in_flight) >= self.concurrency:
+            wait(in_flight, return_when=FIRST_COMPLETED)
+        # 失敗したパートがあれば残りを送らずに中止する
+        for future in self._futures:
+            if future.done():
+                future.result()
+
+        self.parts += 1
+        # コンテキストは同時に複数のスレッドで実行できないため、パートごとにコピー
+        context = contextvars.copy_context()
+        self._futures.append(
+            self._executor.submit(context.run, self._upload_part, self.parts, part)
+        )
+
+    def _upload_part(self, part_number: int, body: bytes) -> Dict[str, Any]:
+        check_cancelled()
+        response = self._s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _complete(self):
+        if self.upload_id is None:
+            self._s3_client.put_object(
+                Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), **self._put_options
+            )
+            self.parts = 1
+            return
+
+        if self._buffer:
+            self._submit_part(bytes(self._buffer))
+        self._buffer = bytearray()
+        parts = [future.result() for future in self._futures]
+        self._s3_client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    def abort(self):
+        """アップロードを中止して閉じる（アップロード済みのパートも破棄）"""
+        if self.closed:
+            return
+        self._aborted = True
+        for future in self._futures:
+            future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self.upload_id is not None:
+            try:
+                self._s3_client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Failed to abort multipart upload s3://{self.bucket}/{self.key}: {e}"
+                )
+        self.close()
+
+    def close(self):
+        """アップロードを完了して閉じる（abort()後は何もしない）"""
+        if self.closed:
+            return
+        if not self._aborted:
+            try:
+                self._complete()
+            except BaseException:
+                self.abort()
+                raise
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        self.close()
+
+    def __del__(self):
+        # 閉じずに破棄された場合は、途中までのデータを保存しない
+        if not self.closed:
+            self.abort()
+
+
+def upload_parallel(tasks: Sequence[Callable[[], Any]]) -> List[Any]:
+    """
+    複数のアップロード処理を並列に実行し、結果を順に返す
+
+    train/testの分割等、独立した出力を同時にアップロードする場合に使います。
+    各スレッドには呼び出し元のコンテキスト（キャンセル・トレース・S3転送量の計測）を
+    引き継ぎます。いずれかが失敗した場合は、すべての完了を待ってから最初の例外を送出します。
+
+    Args:
+        tasks: 引数なしで呼び出せるアップロード処理のリスト
+
+    Returns:
+        各処理の戻り値のリスト
+    """
+    if len(tasks) <= 1:
+        return [task() for task in tasks]
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="mlops-upload") as executor:
+        futures = [executor.submit(contextvars.copy_context().run, task) for task in tasks]
+        wait(futures)
+    return [future.result() for future in futures]
+
+
+def read_dataset(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    file_format: str = "csv",
+    chunksize: Optional[int] = None,
+    formats: Sequence[str] = DATASET_FORMATS,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[Any]] = None,
+    **read_options: Any,
+) -> Any:
+    """
+    S3上のデータセットをダウンロードしながら解析
+
+    CSV・JSON Linesは S3RangeReader（範囲指定GETによる並列の先読み）をそのまま
+    パーサーに渡し、チャンク単位でダウンロードと解析を進めます。ファイル全体のバイト列と
+    DataFrameを同時にメモリに保持しないため、read_body で読み込んでから解析する場合に
+    比べてピーク時のメモリ使用量を抑えられます。
+    Parquetはフッターから読むためランダムアクセスが必要で、全体を並列にダウンロードしてから解析します。
+    ただし columns・filters を指定した場合は S3RandomAccessFile でフッターと必要な
+    列チャンクだけを取得し、フッターの統計情報（min/max）で条件に合わない行グループを
+    読み飛ばします。
+
+    key がプレフィックス（末尾が"/"）またはマニフェストの場合は、シャード化された
+    データセットとして全パートを読み込みます（list_dataset_parts を参照）。
+    chunksize 未指定時は read_table で各パートを並列に読み込んで連結し、
+    指定時はパートを順に読み込みながらチャンクを返します。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー（プレフィックス・マニフェストも可）
+        file_format: ファイルフォーマット（csv, parquet, json, jsonl）
+        chunksize: 指定時はこの行数ずつのDataFrameを返すイテレーターを返す
+        formats: 呼び出し元のツールが対応するファイルフォーマット
+        columns: 読み込む列（指定した順に並べて返す）
+        filters: 行の条件（Parquetのみ）。[列, 演算子, 値] のリスト（AND）、または
+            そのリストのリスト（OR）。演算子は ==, !=, <, <=, >, >=, in, not in。
+            値は列の型に変換して比較します（日時の列には "2024-01-01" 等の文字列も指定可能）
+        **read_options: pandasの読み込み関数に渡す追加の引数（シャード化されたデータセットでは
+            chunksize 指定時のみ）
+
+    Returns:
+        DataFrame（chunksize指定時はDataFrameのイテレーター）
+
+    Raises:
+        ValueError: 未対応のファイルフォーマット、存在しない列、Parquet以外でのfilters指定、
+            パートのないプレフィックス・不正なマニフェスト
+        ClientError: S3アクセスエラー
+        ToolCancelledError: 読み込み中にツール呼び出しがキャンセルされた場合
+    """
+    fmt = _check_dataset_format(file_format, formats, filters)
+    columns = list(columns) if columns is not None else None
+
+    if is_sharded_dataset(key):
+        if chunksize is not None:
+            return _iter_sharded_chunks(
+                s3_client, bucket, key, fmt, chunksize, columns, filters, read_options
+            )
+        if read_options:
+            raise ValueError(
+                "read_options are not supported for sharded datasets without chunksize"
+            )
+        return _read_sharded_table(s3_client, bucket, key, fmt, columns, filters).to_pandas()
+
+    if fmt == "parquet" and (columns is not None or filters):
+        return _read_parquet_pushdown(s3_client, bucket, key, chunksize, columns, filters)
+
+    if fmt == "parquet":
+        buffer = io.BytesIO(download_object(s3_client, bucket, key))
+        if chunksize is not None:
+            return _iter_parquet(buffer, chunksize, read_options)
+        import pandas as pd
+
+        with span("pandas.read_parquet") as parse:
+            df = pd.read_parquet(buffer, **read_options)
+            parse.set_attribute("mlops.rows", len(df))
+        return df
+
+    if fmt == "csv" and columns is not None:
+        # 不要な列は解析時に読み飛ばす
+        read_options.setdefault("usecols", columns)
+    reader = S3RangeReader(s3_client, bucket, key)
+    stream = io.BufferedReader(reader, buffer_size=STREAM_BUFFER_BYTES)
+    if chunksize is not None:
+        return _iter_text(stream, fmt, chunksize, columns, read_options)
+
+    with stream, span(f"pandas.read_{fmt}") as parse:
+        df = _select_columns(_parse_text(stream, fmt, None, read_options), columns)
+        parse.set_attribute("mlops.rows", len(df))
+        parse.set_attribute("mlops.bytes", reader.bytes_read)
+    return df
+
+
+def read_table(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    file_format: str = "csv",
+    formats: Sequence[str] = DATASET_FORMATS,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[Any]] = None,
+) -> Any:
+    """
+    S3上のデータセットをArrowテーブル（pyarrow.Table）として読み込む
+
+    read_dataset と同じ経路（S3RangeReader・S3RandomAccessFile）で取得しながら、
+    pyarrowのマルチスレッドのリーダーで解析します。文字列をPythonオブジェクトに変換せず、
+    数値の列は連続したバッファのまま保持するため、pandasで解析する場合に比べて
+    解析時間とメモリ使用量を抑えられます。scikit-learnに渡す場合は
+    arrow_utils.feature_frame で特徴量のDataFrameに変換してください。
+
+    日付・日時の列は read_dataset（pandas）と同じ型で読み込みます（CSVは文字列のまま、
+    JSON Linesは日時らしい名前の列のみタイムスタンプ）。
+    JSONドキュメント（json）は分割して解析できないため、pandasで解析してから変換します。
+
+    サーバー設定でデータセットのキャッシュ（dataset_cache_dir）が有効な場合は、
+    読み込んだテーブルをArrow IPCファイルとして保存し、同じ版（HEADで確認したETag）・
+    同じ条件の読み込みではそのファイルをmmapで開いて返します（ダウンロード・解析なし）。
+
+    key がプレフィックス（末尾が"/"）またはマニフェストの場合は、全パートを有界の
+    スレッドプールで並列に取得・解析し、コピーせずに1つのテーブルに連結します
+    （キャッシュはパートごと）。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー（プレフィックス・マニフェストも可）
+        file_format: ファイルフォーマット（csv, parquet, json, jsonl）
+        formats: 呼び出し元のツールが対応するファイルフォーマット
+        columns: 読み込む列（指定した順に並べて返す）
+        filters: 行の条件（Parquetのみ。read_dataset と同じ形式）
+
+    Returns:
+        Arrowテーブル
+
+    Raises:
+        ValueError: 未対応のファイルフォーマット、存在しない列、Parquet以外でのfilters指定、
+            パートのないプレフィックス・不正なマニフェスト
+        ClientError: S3アクセスエラー
+        ToolCancelledError: 読み込み中にツール呼び出しがキャンセルされた場合
+    """
+    fmt = _check_dataset_format(file_format, formats, filters)
+    columns = list(columns) if columns is not None else None
+
+    if is_sharded_dataset(key):
+        return _read_sharded_table(s3_client, bucket, key, fmt, columns, filters)
+
+    cache = _dataset_cache
+    if cache is None:
+        return _read_table(s3_client, bucket, key, fmt, columns, filters)[0]
+
+    attributes = {"aws.s3.bucket": bucket, "aws.s3.key": key}
+    options = {"format": fmt, "columns": columns, "filters": filters}
+    # 保存済みの版が最新か、HEADで確認（ダウンロード・解析に比べて十分に小さい）
+    etag = get_s3_etag(s3_client, bucket, key)
+    if etag is not None:
+        with span("dataset_cache.open", attributes) as opened:
+            table = cache.open(bucket, key, etag, options)
+            opened.set_attribute("mlops.hit", table is not None)
+        if table is not None:
+            return table
+
+    table, read_etag = _read_table(s3_client, bucket, key, fmt, columns, filters)
+    # HEADの後に更新されたオブジェクトは、読み込んだ版のETagで次回に保存する
+    if read_etag is not None and read_etag == etag:
+        with span("dataset_cache.store", attributes) as stored:
+            stored.set_attribute("mlops.bytes", table.nbytes)
+            cache.store(bucket, key, read_etag, options, table)
+    return table
+
+
+def _read_table(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    fmt: str,
+    columns: Optional[List[str]],
+    filters: Optional[List[Any]],
+) -> Tuple[Any, Optional[str]]:
+    """
+    read_table の読み込み処理
+
+    Returns:
+        (Arrowテーブル, 読み込んだ版のETag)
+    """
+    if fmt == "parquet" and (columns is not None or filters):
+        source, fragment, expression = _open_parquet_fragment(
+            s3_client, bucket, key, columns, filters
+        )
+        return _read_fragment_table(source, fragment, columns, expression), source.etag
+
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        content, etag = _download(s3_client, bucket, key)
+        with span("pyarrow.read_parquet") as parse:
+            # バイト列をコピーせずに参照して解析
+            table = pq.read_table(pa.BufferReader(content), columns=columns)
+            parse.set_attribute("mlops.rows", table.num_rows)
+        return table, etag
+
+    reader = S3RangeReader(s3_client, bucket, key)
+    stream = io.BufferedReader(reader, buffer_size=STREAM_BUFFER_BYTES)
+    with stream, span(f"pyarrow.read_{fmt}") as parse:
+        table = _select_table_columns(_parse_text_table(stream, fmt, columns), columns)
+        parse.set_attribute("mlops.rows", table.num_rows)
+        parse.set_attribute("mlops.bytes", reader.bytes_read)
+    return table, reader.etag
+
+
+def iter_batches(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    file_format: str = "csv",
+    formats: Sequence[str] = DATASET_FORMATS,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[Any]] = None,
+) -> Iterator[Any]:
+    """
+    S3上のデータセットをArrowのレコードバッチ（pyarrow.RecordBatch）ごとに読み込む
+
+    データセット全体を保持せずに1回で走査する処理（プロファイル・バリデーション等）向けです。
+    CSV・JSON Linesは S3RangeReader から取得しながらpyarrowのストリーミングリーダーで
+    ブロック（1MiB）ごとに解析し、Parquetは S3RandomAccessFile で行グループごとに
+    必要な列チャンクだけを取得します。JSONドキュメント（json）は分割して解析できないため、
+    全体をpandasで解析してから分割します。シャード化されたデータセットはパートを順に読み込みます。
+
+    CSV・JSON Linesの列の型は最初のブロックから推定するため、後のブロックに推定した型に
+    変換できない値（整数の列の小数等）があると pyarrow.ArrowInvalid が送出されます。
+    日付・時刻の列は read_dataset（pandas）と同じ型で読み込みます（CSVは文字列のまま、
+    JSON Linesは日時らしい名前の列のみタイムスタンプ）。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー（プレフィックス・マニフェストも可）
+        file_format: ファイルフォーマット（csv, parquet, json, jsonl）
+        formats: 呼び出し元のツールが対応するファイルフォーマット
+        columns: 読み込む列（指定した順に並べて返す）
+        filters: 行の条件（Parquetのみ。read_dataset と同じ形式）
+
+    Returns:
+        レコードバッチのイテレーター
+
+    Raises:
+        ValueError: 未対応のファイルフォーマット、存在しない列、Parquet以外でのfilters指定
+        ClientError: S3アクセスエラー
+        ToolCancelledError: 読み込み中にツール呼び出しがキャンセルされた場合
+    """
+    fmt = _check_dataset_format(file_format, formats, filters)
+    columns = list(columns) if columns is not None else None
+    return _iter_batches(s3_client, bucket, key, fmt, columns, filters)
+
+
+def _iter_batches(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    fmt: str,
+    columns: Optional[List[str]],
+    filters: Optional[List[Any]],
+) -> Iterator[Any]:
+    import pyarrow as pa
+
+    if is_sharded_dataset(key):
+        for part_bucket, part_key in list_dataset_parts(s3_client, bucket, key):
+            yield from _iter_batches(s3_client, part_bucket, part_key, fmt, columns, filters)
+        return
+
+    if fmt == "parquet":
+        source, fragment, expression = _open_parquet_fragment(
+            s3_client, bucket, key, columns, filters
+        )
+        with source:
+            for batch in fragment.to_batches(columns=columns, filter=expression):
+                check_cancelled()
+                yield batch
+        return
+
+    reader = S3RangeReader(s3_client, bucket, key)
+    with io.BufferedReader(reader, buffer_size=STREAM_BUFFER_BYTES) as stream:
+        if fmt == "json":
+            table = pa.Table.from_pandas(_parse_text(stream, fmt, None, {}), preserve_index=False)
+            batches: Any = _select_table_columns(table, columns).to_batches()
+        else:
+            batches = _open_text_batches(stream, fmt, columns)
+        for batch in batches:
+            check_cancelled()
+            yield _select_table_columns(batch, columns)
+
+
+def _open_text_batches(stream: Any, fmt: str, columns: Optional[List[str]]) -> Any:
+    """テキスト形式（csv, jsonl）のストリーミングリーダーを開く"""
+    column_types = _pandas_text_types(stream, fmt)
+    if fmt == "csv":
+        import pyarrow.csv as pa_csv
+
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=columns, strings_can_be_null=True, column_types=column_types
+        )
+        try:
+            return pa_csv.open_csv(stream, convert_options=convert_options)
+        except KeyError as e:
+            raise ValueError(f"Columns not found in dataset: {e.args[0]}") from e
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+
+    parse_options = pa_json.ParseOptions(
+        explicit_schema=pa.schema(column_types) if column_types else None,
+        unexpected_field_behavior="infer",
+    )
+    if not hasattr(pa_json, "open_json"):
+        # open_json はpyarrow 19以降
+        return _iter_json_blocks(stream, parse_options)
+    return pa_json.open_json(stream, parse_options=parse_options)
+
+
+def _iter_json_blocks(stream: Any, parse_options: Any) -> Iterator[Any]:
+    """
+    JSON Linesを行の区切りでブロック（STREAM_BUFFER_BYTES）ごとに解析
+
+    open_json と同じく最初のブロックから推定した型で後のブロックを解析するため、
+    型に変換できない値・最初のブロックにない列があると pyarrow.ArrowInvalid が送出されます。
+    """
+    import pyarrow.json as pa_json
+
+    pending = b""
+    while True:
+        chunk = stream.read(STREAM_BUFFER_BYTES)
+        block = pending + chunk
+        end = block.rfind(b"\n") + 1 if chunk else len(block)
+        block, pending = block[:end], block[end:]
+        if block.strip():
+            table = pa_json.read_json(io.BytesIO(block), parse_options=parse_options)
+            yield from table.to_batches()
+            parse_options = pa_json.ParseOptions(
+                explicit_schema=table.schema, unexpected_field_behavior="error"
+            )
+        if not chunk:
+            return
+
+
+def read_parquet_metadata(s3_client: Any, bucket: str, key: str) -> List[Any]:
+    """
+    Parquetのフッター（pyarrow.parquet.FileMetaData）を読み込む
+
+    末尾の範囲指定GET（通常は1回）でフッターのみを取得し、データページは読みません。
+    行数・スキーマ・行グループごとの列の統計情報（null数・最小値・最大値）を参照できます。
+    シャード化されたデータセットは、全パートのフッターを並列に読み込みます。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー（プレフィックス・マニフェストも可）
+
+    Returns:
+        パートごとのフッターのリスト（単一のオブジェクトでは1件）
+
+    Raises:
+        ValueError: パートのないプレフィックス・不正なマニフェスト
+        ClientError: S3アクセスエラー
+        pyarrow.ArrowInvalid: Parquetファイルではない場合
+    """
+    parts = list_dataset_parts(s3_client, bucket, key)
+    return _read_parts(
+        parts, lambda part_bucket, part_key: _read_parquet_footer(s3_client, part_bucket, part_key)
+    )
+
+
+def _read_parquet_footer(s3_client: Any, bucket: str, key: str) -> Any:
+    import pyarrow.parquet as pq
+
+    attributes = {"aws.s3.bucket": bucket, "aws.s3.key": key}
+    with span("pyarrow.read_parquet_footer", attributes) as current:
+        with S3RandomAccessFile(s3_client, bucket, key) as source:
+            metadata = pq.ParquetFile(source).metadata
+            current.set_attribute("mlops.bytes", source.bytes_fetched)
+    return metadata
+
+
+def is_sharded_dataset(key: str) -> bool:
+    """キーがシャード化されたデータセット（プレフィックス・マニフェスト）を指すか"""
+    return key.endswith("/") or key.rsplit("/", 1)[-1].endswith(MANIFEST_SUFFIXES)
+
+
+def list_dataset_parts(s3_client: Any, bucket: str, key: str) -> List[Tuple[str, str]]:
+    """
+    シャード化されたデータセットのパートの一覧
+
+    プレフィックス（末尾が"/"）の場合は配下の全オブジェクト（サブディレクトリを含む）を
+    キーの順に返します。名前が"_"・"."で始まるファイル・ディレクトリ（_SUCCESS、
+    _temporary/ 等）、空のオブジェクト、マニフェストは除外します。
+
+    マニフェストは次のいずれかの形式のJSONです。
+        {"entries": [{"url": "s3://bucket/part-0000"}, ...]}（Redshift UNLOAD）
+        [{"prefix": "s3://bucket/data/"}, "part-0000", ...]（SageMaker）
+        ["s3://bucket/part-0000", ...]
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: プレフィックス・マニフェストのキー（それ以外は単一のパートとして扱う）
+
+    Returns:
+        (バケット, キー) のリスト
+
+    Raises:
+        ValueError: パートのないプレフィックス・不正なマニフェスト
+        ClientError: S3アクセスエラー
+    """
+    if not is_sharded_dataset(key):
+        return [(bucket, key)]
+    if key.endswith("/"):
+        parts = _list_prefix_parts(s3_client, bucket, key)
+    else:
+        parts = _parse_manifest(download_object(s3_client, bucket, key), key)
+    if not parts:
+        raise ValueError(f"No dataset parts found in s3://{bucket}/{key}")
+    return parts
+
+
+def map_dataset_parts(
+    s3_client: Any, bucket: str, key: str, func: Callable[[str, str], Any]
+) -> List[Any]:
+    """
+    データセットのパートごとに func(バケット, キー) を並列に実行
+
+    パートごとに集計して後でマージする処理（スケッチ等）向けです。並列数・コンテキストの
+    引き継ぎ・進捗の報告はシャード化されたデータセットの読み込みと同じです。
+
+    Args:
+        s3_client: S3クライアント
+        bucket: S3バケット名
+        key: S3オブジェクトキー（プレフィックス・マニフェストも可）
+        func: パートごとに実行する関数
+
+    Returns:
+        パートの順の結果のリスト（単一のオブジェクトでは1件）
+
+    Raises:
+        ValueError: パートのないプレフィックス・不正なマニフェスト
+        ClientError: S3アクセスエラー
+    """
+    return _read_parts(list_dataset_parts(s3_client, bucket, key), func)
+
+
+def _list_prefix_parts(s3_client: Any, bucket: str, prefix: str) -> List[Tuple[str, str]]:
+    """プレフィックス配下のデータファイルの一覧"""
+    parts = []
+    params = {"Bucket": bucket, "Prefix": prefix}
+    while True:
+        check_cancelled()
+        response = s3_client.list_objects_v2(**params)
+        for obj in response.get("Contents", []):
+            relative = obj["Key"][len(prefix) :]
+            if (
+                not relative
+                or relative.endswith("/")
+                or obj.get("Size", 0) == 0
+                or any(name.startswith(("_", ".")) for name in relative.split("/"))
+                or is_sharded_dataset(relative)
+            ):
+                continue
+            parts.append((bucket, obj["Key"]))
+        if not response.get("IsTruncated"):
+            break
+        params["ContinuationToken"] = response["NextContinuationToken"]
+    return sorted(parts)
+
+
+def _parse_manifest(content: bytes, key: str) -> List[Tuple[str, str]]:
+    """マニフェストのJSONからパートの (バケット, キー) を取り出す"""
+    try:
+        manifest = json.loads(content)
+    except ValueError as e:
+        raise ValueError(f"Invalid dataset manifest {key}: {e}") from e
+
+    prefix = ""
+    if isinstance(manifest, dict) and isinstance(manifest.get("entries"), list):
+        uris = [
+            entry.get("url") if isinstance(entry, dict) else None for entry in manifest["entries"]
+        ]
+    elif isinstance(manifest, list):
+        if manifest and isinstance(manifest[0], dict):
+            prefix = manifest[0].get("prefix") or ""
+            manifest = manifest[1:]
+        uris = [prefix + entry if isinstance(entry, str) else None for entry in manifest]
+    else:
+        raise ValueError(
+            f"Invalid dataset manifest {key}: expected a list or an object with 'entries'"
+        )
+
+    parts = []
+    for uri in uris:
+        if not isinstance(uri, str) or not uri.startswith("s3://") or "/" not in uri[5:]:
+            raise ValueError(f"Invalid dataset manifest {key}: entry is not an S3 URI ({uri})")
+        part_bucket, part_key = uri[5:].split("/", 1)
+        parts.append((part_bucket, part_key))
+    return parts
+
+
+def _read_sharded_table(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    fmt: str,
+    columns: Optional[List[str]],
+    filters: Optional[List[Any]],
+) -> Any:
+    """シャード化されたデータセットの全パートを並列に読み込み、1つのArrowテーブルに連結"""
+    import pyarrow as pa
+
+    parts = list_dataset_parts(s3_client, bucket, key)
+    attributes = {"aws.s3.bucket": bucket, "aws.s3.key": key, "mlops.parts": len(parts)}
+    with span("dataset.read_parts", attributes) as current:
+        tables = _read_parts(
+            parts,
+            lambda part_bucket, part_key: read_table(
+                s3_client, part_bucket, part_key, fmt, (fmt,), columns, filters
+            ),
+        )
+        # チャンクの参照を並べるだけでデータはコピーしない（パート間で型が異なる列は共通の型に揃える）
+        table = pa.concat_tables(tables, promote_options="permissive")
+        current.set_attribute("mlops.rows", table.num_rows)
+    logger.debug(f"Read {table.num_rows:,} rows from {len(parts)} parts of s3://{bucket}/{key}")
+    return table
+
+
+def _read_parts(parts: List[Tuple[str, str]], read_part: Callable[[str, str], Any]) -> List[Any]:
+    """
+    パートを有界のスレッドプールで並列に読み込み、パートの順に結果を返す
+
+    各スレッドには呼び出し元のコンテキスト（キャンセル・トレース・S3転送量の計測）を
+    引き継ぎます。パート内のバイト単位の進捗は報告せず、読み込んだパート数を報告します。
+    いずれかが失敗した場合は、未開始のパートを取り消して例外を送出します。
+    """
+    if len(parts) == 1:
+        return [read_part(*parts[0])]
+
+    def run(part_bucket: str, part_key: str) -> Any:
+        return run_with_progress(None, lambda: read_part(part_bucket, part_key))
+
+    results: List[Any] = [None] * len(parts)
+    workers = min(_transfer_settings["dataset_part_concurrency"], len(parts))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mlops-dataset") as executor:
+        futures = {
+            executor.submit(contextvars.copy_context().run, run, *part): index
+            for index, part in enumerate(parts)
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                report_progress(
+                    "download", done, len(parts), message=f"Loaded {done}/{len(parts)} parts"
+                )
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+    return results
+
+
+def _iter_sharded_chunks(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    fmt: str,
+    chunksize: int,
+    columns: Optional[List[str]],
+    filters: Optional[List[Any]],
+    read_options: Dict[str, Any],
+):
+    """シャード化されたデータセットのパートを順に読み込みながらチャンクを返す"""
+    parts = list_dataset_parts(s3_client, bucket, key)
+    for part_bucket, part_key in parts:
+        check_cancelled()
+        yield from read_dataset(
+            s3_client,
+            part_bucket,
+            part_key,
+            fmt,
+            chunksize,
+            (fmt,),
+            columns,
+            filters,
+            **read_options,
+        )
+
+
+def _check_dataset_format(
+    file_format: str, formats: Sequence[str], filters: Optional[List[Any]]
+) -> str:
+    """ファイルフォーマットとfiltersの指定を検証し、小文字のフォーマット名を返す"""
+    fmt = file_format.lower()
+    if fmt not in formats:
+        raise ValueError(
+            f"Unsupported file format: {file_format}. Supported formats: {', '.join(formats)}"
+        )
+    if filters and fmt != "parquet":
+        raise ValueError(f"filters are only supported for parquet (got {fmt})")
+    return fmt
+
+
+def _parse_text_table(stream: Any, fmt: str, columns: Optional[List[str]]) -> Any:
+    """テキスト形式（csv, json, jsonl）をpyarrowで解析"""
+    import pyarrow as pa
+
+    if fmt == "csv":
+        import pyarrow.csv as pa_csv
+
+        # pandasと同様に空文字列・"NA"等は文字列の列でも欠損として扱い、日付・日時の列は
+        # 文字列のまま読み込む
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=columns,
+            strings_can_be_null=True,
+            column_types=_pandas_text_types(stream, fmt),
+        )
+        try:
+            return pa_csv.read_csv(
+                stream,
+                read_options=pa_csv.ReadOptions(use_threads=True),
+                convert_options=convert_options,
+            )
+        except KeyError as e:
+            raise ValueError(f"Columns not found in dataset: {e.args[0]}") from e
+    if fmt == "jsonl":
+        import pyarrow.json as pa_json
+
+        column_types = _pandas_text_types(stream, fmt)
+        parse_options = pa_json.ParseOptions(
+            explicit_schema=pa.schema(column_types) if column_types else None,
+            unexpected_field_behavior="infer",
+        )
+        return pa_json.read_json(stream, parse_options=parse_options)
+    # JSONドキュメントは全体を解析する必要があるため、pandasで解析してから変換
+    return pa.Table.from_pandas(_parse_text(stream, fmt, None, {}), preserve_index=False)
+
+
+def _pandas_text_types(stream: Any, fmt: str) -> Dict[str, Any]:
+    """
+    日付・日時と推定される列を、pandasで読み込んだ場合と同じ型で読むための型の指定
+
+    pyarrowはISO 8601の日付・時刻・日時の列を推定しますが、pandasの read_csv は文字列
+    （object）のまま、read_json(lines=True) は列名が日時らしい列（"_at"で終わる等）のみ
+    datetime64[ns] に変換します。バッファ済みの先頭（peek。ストリームは消費しない）から
+    型を推定し、日付・日時と推定された列の型を指定します。
+    """
+    import pyarrow as pa
+
+    head = stream.peek(STREAM_BUFFER_BYTES)
+    head = head[: head.rfind(b"\n") + 1]
+    if not head:
+        return {}
+    try:
+        if fmt == "csv":
+            import pyarrow.csv as pa_csv
+
+            schema = pa_csv.read_csv(io.BytesIO(head)).schema
+        else:
+            import pyarrow.json as pa_json
+
+            schema = pa_json.read_json(io.BytesIO(head)).schema
+    except pa.ArrowInvalid:
+        # 先頭のみでは解析できない（引用符内の改行等）場合は推定に任せる
+        return {}
+
+    column_types = {}
+    for field in schema:
+        if not pa.types.is_temporal(field.type):
+            continue
+        if fmt == "jsonl" and _is_pandas_date_column(field.name):
+            column_types[field.name] = pa.timestamp("ns", getattr(field.type, "tz", None))
+        else:
+            column_types[field.name] = pa.string()
+    return column_types
+
+
+def _is_pandas_date_column(name: str) -> bool:
+    """pandasの read_json が日時に変換する列名か"""
+    lower = name.lower()
+    return (
+        lower.endswith(("_at", "_time"))
+        or lower in ("modified", "date", "datetime")
+        or lower.startswith("timestamp")
+    )
+
+
+def _select_table_columns(table: Any, columns: Optional[List[str]]) -> Any:
+    """Arrowテーブルの指定した列を指定した順に並べる"""
+    if columns is None:
+        return table
+    missing = [column for column in columns if column not in table.column_names]
+    if missing:
+        raise ValueError(f"Columns not found in dataset: {', '.join(map(str, missing))}")
+    return table.select(columns)
+
+
+def _select_columns(df: Any, columns: Optional[List[str]]) -> Any:
+    """指定した列を指定した順に並べる"""
+    if columns is None:
+        return df
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"Columns not found in dataset: {', '.join(map(str, missing))}")
+    return df[columns]
+
+
+def _parse_text(stream: Any, fmt: str, chunksize: Optional[int], read_options: Dict[str, Any]):
+    """テキスト形式（csv, json, jsonl）をpandasで解析（chunksize指定時はリーダーを返す）"""
+    import pandas as pd
+
+    if fmt == "csv":
+        return pd.read_csv(stream, chunksize=chunksize, **read_options)
+    if fmt == "jsonl":
+        return pd.read_json(stream, lines=True, chunksize=chunksize, **read_options)
+    # JSONドキュメントは全体を解析する必要があるため分割できない
+    df = pd.read_json(stream, **read_options)
+    return iter([df]) if chunksize is not None else df
+
+
+def _iter_text(
+    stream: Any,
+    fmt: str,
+    chunksize: int,
+    columns: Optional[List[str]],
+    read_options: Dict[str, Any],
+):
+    with stream:
+        for chunk in _parse_text(stream, fmt, chunksize, read_options):
+            yield _select_columns(chunk, columns)
+
+
+def _iter_parquet(buffer: io.BytesIO, chunksize: int, read_options: Dict[str, Any]):
+    import pyarrow.parquet as pq
+
+    columns = read_options.get("columns")
+    for batch in pq.ParquetFile(buffer).iter_batches(batch_size=chunksize, columns=columns):
+        check_cancelled()
+        yield batch.to_pandas()
+
+
+def _read_parquet_pushdown(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    chunksize: Optional[int],
+    columns: Optional[List[str]],
+    filters: Optional[List[Any]],
+) -> Any:
+    """Parquetの必要な列・行グループだけを範囲指定GETで取得して読み込む"""
+    source, fragment, expression = _open_parquet_fragment(s3_client, bucket, key, columns, filters)
+    if chunksize is not None:
+        return _iter_parquet_fragment(source, fragment, chunksize, columns, expression)
+    return _read_fragment_table(source, fragment, columns, expression).to_pandas()
+
+
+def _open_parquet_fragment(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    columns: Optional[List[str]],
+    filters: Optional[List[Any]],
+) -> Tuple["S3RandomAccessFile", Any, Any]:
+    """
+    Parquetのフッターを読み込み、列と行の条件を検証
+
+    Returns:
+        (S3RandomAccessFile, pyarrowのフラグメント, 行の条件式（filters未指定時はNone))
+    """
+    import pyarrow.dataset as ds
+
+    attributes = {"aws.s3.bucket": bucket, "aws.s3.key": key}
+    with span("pyarrow.read_parquet_footer", attributes):
+        source = S3RandomAccessFile(s3_client, bucket, key)
+        try:
+            fragment = ds.ParquetFileFormat().make_fragment(source)
+            schema = fragment.physical_schema
+            if columns is not None:
+                missing = [column for column in columns if schema.get_field_index(column) < 0]
+                if missing:
+                    raise ValueError(f"Columns not found in dataset: {', '.join(missing)}")
+            expression = _parquet_filter_expression(filters, schema) if filters else None
+        except BaseException:
+            source.close()
+            raise
+    return source, fragment, expression
+
+
+def _read_fragment_table(
+    source: "S3RandomAccessFile",
+    fragment: Any,
+    columns: Optional[List[str]],
+    expression: Any,
+) -> Any:
+    """フラグメントの必要な列・行グループを読み込んでArrowテーブルを返す"""
+    attributes = {"aws.s3.bucket": source.bucket, "aws.s3.key": source.key}
+    with source, span("pyarrow.read_parquet", attributes) as parse:
+        table = fragment.to_table(columns=columns, filter=expression)
+        parse.set_attribute("mlops.rows", table.num_rows)
+        parse.set_attribute("mlops.bytes", source.bytes_fetched)
+        parse.set_attribute("mlops.requests", source.requests)
+    logger.debug(
+        f"Read {table.num_rows:,} rows of s3://{source.bucket}/{source.key}: fetched "
+        f"{source.bytes_fetched:,} of {source.size:,} bytes in {source.requests} requests"
+    )
+    return table
+
+
+def _iter_parquet_fragment(
+    source: S3RandomAccessFile,
+    fragment: Any,
+    chunksize: int,
+    columns: Optional[List[str]],
+    expression: Any,
+):
+    with source:
+        for batch in fragment.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+            check_cancelled()
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+
+def _parquet_filter_expression(filters: List[Any], schema: Any) -> Any:
+    """
+    filters（[列, 演算子, 値] のリスト、またはそのリストのリスト）をpyarrowの条件式に変換
+
+    JSONで渡された値（日時の文字列等）は列の型に変換します。
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def convert(value: Any, field_type: Any) -> Any:
+        try:
+            return pa.scalar(value).cast(field_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            return value
+
+    # 1段のリスト（AND）は2段（ORのAND）に揃える
+    groups = filters if filters and isinstance(filters[0][0], (list, tuple)) else [filters]
+    normalized = []
+    for group in groups:
+        conjunction = []
+        for predicate in group:
+            if len(predicate) != 3:
+                raise ValueError(f"Invalid filter {predicate}. Expected [column, op, value]")
+            column, op, value = predicate
+            index = schema.get_field_index(column)
+            if index < 0:
+                raise ValueError(f"Filter column not found in dataset: {column}")
+            field_type = schema.field(index).type
+            if op in ("in", "not in"):
+                value = [convert(item, field_type) for item in value]
+            else:
+                value = convert(value, field_type)
+            conjunction.append((column, op, value))
+        normalized.append(conjunction)
+    return pq.filters_to_expression(normalized)
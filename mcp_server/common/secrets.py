@@ -1,11 +1,12 @@
 """AWS Secrets Manager統合"""
+
 import json
 from functools import lru_cache
 
-import boto3
 from botocore.exceptions import ClientError
 
 from .logger import get_logger
+from .s3_utils import get_client
 
 logger = get_logger(__name__)
 
@@ -15,7 +16,7 @@ class SecretsManager:
 
     def __init__(self, config):
         self.config = config
-        self.client = boto3.client("secretsmanager", region_name=config.aws_region)
+        self.client = get_client("secretsmanager", region_name=config.aws_region)
 
     @lru_cache(maxsize=10)
     def get_secret(self, secret_name: str) -> dict:
@@ -0,0 +1,518 @@
+"""
+Tracing for MLOps MCP Server
+
+ツール実行の処理段階ごとのトレース（スパン）。
+
+サーバーはツール呼び出しごとにルートスパンを作成し、ツールを実行するスレッド
+（またはプロセス）に親スパンを渡します。ツールは span() でS3からの読み込み・
+joblib.load・pd.read_csv・predict・メトリクス計算などの段階を囲み、AWS API呼び出しは
+boto3のイベントフックで自動的にスパンになります（トレース対象外では何もしません）。
+
+スパンはOpenTelemetryのデータモデル（trace_id / span_id / parent_span_id / kind /
+status / attributes / events）に従い、メモリ上のコレクターまたはOTLP/JSON形式の
+ファイルに出力します。コレクター等の外部サービスは不要です。
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# スパンの種類（OpenTelemetryのSpanKind）
+SPAN_KIND_INTERNAL = "SPAN_KIND_INTERNAL"
+SPAN_KIND_SERVER = "SPAN_KIND_SERVER"
+SPAN_KIND_CLIENT = "SPAN_KIND_CLIENT"
+
+# スパンの状態（OpenTelemetryのStatusCode）
+STATUS_UNSET = "STATUS_CODE_UNSET"
+STATUS_OK = "STATUS_CODE_OK"
+STATUS_ERROR = "STATUS_CODE_ERROR"
+
+# 出力時のリソース・計装スコープ
+SERVICE_NAME = "mlops-mcp-server"
+INSTRUMENTATION_SCOPE = "mcp_server"
+
+# 親スパン: (trace_id, span_id)
+SpanContext = Tuple[str, str]
+SpanSink = Callable[["Span"], Any]
+
+_current_parent: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar(
+    "mlops_trace_parent", default=None
+)
+_current_sink: contextvars.ContextVar[Optional[SpanSink]] = contextvars.ContextVar(
+    "mlops_trace_sink", default=None
+)
+_aws_hooks_installed = False
+_aws_hooks_lock = threading.Lock()
+
+
+class Span:
+    """
+    1つの処理段階の開始・終了時刻と属性
+
+    プロセスプールのワーカーで記録したスパンもpickleしてサーバーに返せます。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+        kind: str = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+
+    @property
+    def context(self) -> SpanContext:
+        """子スパンに渡す (trace_id, span_id)"""
+        return self.trace_id, self.span_id
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """所要時間（ミリ秒）。終了前はNone"""
+        if self.end_time_unix_nano is None:
+            return None
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        """属性を設定（OpenTelemetryの属性名の規約に従う。例: "aws.s3.bucket"）"""
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """スパン内の出来事を記録"""
+        self.events.append(
+            {"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes or {}}
+        )
+
+    def set_status(self, code: str, message: str = ""):
+        """状態を設定"""
+        self.status_code = code
+        self.status_message = message
+
+    def record_exception(self, exception: BaseException):
+        """例外をイベントとして記録し、状態をエラーにする"""
+        self.add_event(
+            "exception",
+            {
+                "exception.type": type(exception).__name__,
+                "exception.message": str(exception),
+            },
+        )
+        self.set_status(STATUS_ERROR, str(exception))
+
+    def end(self):
+        """スパンを終了"""
+        if self.end_time_unix_nano is None:
+            self.end_time_unix_nano = time.time_ns()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON形式のスパン"""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_unix_nano),
+            "endTimeUnixNano": str(self.end_time_unix_nano or self.start_time_unix_nano),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": str(event["time_unix_nano"]),
+                    "attributes": _otlp_attributes(event["attributes"]),
+                }
+                for event in self.events
+            ]
+        return span
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, duration_ms={self.duration_ms})"
+
+
+class _NonRecordingSpan:
+    """トレース対象外で使われる何も記録しないスパン"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        pass
+
+    def set_status(self, code: str, message: str = ""):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+
+_NON_RECORDING_SPAN = _NonRecordingSpan()
+
+
+def is_recording() -> bool:
+    """現在のコンテキストがトレース対象か"""
+    return _current_sink.get() is not None
+
+
+def current_span_context() -> Optional[SpanContext]:
+    """現在のスパンの (trace_id, span_id)（トレース対象外ではNone）"""
+    return _current_parent.get() if is_recording() else None
+
+
+@contextmanager
+def span(
+    name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = SPAN_KIND_INTERNAL
+) -> Iterator[Any]:
+    """
+    処理段階をスパンで囲む
+
+    現在のスパンの子スパンとして記録し、ブロック内の例外はスパンに記録してそのまま送出します。
+    トレース対象外（ツール呼び出し外・トレース無効）では何もしません。
+
+    Args:
+        name: スパン名（例: "joblib.load", "pandas.read_csv", "model.predict"）
+        attributes: 属性
+        kind: スパンの種類
+
+    Yields:
+        Span（トレース対象外では何も記録しないスパン）
+    """
+    sink = _current_sink.get()
+    if sink is None:
+        yield _NON_RECORDING_SPAN
+        return
+
+    parent = _current_parent.get()
+    current = Span(
+        name,
+        trace_id=parent[0] if parent else None,
+        parent_span_id=parent[1] if parent else None,
+        kind=kind,
+        attributes=attributes,
+    )
+    reset = _current_parent.set(current.context)
+    try:
+        yield current
+    except Exception as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current_parent.reset(reset)
+        current.end()
+        _export_to(sink, current)
+
+
+def _export_to(sink: SpanSink, finished: Span):
+    try:
+        sink(finished)
+    except Exception as e:
+        # 出力先の障害でツールの実行を止めない
+        logger.debug(f"Failed to export span {finished.name}: {e}")
+
+
+def run_with_trace(
+    parent: SpanContext,
+    name: str,
+    attributes: Dict[str, Any],
+    func: Callable[[], Any],
+) -> Tuple[Any, List[Span]]:
+    """
+    親スパンの子スパンとして関数を実行し、結果と記録したスパンを返す
+
+    ワーカーで記録したスパンは結果と一緒にサーバーに返され、サーバー側で出力されます。
+    関数が例外を送出した場合、記録したスパンは例外の trace_spans 属性に格納されます。
+    モジュールレベルの関数のため、プロセスプールにもそのまま渡せます。
+    """
+    install_aws_tracing_hooks()
+    spans: List[Span] = []
+    reset_sink = _current_sink.set(spans.append)
+    reset_parent = _current_parent.set(parent)
+    try:
+        with span(name, attributes):
+            result = func()
+    except Exception as e:
+        e.trace_spans = spans
+        raise
+    finally:
+        _current_parent.reset(reset_parent)
+        _current_sink.reset(reset_sink)
+    return result, spans
+
+
+def install_aws_tracing_hooks():
+    """
+    boto3のデフォルトセッションにAWS API呼び出しをスパンにするイベントフックを登録
+
+    フックは登録後に作成されたクライアントに適用されます。
+    """
+    global _aws_hooks_installed
+    if _aws_hooks_installed:
+        return
+
+    with _aws_hooks_lock:
+        if not _aws_hooks_installed:
+            import boto3
+
+            events = boto3._get_default_session().events
+            events.register("before-parameter-build", _start_aws_span)
+            events.register("after-call", _end_aws_span)
+            events.register("after-call-error", _end_aws_span_with_error)
+            _aws_hooks_installed = True
+
+
+def _start_aws_span(params=None, model=None, context=None, **kwargs):
+    sink = _current_sink.get()
+    if sink is None or context is None or model is None:
+        return
+
+    service = model.service_model.service_id
+    parent = _current_parent.get()
+    attributes = {"rpc.system": "aws-api", "rpc.service": service, "rpc.method": model.name}
+    if params and service == "S3":
+        for param, attribute in (("Bucket", "aws.s3.bucket"), ("Key", "aws.s3.key")):
+            if isinstance(params.get(param), str):
+                attributes[attribute] = params[param]
+    context["mlops_trace_span"] = (
+        Span(
+            f"{service}.{model.name}",
+            trace_id=parent[0] if parent else None,
+            parent_span_id=parent[1] if parent else None,
+            kind=SPAN_KIND_CLIENT,
+            attributes=attributes,
+        ),
+        sink,
+    )
+
+
+def _end_aws_span(http_response=None, parsed=None, context=None, **kwargs):
+    started = (context or {}).pop("mlops_trace_span", None)
+    if started is None:
+        return
+
+    current, sink = started
+    status = getattr(http_response, "status_code", None)
+    if status is not None:
+        current.set_attribute("http.status_code", status)
+        if status >= 400:
+            error = (parsed or {}).get("Error", {}).get("Code", f"HTTP {status}")
+            current.set_status(STATUS_ERROR, error)
+    request_id = (parsed or {}).get("ResponseMetadata", {}).get("RequestId")
+    if request_id:
+        current.set_attribute("aws.request_id", request_id)
+    current.end()
+    _export_to(sink, current)
+
+
+def _end_aws_span_with_error(exception=None, context=None, **kwargs):
+    started = (context or {}).pop("mlops_trace_span", None)
+    if started is None:
+        return
+
+    current, sink = started
+    if exception is not None:
+        current.record_exception(exception)
+    current.end()
+    _export_to(sink, current)
+
+
+class InMemorySpanExporter:
+    """
+    最近のスパンをメモリに保持するコレクター
+
+    保持数を超えた場合は古いスパンから破棄します。
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        """保持しているスパン（trace_id指定時はそのトレースのもの）を終了順に返す"""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        return spans
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self):
+        pass
+
+
+class FileSpanExporter:
+    """
+    スパンをOTLP/JSON形式でファイルに追記する
+
+    1回の出力を1行（ExportTraceServiceRequest）として書き込むため、
+    OpenTelemetry Collectorのfilelogレシーバー等でそのまま取り込めます。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": INSTRUMENTATION_SCOPE},
+                            "spans": [s.to_otlp() for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(request, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    サーバー側のスパンの作成と出力先への送信
+
+    ワーカーから返されたスパンもexportで同じ出力先に送ります。
+    """
+
+    def __init__(self, exporters: List[Any], enabled: bool = True):
+        """
+        Args:
+            exporters: 出力先（export(spans) / shutdown() を持つオブジェクト）
+            enabled: Falseの場合はスパンを記録しない
+        """
+        self.exporters = exporters
+        self.enabled = enabled
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = SPAN_KIND_INTERNAL,
+    ) -> Iterator[Any]:
+        """
+        このTracerの出力先に送るスパンを開始（呼び出し元に親スパンがなければ新しいトレース）
+        """
+        if not self.enabled:
+            yield _NON_RECORDING_SPAN
+            return
+
+        reset = _current_sink.set(self._export_span)
+        try:
+            with span(name, attributes, kind) as current:
+                yield current
+        finally:
+            _current_sink.reset(reset)
+
+    def export(self, spans: List[Span]):
+        """スパンを全ての出力先に送る"""
+        if not spans:
+            return
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"Failed to export spans with {type(exporter).__name__}: {e}")
+
+    def _export_span(self, finished: Span):
+        self.export([finished])
+
+    def shutdown(self):
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+def trace_breakdown(spans: List[Span]) -> List[Dict[str, Any]]:
+    """
+    1つのトレースのスパンを親子関係の順（深さ優先・開始順）に並べた内訳
+
+    Returns:
+        [{"name", "depth", "start_offset_ms", "duration_ms", "status", "attributes"}, ...]
+        start_offset_ms はトレースの最初のスパンの開始からの経過時間
+    """
+    if not spans:
+        return []
+
+    span_ids = {s.span_id for s in spans}
+    children: Dict[Optional[str], List[Span]] = {}
+    for s in spans:
+        parent = s.parent_span_id if s.parent_span_id in span_ids else None
+        children.setdefault(parent, []).append(s)
+    origin = min(s.start_time_unix_nano for s in spans)
+
+    rows: List[Dict[str, Any]] = []
+
+    def visit(parent: Optional[str], depth: int):
+        for s in sorted(children.get(parent, []), key=lambda c: c.start_time_unix_nano):
+            rows.append(
+                {
+                    "name": s.name,
+                    "depth": depth,
+                    "start_offset_ms": (s.start_time_unix_nano - origin) / 1e6,
+                    "duration_ms": s.duration_ms,
+                    "status": s.status_code,
+                    "attributes": dict(s.attributes),
+                }
+            )
+            visit(s.span_id, depth + 1)
+
+    visit(None, 0)
+    return rows
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """属性をOTLP/JSONのKeyValueのリストに変換"""
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSONでは64bit整数を文字列で表す
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
@@ -1,7 +1,84 @@
 """設定管理"""
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# ツール実行エグゼキューターの種別
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+# CloudWatchへのメトリクスの送信方法
+METRICS_PUBLISH_MODES = ("cloudwatch", "emf")
+
+# AWSクライアントのリトライモード（botocore）
+AWS_RETRY_MODES = ("legacy", "standard", "adaptive")
+
+# CPUバウンドなツールのデフォルト割り当て（それ以外はスレッドプール）
+DEFAULT_TOOL_EXECUTORS: Dict[str, str] = {
+    "ml_training.train_classification": EXECUTOR_PROCESS,
+    "ml_training.train_regression": EXECUTOR_PROCESS,
+    "ml_training.train_clustering": EXECUTOR_PROCESS,
+}
+
+# 同一引数の同時呼び出しを1回の実行にまとめる（副作用のない読み取り系の）ツール
+DEFAULT_COALESCED_TOOLS: List[str] = [
+    "data_preparation.load_dataset",
+    "data_preparation.validate_data",
+    "ml_evaluation.evaluate_classification",
+    "ml_evaluation.evaluate_regression",
+    "ml_evaluation.evaluate_clustering",
+    "model_registry.list_models",
+    "model_registry.get_model",
+    "model_packaging.validate_package",
+    "model_packaging.extract_model_metadata",
+    "model_deployment.monitor_endpoint",
+    "model_deployment.health_check_endpoint",
+]
+
+# 結果をキャッシュするツール（読み込んだS3オブジェクトのみに依存する純粋なツール）
+DEFAULT_CACHED_TOOLS: List[str] = [
+    "data_preparation.load_dataset",
+    "data_preparation.validate_data",
+    "ml_evaluation.evaluate_classification",
+    "ml_evaluation.evaluate_regression",
+    "ml_evaluation.evaluate_clustering",
+    "model_registry.get_model",
+    "model_packaging.extract_model_metadata",
+]
+
+# 同時実行数の上限（メモリ・CPUを大きく消費するツール/Capability）
+DEFAULT_TOOL_CONCURRENCY_LIMITS: Dict[str, int] = {
+    "data_preparation.preprocess_supervised": 2,
+}
+DEFAULT_CAPABILITY_CONCURRENCY_LIMITS: Dict[str, int] = {
+    "data_preparation": 4,
+    "ml_training": 2,
+    "ml_evaluation": 4,
+}
+
+
+def _parse_list(value: str) -> List[str]:
+    """ "a,b,c" 形式の文字列をリストに変換"""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """ "key=value,key=value" 形式の文字列を辞書に変換"""
+    mapping = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, val = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid mapping entry (expected key=value): {item}")
+        mapping[key.strip()] = val.strip()
+    return mapping
+
+
+def _parse_limits(value: str) -> Dict[str, int]:
+    """ "name=n,name=n" 形式の文字列を同時実行数の辞書に変換"""
+    return {name: int(limit) for name, limit in _parse_mapping(value).items()}
 
 
 @dataclass
@@ -25,9 +102,190 @@ class Config:
     # SageMaker設定
     sagemaker_role_arn: Optional[str] = None
 
+    # AWSクライアント設定（全ツールで共有するクライアントに適用）
+    # HTTP接続プールの最大接続数（同時に実行するツールの数以上にする）
+    aws_max_pool_connections: int = 32
+    # TCPキープアライブを有効にするか
+    aws_tcp_keepalive: bool = True
+    # リトライモード（"legacy" / "standard" / "adaptive"）
+    aws_retry_mode: str = "standard"
+    # 最大試行回数（初回の呼び出しを含む）
+    aws_max_attempts: int = 5
+
+    # S3転送設定
+    # 並列ダウンロードで1回の範囲指定GETで取得するバイト数（これ以下のオブジェクトは1回で取得）
+    s3_download_part_bytes: int = 8 * 1024 * 1024
+    # 1オブジェクトあたりの並列ダウンロード数
+    s3_download_concurrency: int = 8
+    # マルチパートアップロードの1パートのバイト数（5MiB以上。これ未満の出力は1回のPutObjectで保存）
+    s3_upload_part_bytes: int = 8 * 1024 * 1024
+    # 1オブジェクトあたりの並列アップロード数
+    s3_upload_concurrency: int = 4
+    # S3オブジェクトのディスクキャッシュのディレクトリ（Noneの場合はキャッシュしない）
+    s3_cache_dir: Optional[str] = None
+    # ディスクキャッシュの上限サイズ（バイト。これを超えるオブジェクトはキャッシュしない）
+    s3_cache_max_bytes: int = 10 * 1024 * 1024 * 1024
+    # 解析済みのデータセットを保存するディレクトリ（Noneの場合は保存しない）
+    dataset_cache_dir: Optional[str] = None
+    # 解析済みのデータセットの保存先の上限サイズ（バイト）
+    dataset_cache_max_bytes: int = 10 * 1024 * 1024 * 1024
+    # シャード化されたデータセット（プレフィックス・マニフェスト）で並列に読み込むパート数
+    dataset_part_concurrency: int = 8
+
+    # ツール実行設定
+    # I/Oバウンドなツール（boto3等）用スレッドプールのワーカー数
+    thread_pool_workers: int = 8
+    # CPUバウンドなツール（学習等）用プロセスプールのワーカー数
+    process_pool_workers: int = 2
+    # ツール名 → エグゼキューター種別 ("thread" / "process")
+    tool_executors: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_TOOL_EXECUTORS))
+    # 同時呼び出しを合流させるツール名（副作用のあるツールは含めないこと）
+    coalesced_tools: List[str] = field(default_factory=lambda: list(DEFAULT_COALESCED_TOOLS))
+
+    # 結果キャッシュ設定
+    # 結果をキャッシュするツール名
+    cached_tools: List[str] = field(default_factory=lambda: list(DEFAULT_CACHED_TOOLS))
+    # メモリ上のキャッシュの上限サイズ（バイト）
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+    # ディスク上のキャッシュディレクトリ（Noneの場合はメモリのみ）
+    result_cache_dir: Optional[str] = None
+    # ディスク上のキャッシュの上限サイズ（バイト）
+    result_cache_disk_max_bytes: int = 1024 * 1024 * 1024
+
+    # 同時実行数制限
+    # ツール名 → 同時実行数の上限
+    tool_concurrency_limits: Dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_TOOL_CONCURRENCY_LIMITS)
+    )
+    # Capability名 → 同時実行数の上限（Capability内の全ツールの合計）
+    capability_concurrency_limits: Dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_CAPABILITY_CONCURRENCY_LIMITS)
+    )
+    # 上限到達時に待機できる呼び出し数（制限ごと）。超えた場合はビジーを返す
+    admission_queue_size: int = 8
+    # 実行時間の実績がない場合にビジー応答で返す再試行までの目安秒数
+    admission_retry_after_seconds: float = 5.0
+
+    # 期限・キャンセル設定
+    # ツール名 → 期限（秒）。呼び出し時に期限が指定されない場合に使用
+    tool_timeouts: Dict[str, float] = field(default_factory=dict)
+    # tool_timeoutsに含まれないツールの期限（秒）。Noneの場合は期限なし
+    default_tool_timeout: Optional[float] = None
+    # キャンセルを通知したツールがチェックポイントで停止するまで実行枠を保持する最大秒数
+    cancellation_grace_seconds: float = 5.0
+
+    # メトリクス設定
+    # Prometheus形式の /metrics エンドポイントのポート（Noneの場合は起動しない）
+    metrics_port: Optional[int] = None
+    # /metrics エンドポイントの待ち受けアドレス
+    metrics_host: str = "127.0.0.1"
+    # CloudWatchへの送信方法（"cloudwatch": put_metric_data / "emf": 構造化ログ / None: 送信しない）
+    metrics_publish_mode: Optional[str] = None
+    # CloudWatchへの送信間隔（秒）
+    metrics_publish_interval_seconds: float = 60.0
+
+    # トレース設定
+    # ツール実行の処理段階ごとのスパンを記録するか
+    tracing_enabled: bool = True
+    # メモリ上に保持するスパン数（古いものから破棄）
+    trace_buffer_spans: int = 10000
+    # スパンをOTLP/JSON形式で追記するファイル（Noneの場合はメモリのみ）
+    trace_file: Optional[str] = None
+
+    def __post_init__(self):
+        for tool_name, kind in self.tool_executors.items():
+            if kind not in (EXECUTOR_THREAD, EXECUTOR_PROCESS):
+                raise ValueError(
+                    f"Invalid executor '{kind}' for tool {tool_name}. "
+                    f"Supported executors: {EXECUTOR_THREAD}, {EXECUTOR_PROCESS}"
+                )
+
+        limits = {**self.tool_concurrency_limits, **self.capability_concurrency_limits}
+        for name, limit in limits.items():
+            if limit < 1:
+                raise ValueError(f"Invalid concurrency limit {limit} for {name}. Must be >= 1")
+        if self.admission_queue_size < 0:
+            raise ValueError(
+                f"Invalid admission queue size {self.admission_queue_size}. Must be >= 0"
+            )
+        if self.aws_retry_mode not in AWS_RETRY_MODES:
+            raise ValueError(
+                f"Invalid AWS retry mode '{self.aws_retry_mode}'. "
+                f"Supported modes: {', '.join(AWS_RETRY_MODES)}"
+            )
+        if self.aws_max_pool_connections < 1:
+            raise ValueError(
+                f"Invalid AWS max pool connections {self.aws_max_pool_connections}. Must be >= 1"
+            )
+        if self.s3_download_part_bytes < 1 or self.s3_download_concurrency < 1:
+            raise ValueError(
+                f"Invalid S3 download settings (part bytes {self.s3_download_part_bytes}, "
+                f"concurrency {self.s3_download_concurrency}). Must be >= 1"
+            )
+        if self.s3_upload_part_bytes < 5 * 1024 * 1024 or self.s3_upload_concurrency < 1:
+            raise ValueError(
+                f"Invalid S3 upload settings (part bytes {self.s3_upload_part_bytes}, "
+                f"concurrency {self.s3_upload_concurrency}). "
+                "Part bytes must be >= 5 MiB and concurrency >= 1"
+            )
+        if self.s3_cache_max_bytes < 0:
+            raise ValueError(f"Invalid S3 cache max bytes {self.s3_cache_max_bytes}. Must be >= 0")
+        if self.dataset_cache_max_bytes < 0:
+            raise ValueError(
+                f"Invalid dataset cache max bytes {self.dataset_cache_max_bytes}. Must be >= 0"
+            )
+        if self.dataset_part_concurrency < 1:
+            raise ValueError(
+                f"Invalid dataset part concurrency {self.dataset_part_concurrency}. Must be >= 1"
+            )
+        if self.metrics_publish_mode not in (None, *METRICS_PUBLISH_MODES):
+            raise ValueError(
+                f"Invalid metrics publish mode '{self.metrics_publish_mode}'. "
+                f"Supported modes: {', '.join(METRICS_PUBLISH_MODES)}"
+            )
+
+    def get_tool_executor(self, tool_name: str) -> str:
+        """ツールの実行に使うエグゼキューター種別を返す"""
+        return self.tool_executors.get(tool_name, EXECUTOR_THREAD)
+
+    def get_tool_timeout(self, tool_name: str) -> Optional[float]:
+        """ツールのデフォルトの期限（秒）を返す（期限なしの場合はNone）"""
+        return self.tool_timeouts.get(tool_name, self.default_tool_timeout)
+
+    def is_coalesced(self, tool_name: str) -> bool:
+        """同一引数の同時呼び出しを合流させるツールか"""
+        return tool_name in self.coalesced_tools
+
+    def is_cached(self, tool_name: str) -> bool:
+        """結果をキャッシュするツールか"""
+        return tool_name in self.cached_tools
+
     @classmethod
     def from_env(cls) -> "Config":
         """環境変数から設定を読み込む"""
+        tool_executors = dict(DEFAULT_TOOL_EXECUTORS)
+        tool_executors.update(_parse_mapping(os.environ.get("MLOPS_TOOL_EXECUTORS", "")))
+
+        coalesced_tools = list(DEFAULT_COALESCED_TOOLS)
+        if "MLOPS_COALESCED_TOOLS" in os.environ:
+            coalesced_tools = _parse_list(os.environ["MLOPS_COALESCED_TOOLS"])
+
+        tool_limits = dict(DEFAULT_TOOL_CONCURRENCY_LIMITS)
+        tool_limits.update(_parse_limits(os.environ.get("MLOPS_TOOL_CONCURRENCY", "")))
+        capability_limits = dict(DEFAULT_CAPABILITY_CONCURRENCY_LIMITS)
+        capability_limits.update(_parse_limits(os.environ.get("MLOPS_CAPABILITY_CONCURRENCY", "")))
+
+        tool_timeouts = {
+            name: float(timeout)
+            for name, timeout in _parse_mapping(os.environ.get("MLOPS_TOOL_TIMEOUTS", "")).items()
+        }
+        default_tool_timeout = os.environ.get("MLOPS_DEFAULT_TOOL_TIMEOUT")
+        metrics_port = os.environ.get("MLOPS_METRICS_PORT")
+
+        cached_tools = list(DEFAULT_CACHED_TOOLS)
+        if "MLOPS_CACHED_TOOLS" in os.environ:
+            cached_tools = _parse_list(os.environ["MLOPS_CACHED_TOOLS"])
+
         return cls(
             aws_region=os.environ.get("AWS_REGION", "us-east-1"),
             s3_bucket=os.environ["MLOPS_S3_BUCKET"],
@@ -36,4 +294,55 @@ class Config:
             cloudwatch_log_group=os.environ.get("CLOUDWATCH_LOG_GROUP"),
             cloudwatch_log_stream=os.environ.get("CLOUDWATCH_LOG_STREAM"),
             sagemaker_role_arn=os.environ.get("SAGEMAKER_ROLE_ARN"),
+            aws_max_pool_connections=int(os.environ.get("MLOPS_AWS_MAX_POOL_CONNECTIONS", "32")),
+            aws_tcp_keepalive=os.environ.get("MLOPS_AWS_TCP_KEEPALIVE", "true").lower() == "true",
+            aws_retry_mode=os.environ.get("AWS_RETRY_MODE", "standard"),
+            aws_max_attempts=int(os.environ.get("AWS_MAX_ATTEMPTS", "5")),
+            s3_download_part_bytes=int(
+                os.environ.get("MLOPS_S3_DOWNLOAD_PART_BYTES", str(8 * 1024 * 1024))
+            ),
+            s3_download_concurrency=int(os.environ.get("MLOPS_S3_DOWNLOAD_CONCURRENCY", "8")),
+            s3_upload_part_bytes=int(
+                os.environ.get("MLOPS_S3_UPLOAD_PART_BYTES", str(8 * 1024 * 1024))
+            ),
+            s3_upload_concurrency=int(os.environ.get("MLOPS_S3_UPLOAD_CONCURRENCY", "4")),
+            s3_cache_dir=os.environ.get("MLOPS_S3_CACHE_DIR"),
+            s3_cache_max_bytes=int(
+                os.environ.get("MLOPS_S3_CACHE_MAX_BYTES", str(10 * 1024 * 1024 * 1024))
+            ),
+            dataset_cache_dir=os.environ.get("MLOPS_DATASET_CACHE_DIR"),
+            dataset_cache_max_bytes=int(
+                os.environ.get("MLOPS_DATASET_CACHE_MAX_BYTES", str(10 * 1024 * 1024 * 1024))
+            ),
+            dataset_part_concurrency=int(os.environ.get("MLOPS_DATASET_PART_CONCURRENCY", "8")),
+            thread_pool_workers=int(os.environ.get("MLOPS_THREAD_POOL_WORKERS", "8")),
+            process_pool_workers=int(os.environ.get("MLOPS_PROCESS_POOL_WORKERS", "2")),
+            tool_executors=tool_executors,
+            coalesced_tools=coalesced_tools,
+            cached_tools=cached_tools,
+            result_cache_max_bytes=int(
+                os.environ.get("MLOPS_RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+            ),
+            result_cache_dir=os.environ.get("MLOPS_RESULT_CACHE_DIR"),
+            result_cache_disk_max_bytes=int(
+                os.environ.get("MLOPS_RESULT_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+            ),
+            tool_concurrency_limits=tool_limits,
+            capability_concurrency_limits=capability_limits,
+            admission_queue_size=int(os.environ.get("MLOPS_ADMISSION_QUEUE_SIZE", "8")),
+            admission_retry_after_seconds=float(os.environ.get("MLOPS_ADMISSION_RETRY_AFTER", "5")),
+            tool_timeouts=tool_timeouts,
+            default_tool_timeout=float(default_tool_timeout) if default_tool_timeout else None,
+            cancellation_grace_seconds=float(
+                os.environ.get("MLOPS_CANCELLATION_GRACE_SECONDS", "5")
+            ),
+            metrics_port=int(metrics_port) if metrics_port else None,
+            metrics_host=os.environ.get("MLOPS_METRICS_HOST", "127.0.0.1"),
+            metrics_publish_mode=os.environ.get("MLOPS_METRICS_PUBLISH_MODE") or None,
+            metrics_publish_interval_seconds=float(
+                os.environ.get("MLOPS_METRICS_PUBLISH_INTERVAL", "60")
+            ),
+            tracing_enabled=os.environ.get("MLOPS_TRACING", "true").lower() == "true",
+            trace_buffer_spans=int(os.environ.get("MLOPS_TRACE_BUFFER_SPANS", "10000")),
+            trace_file=os.environ.get("MLOPS_TRACE_FILE"),
         )
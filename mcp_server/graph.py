@@ -0,0 +1,243 @@
+"""
+Tool Call Graph
+
+複数のツール呼び出しをDAG（有向非巡回グラフ）として1回のリクエストで実行します。
+
+各ステップの引数から先行ステップの結果を参照できます。
+- `{"$ref": "step_id.path.to.value"}`: 値をそのまま置き換え（任意の型）
+- `"${step_id.path.to.value}/train.csv"`: 文字列中に埋め込み（文字列以外の値はJSONの表記）
+
+参照またはdepends_onで依存関係が決まり、依存関係のないステップは並行して実行されます。
+"""
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+# ステップの状態
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+REF_KEY = "$ref"
+_STEP_ID = re.compile(r"^[A-Za-z_][A-Za-z0-9_\-]*$")
+_TEMPLATE_REF = re.compile(r"\$\{([^}]+)\}")
+
+ToolCaller = Callable[[str, Dict[str, Any], Optional[float]], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class GraphStep:
+    """グラフ上の1つのツール呼び出し"""
+
+    id: str
+    tool: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    # 参照とdepends_onから求めた依存ステップ
+    depends_on: List[str] = field(default_factory=list)
+    # ステップの期限（秒）
+    timeout: Optional[float] = None
+
+
+def parse_graph(steps: List[Dict[str, Any]], available_tools: Set[str]) -> List[GraphStep]:
+    """
+    ステップ定義を検証し、トポロジカル順に並べたステップを返す
+
+    Args:
+        steps: ステップ定義のリスト（{"id", "tool", "arguments", "depends_on", "timeout"}）
+        available_tools: 登録されているツール名
+
+    Returns:
+        依存関係の順に並べたステップ
+
+    Raises:
+        ValueError: ID重複・未知のツール・未定義のステップへの参照・循環がある場合
+    """
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("steps must be a non-empty list")
+
+    parsed: Dict[str, GraphStep] = {}
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            raise ValueError(f"Step {index} must be an object")
+
+        step_id = step.get("id")
+        tool = step.get("tool")
+        arguments = step.get("arguments") or {}
+        if not isinstance(step_id, str) or not _STEP_ID.match(step_id):
+            raise ValueError(f"Step {index} has an invalid id: {step_id!r}")
+        if step_id in parsed:
+            raise ValueError(f"Duplicate step id: {step_id}")
+        if tool not in available_tools:
+            raise ValueError(f"Tool not found: {tool} (step {step_id})")
+        if not isinstance(arguments, dict):
+            raise ValueError(f"arguments of step {step_id} must be an object")
+        timeout = step.get("timeout")
+        if timeout is not None and (
+            isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+        ):
+            raise ValueError(f"timeout of step {step_id} must be a positive number")
+
+        depends_on = step.get("depends_on") or []
+        if not isinstance(depends_on, list) or not all(
+            isinstance(dependency, str) and dependency for dependency in depends_on
+        ):
+            raise ValueError(f"depends_on of step {step_id} must be a list of step ids")
+        depends_on = list(depends_on)
+        for ref in _collect_references(arguments):
+            if not isinstance(ref, str) or not ref:
+                raise ValueError(f"Invalid reference in step {step_id}: {ref!r}")
+            dependency = ref.split(".", 1)[0]
+            if dependency not in depends_on:
+                depends_on.append(dependency)
+
+        parsed[step_id] = GraphStep(step_id, tool, arguments, depends_on, timeout)
+
+    for step in parsed.values():
+        for dependency in step.depends_on:
+            if dependency not in parsed:
+                raise ValueError(f"Step {step.id} depends on undefined step: {dependency}")
+            if dependency == step.id:
+                raise ValueError(f"Step {step.id} depends on itself")
+
+    return _topological_order(parsed)
+
+
+def _topological_order(steps: Dict[str, GraphStep]) -> List[GraphStep]:
+    """依存関係の順に並べる（定義順を保つ）"""
+    ordered: List[GraphStep] = []
+    done: Set[str] = set()
+    remaining = list(steps.values())
+
+    while remaining:
+        ready = [step for step in remaining if all(d in done for d in step.depends_on)]
+        if not ready:
+            cycle = ", ".join(step.id for step in remaining)
+            raise ValueError(f"Dependency cycle detected among steps: {cycle}")
+        for step in ready:
+            ordered.append(step)
+            done.add(step.id)
+        remaining = [step for step in remaining if step.id not in done]
+
+    return ordered
+
+
+def _collect_references(value: Any) -> List[str]:
+    """引数に含まれる参照（"step_id.path"）を列挙"""
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            return [value[REF_KEY]]
+        return [ref for item in value.values() for ref in _collect_references(item)]
+    if isinstance(value, list):
+        return [ref for item in value for ref in _collect_references(item)]
+    if isinstance(value, str):
+        return _TEMPLATE_REF.findall(value)
+    return []
+
+
+def resolve_references(value: Any, results: Dict[str, Any]) -> Any:
+    """
+    引数中の参照を先行ステップの結果で置き換える
+
+    Args:
+        value: 引数（ネストした辞書・リストを含む）
+        results: ステップID → ツールの結果
+
+    Raises:
+        ValueError: 参照先の値が存在しない場合
+    """
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            return _lookup(value[REF_KEY], results)
+        return {key: resolve_references(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(item, results) for item in value]
+    if isinstance(value, str):
+        return _TEMPLATE_REF.sub(lambda m: _embed(_lookup(m.group(1), results)), value)
+    return value
+
+
+def _embed(value: Any) -> str:
+    """文字列に埋め込む表記（文字列はそのまま、それ以外は {"a": 1}・true・null 等のJSON）"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _lookup(ref: str, results: Dict[str, Any]) -> Any:
+    """ "step_id.key.0.key" 形式の参照を辿る"""
+    step_id, *path = ref.split(".")
+    current = results[step_id]
+    for part in path:
+        if isinstance(current, dict) and part in current:
+            current = current[part]
+        elif isinstance(current, list) and part.isdigit() and int(part) < len(current):
+            current = current[int(part)]
+        else:
+            raise ValueError(f"Reference {ref} not found in result of step {step_id}")
+    return current
+
+
+async def run_graph(steps: List[GraphStep], call_tool: ToolCaller) -> Dict[str, Any]:
+    """
+    ステップを依存関係に従って実行（独立したステップは並行実行）
+
+    失敗したステップに依存するステップは実行せずにスキップします。
+
+    Args:
+        steps: parse_graphで検証済みのステップ
+        call_tool: ツール呼び出し関数（MLOpsServer.call_tool）
+
+    Returns:
+        全体の成否・ステップごとの結果と所要時間
+    """
+    graph_start = time.perf_counter()
+    results: Dict[str, Any] = {}
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    def elapsed_ms(since: float) -> float:
+        return (time.perf_counter() - since) * 1000
+
+    async def run_step(step: GraphStep):
+        if step.depends_on:
+            await asyncio.wait([tasks[d] for d in step.depends_on])
+
+        outcome: Dict[str, Any] = {"tool": step.tool}
+        outcomes[step.id] = outcome
+
+        failed = [d for d in step.depends_on if outcomes[d]["status"] != STATUS_SUCCEEDED]
+        if failed:
+            outcome["status"] = STATUS_SKIPPED
+            outcome["error"] = f"Skipped because dependencies did not succeed: {failed}"
+            return
+
+        outcome["start_ms"] = elapsed_ms(graph_start)
+        step_start = time.perf_counter()
+        try:
+            arguments = resolve_references(step.arguments, results)
+            response = await call_tool(step.tool, arguments, step.timeout)
+        except Exception as e:
+            response = {"success": False, "error": str(e)}
+        outcome["duration_ms"] = elapsed_ms(step_start)
+
+        if response["success"]:
+            outcome["status"] = STATUS_SUCCEEDED
+            outcome["result"] = response["result"]
+            results[step.id] = response["result"]
+        else:
+            outcome["status"] = STATUS_FAILED
+            outcome.update({k: v for k, v in response.items() if k != "success"})
+
+    for step in steps:
+        tasks[step.id] = asyncio.create_task(run_step(step))
+    await asyncio.gather(*tasks.values())
+
+    return {
+        "success": all(o["status"] == STATUS_SUCCEEDED for o in outcomes.values()),
+        "steps": {step.id: outcomes[step.id] for step in steps},
+        "total_duration_ms": elapsed_ms(graph_start),
+    }
@@ -0,0 +1,71 @@
+"""
+Metrics Endpoint
+
+ツール呼び出しのメトリクスをPrometheusのテキスト形式で公開するHTTPエンドポイント。
+
+`GET /metrics` のみを処理する最小限のHTTP/1.1サーバーです（1リクエストごとに接続を閉じます）。
+集計はプロセス内で行われるため、スクレイプ時以外にネットワーク通信は発生しません。
+"""
+
+import asyncio
+import logging
+
+from .common.metrics import ToolMetrics
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# リクエストヘッダーの最大サイズ
+MAX_HEADER_BYTES = 16 * 1024
+
+
+async def start_metrics_server(
+    metrics: ToolMetrics, host: str = "127.0.0.1", port: int = 9464
+) -> asyncio.AbstractServer:
+    """/metrics エンドポイントを起動"""
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await _handle_request(metrics, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(on_connect, host, port, limit=MAX_HEADER_BYTES)
+    for sock in server.sockets:
+        logger.info(f"Serving metrics on http://{sock.getsockname()}/metrics")
+    return server
+
+
+async def _handle_request(
+    metrics: ToolMetrics, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+):
+    """1件のHTTPリクエストを処理してレスポンスを書き込む"""
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    # ヘッダーは読み捨てる
+    while (await reader.readline()).strip():
+        pass
+
+    parts = request_line.split()
+    if len(parts) != 3:
+        status, body, content_type = "400 Bad Request", "Bad Request\n", "text/plain"
+    elif parts[0] not in ("GET", "HEAD"):
+        status, body, content_type = "405 Method Not Allowed", "Method Not Allowed\n", "text/plain"
+    elif parts[1].split("?", 1)[0] != "/metrics":
+        status, body, content_type = "404 Not Found", "Not Found\n", "text/plain"
+    else:
+        status, body, content_type = "200 OK", metrics.render_prometheus(), PROMETHEUS_CONTENT_TYPE
+
+    payload = body.encode("utf-8")
+    headers = (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    writer.write(headers.encode("latin-1"))
+    if parts and parts[0] != "HEAD":
+        writer.write(payload)
+    await writer.drain()
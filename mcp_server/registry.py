@@ -0,0 +1,127 @@
+"""
+Lazy Capability Registry
+
+Capabilityの遅延ロード機構。
+ツール名・説明はマニフェスト（capabilities/manifest.py）から取得し、
+重い依存（sklearn, pandas, joblib, boto3）を含むCapabilityモジュールは
+そのCapabilityのツールが初めて呼び出された時点でインポートします。
+"""
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """マニフェスト上のツール定義"""
+
+    name: str
+    # ツール関数の場所 ("module:function")。スキーマ生成に使用（インポートはしない）
+    entry_point: str
+    description: str
+
+
+@dataclass(frozen=True)
+class CapabilitySpec:
+    """マニフェスト上のCapability定義"""
+
+    name: str
+    module: str
+    class_name: str
+    tools: Tuple[ToolSpec, ...] = field(default_factory=tuple)
+
+
+class LazyCapability:
+    """
+    初回アクセス時にCapabilityモジュールをインポートするプロキシ
+
+    属性アクセス（get_tools等）は実体のCapabilityインスタンスに委譲されます。
+    """
+
+    def __init__(self, spec: CapabilitySpec):
+        self.spec = spec
+        self.import_time_ms: Optional[float] = None
+        self._instance: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Capabilityがロード済みか"""
+        return self._instance is not None
+
+    def load(self) -> Any:
+        """Capabilityをインポート・初期化して返す（ロード済みの場合はキャッシュを返す）"""
+        if self._instance is not None:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.spec.module)
+                instance = getattr(module, self.spec.class_name)()
+                self.import_time_ms = (time.perf_counter() - start) * 1000
+                self._instance = instance
+                logger.info(
+                    f"Loaded capability {self.spec.name} in {self.import_time_ms:.1f} ms"
+                )
+        return self._instance
+
+    def get_tool(self, tool_name: str) -> Callable:
+        """ツール関数の実体を返す"""
+        tools = self.load().get_tools()
+        if tool_name not in tools:
+            raise ImportError(
+                f"Capability {self.spec.name} does not provide tool declared in manifest: "
+                f"{tool_name}"
+            )
+        return tools[tool_name]
+
+    def __getattr__(self, name: str) -> Any:
+        # __init__で設定した属性以外は実体に委譲（ここで初めてインポートされる）
+        if name.startswith("__") or name in ("spec", "_instance", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # プロセスプールに渡す際は実体とロックを含めない（子プロセス側で再ロード）
+        return {"spec": self.spec, "import_time_ms": None}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.spec = state["spec"]
+        self.import_time_ms = state["import_time_ms"]
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        status = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyCapability {self.spec.name} ({status})>"
+
+
+class LazyTool:
+    """
+    呼び出し時に所属Capabilityをロードしてツール関数を実行するプロキシ
+
+    ピックル化可能なため、プロセスプールにもそのまま渡せます。
+    その場合、Capabilityのインポートは子プロセス側でのみ行われます。
+    """
+
+    def __init__(self, capability: LazyCapability, tool_spec: ToolSpec):
+        self.capability = capability
+        self.spec = tool_spec
+        self.__doc__ = tool_spec.description
+
+    def resolve(self) -> Callable:
+        """ツール関数の実体を返す"""
+        return self.capability.get_tool(self.spec.name)
+
+    def __call__(self, **kwargs) -> Any:
+        return self.resolve()(**kwargs)
+
+    def __repr__(self) -> str:
+        return f"<LazyTool {self.capability.spec.name}.{self.spec.name}>"
@@ -0,0 +1,288 @@
+"""
+Tool Result Cache
+
+読み取り系ツールの実行結果キャッシュ。
+
+ツールの結果は、ツールが読み込んだ全S3オブジェクトのETagとともに保存されます。
+キャッシュを返す前にHEADリクエストで各オブジェクトのETagを確認し、
+1つでも変更（または削除・新規作成）されていれば結果を破棄します。
+メモリ上のLRU（サイズ上限付き）と、任意でディスク上の第2層を持ちます。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .common.s3_utils import S3ObjectVersions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """キャッシュエントリ"""
+
+    # ツールが読み込んだS3オブジェクト (バケット, キー, ETag)
+    objects: S3ObjectVersions
+    # シリアライズ済みの結果（呼び出し元ごとに復元するため共有による変更の影響を受けない）
+    payload: str
+    size_bytes: int
+
+
+class ResultCache:
+    """
+    S3オブジェクトのETagで検証するツール結果キャッシュ
+
+    スレッドセーフです（HEADによる検証はブロッキングのため、呼び出し側で
+    エグゼキューター上から使用してください）。
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ):
+        """
+        Args:
+            max_bytes: メモリ上のキャッシュの上限サイズ（シリアライズ後のバイト数）
+            disk_dir: ディスク上のキャッシュディレクトリ（Noneの場合はメモリのみ）
+            disk_max_bytes: ディスク上のキャッシュの上限サイズ
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes if self.disk_dir else 0
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        # ディスク上のファイル名 → サイズ（古い順）
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir:
+            self._load_disk_index()
+
+    def lookup(
+        self, key: str, is_unchanged: Callable[[S3ObjectVersions], bool]
+    ) -> Tuple[bool, Any]:
+        """
+        キャッシュされた結果を検証して返す
+
+        Args:
+            key: キャッシュキー
+            is_unchanged: 記録されたS3オブジェクトが変更されていないかを確認する関数
+
+        Returns:
+            (ヒットしたか, 結果)
+        """
+        entry, from_disk = self._get_entry(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return False, None
+
+        if not is_unchanged(entry.objects):
+            self.invalidate(key)
+            with self._lock:
+                self.stale += 1
+                self.misses += 1
+            return False, None
+
+        with self._lock:
+            self.hits += 1
+            if from_disk:
+                self.disk_hits += 1
+        if from_disk:
+            self._put_entry(key, entry)
+        return True, json.loads(entry.payload)
+
+    def put(self, key: str, result: Any, objects: S3ObjectVersions) -> bool:
+        """
+        結果を保存
+
+        Returns:
+            保存した場合True（JSONにできない結果や上限を超える結果は保存しない）
+        """
+        try:
+            payload = json.dumps(result, ensure_ascii=False, allow_nan=True)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Result for {key} is not cacheable: {e}")
+            return False
+
+        entry = CacheEntry(
+            objects=[tuple(obj) for obj in objects],
+            payload=payload,
+            size_bytes=len(payload.encode("utf-8")),
+        )
+        return self._put_entry(key, entry)
+
+    def invalidate(self, key: str):
+        """エントリを削除"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size_bytes
+        if self.disk_dir:
+            self._remove_disk_entry(self._disk_name(key))
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            names = list(self._disk_entries)
+        for name in names:
+            self._remove_disk_entry(name)
+
+    def stats(self) -> Dict[str, Any]:
+        """キャッシュのサイズとヒット・ミス・追い出しのカウンター"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk_entries),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def _get_entry(self, key: str) -> Tuple[Optional[CacheEntry], bool]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, False
+
+        if self.disk_dir:
+            entry = self._read_disk_entry(key)
+            if entry is not None:
+                return entry, True
+        return None, False
+
+    def _put_entry(self, key: str, entry: CacheEntry) -> bool:
+        if entry.size_bytes > self.max_bytes:
+            # メモリに載らない結果はディスクに直接保存
+            return self._write_disk_entry(key, entry)
+
+        evicted: List[Tuple[str, CacheEntry]] = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size_bytes
+            self._entries[key] = entry
+            self._bytes += entry.size_bytes
+
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted_entry = self._entries.popitem(last=False)
+                self._bytes -= evicted_entry.size_bytes
+                self.evictions += 1
+                evicted.append((evicted_key, evicted_entry))
+
+        if self.disk_dir:
+            self._remove_disk_entry(self._disk_name(key))
+            # メモリから追い出したエントリはディスクに退避
+            for evicted_key, evicted_entry in evicted:
+                self._write_disk_entry(evicted_key, evicted_entry)
+        return True
+
+    # ディスク層
+
+    def _disk_name(self, key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+
+    def _load_disk_index(self):
+        """既存のキャッシュファイルを読み込み順序（更新日時順）に登録"""
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        files = sorted(self.disk_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._disk_entries[path.name] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _read_disk_entry(self, key: str) -> Optional[CacheEntry]:
+        name = self._disk_name(key)
+        with self._lock:
+            if name not in self._disk_entries:
+                return None
+        try:
+            data = json.loads((self.disk_dir / name).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read result cache file {name}: {e}")
+            self._remove_disk_entry(name)
+            return None
+
+        if data.get("key") != key:
+            return None
+        payload = data["payload"]
+        return CacheEntry(
+            objects=[tuple(obj) for obj in data["objects"]],
+            payload=payload,
+            size_bytes=len(payload.encode("utf-8")),
+        )
+
+    def _write_disk_entry(self, key: str, entry: CacheEntry) -> bool:
+        if not self.disk_dir:
+            return False
+
+        content = json.dumps(
+            {"key": key, "objects": entry.objects, "payload": entry.payload}, ensure_ascii=False
+        ).encode("utf-8")
+        if len(content) > self.disk_max_bytes:
+            return False
+
+        name = self._disk_name(key)
+        path = self.disk_dir / name
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write result cache file {name}: {e}")
+            return False
+
+        with self._lock:
+            self._disk_bytes -= self._disk_entries.pop(name, 0)
+            self._disk_entries[name] = len(content)
+            self._disk_bytes += len(content)
+        self._evict_disk()
+        return True
+
+    def _remove_disk_entry(self, name: str):
+        with self._lock:
+            if name not in self._disk_entries:
+                return
+            self._disk_bytes -= self._disk_entries.pop(name)
+        try:
+            (self.disk_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict_disk(self):
+        while True:
+            with self._lock:
+                if self._disk_bytes <= self.disk_max_bytes or not self._disk_entries:
+                    return
+                name = next(iter(self._disk_entries))
+                self.disk_evictions += 1
+            self._remove_disk_entry(name)
@@ -5,159 +5,287 @@ MLOps Integrated MCP Server
 全capabilityのツールを登録し、ルーティングを行います。
 """
 
+import asyncio
+import functools
+import json
 import logging
-from typing import Any, Dict, List
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from queue import Empty
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .admission import AdmissionController
+from .capabilities.schema import build_entry_point_schema, validate_arguments
+from .common.cancellation import CancellationToken, run_with_token
+from .common.exceptions import DeadlineExceededError, ServerBusyError, ToolCancelledError
+from .common.metrics import (
+    OUTCOME_BUSY,
+    OUTCOME_CANCELLED,
+    OUTCOME_DEADLINE_EXCEEDED,
+    OUTCOME_ERROR,
+    OUTCOME_SUCCESS,
+    MetricsPublisher,
+    ToolMetrics,
+)
+from .common.progress import ProgressReporter, ProgressUpdate, run_with_progress
+from .common.s3_utils import (
+    aws_client_info,
+    call_with_s3_io_counting,
+    call_with_s3_tracking,
+    configure_aws_clients,
+    dataset_cache_info,
+    s3_cache_info,
+    s3_objects_unchanged,
+)
+from .common.tracing import (
+    SPAN_KIND_SERVER,
+    STATUS_ERROR,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Tracer,
+    current_span_context,
+    run_with_trace,
+    span,
+    trace_breakdown,
+)
+from .config import EXECUTOR_PROCESS, Config
+from .graph import parse_graph, run_graph
+from .registry import LazyCapability, LazyTool
+from .result_cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
+# 進捗の通知先（イベントループ上で呼び出される）
+ProgressCallback = Callable[[ProgressUpdate], None]
+
+# プロセスプールで実行中のツールの進捗を取り出す間隔（秒）
+PROGRESS_POLL_INTERVAL = 0.25
+
+# スキーマを生成できなかったツール用（引数の検証は行わない）
+_PERMISSIVE_INPUT_SCHEMA: Dict[str, Any] = {"type": "object", "properties": {}, "required": []}
+
+
+def _load_default_config() -> Config:
+    """環境変数から設定を読み込む（必須項目が未設定の場合はデフォルト値）"""
+    if "MLOPS_S3_BUCKET" in os.environ:
+        return Config.from_env()
+    return Config(aws_region=os.environ.get("AWS_REGION", "us-east-1"), s3_bucket="")
+
 
 class MLOpsServer:
     """
     統合MLOps MCPサーバー
 
     12個のcapabilityを統合し、単一のMCPサーバーとして提供します。
-    Phase 1では Data Preparation Capability のみ実装済み。
+    Capability本体はツールの初回呼び出し時に遅延ロードされます。
     """
 
-    def __init__(self):
-        """サーバーの初期化"""
+    def __init__(self, config: Optional[Config] = None):
+        """
+        サーバーの初期化
+
+        Args:
+            config: サーバー設定（省略時は環境変数から読み込み）
+        """
+        self.config = config if config is not None else _load_default_config()
         self.tools: Dict[str, Any] = {}
         self.capabilities: Dict[str, Any] = {}
+        # ツール名 → 入力スキーマ（登録時に一度だけ生成）
+        self._tool_schemas: Dict[str, Dict[str, Any]] = {}
         logger.info("MLOps MCP Server initializing...")
 
-        # Capabilityの登録
+        # 全ツールで共有するAWSクライアントの接続プール・リトライ設定
+        configure_aws_clients(self.config)
+
+        # ツール実行用エグゼキューター
+        # プロセスプールはワーカー起動コストが大きいため初回利用時に作成
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=self.config.thread_pool_workers,
+            thread_name_prefix="mlops-tool",
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_lock = threading.Lock()
+        # プロセスプールのワーカーにキャンセルを通知するためのEvent管理（初回利用時に起動）
+        self._sync_manager: Optional[SyncManager] = None
+
+        # 実行中の合流対象呼び出し: (ツール名, 正規化済み引数) → 実行タスク
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        # 実行タスクごとの待機中の呼び出し元の数（全員がキャンセルしたら実行もキャンセル）
+        self._in_flight_waiters: Dict[asyncio.Task, int] = {}
+        # 実行タスクごとの進捗の通知先（合流した呼び出し元全員に配信）
+        self._in_flight_listeners: Dict[asyncio.Task, List[ProgressCallback]] = {}
+        self.coalesced_calls = 0
+
+        # ツール・Capability単位の同時実行数制限
+        self.admission = AdmissionController(
+            tool_limits=self.config.tool_concurrency_limits,
+            capability_limits=self.config.capability_concurrency_limits,
+            queue_size=self.config.admission_queue_size,
+            default_retry_after=self.config.admission_retry_after_seconds,
+        )
+
+        # ツール呼び出しのレイテンシ・エラー数・S3転送量等のプロセス内集計
+        self.metrics = ToolMetrics()
+        # CloudWatchへの送信（バッファリングしてバックグラウンドで送信するため呼び出しを待たせない）
+        self.metrics_publisher: Optional[MetricsPublisher] = None
+        if self.config.metrics_publish_mode:
+            self.metrics_publisher = MetricsPublisher(
+                self.config,
+                mode=self.config.metrics_publish_mode,
+                flush_interval=self.config.metrics_publish_interval_seconds,
+            )
+
+        # ツール実行の処理段階ごとのトレース（メモリ上に保持し、指定時はファイルにも出力）
+        self.trace_collector = InMemorySpanExporter(max_spans=self.config.trace_buffer_spans)
+        span_exporters: List[Any] = [self.trace_collector]
+        if self.config.trace_file:
+            span_exporters.append(FileSpanExporter(self.config.trace_file))
+        self.tracer = Tracer(span_exporters, enabled=self.config.tracing_enabled)
+
+        # 読み取り系ツールの結果キャッシュ（S3オブジェクトのETagで検証）
+        self.result_cache = ResultCache(
+            max_bytes=self.config.result_cache_max_bytes,
+            disk_dir=self.config.result_cache_dir,
+            disk_max_bytes=self.config.result_cache_disk_max_bytes,
+        )
+
+        # Capabilityの登録（マニフェストのみ、本体は遅延ロード）
+        start = time.perf_counter()
         self._register_capabilities()
+        self._build_tool_list()
+        self.startup_time_ms = (time.perf_counter() - start) * 1000
 
     def _register_capabilities(self):
         """
         全capabilityを登録
 
-        Phase 1 Week 1-2では Data Preparation のみ登録
+        マニフェストからツール名・説明のみを登録し、Capability本体の
+        インポートはそのツールの初回呼び出しまで遅延させます。
         """
-        # Data Preparation Capability
-        try:
-            from .capabilities.data_preparation.capability import DataPreparationCapability
+        from .capabilities.manifest import CAPABILITY_MANIFEST
 
-            data_prep = DataPreparationCapability()
-            self.capabilities["data_preparation"] = data_prep
+        for spec in CAPABILITY_MANIFEST:
+            capability = LazyCapability(spec)
+            self.capabilities[spec.name] = capability
 
             # ツールをグローバルツールリストに登録
-            for tool_name, tool_func in data_prep.get_tools().items():
-                full_tool_name = f"data_preparation.{tool_name}"
-                self.tools[full_tool_name] = tool_func
-                logger.info(f"Registered tool: {full_tool_name}")
-
-        except ImportError as e:
-            logger.warning(f"Data Preparation Capability not available: {e}")
-
-        # ML Training Capability
-        try:
-            from .capabilities.ml_training.capability import MLTrainingCapability
-
-            ml_training = MLTrainingCapability()
-            self.capabilities["ml_training"] = ml_training
+            for tool_spec in spec.tools:
+                full_tool_name = f"{spec.name}.{tool_spec.name}"
+                self.tools[full_tool_name] = LazyTool(capability, tool_spec)
+                self._tool_schemas[full_tool_name] = self._build_input_schema(
+                    full_tool_name, tool_spec.entry_point
+                )
+                logger.debug(f"Registered tool: {full_tool_name}")
 
-            # ツールをグローバルツールリストに登録
-            for tool_name, tool_func in ml_training.get_tools().items():
-                full_tool_name = f"ml_training.{tool_name}"
-                self.tools[full_tool_name] = tool_func
-                logger.info(f"Registered tool: {full_tool_name}")
-
-        except ImportError as e:
-            logger.warning(f"ML Training Capability not available: {e}")
-
-        # ML Evaluation Capability
-        try:
-            from .capabilities.ml_evaluation.capability import MLEvaluationCapability
-
-            ml_evaluation = MLEvaluationCapability()
-            self.capabilities["ml_evaluation"] = ml_evaluation
-
-            # ツールをグローバルツールリストに登録
-            for tool_name, tool_func in ml_evaluation.get_tools().items():
-                full_tool_name = f"ml_evaluation.{tool_name}"
-                self.tools[full_tool_name] = tool_func
-                logger.info(f"Registered tool: {full_tool_name}")
-
-        except ImportError as e:
-            logger.warning(f"ML Evaluation Capability not available: {e}")
-
-        # Model Registry Capability
-        try:
-            from .capabilities.model_registry.capability import ModelRegistryCapability
-
-            model_registry = ModelRegistryCapability()
-            self.capabilities["model_registry"] = model_registry
-
-            # ツールをグローバルツールリストに登録
-            for tool_name, tool_func in model_registry.get_tools().items():
-                full_tool_name = f"model_registry.{tool_name}"
-                self.tools[full_tool_name] = tool_func
-                logger.info(f"Registered tool: {full_tool_name}")
+        logger.info(f"Total {len(self.tools)} tools registered")
 
-        except ImportError as e:
-            logger.warning(f"Model Registry Capability not available: {e}")
+    def preload_capabilities(self) -> Dict[str, float]:
+        """
+        全capabilityを即時ロード（コンテナのウォームアップ用）
 
-        # Model Packaging Capability
-        try:
-            from .capabilities.model_packaging.capability import ModelPackagingCapability
+        Returns:
+            Capability名 → インポート時間(ms) の辞書（ロードに失敗したものは含まない）
+        """
+        for name, capability in self.capabilities.items():
+            try:
+                capability.load()
+            except ImportError as e:
+                logger.warning(f"Capability {name} not available: {e}")
 
-            model_packaging = ModelPackagingCapability()
-            self.capabilities["model_packaging"] = model_packaging
+        return {
+            name: capability.import_time_ms
+            for name, capability in self.capabilities.items()
+            if capability.is_loaded
+        }
 
-            # ツールをグローバルツールリストに登録
-            for tool_name, tool_func in model_packaging.get_tools().items():
-                full_tool_name = f"model_packaging.{tool_name}"
-                self.tools[full_tool_name] = tool_func
-                logger.info(f"Registered tool: {full_tool_name}")
+    def get_startup_report(self) -> Dict[str, Any]:
+        """
+        起動時間とCapabilityごとのインポートコストを返す
 
-        except ImportError as e:
-            logger.warning(f"Model Packaging Capability not available: {e}")
+        Note:
+            pandas/sklearn等の共有依存は最初にロードされたCapabilityの
+            インポート時間に計上されます。
+        """
+        return {
+            "startup_time_ms": self.startup_time_ms,
+            "capabilities": {
+                name: {
+                    "loaded": capability.is_loaded,
+                    "import_time_ms": capability.import_time_ms,
+                }
+                for name, capability in self.capabilities.items()
+            },
+        }
 
-        # Model Deployment Capability
+    def _build_input_schema(self, tool_name: str, entry_point: str) -> Dict[str, Any]:
+        """ツール関数のシグネチャから入力スキーマを生成"""
         try:
-            from .capabilities.model_deployment.capability import ModelDeploymentCapability
-
-            model_deployment = ModelDeploymentCapability()
-            self.capabilities["model_deployment"] = model_deployment
-
-            # ツールをグローバルツールリストに登録
-            for tool_name, tool_func in model_deployment.get_tools().items():
-                full_tool_name = f"model_deployment.{tool_name}"
-                self.tools[full_tool_name] = tool_func
-                logger.info(f"Registered tool: {full_tool_name}")
-
-        except ImportError as e:
-            logger.warning(f"Model Deployment Capability not available: {e}")
-
-        logger.info(f"Total {len(self.tools)} tools registered")
+            return build_entry_point_schema(entry_point)
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.warning(f"Failed to build input schema for {tool_name}: {e}")
+            return _PERMISSIVE_INPUT_SCHEMA
+
+    def _build_tool_list(self):
+        """ツール定義リストとそのシリアライズ済みJSONを構築してキャッシュ"""
+        self._tool_list: List[Dict[str, Any]] = [
+            {
+                "name": tool_name,
+                "description": self._get_tool_description(tool_name),
+                "inputSchema": self._get_tool_input_schema(tool_name),
+            }
+            for tool_name in self.tools.keys()
+        ]
+        self._tool_list_json = json.dumps({"tools": self._tool_list}, ensure_ascii=False)
 
     def list_tools(self) -> List[Dict[str, Any]]:
         """
         利用可能なツールのリストを返す
 
+        ツール定義は登録時に構築済みのものを返します（呼び出し側で変更しないこと）。
+
         Returns:
             ツール定義のリスト（MCP仕様準拠）
         """
-        tool_list = []
-        for tool_name in self.tools.keys():
-            # ツールのメタデータを取得（簡易実装）
-            tool_list.append(
-                {
-                    "name": tool_name,
-                    "description": self._get_tool_description(tool_name),
-                    "inputSchema": self._get_tool_input_schema(tool_name),
-                }
-            )
-        return tool_list
+        return self._tool_list
 
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    def list_tools_json(self) -> str:
+        """
+        ツール定義リストをシリアライズ済みJSON（{"tools": [...]}）で返す
+
+        Returns:
+            MCP tools/list レスポンスのresult部分のJSON文字列
+        """
+        return self._tool_list_json
+
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
         """
         指定されたツールを実行
 
+        ツール本体はブロッキング処理（boto3/pandas/sklearn）のため、
+        イベントループ上では実行せず、ツールごとに設定された
+        スレッドプール（I/Oバウンド）またはプロセスプール（CPUバウンド）に委譲します。
+
+        期限を過ぎた場合、または呼び出し元のタスクがキャンセルされた場合は、
+        ツールにキャンセルを通知します。ツールは次のチェックポイント
+        （check_cancelled / cancellable_sleep）で処理を中断します。
+
         Args:
             tool_name: ツール名（例: "data_preparation.load_dataset"）
             arguments: ツールへの引数
+            timeout: 期限（秒）。省略時はConfig.tool_timeoutsの設定値（未設定なら期限なし）
+            progress: 進捗の通知先。ツールがreport_progressで報告した進捗
+                （{"stage", "current", "total", "message"}）がイベントループ上で渡される
 
         Returns:
             ツールの実行結果
@@ -171,16 +299,439 @@ class MLOpsServer:
         logger.info(f"Calling tool: {tool_name}")
         logger.debug(f"Arguments: {arguments}")
 
+        # レイテンシは待ち時間・キャッシュヒットを含む呼び出し全体で計測
+        self.metrics.call_started(tool_name)
+        start = time.perf_counter()
+        response = None
+        with self.tracer.start_span(
+            f"tools/call {tool_name}",
+            {"mcp.method.name": "tools/call", "gen_ai.tool.name": tool_name},
+            kind=SPAN_KIND_SERVER,
+        ) as root:
+            try:
+                response = await self._call_tool(tool_name, arguments, timeout, progress)
+                return response
+            finally:
+                outcome = _response_outcome(response)
+                duration = time.perf_counter() - start
+                self.metrics.call_finished(tool_name, duration, outcome)
+                if self.metrics_publisher is not None:
+                    self.metrics_publisher.record_tool_execution(
+                        tool_name, duration * 1000, outcome == OUTCOME_SUCCESS
+                    )
+                root.set_attribute("mlops.tool.outcome", outcome)
+                if outcome != OUTCOME_SUCCESS:
+                    root.set_status(STATUS_ERROR, (response or {}).get("error", outcome))
+
+    async def _call_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[float],
+        progress: Optional[ProgressCallback],
+    ) -> Dict[str, Any]:
+        """引数を検証し、合流・キャッシュ・期限の設定に従ってツールを実行"""
+        # 実行前に引数を検証（S3ダウンロード等の重い処理を始める前に拒否）
+        schema = self._tool_schemas.get(tool_name)
+        if schema is not None:
+            errors = validate_arguments(schema, arguments)
+            if errors:
+                error = f"Invalid arguments for {tool_name}: {'; '.join(errors)}"
+                logger.warning(error)
+                return {"success": False, "error": error}
+
+        if timeout is None:
+            timeout = self.config.get_tool_timeout(tool_name)
+
+        call_key = None
+        if self.config.is_coalesced(tool_name) or self.config.is_cached(tool_name):
+            call_key = self._call_key(tool_name, arguments)
+
+        if call_key is not None and self.config.is_coalesced(tool_name):
+            # 合流した実行は呼び出し元ごとの期限で待機し、全員が離れた時点でキャンセル
+            dispatch = self._call_coalesced(call_key, tool_name, arguments, progress)
+        else:
+            deadline = time.time() + timeout if timeout is not None else None
+            dispatch = self._execute_tool(tool_name, arguments, call_key, deadline, progress)
+
+        if timeout is None:
+            return await dispatch
+
         try:
-            tool_func = self.tools[tool_name]
-            result = tool_func(**arguments)
+            return await asyncio.wait_for(dispatch, timeout)
+        except asyncio.TimeoutError:
+            error = f"Tool {tool_name} exceeded its deadline of {timeout} seconds"
+            logger.warning(error)
+            return {"success": False, "error": error, "cancelled": True, "deadline_exceeded": True}
+
+    async def call_tools(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        ツール呼び出しのDAGを実行し、全ステップの結果を1つのレスポンスで返す
+
+        各ステップの引数では `{"$ref": "step_id.path"}` または文字列中の
+        `${step_id.path}` で先行ステップの結果を参照できます。
+        依存関係のないステップ（例: 複数アルゴリズムの学習）は並行して実行され、
+        各ステップはcall_toolと同様に検証・合流・キャッシュ・同時実行数制限の対象となります。
+
+        Args:
+            steps: ステップ定義のリスト
+                [{"id": "train", "tool": "ml_training.train_classification",
+                  "arguments": {...}, "depends_on": ["..."]}, ...]
+
+        Returns:
+            {"success": 全ステップが成功したか,
+             "steps": {ステップID: {"tool", "status", "result"/"error", "start_ms", "duration_ms"}},
+             "total_duration_ms": 全体の所要時間}
+
+        Raises:
+            ValueError: グラフが不正な場合（未知のツール・未定義の参照・循環など）
+        """
+        ordered = parse_graph(steps, set(self.tools))
+        logger.info(f"Calling tool graph with {len(ordered)} steps")
+
+        with self.tracer.start_span("tools/call_graph", {"mlops.graph.steps": len(ordered)}):
+            response = await run_graph(ordered, self.call_tool)
+        logger.info(
+            f"Tool graph finished in {response['total_duration_ms']:.1f} ms "
+            f"(success: {response['success']})"
+        )
+        return response
+
+    def _call_key(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """
+        合流・キャッシュ用のキー（ツール名, 正規化済み引数）を返す
+
+        省略された引数はスキーマのデフォルト値で補完し、キー順を揃えてシリアライズします。
+        JSONにできない引数の場合はNoneを返します。
+        """
+        properties = self._tool_schemas.get(tool_name, _PERMISSIVE_INPUT_SCHEMA)["properties"]
+        normalized = {
+            name: prop["default"] for name, prop in properties.items() if "default" in prop
+        }
+        normalized.update(arguments)
+        try:
+            return tool_name, json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+
+    async def _call_coalesced(
+        self,
+        key: Tuple[str, str],
+        tool_name: str,
+        arguments: Dict[str, Any],
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        同一キーの実行中の呼び出しがあればその結果を待ち、なければ実行する
+
+        結果の辞書は合流した呼び出し間で共有されます（呼び出し側で変更しないこと）。
+        進捗は合流した時点以降のものが各呼び出し元に通知されます。
+        """
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+
+        if task is not None and task.get_loop() is loop:
+            self.coalesced_calls += 1
+            logger.info(f"Coalescing call to {tool_name} with in-flight execution")
+        else:
+            listeners: List[ProgressCallback] = []
+            task = loop.create_task(
+                self._execute_tool(
+                    tool_name,
+                    arguments,
+                    key,
+                    progress=functools.partial(_notify_listeners, listeners),
+                )
+            )
+            self._in_flight[key] = task
+            self._in_flight_listeners[task] = listeners
+            task.add_done_callback(functools.partial(self._release_in_flight, key))
+
+        listeners = self._in_flight_listeners.get(task, [])
+        if progress is not None:
+            listeners.append(progress)
+
+        # 1つの呼び出し元がキャンセルされても、合流した他の呼び出し元のために実行は継続
+        self._in_flight_waiters[task] = self._in_flight_waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if progress is not None and progress in listeners:
+                listeners.remove(progress)
+            if task in self._in_flight_waiters:
+                self._in_flight_waiters[task] -= 1
+            if not task.done() and self._in_flight_waiters.get(task) == 0:
+                logger.info(f"All callers of {tool_name} went away; cancelling execution")
+                task.cancel()
+
+    def _release_in_flight(self, key: Tuple[str, str], task: asyncio.Task):
+        """完了した実行を合流対象から外す"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._in_flight_waiters.pop(task, None)
+        self._in_flight_listeners.pop(task, None)
+
+    async def _execute_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        call_key: Optional[Tuple[str, str]] = None,
+        deadline: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """ツールを実行し、結果をレスポンス形式で返す"""
+        try:
+            if call_key is not None and self.config.is_cached(tool_name):
+                result = await self._run_cached_tool(
+                    call_key, tool_name, arguments, deadline, progress
+                )
+            else:
+                result = await self._run_tool(
+                    tool_name, arguments, deadline=deadline, progress=progress
+                )
             logger.info(f"Tool {tool_name} executed successfully")
             return {"success": True, "result": result}
 
+        except ServerBusyError as e:
+            logger.warning(f"Tool {tool_name} rejected: {e}")
+            return {"success": False, "error": str(e), "busy": True, "retry_after": e.retry_after}
+
+        except ToolCancelledError as e:
+            # ツールがチェックポイントでキャンセル・期限切れを検知して中断した
+            logger.warning(f"Tool {tool_name} stopped: {e}")
+            response = {"success": False, "error": str(e), "cancelled": True}
+            if isinstance(e, DeadlineExceededError):
+                response["deadline_exceeded"] = True
+            return response
+
         except Exception as e:
             logger.error(f"Tool {tool_name} failed: {str(e)}", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    async def _run_cached_tool(
+        self,
+        call_key: Tuple[str, str],
+        tool_name: str,
+        arguments: Dict[str, Any],
+        deadline: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Any:
+        """
+        キャッシュされた結果を返す（なければツールを実行して結果をキャッシュ）
+
+        キャッシュされた結果は、ツールが読み込んだS3オブジェクトのETagを
+        HEADリクエストで確認してから返します。
+        """
+        cache_key = "\n".join(call_key)
+        loop = asyncio.get_running_loop()
+
+        with span("result_cache.lookup") as lookup:
+            hit, result = await loop.run_in_executor(
+                self._thread_pool, self.result_cache.lookup, cache_key, s3_objects_unchanged
+            )
+            lookup.set_attribute("mlops.cache.hit", hit)
+        if hit:
+            logger.info(f"Result cache hit: {tool_name}")
+            return result
+
+        result, objects = await self._run_tool(
+            tool_name, arguments, track_s3_reads=True, deadline=deadline, progress=progress
+        )
+        if objects is not None:
+            await loop.run_in_executor(
+                self._thread_pool, self.result_cache.put, cache_key, result, objects
+            )
+        return result
+
+    async def _run_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        track_s3_reads: bool = False,
+        deadline: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Any:
+        """
+        ツールをエグゼキューター上で実行し、結果を待つ
+
+        待機中にキャンセルされた場合はツールにキャンセルを通知し、ツールが
+        チェックポイントで停止するまで（最大cancellation_grace_seconds秒）実行枠を保持します。
+
+        Args:
+            track_s3_reads: Trueの場合、(結果, 読み込んだS3オブジェクト) を返す
+            deadline: 期限（エポック秒）。ツール側のチェックポイントで確認される
+            progress: 進捗の通知先（イベントループ上で呼び出される）
+        """
+        tool_func = self.tools[tool_name]
+        executor = self._get_executor(tool_name)
+        loop = asyncio.get_running_loop()
+
+        if track_s3_reads:
+            call = functools.partial(call_with_s3_tracking, tool_func, arguments)
+        else:
+            call = functools.partial(tool_func, **arguments)
+        # S3転送量はワーカー側で計測して結果と一緒に返す
+        call = functools.partial(call_with_s3_io_counting, call)
+
+        # 処理段階のスパンはワーカー側で記録し、完了時に（例外の場合も）サーバー側で出力
+        parent_span = current_span_context()
+        execute_attributes: Dict[str, Any] = {
+            "gen_ai.tool.name": tool_name,
+            "mlops.executor": "thread" if executor is self._thread_pool else "process",
+        }
+        if parent_span is not None:
+            call = functools.partial(
+                run_with_trace, parent_span, "tool.execute", execute_attributes, call
+            )
+
+        progress_queue = None
+        if progress is not None:
+            if executor is self._thread_pool:
+                reporter = ProgressReporter(functools.partial(loop.call_soon_threadsafe, progress))
+            else:
+                # プロセスプールのワーカーからはプロセス間で共有するキュー経由で受け取る
+                progress_queue = self._get_sync_manager().Queue()
+                reporter = ProgressReporter(progress_queue.put)
+            call = functools.partial(run_with_progress, reporter, call)
+
+        token = CancellationToken(deadline=deadline, event=self._create_cancel_event(executor))
+        call = functools.partial(run_with_token, token, call)
+
+        try:
+            # 同時実行数の上限に達している場合は待機（待ち行列が満杯ならServerBusyError）
+            queued_at = time.perf_counter()
+            async with self.admission.admit(tool_name):
+                queue_wait = time.perf_counter() - queued_at
+                self.metrics.record_queue_wait(tool_name, queue_wait)
+                # 実行開始前に設定するため、プロセスプールに渡す引数にも含まれる
+                execute_attributes["mlops.queue_wait_ms"] = queue_wait * 1000
+                future = loop.run_in_executor(executor, call)
+                if parent_span is not None:
+                    future.add_done_callback(self._export_worker_spans)
+                forwarder = None
+                if progress_queue is not None:
+                    forwarder = loop.create_task(
+                        self._forward_progress(progress_queue, future, progress)
+                    )
+                try:
+                    outcome = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    token.cancel()
+                    await self._wait_for_cancelled_tool(tool_name, future)
+                    raise
+                finally:
+                    if forwarder is not None and not future.done():
+                        forwarder.cancel()
+                if forwarder is not None:
+                    # 完了までに報告された進捗を結果より先に通知
+                    await forwarder
+                if parent_span is not None:
+                    # スパンは_export_worker_spansで出力済み
+                    outcome, _ = outcome
+                result, io_stats = outcome
+                self.metrics.record_s3_io(tool_name, *io_stats)
+                return result
+
+        except BrokenProcessPool:
+            # ワーカープロセスが異常終了した場合（OOM等）は次回呼び出し時に再作成
+            logger.error("Process pool is broken; it will be recreated on next call")
+            with self._process_pool_lock:
+                if self._process_pool is executor:
+                    self._process_pool = None
+            raise
+
+    def _export_worker_spans(self, future: asyncio.Future):
+        """ワーカーが記録したスパンを出力（キャンセル後に完了した場合も含む）"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        spans = getattr(error, "trace_spans", None) if error is not None else future.result()[1]
+        if spans:
+            self.tracer.export(spans)
+
+    async def _wait_for_cancelled_tool(self, tool_name: str, future: asyncio.Future):
+        """キャンセルを通知したツールが停止するのを猶予時間まで待つ"""
+        done, _ = await asyncio.wait({future}, timeout=self.config.cancellation_grace_seconds)
+        if done:
+            # 中断による例外（ToolCancelledError等）は呼び出し元に返さない
+            future.exception()
+            logger.info(f"Cancelled tool {tool_name} stopped")
+        else:
+            logger.warning(
+                f"Cancelled tool {tool_name} did not stop within "
+                f"{self.config.cancellation_grace_seconds} seconds; it keeps running "
+                "until its next checkpoint"
+            )
+
+    async def _forward_progress(
+        self, queue: Any, future: asyncio.Future, progress: ProgressCallback
+    ):
+        """プロセスプールのワーカーが報告した進捗を、ツールの完了まで通知先に転送"""
+        loop = asyncio.get_running_loop()
+        while True:
+            finished = future.done()
+            try:
+                updates = await loop.run_in_executor(self._thread_pool, _drain_queue, queue)
+            except Exception as e:
+                logger.debug(f"Stopped forwarding progress: {e}")
+                return
+            for update in updates:
+                progress(update)
+            if finished:
+                return
+            await asyncio.wait({future}, timeout=PROGRESS_POLL_INTERVAL)
+
+    def _create_cancel_event(self, executor: Executor) -> Any:
+        """キャンセル通知用のEvent（プロセスプールの場合はプロセス間で共有できるEvent）"""
+        if executor is self._thread_pool:
+            return threading.Event()
+        return self._get_sync_manager().Event()
+
+    def _get_sync_manager(self) -> SyncManager:
+        """プロセスプールのワーカーと共有するオブジェクトの管理プロセス（初回利用時に起動）"""
+        with self._process_pool_lock:
+            if self._sync_manager is None:
+                self._sync_manager = multiprocessing.get_context("spawn").Manager()
+            return self._sync_manager
+
+    def _get_executor(self, tool_name: str) -> Executor:
+        """ツールの実行に使用するエグゼキューターを返す"""
+        if self.config.get_tool_executor(tool_name) != EXECUTOR_PROCESS:
+            return self._thread_pool
+
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                # forkはスレッドプールやイベントループの状態を引き継ぐためspawnを使用
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.config.process_pool_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=configure_aws_clients,
+                    initargs=(self.config,),
+                )
+                logger.info(f"Started process pool ({self.config.process_pool_workers} workers)")
+            return self._process_pool
+
+    def shutdown(self, wait: bool = True):
+        """
+        エグゼキューターを停止
+
+        Args:
+            wait: 実行中のツールの完了を待つか
+        """
+        self._thread_pool.shutdown(wait=wait)
+        with self._process_pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=wait)
+                self._process_pool = None
+            if self._sync_manager is not None:
+                self._sync_manager.shutdown()
+                self._sync_manager = None
+        self.tracer.shutdown()
+        if self.metrics_publisher is not None:
+            # バッファに残ったメトリクスを送信
+            self.metrics_publisher.close()
+        logger.info("MLOps MCP Server executors shut down")
+
     def _get_tool_description(self, tool_name: str) -> str:
         """ツールの説明を取得（簡易実装）"""
         tool_func = self.tools.get(tool_name)
@@ -190,16 +741,11 @@ class MLOpsServer:
 
     def _get_tool_input_schema(self, tool_name: str) -> Dict[str, Any]:
         """
-        ツールの入力スキーマを取得（簡易実装）
+        ツールの入力スキーマを取得
 
-        実際の実装では、関数のシグネチャやデコレーターから
-        JSON Schemaを自動生成します。
+        スキーマは登録時にツール関数のシグネチャ・型ヒント・docstringから生成済みです。
         """
-        return {
-            "type": "object",
-            "properties": {},
-            "required": [],
-        }
+        return self._tool_schemas.get(tool_name, _PERMISSIVE_INPUT_SCHEMA)
 
     def get_server_info(self) -> Dict[str, Any]:
         """サーバー情報を返す"""
@@ -208,4 +754,93 @@ class MLOpsServer:
             "version": "0.1.0",
             "capabilities": list(self.capabilities.keys()),
             "total_tools": len(self.tools),
+            "executors": {
+                "thread_pool_workers": self.config.thread_pool_workers,
+                "process_pool_workers": self.config.process_pool_workers,
+            },
+            "coalescing": {
+                "tools": len(self.config.coalesced_tools),
+                "in_flight": len(self._in_flight),
+                "coalesced_calls": self.coalesced_calls,
+            },
+            "result_cache": self.result_cache.stats(),
+            "admission": self.admission.stats(),
+            "metrics": self.metrics.summary(),
+            "metrics_publisher": (
+                self.metrics_publisher.stats() if self.metrics_publisher is not None else None
+            ),
+            "aws_clients": aws_client_info(),
+            "s3_cache": s3_cache_info(),
+            "dataset_cache": dataset_cache_info(),
+            "tracing": {
+                "enabled": self.tracer.enabled,
+                "buffered_spans": len(self.trace_collector.get_finished_spans()),
+                "trace_file": self.config.trace_file,
+            },
         }
+
+    def get_recent_traces(
+        self, tool_name: Optional[str] = None, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        最近のツール呼び出しのトレースを処理段階ごとの内訳付きで返す
+
+        Args:
+            tool_name: ツール名で絞り込む（省略時は全ツール）
+            limit: 返すトレースの数（新しいものから）
+
+        Returns:
+            [{"trace_id", "name", "duration_ms", "status", "spans": 内訳}, ...]
+            内訳は trace_breakdown の形式（親子関係の順、開始からの経過時間・所要時間）
+        """
+        spans = self.trace_collector.get_finished_spans()
+        roots = [
+            s
+            for s in spans
+            if s.parent_span_id is None
+            and (tool_name is None or s.attributes.get("gen_ai.tool.name") == tool_name)
+        ]
+
+        traces = []
+        for root in reversed(roots[-limit:] if limit else []):
+            traces.append(
+                {
+                    "trace_id": root.trace_id,
+                    "name": root.name,
+                    "duration_ms": root.duration_ms,
+                    "status": root.status_code,
+                    "spans": trace_breakdown([s for s in spans if s.trace_id == root.trace_id]),
+                }
+            )
+        return traces
+
+
+def _response_outcome(response: Optional[Dict[str, Any]]) -> str:
+    """レスポンスからメトリクス用の結果の分類を求める（Noneは呼び出し元のキャンセル）"""
+    if response is None:
+        return OUTCOME_CANCELLED
+    if response.get("success"):
+        return OUTCOME_SUCCESS
+    if response.get("busy"):
+        return OUTCOME_BUSY
+    if response.get("deadline_exceeded"):
+        return OUTCOME_DEADLINE_EXCEEDED
+    if response.get("cancelled"):
+        return OUTCOME_CANCELLED
+    return OUTCOME_ERROR
+
+
+def _notify_listeners(listeners: List[ProgressCallback], update: ProgressUpdate):
+    """合流した呼び出し元全員に進捗を通知"""
+    for listener in list(listeners):
+        listener(update)
+
+
+def _drain_queue(queue: Any) -> List[ProgressUpdate]:
+    """キューに溜まっている進捗をすべて取り出す（待機しない）"""
+    updates = []
+    while True:
+        try:
+            updates.append(queue.get_nowait())
+        except Empty:
+            return updates
@@ -0,0 +1,441 @@
+"""
+MCP Transport
+
+JSON-RPC 2.0（MCP）のトランスポート実装。
+改行区切りJSONのストリーム（stdio / TCP / Unixソケット）上で、1接続あたり複数の
+リクエストを並行して処理し、完了した順に（リクエスト順とは無関係に）レスポンスを返します。
+処理中のリクエストは notifications/cancelled（params.requestId）でキャンセルできます。
+tools/call に params._meta.progressToken が指定された場合は、ツールの進捗を
+notifications/progress として応答より前に送信します。
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import sys
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from .server import MLOpsServer
+
+logger = logging.getLogger(__name__)
+
+# サポートするMCPプロトコルバージョン
+PROTOCOL_VERSION = "2024-11-05"
+
+# 1メッセージ（1行）の最大サイズ
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+# JSON-RPC エラーコード
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# サーバー定義エラー: 同時実行数の上限によりビジー（data.retryAfter秒後に再試行）
+SERVER_BUSY = -32000
+
+
+# 接続にクライアント宛ての通知（method, params）を送信する関数
+Notifier = Callable[[str, Dict[str, Any]], None]
+
+
+class RPCError(Exception):
+    """JSON-RPCエラーレスポンスとして返す例外"""
+
+    def __init__(self, code: int, message: str, data: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class PreSerialized(str):
+    """シリアライズ済みのJSON（レスポンスにそのまま埋め込む）"""
+
+
+def _encode_response(request_id: Any, result: Any) -> str:
+    """成功レスポンスをシリアライズ"""
+    if isinstance(result, PreSerialized):
+        return f'{{"jsonrpc": "2.0", "id": {json.dumps(request_id)}, "result": {result}}}'
+    return json.dumps(
+        {"jsonrpc": "2.0", "id": request_id, "result": result}, ensure_ascii=False, default=str
+    )
+
+
+def _encode_error(
+    request_id: Any, code: int, message: str, data: Optional[Dict[str, Any]] = None
+) -> str:
+    """エラーレスポンスをシリアライズ"""
+    error: Dict[str, Any] = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "error": error}, ensure_ascii=False)
+
+
+class MCPProtocolHandler:
+    """
+    MCPのJSON-RPCメソッドをMLOpsServerにディスパッチ
+
+    トランスポートに依存しないため、1つのハンドラーを複数の接続で共有できます。
+    """
+
+    def __init__(self, server: MLOpsServer):
+        self.server = server
+        self._methods: Dict[str, Callable[[Dict[str, Any], Optional[Notifier]], Awaitable[Any]]] = {
+            "initialize": self._initialize,
+            "notifications/initialized": self._noop,
+            # キャンセル通知はMCPConnectionが処理中のリクエストに対して処理する
+            "notifications/cancelled": self._noop,
+            "ping": self._ping,
+            "tools/list": self._tools_list,
+            "tools/call": self._tools_call,
+            # 拡張: 複数ツール呼び出しのDAGを1リクエストで実行
+            "tools/callGraph": self._tools_call_graph,
+        }
+
+    async def handle_line(self, line: bytes, notify: Optional[Notifier] = None) -> Optional[str]:
+        """
+        1行分のメッセージを処理
+
+        Args:
+            line: 受信したメッセージ
+            notify: 処理中にクライアントへ通知を送信する関数（省略時は通知しない）
+
+        Returns:
+            シリアライズ済みレスポンス（通知の場合はNone）
+        """
+        try:
+            message = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return _encode_error(None, PARSE_ERROR, f"Parse error: {e}")
+
+        return await self.handle_message(message, notify)
+
+    async def handle_message(
+        self, message: Any, notify: Optional[Notifier] = None
+    ) -> Optional[str]:
+        """
+        JSON-RPCメッセージを処理
+
+        Args:
+            message: デコード済みのメッセージ
+            notify: 処理中にクライアントへ通知を送信する関数（省略時は通知しない）
+
+        Returns:
+            シリアライズ済みレスポンス（通知の場合はNone）
+        """
+        if (
+            not isinstance(message, dict)
+            or message.get("jsonrpc") != "2.0"
+            or not isinstance(message.get("method"), str)
+        ):
+            request_id = message.get("id") if isinstance(message, dict) else None
+            return _encode_error(request_id, INVALID_REQUEST, "Invalid Request")
+
+        request_id = message.get("id")
+        is_notification = "id" not in message
+        method = message["method"]
+        params = message.get("params") or {}
+
+        handler = self._methods.get(method)
+        if handler is None:
+            if is_notification:
+                logger.debug(f"Ignoring unknown notification: {method}")
+                return None
+            return _encode_error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+
+        try:
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params must be an object")
+            result = await handler(params, notify)
+
+        except RPCError as e:
+            if is_notification:
+                return None
+            return _encode_error(request_id, e.code, e.message, e.data)
+
+        except Exception as e:
+            logger.error(f"Failed to handle {method}: {e}", exc_info=True)
+            if is_notification:
+                return None
+            return _encode_error(request_id, INTERNAL_ERROR, f"Internal error: {e}")
+
+        if is_notification:
+            return None
+        return _encode_response(request_id, result)
+
+    async def _initialize(
+        self, params: Dict[str, Any], notify: Optional[Notifier] = None
+    ) -> Dict[str, Any]:
+        info = self.server.get_server_info()
+        return {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {"tools": {"listChanged": False}},
+            "serverInfo": {"name": info["name"], "version": info["version"]},
+        }
+
+    async def _noop(
+        self, params: Dict[str, Any], notify: Optional[Notifier] = None
+    ) -> Dict[str, Any]:
+        return {}
+
+    async def _ping(
+        self, params: Dict[str, Any], notify: Optional[Notifier] = None
+    ) -> Dict[str, Any]:
+        return {}
+
+    async def _tools_list(
+        self, params: Dict[str, Any], notify: Optional[Notifier] = None
+    ) -> PreSerialized:
+        # 登録時に構築済みのJSONをそのまま返す
+        return PreSerialized(self.server.list_tools_json())
+
+    async def _tools_call(
+        self, params: Dict[str, Any], notify: Optional[Notifier] = None
+    ) -> Dict[str, Any]:
+        tool_name = params.get("name")
+        arguments = params.get("arguments") or {}
+        if not isinstance(tool_name, str):
+            raise RPCError(INVALID_PARAMS, "Missing tool name")
+        if not isinstance(arguments, dict):
+            raise RPCError(INVALID_PARAMS, "arguments must be an object")
+        timeout = params.get("timeout")
+        if timeout is not None and (
+            isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+        ):
+            raise RPCError(INVALID_PARAMS, "timeout must be a positive number")
+
+        progress = None
+        progress_token = (params.get("_meta") or {}).get("progressToken")
+        if progress_token is not None and notify is not None:
+            progress = _progress_notifier(notify, progress_token)
+
+        try:
+            response = await self.server.call_tool(
+                tool_name, arguments, timeout=timeout, progress=progress
+            )
+        except ValueError as e:
+            # ツールが存在しない
+            raise RPCError(INVALID_PARAMS, str(e))
+
+        if response.get("busy"):
+            # 待たずに再試行を促す（クライアントはretryAfter秒後に再送）
+            raise RPCError(SERVER_BUSY, response["error"], {"retryAfter": response["retry_after"]})
+        if response["success"]:
+            text = json.dumps(response["result"], ensure_ascii=False, default=str)
+            return {"content": [{"type": "text", "text": text}], "isError": False}
+        return {"content": [{"type": "text", "text": response["error"]}], "isError": True}
+
+    async def _tools_call_graph(
+        self, params: Dict[str, Any], notify: Optional[Notifier] = None
+    ) -> Dict[str, Any]:
+        try:
+            return await self.server.call_tools(params.get("steps"))
+        except ValueError as e:
+            # グラフが不正（未知のツール・未定義の参照・循環など）
+            raise RPCError(INVALID_PARAMS, str(e))
+
+
+def _progress_notifier(notify: Notifier, progress_token: Any) -> Callable[[Dict[str, Any]], None]:
+    """
+    ツールの進捗をnotifications/progressとして送信する関数を作成
+
+    MCPではprogressは単調増加である必要があるため、段階をまたいで増加する通知の通し番号を
+    progressとし、段階ごとの進捗（stage, current, total）はdataに含めます。
+    """
+    sequence = itertools.count(1)
+
+    def on_progress(update: Dict[str, Any]):
+        notify(
+            "notifications/progress",
+            {
+                "progressToken": progress_token,
+                "progress": next(sequence),
+                "message": update["message"],
+                "data": {key: update[key] for key in ("stage", "current", "total")},
+            },
+        )
+
+    return on_progress
+
+
+class MCPConnection:
+    """
+    1つのストリーム接続
+
+    受信した各リクエストを個別のタスクとして並行処理し、
+    レスポンスは完了した順に書き込みます（書き込みはロックで直列化）。
+    notifications/cancelled を受信すると該当リクエストのタスクをキャンセルし、
+    そのリクエストにはレスポンスを返しません。処理中のリクエストと同じIDのリクエストは
+    Invalid Request エラーで拒否します。
+    処理中の通知（進捗など）も同じロックで直列化して書き込みます。
+    """
+
+    def __init__(
+        self,
+        handler: MCPProtocolHandler,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        name: str,
+    ):
+        self.handler = handler
+        self.reader = reader
+        self.writer = writer
+        self.name = name
+        self._write_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        # リクエストID → 処理中のタスク（キャンセル通知用）
+        self._requests: Dict[Any, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """処理中のリクエスト数"""
+        return len(self._tasks)
+
+    async def serve(self):
+        """接続が閉じられるまでリクエストを読み込んで処理"""
+        logger.info(f"Connection opened: {self.name}")
+        try:
+            while True:
+                try:
+                    line = await self.reader.readline()
+                except ValueError as e:
+                    # メッセージサイズ超過
+                    logger.error(f"Failed to read message from {self.name}: {e}")
+                    await self.send(_encode_error(None, PARSE_ERROR, "Message too large"))
+                    break
+
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                task = asyncio.create_task(self._process(line))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        finally:
+            # 受信側が閉じられても処理中のリクエストには応答する
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._close()
+            logger.info(f"Connection closed: {self.name}")
+
+    async def _process(self, line: bytes):
+        try:
+            message = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            await self.send(_encode_error(None, PARSE_ERROR, f"Parse error: {e}"))
+            return
+
+        if not isinstance(message, dict):
+            response = await self.handler.handle_message(message)
+        elif message.get("method") == "notifications/cancelled":
+            self._cancel_request(message.get("params") or {})
+            return
+        elif "id" in message and _is_hashable(message["id"]):
+            request_id = message["id"]
+            if request_id in self._requests:
+                # IDは処理中のリクエスト間で一意でなければならない（キャンセル先を特定できない）
+                await self.send(
+                    _encode_error(
+                        request_id, INVALID_REQUEST, f"Request id {request_id!r} is already in use"
+                    )
+                )
+                return
+            self._requests[request_id] = asyncio.current_task()
+            try:
+                response = await self.handler.handle_message(message, self.notify)
+            except asyncio.CancelledError:
+                logger.info(f"Request {request_id} on {self.name} was cancelled")
+                return
+            finally:
+                self._requests.pop(request_id, None)
+        else:
+            response = await self.handler.handle_message(message)
+
+        if response is not None:
+            await self.send(response)
+
+    def notify(self, method: str, params: Dict[str, Any]):
+        """クライアント宛ての通知を送信（送信は別タスクで行い、呼び出し元は待たない）"""
+        payload = json.dumps(
+            {"jsonrpc": "2.0", "method": method, "params": params}, ensure_ascii=False, default=str
+        )
+        task = asyncio.get_running_loop().create_task(self.send(payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _cancel_request(self, params: Any):
+        """notifications/cancelled で指定されたリクエストをキャンセル"""
+        request_id = params.get("requestId") if isinstance(params, dict) else None
+        task = self._requests.get(request_id) if _is_hashable(request_id) else None
+        if task is None:
+            # 完了済み・未知のリクエスト（通知が応答と行き違った場合など）
+            logger.debug(f"Ignoring cancellation of unknown request: {request_id!r}")
+            return
+        logger.info(f"Cancelling request {request_id} on {self.name}: {params.get('reason')}")
+        task.cancel()
+
+    async def send(self, payload: str):
+        """1メッセージを送信"""
+        async with self._write_lock:
+            try:
+                self.writer.write(payload.encode("utf-8") + b"\n")
+                await self.writer.drain()
+            except (ConnectionError, RuntimeError) as e:
+                logger.warning(f"Failed to send message to {self.name}: {e}")
+
+    async def _close(self):
+        try:
+            self.writer.close()
+            await self.writer.wait_closed()
+        except (ConnectionError, RuntimeError):
+            pass
+
+
+def _is_hashable(value: Any) -> bool:
+    """リクエストIDとして辞書のキーに使えるか"""
+    return isinstance(value, (str, int, float))
+
+
+async def serve_stdio(handler: MCPProtocolHandler):
+    """標準入出力でMCPリクエストを処理（標準入力が閉じられるまで）"""
+    loop = asyncio.get_running_loop()
+
+    reader = asyncio.StreamReader(limit=MAX_MESSAGE_BYTES)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    write_transport, write_protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, sys.stdout
+    )
+    writer = asyncio.StreamWriter(write_transport, write_protocol, reader, loop)
+
+    await MCPConnection(handler, reader, writer, "stdio").serve()
+
+
+async def start_tcp_server(
+    handler: MCPProtocolHandler, host: str = "127.0.0.1", port: int = 8765
+) -> asyncio.AbstractServer:
+    """TCPリスナーを起動（接続ごとに並行処理）"""
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        await MCPConnection(handler, reader, writer, f"tcp:{peer}").serve()
+
+    server = await asyncio.start_server(on_connect, host, port, limit=MAX_MESSAGE_BYTES)
+    for sock in server.sockets:
+        logger.info(f"Listening on tcp://{sock.getsockname()}")
+    return server
+
+
+async def start_unix_server(handler: MCPProtocolHandler, path: str) -> asyncio.AbstractServer:
+    """Unixドメインソケットのリスナーを起動（接続ごとに並行処理）"""
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await MCPConnection(handler, reader, writer, f"unix:{path}").serve()
+
+    server = await asyncio.start_unix_server(on_connect, path, limit=MAX_MESSAGE_BYTES)
+    logger.info(f"Listening on unix://{path}")
+    return server
@@ -0,0 +1,26 @@
+"""
+Pytest共通設定
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp_server.common.s3_utils import clear_aws_clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_aws_clients():
+    """
+    テストごとに共有AWSクライアントを破棄
+
+    テストは boto3.client をモックに差し替えるため、前のテストで作成された
+    クライアント（モック）が使い回されないようにします。
+    """
+    clear_aws_clients()
+    yield
+    clear_aws_clients()
@@ -4,17 +4,37 @@ MCP Server Integration Tests
 MCPサーバーの統合テスト
 """
 
+import asyncio
 import io
+import json
 import os
+import subprocess
 import sys
+import threading
 from unittest.mock import Mock, patch
 
+import boto3
 import pandas as pd
 import pytest
+from botocore.response import StreamingBody
+from botocore.stub import ANY, Stubber
 
 # Add project root to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+from mcp_server.capabilities.manifest import CAPABILITY_MANIFEST
+from mcp_server.common.cancellation import cancellable_sleep
+from mcp_server.common.exceptions import ToolCancelledError
+from mcp_server.common.progress import report_progress
+from mcp_server.common.s3_utils import (
+    DEFAULT_DOWNLOAD_PART_BYTES,
+    install_s3_io_hooks,
+    install_s3_read_hooks,
+    read_body,
+)
+from mcp_server.common.tracing import span
+from mcp_server.config import Config
+from mcp_server.metrics_endpoint import start_metrics_server
 from mcp_server.server import MLOpsServer
 
 
@@ -54,6 +74,7 @@ class TestMLOpsServerInitialization:
             "data_preparation.load_dataset",
             "data_preparation.validate_data",
             "data_preparation.preprocess_supervised",
+            "data_preparation.profile_dataset",
         ]
 
         for tool_name in expected_data_prep_tools:
@@ -138,6 +159,185 @@ class TestMLOpsServerInitialization:
             assert "inputSchema" in tool
 
 
+class TestLazyCapabilityLoading:
+    """
+    Capability遅延ロードのテスト
+    """
+
+    def test_server_startup_does_not_import_heavy_dependencies(self):
+        """
+        サーバー起動時にsklearn/pandasがインポートされないことを確認
+        """
+        code = (
+            "import sys; from mcp_server.server import MLOpsServer; MLOpsServer(); "
+            "print(any(m in sys.modules for m in ('sklearn', 'pandas', 'joblib')))"
+        )
+        project_root = os.path.join(os.path.dirname(__file__), "..", "..")
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        assert output.strip().splitlines()[-1] == "False"
+
+    def test_capability_loaded_on_first_tool_call(self):
+        """
+        ツールの初回呼び出し時に所属Capabilityのみがロードされることを確認
+        """
+        server = MLOpsServer()
+
+        assert not any(cap.is_loaded for cap in server.capabilities.values())
+
+        result = asyncio.run(
+            server.call_tool(
+                "model_packaging.generate_deployment_config",
+                {"model_s3_uri": "s3://test-bucket/model.pkl", "deployment_type": "sagemaker"},
+            )
+        )
+        server.shutdown()
+
+        assert result["success"] is True
+        loaded = [name for name, cap in server.capabilities.items() if cap.is_loaded]
+        assert loaded == ["model_packaging"]
+
+        report = server.get_startup_report()
+        assert report["startup_time_ms"] >= 0
+        assert report["capabilities"]["model_packaging"]["import_time_ms"] is not None
+        assert report["capabilities"]["ml_training"]["loaded"] is False
+
+    def test_manifest_matches_capabilities(self):
+        """
+        マニフェストのツール定義がCapability実装と一致することを確認
+        """
+        server = MLOpsServer()
+        server.preload_capabilities()
+
+        for spec in CAPABILITY_MANIFEST:
+            implemented = set(server.capabilities[spec.name].get_tools().keys())
+            declared = {tool.name for tool in spec.tools}
+            assert declared == implemented, f"Manifest out of date for {spec.name}"
+
+            for tool_name, tool_func in server.capabilities[spec.name].get_tools().items():
+                assert callable(tool_func), f"{spec.name}.{tool_name} is not callable"
+
+
+class TestToolSchemas:
+    """
+    シグネチャから生成したツールスキーマのテスト
+    """
+
+    def test_list_tools_is_prebuilt(self):
+        """
+        list_toolsが構築済みのリストを返し、シリアライズ済みJSONと一致することを確認
+        """
+        server = MLOpsServer()
+
+        tools = server.list_tools()
+        assert server.list_tools() is tools
+        assert json.loads(server.list_tools_json()) == {"tools": tools}
+
+    def test_schema_generated_from_signature(self):
+        """
+        関数シグネチャ・型ヒント・docstringからスキーマが生成されることを確認
+        """
+        server = MLOpsServer()
+        schemas = {tool["name"]: tool["inputSchema"] for tool in server.list_tools()}
+
+        schema = schemas["data_preparation.preprocess_supervised"]
+        assert schema["required"] == ["s3_uri", "target_column"]
+        assert schema["additionalProperties"] is False
+        assert schema["properties"]["test_size"] == {
+            "type": "number",
+            "default": 0.2,
+            "description": "テストデータの割合 (0.0-1.0)",
+        }
+        assert schema["properties"]["normalize"]["type"] == "boolean"
+        assert schema["properties"]["output_s3_uri"]["type"] == ["string", "null"]
+
+        schema = schemas["ml_training.train_classification"]
+        assert schema["properties"]["hyperparameters"]["type"] == ["object", "null"]
+
+    def test_capability_schemas_match_server_schemas(self):
+        """
+        Capabilityのget_tool_schemasがサーバーのスキーマと一致することを確認
+        """
+        server = MLOpsServer()
+        schemas = {tool["name"]: tool["inputSchema"] for tool in server.list_tools()}
+
+        for capability_name in ("ml_training", "model_deployment"):
+            capability_schemas = server.capabilities[capability_name].get_tool_schemas()
+            for tool_name, tool_schema in capability_schemas.items():
+                full_name = f"{capability_name}.{tool_name}"
+                assert tool_schema["parameters"] == schemas[full_name]
+
+    def test_invalid_arguments_rejected_before_execution(self):
+        """
+        スキーマに合わない引数がツール実行前に拒否されることを確認
+        """
+        server = MLOpsServer()
+
+        with patch("boto3.client") as mock_client:
+            missing = asyncio.run(server.call_tool("data_preparation.load_dataset", {}))
+            wrong_type = asyncio.run(
+                server.call_tool(
+                    "data_preparation.preprocess_supervised",
+                    {
+                        "s3_uri": "s3://test-bucket/data.csv",
+                        "target_column": "y",
+                        "test_size": "0.2",
+                    },
+                )
+            )
+            unexpected = asyncio.run(
+                server.call_tool(
+                    "data_preparation.load_dataset",
+                    {"s3_uri": "s3://test-bucket/data.csv", "bucket": "test-bucket"},
+                )
+            )
+
+            mock_client.assert_not_called()
+
+        assert missing["success"] is False
+        assert "missing required argument 's3_uri'" in missing["error"]
+        assert wrong_type["success"] is False
+        assert "argument 'test_size' must be number" in wrong_type["error"]
+        assert unexpected["success"] is False
+        assert "unexpected argument 'bucket'" in unexpected["error"]
+
+    def test_enum_arguments_rejected_before_execution(self):
+        """
+        Literalの型ヒントがenumになり、列挙されていない値がツール実行前に拒否されることを確認
+        """
+        server = MLOpsServer()
+        schemas = {tool["name"]: tool["inputSchema"] for tool in server.list_tools()}
+
+        assert schemas["ml_training.train_classification"]["properties"]["algorithm"]["enum"] == [
+            "random_forest",
+            "logistic_regression",
+            "neural_network",
+        ]
+        status_filter = schemas["model_registry.list_models"]["properties"]["status_filter"]
+        assert status_filter["type"] == ["string", "null"]
+        assert None in status_filter["enum"]
+
+        with patch("boto3.client") as mock_client:
+            result = asyncio.run(
+                server.call_tool(
+                    "ml_training.train_classification",
+                    {"train_data_s3_uri": "s3://test-bucket/train.csv", "algorithm": "svm"},
+                )
+            )
+
+            mock_client.assert_not_called()
+
+        assert result["success"] is False
+        assert "argument 'algorithm' must be one of 'random_forest'" in result["error"]
+        assert "got 'svm'" in result["error"]
+
+
 class TestToolExecution:
     """
     ツール実行のテスト
@@ -180,9 +380,11 @@ class TestToolExecution:
         """
         load_datasetツールの実行テスト
         """
-        result = server.call_tool(
-            "data_preparation.load_dataset",
-            {"s3_uri": "s3://test-bucket/data.csv", "file_format": "csv"},
+        result = asyncio.run(
+            server.call_tool(
+                "data_preparation.load_dataset",
+                {"s3_uri": "s3://test-bucket/data.csv", "file_format": "csv"},
+            )
         )
 
         # 実行結果の確認
@@ -200,13 +402,15 @@ class TestToolExecution:
         """
         validate_dataツールの実行テスト
         """
-        result = server.call_tool(
-            "data_preparation.validate_data",
-            {
-                "s3_uri": "s3://test-bucket/data.csv",
-                "file_format": "csv",
-                "required_columns": ["feature1", "target"],
-            },
+        result = asyncio.run(
+            server.call_tool(
+                "data_preparation.validate_data",
+                {
+                    "s3_uri": "s3://test-bucket/data.csv",
+                    "file_format": "csv",
+                    "required_columns": ["feature1", "target"],
+                },
+            )
         )
 
         # 実行結果の確認
@@ -223,14 +427,16 @@ class TestToolExecution:
         """
         preprocess_supervisedツールの実行テスト
         """
-        result = server.call_tool(
-            "data_preparation.preprocess_supervised",
-            {
-                "s3_uri": "s3://test-bucket/data.csv",
-                "target_column": "target",
-                "file_format": "csv",
-                "test_size": 0.2,
-            },
+        result = asyncio.run(
+            server.call_tool(
+                "data_preparation.preprocess_supervised",
+                {
+                    "s3_uri": "s3://test-bucket/data.csv",
+                    "target_column": "target",
+                    "file_format": "csv",
+                    "test_size": 0.2,
+                },
+            )
         )
 
         # 実行結果の確認
@@ -251,15 +457,17 @@ class TestToolExecution:
         存在しないツールの呼び出しエラーテスト
         """
         with pytest.raises(ValueError, match="Tool not found"):
-            server.call_tool("nonexistent.tool", {})
+            asyncio.run(server.call_tool("nonexistent.tool", {}))
 
     def test_call_tool_with_invalid_arguments(self, server, mock_s3):
         """
         無効な引数でのツール呼び出しエラーテスト
         """
-        result = server.call_tool(
-            "data_preparation.load_dataset",
-            {"s3_uri": "invalid://not-s3-uri"},  # 無効なURI
+        result = asyncio.run(
+            server.call_tool(
+                "data_preparation.load_dataset",
+                {"s3_uri": "invalid://not-s3-uri"},  # 無効なURI
+            )
         )
 
         # エラーが適切に処理されることを確認
@@ -268,6 +476,999 @@ class TestToolExecution:
         assert "Invalid S3 URI" in result["error"]
 
 
+class TestAsyncToolExecution:
+    """
+    非同期ツール実行（エグゼキューターへの委譲）のテスト
+    """
+
+    def test_slow_tool_does_not_block_other_calls(self):
+        """
+        実行中の長時間ツールが他のツール呼び出しをブロックしないことを確認
+        """
+        server = MLOpsServer()
+        released = threading.Event()
+
+        # fastが完了するまでslowは終わらない（直列実行ならタイムアウトする）
+        server.tools["test.slow"] = lambda: released.wait(timeout=5)
+        server.tools["test.fast"] = lambda: released.set() or "done"
+
+        async def run():
+            slow = asyncio.create_task(server.call_tool("test.slow", {}))
+            fast = await server.call_tool("test.fast", {})
+            return fast, await slow
+
+        try:
+            fast_result, slow_result = asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        assert fast_result == {"success": True, "result": "done"}
+        assert slow_result == {"success": True, "result": True}
+
+    def test_process_pool_executor(self):
+        """
+        processに割り当てたツールが別プロセスで実行されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1",
+            s3_bucket="test-bucket",
+            process_pool_workers=1,
+            tool_executors={"test.getpid": "process"},
+        )
+        server = MLOpsServer(config=config)
+        server.tools["test.getpid"] = os.getpid
+
+        try:
+            result = asyncio.run(server.call_tool("test.getpid", {}))
+        finally:
+            server.shutdown()
+
+        assert result["success"] is True
+        assert result["result"] != os.getpid()
+
+    def test_default_executor_assignment(self):
+        """
+        学習ツールはプロセスプール、それ以外はスレッドプールに割り当てられることを確認
+        """
+        config = Config(aws_region="us-east-1", s3_bucket="test-bucket")
+
+        assert config.get_tool_executor("ml_training.train_classification") == "process"
+        assert config.get_tool_executor("model_deployment.monitor_endpoint") == "thread"
+
+    def test_invalid_executor_config(self):
+        """
+        不正なエグゼキューター種別の設定エラーテスト
+        """
+        with pytest.raises(ValueError, match="Invalid executor"):
+            Config(
+                aws_region="us-east-1",
+                s3_bucket="test-bucket",
+                tool_executors={"ml_training.train_classification": "gpu"},
+            )
+
+
+class TestCallCoalescing:
+    """
+    同一引数の同時呼び出しの合流（single-flight）のテスト
+    """
+
+    @staticmethod
+    def _counting_tool(calls, released):
+        """呼び出し回数を記録し、releasedがセットされるまで終わらないツール"""
+
+        def tool(**kwargs):
+            calls.append(kwargs)
+            call_number = len(calls)
+            released.wait(timeout=5)
+            return {"call": call_number}
+
+        return tool
+
+    def _run_concurrently(self, server, released, requests):
+        async def run():
+            tasks = [asyncio.create_task(server.call_tool(name, args)) for name, args in requests]
+            # 全呼び出しがディスパッチされてから実行を完了させる
+            await asyncio.sleep(0.1)
+            released.set()
+            return await asyncio.gather(*tasks)
+
+        try:
+            return asyncio.run(run())
+        finally:
+            server.shutdown()
+
+    def test_identical_calls_share_one_execution(self):
+        """
+        同一引数（デフォルト値の省略を含む）の同時呼び出しが1回の実行を共有することを確認
+        """
+        server = MLOpsServer()
+        calls, released = [], threading.Event()
+        server.tools["data_preparation.load_dataset"] = self._counting_tool(calls, released)
+
+        results = self._run_concurrently(
+            server,
+            released,
+            [
+                ("data_preparation.load_dataset", {"s3_uri": "s3://b/data.csv"}),
+                (
+                    "data_preparation.load_dataset",
+                    {"file_format": "csv", "s3_uri": "s3://b/data.csv"},
+                ),
+                ("data_preparation.load_dataset", {"s3_uri": "s3://b/other.csv"}),
+            ],
+        )
+
+        assert len(calls) == 2
+        assert results[0] == results[1]
+        assert results[0] != results[2]
+        assert server.coalesced_calls == 1
+        assert server._in_flight == {}
+
+    def test_tools_without_opt_in_are_not_coalesced(self):
+        """
+        合流対象に含まれないツール（副作用のあるツール）は毎回実行されることを確認
+        """
+        server = MLOpsServer()
+        calls, released = [], threading.Event()
+        server.tools["model_registry.delete_model"] = self._counting_tool(calls, released)
+
+        args = {"model_s3_uri": "s3://b/models/m"}
+        self._run_concurrently(
+            server,
+            released,
+            [("model_registry.delete_model", args), ("model_registry.delete_model", args)],
+        )
+
+        assert len(calls) == 2
+        assert server.coalesced_calls == 0
+
+    def test_completed_calls_are_not_reused(self):
+        """
+        完了済みの実行結果は再利用されない（実行中の呼び出しのみ合流する）ことを確認
+        """
+        server = MLOpsServer()
+        calls, released = [], threading.Event()
+        released.set()
+        server.tools["data_preparation.load_dataset"] = self._counting_tool(calls, released)
+
+        args = {"s3_uri": "s3://b/data.csv"}
+        try:
+            asyncio.run(server.call_tool("data_preparation.load_dataset", args))
+            asyncio.run(server.call_tool("data_preparation.load_dataset", args))
+        finally:
+            server.shutdown()
+
+        assert len(calls) == 2
+
+    def test_coalesced_tools_from_env(self, monkeypatch):
+        """
+        環境変数で合流対象のツールを設定できることを確認
+        """
+        monkeypatch.setenv("MLOPS_S3_BUCKET", "test-bucket")
+        monkeypatch.setenv("MLOPS_COALESCED_TOOLS", "data_preparation.load_dataset")
+
+        config = Config.from_env()
+
+        assert config.is_coalesced("data_preparation.load_dataset")
+        assert not config.is_coalesced("ml_evaluation.evaluate_classification")
+
+
+class TestResultCaching:
+    """
+    読み取り系ツールの結果キャッシュのテスト
+    """
+
+    CSV = b"a,b\n1,2\n3,4\n"
+    ARGS = {"s3_uri": "s3://test-bucket/data.csv"}
+    OBJECT = {"Bucket": "test-bucket", "Key": "data.csv"}
+
+    @pytest.fixture
+    def stubbed_s3(self):
+        """S3読み込み追跡フックが適用されたスタブ付きS3クライアント"""
+        install_s3_read_hooks()
+        client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+        with Stubber(client) as stubber, patch("boto3.client", return_value=client):
+            yield stubber
+            stubber.assert_no_pending_responses()
+
+    def _add_get(self, stubber, etag):
+        body = StreamingBody(io.BytesIO(self.CSV), len(self.CSV))
+        # 最初のパートの範囲指定GET（オブジェクトがパートサイズ以下のため1回で取得）
+        first_part = {**self.OBJECT, "Range": f"bytes=0-{DEFAULT_DOWNLOAD_PART_BYTES - 1}"}
+        stubber.add_response("get_object", {"ETag": etag, "Body": body}, first_part)
+
+    def test_cached_result_served_after_head_check(self, stubbed_s3):
+        """
+        2回目の呼び出しはHEADリクエストのみで結果が返されることを確認
+        """
+        server = MLOpsServer()
+        self._add_get(stubbed_s3, '"v1"')
+        stubbed_s3.add_response("head_object", {"ETag": '"v1"'}, self.OBJECT)
+
+        try:
+            first = asyncio.run(server.call_tool("data_preparation.load_dataset", self.ARGS))
+            second = asyncio.run(server.call_tool("data_preparation.load_dataset", self.ARGS))
+        finally:
+            server.shutdown()
+
+        assert first["success"] is True
+        assert second == first
+        assert server.result_cache.stats()["hits"] == 1
+
+    def test_changed_object_invalidates_cache(self, stubbed_s3):
+        """
+        S3オブジェクトのETagが変わった場合は再実行されることを確認
+        """
+        server = MLOpsServer()
+        self._add_get(stubbed_s3, '"v1"')
+        stubbed_s3.add_response("head_object", {"ETag": '"v2"'}, self.OBJECT)
+        self._add_get(stubbed_s3, '"v2"')
+
+        try:
+            asyncio.run(server.call_tool("data_preparation.load_dataset", self.ARGS))
+            result = asyncio.run(server.call_tool("data_preparation.load_dataset", self.ARGS))
+        finally:
+            server.shutdown()
+
+        stats = server.get_server_info()["result_cache"]
+        assert result["success"] is True
+        assert stats["hits"] == 0
+        assert stats["stale"] == 1
+        assert stats["entries"] == 1
+
+    def test_untracked_results_not_cached(self):
+        """
+        ETagを追跡できない結果（モックのS3応答等）はキャッシュされないことを確認
+        """
+        server = MLOpsServer()
+        mock_client = Mock()
+        mock_client.get_object.return_value = {"Body": io.BytesIO(self.CSV)}
+
+        try:
+            with patch("boto3.client", return_value=mock_client):
+                for _ in range(2):
+                    asyncio.run(server.call_tool("data_preparation.load_dataset", self.ARGS))
+        finally:
+            server.shutdown()
+
+        assert mock_client.get_object.call_count == 2
+        assert mock_client.head_object.call_count == 0
+        assert server.result_cache.stats()["entries"] == 0
+
+
+class TestAdmissionControl:
+    """
+    ツール・Capability単位の同時実行数制限のテスト
+    """
+
+    @staticmethod
+    def _tracking_tool(state, released):
+        """同時実行数の最大値を記録し、releasedがセットされるまで終わらないツール"""
+        lock = threading.Lock()
+
+        def tool():
+            with lock:
+                state["running"] += 1
+                state["max_running"] = max(state["max_running"], state["running"])
+            released.wait(timeout=5)
+            with lock:
+                state["running"] -= 1
+            return "done"
+
+        return tool
+
+    def _run_concurrently(self, server, released, tool_names):
+        async def run():
+            tasks = [asyncio.create_task(server.call_tool(name, {})) for name in tool_names]
+            await asyncio.sleep(0.1)
+            released.set()
+            return await asyncio.gather(*tasks)
+
+        try:
+            return asyncio.run(run())
+        finally:
+            server.shutdown()
+
+    def test_tool_limit_with_bounded_queue(self):
+        """
+        上限を超えた呼び出しは待機し、待ち行列が満杯ならビジーが返されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1",
+            s3_bucket="test-bucket",
+            tool_concurrency_limits={"test.heavy": 1},
+            admission_queue_size=1,
+            admission_retry_after_seconds=7,
+        )
+        server = MLOpsServer(config=config)
+        state, released = {"running": 0, "max_running": 0}, threading.Event()
+        server.tools["test.heavy"] = self._tracking_tool(state, released)
+
+        results = self._run_concurrently(server, released, ["test.heavy"] * 3)
+
+        assert [r["success"] for r in results] == [True, True, False]
+        assert results[2]["busy"] is True
+        assert results[2]["retry_after"] == 7
+        assert state["max_running"] == 1
+        assert server.admission.stats()["tools"]["test.heavy"]["rejected"] == 1
+
+    def test_capability_limit_shared_across_tools(self):
+        """
+        Capabilityの上限がCapability内の全ツールで共有されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1",
+            s3_bucket="test-bucket",
+            tool_concurrency_limits={},
+            capability_concurrency_limits={"test": 2},
+        )
+        server = MLOpsServer(config=config)
+        state, released = {"running": 0, "max_running": 0}, threading.Event()
+        server.tools["test.a"] = self._tracking_tool(state, released)
+        server.tools["test.b"] = self._tracking_tool(state, released)
+
+        results = self._run_concurrently(server, released, ["test.a", "test.b"] * 2)
+
+        assert all(r["success"] for r in results)
+        assert state["max_running"] == 2
+        assert server.admission.stats()["capabilities"]["test"]["active"] == 0
+
+    def test_retry_after_estimated_from_durations(self):
+        """
+        再試行までの目安が実行時間の実績から算出されることを確認
+        """
+        from mcp_server.admission import ConcurrencyLimiter
+
+        limiter = ConcurrencyLimiter("test", limit=2, queue_size=4, default_retry_after=5)
+        assert limiter.retry_after() == 5
+
+        limiter.record_duration(3.0)
+        limiter._waiters.extend([None] * 3)
+
+        # 待機中3件 + 新規1件を2並列で捌く → 2巡 × 3秒
+        assert limiter.retry_after() == 6
+
+    def test_invalid_concurrency_config(self):
+        """
+        不正な同時実行数の設定エラーテスト
+        """
+        with pytest.raises(ValueError, match="Invalid concurrency limit"):
+            Config(
+                aws_region="us-east-1",
+                s3_bucket="test-bucket",
+                capability_concurrency_limits={"ml_training": 0},
+            )
+
+    def test_concurrency_limits_from_env(self, monkeypatch):
+        """
+        環境変数で同時実行数の上限を設定できることを確認
+        """
+        monkeypatch.setenv("MLOPS_S3_BUCKET", "test-bucket")
+        monkeypatch.setenv("MLOPS_TOOL_CONCURRENCY", "ml_training.train_classification=1")
+        monkeypatch.setenv("MLOPS_CAPABILITY_CONCURRENCY", "ml_training=3")
+
+        config = Config.from_env()
+
+        assert config.tool_concurrency_limits["ml_training.train_classification"] == 1
+        assert config.capability_concurrency_limits["ml_training"] == 3
+
+
+class TestCancellation:
+    """
+    期限と協調的なキャンセルのテスト
+    """
+
+    @staticmethod
+    def _looping_tool(state):
+        """チェックポイント（cancellable_sleep）を挟んで最大5秒ループするツール"""
+
+        def tool():
+            try:
+                for _ in range(100):
+                    cancellable_sleep(0.05)
+                    state["iterations"] += 1
+            except ToolCancelledError as e:
+                state["stopped_by"] = type(e).__name__
+                raise
+            return "finished"
+
+        return tool
+
+    def test_deadline_stops_tool_at_checkpoint(self):
+        """
+        期限を過ぎると期限切れのレスポンスが返り、ツールもチェックポイントで停止することを確認
+        """
+        server = MLOpsServer()
+        state = {"iterations": 0}
+        server.tools["test.loop"] = self._looping_tool(state)
+
+        try:
+            response = asyncio.run(server.call_tool("test.loop", {}, timeout=0.3))
+        finally:
+            server.shutdown()
+
+        assert response["success"] is False
+        assert response["cancelled"] is True
+        assert response["deadline_exceeded"] is True
+        assert state["stopped_by"] == "DeadlineExceededError"
+        assert state["iterations"] < 100
+
+    def test_cancelled_caller_signals_tool(self):
+        """
+        呼び出し元のタスクがキャンセルされるとツールにキャンセルが通知されることを確認
+        """
+        server = MLOpsServer()
+        state = {"iterations": 0}
+        server.tools["test.loop"] = self._looping_tool(state)
+
+        async def run():
+            task = asyncio.create_task(server.call_tool("test.loop", {}))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        try:
+            asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        # 猶予時間内に停止したツールの結果を待ってからキャンセルが伝播する
+        assert state["stopped_by"] == "ToolCancelledError"
+        assert state["iterations"] < 100
+
+    def test_process_pool_tool_cancelled(self):
+        """
+        プロセスプールで実行中のツールにもキャンセルが通知され、ワーカーが解放されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1",
+            s3_bucket="test-bucket",
+            process_pool_workers=1,
+            tool_executors={"test.sleep": "process", "test.getpid": "process"},
+        )
+        server = MLOpsServer(config=config)
+        server.tools["test.sleep"] = cancellable_sleep
+        server.tools["test.getpid"] = os.getpid
+
+        async def run():
+            # ワーカーを起動しておく
+            await server.call_tool("test.getpid", {})
+            task = asyncio.create_task(server.call_tool("test.sleep", {"seconds": 60}))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # ワーカーが1つしかないため、停止していなければ60秒待たされる
+            return await asyncio.wait_for(server.call_tool("test.getpid", {}), 10)
+
+        try:
+            response = asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        assert response["success"] is True
+
+    def test_coalesced_execution_cancelled_when_all_callers_leave(self):
+        """
+        合流した呼び出し元が全員キャンセルされた場合のみ実行がキャンセルされることを確認
+        """
+        config = Config(
+            aws_region="us-east-1", s3_bucket="test-bucket", coalesced_tools=["test.loop"]
+        )
+        server = MLOpsServer(config=config)
+        state = {"iterations": 0}
+        server.tools["test.loop"] = self._looping_tool(state)
+
+        async def run():
+            first = asyncio.create_task(server.call_tool("test.loop", {}))
+            second = asyncio.create_task(server.call_tool("test.loop", {}))
+            await asyncio.sleep(0.1)
+            first.cancel()
+            await asyncio.sleep(0.1)
+            # 残りの呼び出し元がいるため実行は継続
+            assert "stopped_by" not in state
+
+            second.cancel()
+            await asyncio.gather(first, second, return_exceptions=True)
+            # 実行タスクのキャンセル処理（ツールの停止待ち）が終わるまで待つ
+            for _ in range(50):
+                if not server._in_flight:
+                    break
+                await asyncio.sleep(0.05)
+
+        try:
+            asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        assert state["stopped_by"] == "ToolCancelledError"
+        assert server.coalesced_calls == 1
+
+    def test_tool_timeouts_from_env(self, monkeypatch):
+        """
+        環境変数でツールごとの期限とデフォルトの期限を設定できることを確認
+        """
+        monkeypatch.setenv("MLOPS_S3_BUCKET", "test-bucket")
+        monkeypatch.setenv("MLOPS_TOOL_TIMEOUTS", "ml_training.train_classification=600")
+        monkeypatch.setenv("MLOPS_DEFAULT_TOOL_TIMEOUT", "60")
+
+        config = Config.from_env()
+
+        assert config.get_tool_timeout("ml_training.train_classification") == 600
+        assert config.get_tool_timeout("data_preparation.load_dataset") == 60
+        assert Config(aws_region="us-east-1", s3_bucket="b").get_tool_timeout("x.y") is None
+
+
+class TestProgressReporting:
+    """
+    ツールの進捗通知のテスト
+    """
+
+    @staticmethod
+    def _stepping_tool(released=None):
+        """進捗を報告するツール（releasedがセットされるまで報告を始めない）"""
+
+        def tool():
+            if released is not None:
+                released.wait(timeout=5)
+            report_progress("download", 1024, 2048, message="Downloaded 1,024 bytes")
+            for epoch in range(1, 4):
+                report_progress("train", epoch, 3)
+            return "done"
+
+        return tool
+
+    def test_progress_delivered_in_order(self):
+        """
+        ツールが報告した進捗が結果より先に順に通知され、同じ段階の進捗は間引かれることを確認
+        """
+        server = MLOpsServer()
+        server.tools["test.steps"] = self._stepping_tool()
+        updates = []
+
+        try:
+            response = asyncio.run(server.call_tool("test.steps", {}, progress=updates.append))
+        finally:
+            server.shutdown()
+
+        assert response["success"] is True
+        assert updates[0] == {
+            "stage": "download",
+            "current": 1024,
+            "total": 2048,
+            "message": "Downloaded 1,024 bytes",
+        }
+        # 段階の切り替わりと完了は必ず通知され、間の進捗は間引かれる
+        assert [(u["stage"], u["current"]) for u in updates[1:]] == [("train", 1), ("train", 3)]
+        assert updates[-1]["message"] == "train: 3/3"
+
+    def test_progress_from_process_pool(self):
+        """
+        プロセスプールで実行したツールの進捗も通知されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1",
+            s3_bucket="test-bucket",
+            process_pool_workers=1,
+            tool_executors={"test.report": "process"},
+        )
+        server = MLOpsServer(config=config)
+        server.tools["test.report"] = report_progress
+        updates = []
+
+        try:
+            response = asyncio.run(
+                server.call_tool(
+                    "test.report",
+                    {"stage": "train", "current": 5, "total": 10},
+                    progress=updates.append,
+                )
+            )
+        finally:
+            server.shutdown()
+
+        assert response["success"] is True
+        assert updates == [{"stage": "train", "current": 5, "total": 10, "message": "train: 5/10"}]
+
+    def test_progress_fanned_out_to_coalesced_callers(self):
+        """
+        合流した呼び出し元のそれぞれに進捗が通知されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1", s3_bucket="test-bucket", coalesced_tools=["test.steps"]
+        )
+        server = MLOpsServer(config=config)
+        released = threading.Event()
+        server.tools["test.steps"] = self._stepping_tool(released)
+        first, second = [], []
+
+        async def run():
+            tasks = [
+                asyncio.create_task(server.call_tool("test.steps", {}, progress=first.append)),
+                asyncio.create_task(server.call_tool("test.steps", {}, progress=second.append)),
+            ]
+            await asyncio.sleep(0.1)
+            released.set()
+            return await asyncio.gather(*tasks)
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        assert all(r["success"] for r in results)
+        assert server.coalesced_calls == 1
+        assert first == second
+        assert len(first) == 3
+
+
+class TestToolMetrics:
+    """
+    ツール呼び出しメトリクスの記録と /metrics エンドポイントのテスト
+    """
+
+    def test_calls_recorded_by_outcome(self):
+        """
+        呼び出しごとのレイテンシと結果（成功・エラー・ビジー）が記録されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1",
+            s3_bucket="test-bucket",
+            tool_concurrency_limits={"test.slow": 1},
+            admission_queue_size=0,
+        )
+        server = MLOpsServer(config=config)
+        released = threading.Event()
+        server.tools["test.slow"] = lambda: released.wait(timeout=5) and "done"
+        server.tools["test.fail"] = Mock(side_effect=RuntimeError("boom"))
+
+        async def run():
+            slow = asyncio.create_task(server.call_tool("test.slow", {}))
+            await asyncio.sleep(0.1)
+            in_flight = server.metrics.summary()["test.slow"]["in_flight"]
+            busy = await server.call_tool("test.slow", {})
+            await server.call_tool("test.fail", {})
+            released.set()
+            await slow
+            return in_flight, busy
+
+        try:
+            in_flight, busy = asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        summary = server.get_server_info()["metrics"]
+        assert in_flight == 1
+        assert busy["busy"] is True
+        assert summary["test.slow"]["outcomes"] == {"busy": 1, "success": 1}
+        assert summary["test.slow"]["in_flight"] == 0
+        assert (
+            summary["test.slow"]["latency_ms"]["p99"] >= summary["test.slow"]["latency_ms"]["p50"]
+        )
+        assert summary["test.fail"]["errors"] == 1
+
+    def test_s3_bytes_counted(self):
+        """
+        ツールがS3から読み込んだ・書き込んだバイト数が記録されることを確認
+        """
+        install_s3_io_hooks()
+        client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+        content = b"a,b\n1,2\n"
+
+        def copy_object():
+            s3 = boto3.client("s3")
+            body = read_body(s3.get_object(Bucket="b", Key="in.csv")["Body"])
+            s3.put_object(Bucket="b", Key="out.csv", Body=body * 3)
+            return "copied"
+
+        server = MLOpsServer()
+        server.tools["test.copy"] = copy_object
+        with Stubber(client) as stubber, patch("boto3.client", return_value=client):
+            body = StreamingBody(io.BytesIO(content), len(content))
+            stubber.add_response(
+                "get_object",
+                {"Body": body, "ContentLength": len(content)},
+                {"Bucket": "b", "Key": "in.csv"},
+            )
+            stubber.add_response("put_object", {}, {"Bucket": "b", "Key": "out.csv", "Body": ANY})
+            try:
+                response = asyncio.run(server.call_tool("test.copy", {}))
+            finally:
+                server.shutdown()
+
+        summary = server.metrics.summary()["test.copy"]
+        assert response["success"] is True
+        assert summary["s3_bytes_read"] == len(content)
+        assert summary["s3_bytes_written"] == len(content) * 3
+
+    def test_metrics_endpoint(self):
+        """
+        /metrics がPrometheusのテキスト形式を返し、それ以外のパスは404になることを確認
+        """
+        server = MLOpsServer()
+        server.tools["test.echo"] = lambda value: value
+
+        async def get(port, path):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response.decode("utf-8")
+
+        async def run():
+            await server.call_tool("test.echo", {"value": 1})
+            listener = await start_metrics_server(server.metrics, "127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            async with listener:
+                return await get(port, "/metrics"), await get(port, "/other")
+
+        try:
+            metrics, not_found = asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        headers, body = metrics.split("\r\n\r\n", 1)
+        assert headers.startswith("HTTP/1.1 200 OK")
+        assert "text/plain; version=0.0.4" in headers
+        assert 'mlops_tool_calls_total{tool="test.echo",outcome="success"} 1' in body
+        assert not_found.startswith("HTTP/1.1 404")
+
+    def test_cloudwatch_publishing_off_call_path(self):
+        """
+        CloudWatchへの送信はツール呼び出し中に行われず、停止時にまとめて送信されることを確認
+        """
+        config = Config(
+            aws_region="us-east-1", s3_bucket="test-bucket", metrics_publish_mode="cloudwatch"
+        )
+        with patch("boto3.client") as mock_client:
+            cloudwatch = Mock()
+            mock_client.return_value = cloudwatch
+            server = MLOpsServer(config=config)
+            server.tools["test.echo"] = lambda value: value
+
+            try:
+                for value in range(3):
+                    asyncio.run(server.call_tool("test.echo", {"value": value}))
+                calls_during_tool_calls = cloudwatch.put_metric_data.call_count
+            finally:
+                server.shutdown()
+
+        assert calls_during_tool_calls == 0
+        (metric,) = cloudwatch.put_metric_data.call_args.kwargs["MetricData"]
+        assert metric["StatisticValues"]["SampleCount"] == 3
+        assert {"Name": "ToolName", "Value": "test.echo"} in metric["Dimensions"]
+
+    def test_emf_publishing(self, capsys):
+        """
+        EMFモードではツールの実行時間が構造化ログ行として標準エラー出力に出力されることを確認
+        """
+        config = Config(aws_region="us-east-1", s3_bucket="test-bucket", metrics_publish_mode="emf")
+        server = MLOpsServer(config=config)
+        server.tools["test.echo"] = lambda value: value
+
+        try:
+            asyncio.run(server.call_tool("test.echo", {"value": 1}))
+        finally:
+            server.shutdown()
+
+        captured = capsys.readouterr()
+        records = [
+            json.loads(line) for line in captured.err.splitlines() if line.startswith('{"_aws"')
+        ]
+        assert captured.out == ""
+        assert len(records) == 1
+        assert records[0]["ToolName"] == "test.echo"
+        assert records[0]["Success"] == "True"
+        assert records[0]["ToolExecutionDuration"] > 0
+
+    def test_metrics_port_from_env(self, monkeypatch):
+        """
+        環境変数で /metrics エンドポイントのポートを設定できることを確認
+        """
+        monkeypatch.setenv("MLOPS_S3_BUCKET", "test-bucket")
+        monkeypatch.setenv("MLOPS_METRICS_PORT", "9464")
+
+        config = Config.from_env()
+
+        assert config.metrics_port == 9464
+        assert config.metrics_host == "127.0.0.1"
+
+    def test_metrics_publish_mode_from_env(self, monkeypatch):
+        """
+        環境変数でCloudWatchへの送信方法を設定でき、未知の方法はエラーになることを確認
+        """
+        monkeypatch.setenv("MLOPS_S3_BUCKET", "test-bucket")
+        monkeypatch.setenv("MLOPS_METRICS_PUBLISH_MODE", "emf")
+        monkeypatch.setenv("MLOPS_METRICS_PUBLISH_INTERVAL", "15")
+
+        config = Config.from_env()
+
+        assert config.metrics_publish_mode == "emf"
+        assert config.metrics_publish_interval_seconds == 15.0
+        with pytest.raises(ValueError, match="Invalid metrics publish mode"):
+            Config(aws_region="us-east-1", s3_bucket="b", metrics_publish_mode="statsd")
+
+
+class TestToolTracing:
+    """
+    ツール呼び出しのトレースのテスト
+    """
+
+    @staticmethod
+    def _phased_tool(fail: bool = False):
+        def tool():
+            with span("load", {"mlops.rows": 3}):
+                pass
+            with span("predict"):
+                if fail:
+                    raise RuntimeError("predict failed")
+            return "done"
+
+        return tool
+
+    def test_phases_recorded_under_tool_call(self):
+        """
+        ツール内の処理段階がツール呼び出しのスパンの子として記録されることを確認
+        """
+        server = MLOpsServer()
+        server.tools["test.phases"] = self._phased_tool()
+
+        try:
+            response = asyncio.run(server.call_tool("test.phases", {}))
+        finally:
+            server.shutdown()
+
+        assert response["success"] is True
+        (trace,) = server.get_recent_traces("test.phases")
+        assert trace["name"] == "tools/call test.phases"
+        rows = trace["spans"]
+        assert [(row["name"], row["depth"]) for row in rows] == [
+            ("tools/call test.phases", 0),
+            ("tool.execute", 1),
+            ("load", 2),
+            ("predict", 2),
+        ]
+        assert rows[0]["attributes"]["mlops.tool.outcome"] == "success"
+        assert rows[1]["attributes"]["mlops.executor"] == "thread"
+        assert rows[1]["attributes"]["mlops.queue_wait_ms"] >= 0
+        assert rows[2]["attributes"]["mlops.rows"] == 3
+        assert server.get_server_info()["tracing"]["buffered_spans"] == 4
+
+    def test_failed_tool_spans_exported(self):
+        """
+        失敗したツール呼び出しでも、失敗までの処理段階が記録されることを確認
+        """
+        server = MLOpsServer()
+        server.tools["test.phases"] = self._phased_tool(fail=True)
+
+        try:
+            response = asyncio.run(server.call_tool("test.phases", {}))
+        finally:
+            server.shutdown()
+
+        assert response["success"] is False
+        (trace,) = server.get_recent_traces()
+        statuses = {row["name"]: row["status"] for row in trace["spans"]}
+        assert trace["status"] == "STATUS_CODE_ERROR"
+        assert statuses == {
+            "tools/call test.phases": "STATUS_CODE_ERROR",
+            "tool.execute": "STATUS_CODE_ERROR",
+            "load": "STATUS_CODE_UNSET",
+            "predict": "STATUS_CODE_ERROR",
+        }
+
+    def test_spans_from_process_pool(self):
+        """
+        プロセスプールのワーカーで記録した処理段階もトレースに含まれることを確認
+        """
+        config = Config(
+            aws_region="us-east-1",
+            s3_bucket="test-bucket",
+            process_pool_workers=1,
+            tool_executors={"test.read": "process"},
+        )
+        server = MLOpsServer(config=config)
+        server.tools["test.read"] = read_body
+
+        try:
+            response = asyncio.run(server.call_tool("test.read", {"body": io.BytesIO(b"abc")}))
+        finally:
+            server.shutdown()
+
+        assert response["result"] == b"abc"
+        (trace,) = server.get_recent_traces("test.read")
+        rows = trace["spans"]
+        assert [(row["name"], row["depth"]) for row in rows] == [
+            ("tools/call test.read", 0),
+            ("tool.execute", 1),
+            ("s3.read_body", 2),
+        ]
+        assert rows[1]["attributes"]["mlops.executor"] == "process"
+        assert rows[2]["attributes"]["mlops.bytes"] == 3
+
+    def test_graph_steps_in_one_trace(self):
+        """
+        call_toolsの各ステップが1つのトレースにまとまることを確認
+        """
+        server = MLOpsServer()
+        server.tools["test.phases"] = self._phased_tool()
+
+        try:
+            response = asyncio.run(
+                server.call_tools(
+                    [
+                        {"id": "first", "tool": "test.phases"},
+                        {"id": "second", "tool": "test.phases", "depends_on": ["first"]},
+                    ]
+                )
+            )
+        finally:
+            server.shutdown()
+
+        assert response["success"] is True
+        (trace,) = server.get_recent_traces()
+        names = [(row["name"], row["depth"]) for row in trace["spans"]]
+        assert trace["name"] == "tools/call_graph"
+        assert names.count(("tools/call test.phases", 1)) == 2
+        assert names.count(("predict", 3)) == 2
+
+    def test_trace_file(self, tmp_path, monkeypatch):
+        """
+        環境変数で指定したファイルにOTLP/JSON形式でスパンが出力されることを確認
+        """
+        path = tmp_path / "traces.jsonl"
+        monkeypatch.setenv("MLOPS_S3_BUCKET", "test-bucket")
+        monkeypatch.setenv("MLOPS_TRACE_FILE", str(path))
+        server = MLOpsServer(config=Config.from_env())
+        server.tools["test.phases"] = self._phased_tool()
+
+        try:
+            asyncio.run(server.call_tool("test.phases", {}))
+        finally:
+            server.shutdown()
+
+        spans = [
+            otlp_span
+            for line in path.read_text(encoding="utf-8").splitlines()
+            for otlp_span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        ]
+        assert sorted(s["name"] for s in spans) == [
+            "load",
+            "predict",
+            "tool.execute",
+            "tools/call test.phases",
+        ]
+        assert len({s["traceId"] for s in spans}) == 1
+
+    def test_tracing_disabled(self):
+        """
+        トレースを無効にした場合はスパンを記録しないことを確認
+        """
+        config = Config(aws_region="us-east-1", s3_bucket="test-bucket", tracing_enabled=False)
+        server = MLOpsServer(config=config)
+        server.tools["test.phases"] = self._phased_tool()
+
+        try:
+            response = asyncio.run(server.call_tool("test.phases", {}))
+        finally:
+            server.shutdown()
+
+        assert response["success"] is True
+        assert server.get_recent_traces() == []
+
+
 class TestEndToEndWorkflow:
     """
     エンドツーエンドワークフローのテスト
@@ -326,9 +1527,11 @@ class TestEndToEndWorkflow:
         s3_uri = "s3://test-bucket/workflow-data.csv"
 
         # Step 1: データ読み込み
-        load_result = server.call_tool(
-            "data_preparation.load_dataset",
-            {"s3_uri": s3_uri, "file_format": "csv"},
+        load_result = asyncio.run(
+            server.call_tool(
+                "data_preparation.load_dataset",
+                {"s3_uri": s3_uri, "file_format": "csv"},
+            )
         )
 
         assert load_result["success"] is True
@@ -337,13 +1540,15 @@ class TestEndToEndWorkflow:
         assert dataset_info["columns"] == 3
 
         # Step 2: データバリデーション
-        validate_result = server.call_tool(
-            "data_preparation.validate_data",
-            {
-                "s3_uri": s3_uri,
-                "file_format": "csv",
-                "required_columns": ["numeric_feature", "categorical_feature", "target"],
-            },
+        validate_result = asyncio.run(
+            server.call_tool(
+                "data_preparation.validate_data",
+                {
+                    "s3_uri": s3_uri,
+                    "file_format": "csv",
+                    "required_columns": ["numeric_feature", "categorical_feature", "target"],
+                },
+            )
         )
 
         assert validate_result["success"] is True
@@ -352,16 +1557,18 @@ class TestEndToEndWorkflow:
         assert len(validation_info["errors"]) == 0
 
         # Step 3: データ前処理
-        preprocess_result = server.call_tool(
-            "data_preparation.preprocess_supervised",
-            {
-                "s3_uri": s3_uri,
-                "target_column": "target",
-                "file_format": "csv",
-                "test_size": 0.2,
-                "normalize": True,
-                "encode_categorical": True,
-            },
+        preprocess_result = asyncio.run(
+            server.call_tool(
+                "data_preparation.preprocess_supervised",
+                {
+                    "s3_uri": s3_uri,
+                    "target_column": "target",
+                    "file_format": "csv",
+                    "test_size": 0.2,
+                    "normalize": True,
+                    "encode_categorical": True,
+                },
+            )
         )
 
         assert preprocess_result["success"] is True
@@ -390,9 +1597,11 @@ class TestEndToEndWorkflow:
             mock_client.return_value = mock_s3_instance
 
             # バリデーション実行
-            validate_result = server.call_tool(
-                "data_preparation.validate_data",
-                {"s3_uri": "s3://test-bucket/empty.csv", "file_format": "csv"},
+            validate_result = asyncio.run(
+                server.call_tool(
+                    "data_preparation.validate_data",
+                    {"s3_uri": "s3://test-bucket/empty.csv", "file_format": "csv"},
+                )
             )
 
             # バリデーション失敗を確認
@@ -445,8 +1654,8 @@ class TestServerCapabilities:
         # Data Preparation, ML Training, ML Evaluation, Model Registry, Model Packaging, Model Deployment が登録されている
         assert len(server.capabilities) == 6
 
-        # toolsには28つのツールが登録されている (Data Prep: 3 + ML Training: 3 + ML Evaluation: 3 + Model Registry: 5 + Model Packaging: 5 + Model Deployment: 9)
-        assert len(server.tools) == 28
+        # toolsには29つのツールが登録されている (Data Prep: 4 + ML Training: 3 + ML Evaluation: 3 + Model Registry: 5 + Model Packaging: 5 + Model Deployment: 9)
+        assert len(server.tools) == 29
 
         # 将来的に他のCapabilityが追加されることを想定
         # （このテストは構造の確認のみ）
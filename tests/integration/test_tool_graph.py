@@ -0,0 +1,269 @@
+"""
+Tool Call Graph Integration Tests
+
+ツール呼び出しDAG（call_tools）の統合テスト
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.graph import parse_graph, resolve_references
+from mcp_server.server import MLOpsServer
+from mcp_server.transport import INVALID_PARAMS, MCPProtocolHandler
+
+
+@pytest.fixture
+def server():
+    """パイプラインを模したテスト用ツールを登録したサーバー"""
+    server = MLOpsServer()
+    # 3つの学習ステップが同時に実行されないと揃わない
+    barrier = threading.Barrier(3, timeout=5)
+
+    def preprocess(s3_uri):
+        return {"output_s3_uri": s3_uri.replace(".csv", "-processed")}
+
+    def train(train_data_s3_uri, algorithm):
+        barrier.wait()
+        return {"model_s3_uri": f"{train_data_s3_uri}/{algorithm}.pkl"}
+
+    def evaluate(model_s3_uri, test_data_s3_uri):
+        return {"model": model_s3_uri, "test": test_data_s3_uri, "accuracy": 0.9}
+
+    def fail(**kwargs):
+        raise RuntimeError("training failed")
+
+    server.tools["test.preprocess"] = preprocess
+    server.tools["test.train"] = train
+    server.tools["test.evaluate"] = evaluate
+    server.tools["test.fail"] = fail
+    yield server
+    server.shutdown()
+
+
+def _pipeline(algorithms):
+    steps = [{"id": "prep", "tool": "test.preprocess", "arguments": {"s3_uri": "s3://b/d.csv"}}]
+    for algorithm in algorithms:
+        steps.append(
+            {
+                "id": f"train_{algorithm}",
+                "tool": "test.train",
+                "arguments": {
+                    "train_data_s3_uri": {"$ref": "prep.output_s3_uri"},
+                    "algorithm": algorithm,
+                },
+            }
+        )
+        steps.append(
+            {
+                "id": f"eval_{algorithm}",
+                "tool": "test.evaluate",
+                "arguments": {
+                    "model_s3_uri": {"$ref": f"train_{algorithm}.model_s3_uri"},
+                    "test_data_s3_uri": "${prep.output_s3_uri}/test.csv",
+                },
+            }
+        )
+    return steps
+
+
+class TestToolGraphExecution:
+    """
+    DAGの実行のテスト
+    """
+
+    def test_parallel_branches_with_references(self, server):
+        """
+        独立した学習ステップが並行実行され、参照が先行ステップの結果で解決されることを確認
+        """
+        response = asyncio.run(server.call_tools(_pipeline(["rf", "lr", "nn"])))
+
+        assert response["success"] is True
+        assert len(response["steps"]) == 7
+        assert response["steps"]["eval_lr"]["result"] == {
+            "model": "s3://b/d-processed/lr.pkl",
+            "test": "s3://b/d-processed/test.csv",
+            "accuracy": 0.9,
+        }
+        for outcome in response["steps"].values():
+            assert outcome["status"] == "succeeded"
+            assert outcome["duration_ms"] >= 0
+            assert outcome["start_ms"] <= response["total_duration_ms"]
+
+        # 評価は対応する学習の完了後に開始される
+        steps = response["steps"]
+        train_end = steps["train_rf"]["start_ms"] + steps["train_rf"]["duration_ms"]
+        assert steps["eval_rf"]["start_ms"] >= train_end
+
+    def test_failed_step_skips_dependents(self, server):
+        """
+        失敗したステップに依存するステップのみがスキップされることを確認
+        """
+        steps = [
+            {"id": "prep", "tool": "test.preprocess", "arguments": {"s3_uri": "s3://b/d.csv"}},
+            {"id": "train", "tool": "test.fail", "depends_on": ["prep"]},
+            {
+                "id": "eval",
+                "tool": "test.evaluate",
+                "arguments": {"model_s3_uri": {"$ref": "train.model_s3_uri"}},
+            },
+            {
+                "id": "other",
+                "tool": "test.evaluate",
+                "arguments": {"model_s3_uri": "s3://b/m.pkl", "test_data_s3_uri": "s3://b/t"},
+            },
+        ]
+
+        response = asyncio.run(server.call_tools(steps))
+
+        assert response["success"] is False
+        assert response["steps"]["prep"]["status"] == "succeeded"
+        assert response["steps"]["train"]["status"] == "failed"
+        assert response["steps"]["train"]["error"] == "training failed"
+        assert response["steps"]["eval"]["status"] == "skipped"
+        assert response["steps"]["other"]["status"] == "succeeded"
+
+    def test_missing_reference_value_fails_step(self, server):
+        """
+        参照先の値が結果に存在しない場合はステップが失敗することを確認
+        """
+        steps = [
+            {"id": "prep", "tool": "test.preprocess", "arguments": {"s3_uri": "s3://b/d.csv"}},
+            {
+                "id": "train",
+                "tool": "test.train",
+                "arguments": {"train_data_s3_uri": {"$ref": "prep.no_such_key"}},
+            },
+        ]
+
+        response = asyncio.run(server.call_tools(steps))
+
+        assert response["steps"]["train"]["status"] == "failed"
+        assert "prep.no_such_key" in response["steps"]["train"]["error"]
+
+    def test_graph_over_transport(self, server):
+        """
+        tools/callGraphで1リクエストとしてDAGを実行できることを確認
+        """
+        handler = MCPProtocolHandler(server)
+        request = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/callGraph",
+            "params": {"steps": _pipeline(["rf", "lr", "nn"])},
+        }
+
+        response = json.loads(asyncio.run(handler.handle_message(request)))
+
+        assert response["result"]["success"] is True
+        assert set(response["result"]["steps"]) == {
+            "prep",
+            "train_rf",
+            "train_lr",
+            "train_nn",
+            "eval_rf",
+            "eval_lr",
+            "eval_nn",
+        }
+
+
+class TestToolGraphValidation:
+    """
+    グラフ定義の検証のテスト
+    """
+
+    TOOLS = {"test.a", "test.b"}
+
+    def test_topological_order(self):
+        """
+        定義順に関係なく依存関係の順に並べられることを確認
+        """
+        steps = [
+            {"id": "second", "tool": "test.b", "arguments": {"x": {"$ref": "first.value"}}},
+            {"id": "first", "tool": "test.a"},
+        ]
+
+        ordered = parse_graph(steps, self.TOOLS)
+
+        assert [step.id for step in ordered] == ["first", "second"]
+        assert ordered[1].depends_on == ["first"]
+
+    @pytest.mark.parametrize(
+        "steps, message",
+        [
+            ([], "non-empty"),
+            ([{"id": "a", "tool": "test.unknown"}], "Tool not found"),
+            ([{"id": "a", "tool": "test.a"}, {"id": "a", "tool": "test.b"}], "Duplicate"),
+            ([{"id": "a", "tool": "test.a", "depends_on": ["missing"]}], "undefined step"),
+            ([{"id": "a", "tool": "test.a", "depends_on": "load"}], "list of step ids"),
+            ([{"id": "a", "tool": "test.a", "depends_on": ["load", ""]}], "list of step ids"),
+            ([{"id": "a", "tool": "test.a", "depends_on": [1]}], "list of step ids"),
+            (
+                [
+                    {"id": "a", "tool": "test.a", "arguments": {"x": {"$ref": "b.value"}}},
+                    {"id": "b", "tool": "test.b", "arguments": {"x": "${a.value}"}},
+                ],
+                "cycle",
+            ),
+        ],
+    )
+    def test_invalid_graph(self, steps, message):
+        """
+        不正なグラフ定義の検証エラーテスト
+        """
+        with pytest.raises(ValueError, match=message):
+            parse_graph(steps, self.TOOLS)
+
+    def test_invalid_graph_over_transport(self, server):
+        """
+        不正なグラフはINVALID_PARAMSエラーとして返ることを確認
+        """
+        handler = MCPProtocolHandler(server)
+        request = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/callGraph",
+            "params": {"steps": [{"id": "a", "tool": "no.such_tool"}]},
+        }
+
+        response = json.loads(asyncio.run(handler.handle_message(request)))
+
+        assert response["error"]["code"] == INVALID_PARAMS
+
+    def test_resolve_references(self):
+        """
+        ネストした引数中の参照（値の置き換え・文字列への埋め込み）の解決を確認
+        """
+        results = {"prep": {"uris": ["s3://b/train", "s3://b/test"], "n": 3}}
+        arguments = {
+            "train": {"$ref": "prep.uris.0"},
+            "paths": ["${prep.uris.1}/data.csv"],
+            "options": {"n": {"$ref": "prep.n"}, "fixed": 1},
+        }
+
+        assert resolve_references(arguments, results) == {
+            "train": "s3://b/train",
+            "paths": ["s3://b/test/data.csv"],
+            "options": {"n": 3, "fixed": 1},
+        }
+
+    def test_embedded_references_use_json(self):
+        """
+        文字列に埋め込んだ辞書・リスト・真偽値・Noneの参照がPythonのreprではなく
+        JSONの表記になることを確認
+        """
+        results = {"prep": {"params": {"a": 1, "b": [True, None]}, "ok": False, "n": 0.5}}
+
+        resolved = resolve_references(
+            {"x": "params=${prep.params}", "y": "${prep.ok}/${prep.params.b.1}/${prep.n}"},
+            results,
+        )
+
+        assert resolved == {"x": 'params={"a": 1, "b": [true, null]}', "y": "false/null/0.5"}
@@ -0,0 +1,320 @@
+"""
+MCP Transport Integration Tests
+
+MCPトランスポート（JSON-RPC over stream）の統合テスト
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common.cancellation import cancellable_sleep
+from mcp_server.common.progress import report_progress
+from mcp_server.server import MLOpsServer
+from mcp_server.transport import (
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    SERVER_BUSY,
+    MCPConnection,
+    MCPProtocolHandler,
+    start_tcp_server,
+)
+
+
+def _request(request_id, method, params=None) -> bytes:
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+class _CollectingWriter:
+    """書き込まれたメッセージを保持するStreamWriter代替"""
+
+    def __init__(self):
+        self.messages = []
+
+    def write(self, data: bytes):
+        self.messages.extend(json.loads(line) for line in data.splitlines() if line)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    """テスト用サーバーインスタンス"""
+    server = MLOpsServer()
+    yield server
+    server.shutdown()
+
+
+class TestMCPProtocolHandler:
+    """
+    JSON-RPCメソッドのディスパッチのテスト
+    """
+
+    def test_initialize(self, server):
+        """
+        initializeレスポンスの確認テスト
+        """
+        handler = MCPProtocolHandler(server)
+        response = json.loads(asyncio.run(handler.handle_line(_request(1, "initialize", {}))))
+
+        assert response["id"] == 1
+        assert response["result"]["serverInfo"]["name"] == "MLOps Integrated MCP Server"
+        assert "tools" in response["result"]["capabilities"]
+
+    def test_tools_list(self, server):
+        """
+        tools/listがサーバーのツール定義を返すことを確認
+        """
+        handler = MCPProtocolHandler(server)
+        response = json.loads(asyncio.run(handler.handle_line(_request("a", "tools/list"))))
+
+        assert response["id"] == "a"
+        assert response["result"]["tools"] == server.list_tools()
+
+    def test_tools_call_error_result(self, server):
+        """
+        ツールの実行エラーがisError付きの結果として返ることを確認
+        """
+        handler = MCPProtocolHandler(server)
+        params = {"name": "data_preparation.load_dataset", "arguments": {}}
+        response = json.loads(asyncio.run(handler.handle_line(_request(2, "tools/call", params))))
+
+        assert response["result"]["isError"] is True
+        assert "missing required argument" in response["result"]["content"][0]["text"]
+
+    def test_protocol_errors(self, server):
+        """
+        不正なメッセージ・未知のメソッド・未知のツールのエラーテスト
+        """
+        handler = MCPProtocolHandler(server)
+
+        parse_error = json.loads(asyncio.run(handler.handle_line(b"not json\n")))
+        unknown_method = json.loads(asyncio.run(handler.handle_line(_request(3, "unknown"))))
+        unknown_tool = json.loads(
+            asyncio.run(handler.handle_line(_request(4, "tools/call", {"name": "no.such_tool"})))
+        )
+
+        assert parse_error["error"]["code"] == PARSE_ERROR
+        assert unknown_method["error"]["code"] == METHOD_NOT_FOUND
+        assert unknown_tool["error"]["code"] == INVALID_PARAMS
+
+    def test_busy_error(self, server):
+        """
+        同時実行数の上限によるビジーがretryAfter付きのエラーとして返ることを確認
+        """
+
+        async def busy(tool_name, arguments, **kwargs):
+            return {"success": False, "error": "Server busy", "busy": True, "retry_after": 3}
+
+        server.call_tool = busy
+        handler = MCPProtocolHandler(server)
+        response = json.loads(
+            asyncio.run(handler.handle_line(_request(5, "tools/call", {"name": "test.tool"})))
+        )
+
+        assert response["error"]["code"] == SERVER_BUSY
+        assert response["error"]["data"] == {"retryAfter": 3}
+
+    def test_tools_call_timeout(self, server):
+        """
+        params.timeoutで指定した期限を過ぎるとエラー結果が返ることを確認
+        """
+        server.tools["test.sleep"] = cancellable_sleep
+        handler = MCPProtocolHandler(server)
+        params = {"name": "test.sleep", "arguments": {"seconds": 5}, "timeout": 0.2}
+
+        start = time.monotonic()
+        response = json.loads(asyncio.run(handler.handle_line(_request(6, "tools/call", params))))
+
+        assert time.monotonic() - start < 2
+        assert response["result"]["isError"] is True
+        assert "deadline" in response["result"]["content"][0]["text"]
+
+        invalid = dict(params, timeout=-1)
+        response = json.loads(asyncio.run(handler.handle_line(_request(7, "tools/call", invalid))))
+        assert response["error"]["code"] == INVALID_PARAMS
+
+    def test_notification_has_no_response(self, server):
+        """
+        通知（idなし）にはレスポンスを返さないことを確認
+        """
+        handler = MCPProtocolHandler(server)
+        notification = b'{"jsonrpc": "2.0", "method": "notifications/initialized"}\n'
+
+        assert asyncio.run(handler.handle_line(notification)) is None
+
+
+class TestMCPConnection:
+    """
+    1接続上での並行処理のテスト
+    """
+
+    def test_responses_returned_out_of_order(self, server):
+        """
+        後から届いた短いリクエストが先に応答されることを確認
+        """
+        released = threading.Event()
+        # fastが完了するまで待ち、さらに応答が書き込まれる猶予を置いてから完了する
+        server.tools["test.slow"] = lambda: released.wait(timeout=5) and time.sleep(0.2)
+        server.tools["test.fast"] = lambda: released.set() or "fast"
+
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(_request(1, "tools/call", {"name": "test.slow"}))
+            reader.feed_data(_request(2, "tools/call", {"name": "test.fast"}))
+            reader.feed_eof()
+
+            writer = _CollectingWriter()
+            await MCPConnection(MCPProtocolHandler(server), reader, writer, "test").serve()
+            return writer.messages
+
+        messages = asyncio.run(run())
+
+        assert [message["id"] for message in messages] == [2, 1]
+        assert all(message["result"]["isError"] is False for message in messages)
+
+    def test_cancel_notification(self, server):
+        """
+        notifications/cancelledで処理中のリクエストがキャンセルされ、応答が返らないことを確認
+        """
+        server.tools["test.sleep"] = cancellable_sleep
+
+        async def run():
+            reader = asyncio.StreamReader()
+            writer = _CollectingWriter()
+            connection = MCPConnection(MCPProtocolHandler(server), reader, writer, "test")
+            serving = asyncio.create_task(connection.serve())
+
+            params = {"name": "test.sleep", "arguments": {"seconds": 5}}
+            reader.feed_data(_request(1, "tools/call", params))
+            await asyncio.sleep(0.2)
+            assert connection.in_flight == 1
+
+            cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled"}
+            cancel["params"] = {"requestId": 1, "reason": "user aborted"}
+            reader.feed_data(json.dumps(cancel).encode("utf-8") + b"\n")
+            reader.feed_data(_request(2, "ping"))
+            reader.feed_eof()
+            await asyncio.wait_for(serving, 3)
+            return writer.messages
+
+        messages = asyncio.run(run())
+
+        assert [message["id"] for message in messages] == [2]
+
+    def test_duplicate_request_id_rejected(self, server):
+        """
+        処理中のリクエストと同じIDのリクエストは拒否され、最初のリクエストは
+        キャンセル通知で取り消せることを確認
+        """
+        server.tools["test.sleep"] = cancellable_sleep
+
+        async def run():
+            reader = asyncio.StreamReader()
+            writer = _CollectingWriter()
+            connection = MCPConnection(MCPProtocolHandler(server), reader, writer, "test")
+            serving = asyncio.create_task(connection.serve())
+
+            params = {"name": "test.sleep", "arguments": {"seconds": 5}}
+            reader.feed_data(_request(1, "tools/call", params))
+            await asyncio.sleep(0.2)
+            reader.feed_data(_request(1, "ping"))
+            await asyncio.sleep(0.1)
+            assert connection.in_flight == 1
+
+            cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled"}
+            cancel["params"] = {"requestId": 1, "reason": "user aborted"}
+            reader.feed_data(json.dumps(cancel).encode("utf-8") + b"\n")
+            reader.feed_eof()
+            await asyncio.wait_for(serving, 3)
+            return writer.messages
+
+        messages = asyncio.run(run())
+
+        assert len(messages) == 1
+        assert messages[0]["id"] == 1
+        assert messages[0]["error"]["code"] == INVALID_REQUEST
+        assert "already in use" in messages[0]["error"]["message"]
+
+    def test_progress_notifications(self, server):
+        """
+        progressTokenを指定したtools/callで、進捗が応答より先に通知されることを確認
+        """
+
+        def tool():
+            report_progress("download", 10, 20)
+            report_progress("parse", 100, message="Parsed 100 rows")
+            return "done"
+
+        server.tools["test.progress"] = tool
+
+        async def run():
+            reader = asyncio.StreamReader()
+            params = {"name": "test.progress", "_meta": {"progressToken": "tok-1"}}
+            reader.feed_data(_request(1, "tools/call", params))
+            # progressTokenがない場合は通知しない
+            reader.feed_data(_request(2, "tools/call", {"name": "test.progress"}))
+            reader.feed_eof()
+
+            writer = _CollectingWriter()
+            await MCPConnection(MCPProtocolHandler(server), reader, writer, "test").serve()
+            return writer.messages
+
+        messages = asyncio.run(run())
+        notifications = [m for m in messages if m.get("method") == "notifications/progress"]
+        response = next(m for m in messages if m.get("id") == 1)
+
+        assert [n["params"]["progress"] for n in notifications] == [1, 2]
+        assert all(n["params"]["progressToken"] == "tok-1" for n in notifications)
+        assert notifications[0]["params"]["data"] == {
+            "stage": "download",
+            "current": 10,
+            "total": 20,
+        }
+        assert notifications[1]["params"]["message"] == "Parsed 100 rows"
+        assert messages.index(notifications[-1]) < messages.index(response)
+        assert len(messages) == 4
+
+    def test_tcp_transport(self, server):
+        """
+        TCPトランスポート上で複数のリクエストを多重化できることを確認
+        """
+
+        async def run():
+            listener = await start_tcp_server(MCPProtocolHandler(server), "127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+
+            async with listener:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(_request(1, "ping") + _request(2, "tools/list"))
+                await writer.drain()
+
+                responses = [json.loads(await reader.readline()) for _ in range(2)]
+                writer.close()
+                await writer.wait_closed()
+            return responses
+
+        responses = {response["id"]: response for response in asyncio.run(run())}
+
+        assert responses[1]["result"] == {}
+        assert len(responses[2]["result"]["tools"]) == len(server.tools)
@@ -0,0 +1,152 @@
+"""
+Arrow Utils Unit Tests
+
+Arrowテーブルの前処理と特徴量への変換のユニットテスト
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils.validation import check_array
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common.arrow_utils import (
+    drop_missing,
+    encode_labels,
+    feature_frame,
+    fill_missing,
+    is_categorical,
+)
+
+
+def _sample_table() -> pa.Table:
+    """欠損を含む数値・文字列・真偽値の列（整数の列は2チャンク）"""
+    return pa.table(
+        {
+            "count": pa.chunked_array([[1, 2, 2], [None, 4, 2]]),
+            "ratio": [1.5, float("nan"), 2.5, None, 0.5, 2.5],
+            "name": ["x", None, "b", "x", "b", "x"],
+            "flag": [True, False, True, True, False, True],
+        }
+    )
+
+
+class TestFeatureFrame:
+    """
+    feature_frameのテスト
+    """
+
+    def test_single_block_without_copy(self):
+        """
+        数値の列が1つの配列にまとめられ、scikit-learnにコピーせずに渡ることを確認
+        """
+        table = pa.table({"a": np.arange(5.0), "b": np.arange(5.0) * 2})
+
+        X = feature_frame(table)
+
+        assert X.columns.tolist() == ["a", "b"]
+        assert X["b"].tolist() == [0.0, 2.0, 4.0, 6.0, 8.0]
+        matrix = np.asarray(X)
+        assert matrix.flags.f_contiguous
+        assert np.shares_memory(check_array(X), matrix)
+        assert np.shares_memory(check_array(X), np.asarray(X))
+
+    def test_missing_and_mixed_types(self):
+        """
+        欠損のある整数・真偽値と浮動小数点の列がfloat64（欠損はNaN）に揃うことを確認
+        """
+        table = _sample_table().select(["count", "ratio", "flag"])
+
+        X = feature_frame(table)
+
+        expected = table.to_pandas().astype(np.float64)
+        pd.testing.assert_frame_equal(X, expected)
+
+    def test_integer_columns_keep_dtype(self):
+        """
+        欠損のない整数の列のみの場合は整数のまま変換されることを確認
+        """
+        X = feature_frame(pa.table({"a": [1, 2], "b": [3, 4]}))
+
+        assert X.dtypes.tolist() == [np.dtype(np.int64)] * 2
+
+    def test_non_numeric_fallback(self):
+        """
+        文字列の列を含む場合はpandasの通常の変換になることを確認
+        """
+        table = _sample_table()
+
+        pd.testing.assert_frame_equal(feature_frame(table), table.to_pandas())
+
+
+class TestPreprocessing:
+    """
+    欠損値処理・ラベルエンコーディングがpandas・scikit-learnと同じ結果になることのテスト
+    """
+
+    def test_drop_missing(self):
+        """
+        nullとNaNを含む行が除外されることを確認
+        """
+        table = _sample_table()
+
+        result = drop_missing(table).to_pandas()
+
+        expected = table.to_pandas().dropna().reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_fill_mean_and_median(self):
+        """
+        数値の列のみが平均値・中央値で補完されることを確認
+        """
+        table = _sample_table()
+        df = table.to_pandas()
+        numeric = ["count", "ratio"]
+
+        for strategy in ("mean", "median"):
+            result = fill_missing(table, strategy).to_pandas()
+
+            expected = df.copy()
+            expected[numeric] = df[numeric].fillna(getattr(df[numeric], strategy)())
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_fill_mode(self):
+        """
+        全ての列が最頻値（同数の場合は最小の値）で補完されることを確認
+        """
+        table = _sample_table()
+
+        result = fill_missing(table, "mode")
+
+        assert result.column("count").to_pylist() == [1, 2, 2, 2, 4, 2]
+        assert result.column("ratio").to_pylist() == [1.5, 2.5, 2.5, 2.5, 0.5, 2.5]
+        assert result.column("name").to_pylist() == ["x", "x", "b", "x", "b", "x"]
+
+    def test_encode_labels(self):
+        """
+        文字列に変換してLabelEncoderでエンコードした場合と同じ番号になることを確認
+        """
+        column = pa.chunked_array([["b", "a"], [None, "é", "Z", "b"]])
+
+        codes, classes = encode_labels(column)
+
+        # CSVをpandasで読み込んだ場合と同様に欠損はNaN（文字列では "nan"）
+        encoder = LabelEncoder()
+        expected = encoder.fit_transform(column.to_pandas().fillna(np.nan).astype(str))
+        assert codes.to_pylist() == expected.tolist()
+        assert classes == encoder.classes_.tolist()
+
+    def test_categorical_types(self):
+        """
+        文字列・日付の列がカテゴリ変数として扱われることを確認
+        """
+        assert is_categorical(pa.string())
+        assert is_categorical(pa.date32())
+        assert not is_categorical(pa.int64())
+        assert not is_categorical(pa.bool_())
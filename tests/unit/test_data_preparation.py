@@ -11,6 +11,7 @@ from unittest.mock import Mock, patch
 
 import pandas as pd
 import pytest
+from sklearn.preprocessing import LabelEncoder
 
 # Add mcp_server to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "mcp_server"))
@@ -84,7 +85,81 @@ class TestLoadDataset:
         assert dataset_info["missing_values"]["feature1"] == 0
 
         # S3が正しく呼ばれたか確認
-        mock_s3_client.get_object.assert_called_once_with(Bucket="test-bucket", Key="data.csv")
+        mock_s3_client.get_object.assert_called_once_with(
+            Bucket="test-bucket", Key="data.csv", Range="bytes=0-8388607"
+        )
+
+    def test_load_dataset_jsonl(self, mock_s3_client, sample_csv_data):
+        """
+        JSON Lines形式の読み込みテスト
+        """
+        jsonl_bytes = sample_csv_data.to_json(orient="records", lines=True).encode("utf-8")
+        mock_s3_client.get_object.return_value = {"Body": io.BytesIO(jsonl_bytes)}
+
+        result = load_dataset(s3_uri="s3://test-bucket/data.jsonl", file_format="jsonl")
+
+        assert result["status"] == "success"
+        assert result["dataset_info"]["rows"] == 5
+        assert result["dataset_info"]["missing_values"]["feature2"] == 1
+
+    def test_load_dataset_profile_only(self, mock_s3_client, sample_csv_data):
+        """
+        profile_onlyではDataFrameを作らずに、同じ行数・型・欠損値の数が集計されることを確認
+        """
+        result = load_dataset(
+            s3_uri="s3://test-bucket/data.csv", file_format="csv", profile_only=True
+        )
+
+        assert result["profile_only"] is True
+        dataset_info = result["dataset_info"]
+        assert dataset_info["profile_method"] == "arrow_stream"
+        assert dataset_info["rows"] == 5
+        assert dataset_info["column_names"] == sample_csv_data.columns.tolist()
+        assert dataset_info["dtypes"] == {
+            col: str(dtype) for col, dtype in sample_csv_data.dtypes.items()
+        }
+        assert dataset_info["missing_values"] == sample_csv_data.isnull().sum().to_dict()
+        assert dataset_info["memory_usage_mb"] > 0
+
+    def test_load_dataset_profile_only_type_change(self, mock_s3_client):
+        """
+        最初のブロックから推定した型に変換できない値が後にある場合は、pandasのチャンクで
+        集計し直し、全体を読み込んだ場合と同じ型になることを確認
+        """
+        csv_bytes = b"id,value\n" + b"".join(f"{i},{i}\n".encode() for i in range(300_000))
+        csv_bytes += b"300000,0.5\n"
+        mock_s3_client.get_object.side_effect = lambda **kwargs: {"Body": io.BytesIO(csv_bytes)}
+
+        result = load_dataset(
+            s3_uri="s3://test-bucket/data.csv", file_format="csv", profile_only=True
+        )
+
+        dataset_info = result["dataset_info"]
+        assert dataset_info["profile_method"] == "pandas_chunks"
+        assert dataset_info["rows"] == 300_001
+        assert dataset_info["dtypes"] == {"id": "int64", "value": "float64"}
+
+    def test_load_dataset_profile_only_dates(self, mock_s3_client):
+        """
+        日付・日時・時刻の列の型が、pandasで全体を読み込んだ場合と同じになることを確認
+        """
+        csv_bytes = (
+            b"day,at,clock,value\n"
+            b"2024-01-01,2024-01-01 10:00:00,10:00:00,1\n"
+            b"2024-01-02,,11:30:00,2\n"
+            b",2024-01-03 09:15:00,12:45:00,3\n"
+        )
+        mock_s3_client.get_object.side_effect = lambda **kwargs: {"Body": io.BytesIO(csv_bytes)}
+
+        result = load_dataset(
+            s3_uri="s3://test-bucket/data.csv", file_format="csv", profile_only=True
+        )
+
+        dataset_info = result["dataset_info"]
+        expected = pd.read_csv(io.BytesIO(csv_bytes))
+        assert dataset_info["profile_method"] == "arrow_stream"
+        assert dataset_info["dtypes"] == {col: str(dtype) for col, dtype in expected.dtypes.items()}
+        assert dataset_info["missing_values"] == expected.isnull().sum().to_dict()
 
     def test_load_dataset_invalid_s3_uri(self):
         """
@@ -174,6 +249,84 @@ class TestValidateData:
         assert len(validation_results["errors"]) > 0
         assert "missing_column" in str(validation_results["errors"])
 
+    def test_validate_data_with_rules(self, mock_s3_for_validation, sample_data_with_issues):
+        """
+        ルールがプロファイルと同じ1回の走査で評価され、失敗したルールが重要度に応じて
+        エラー・警告になることを確認
+        """
+        result = validate_data(
+            s3_uri="s3://test-bucket/data.csv",
+            file_format="csv",
+            max_missing_ratio=1.0,
+            rules=[
+                {"type": "range", "column": "feature1", "min": 1, "max": 8},
+                {"type": "allowed_values", "column": "target", "values": [0, 1]},
+                {"type": "unique", "column": "feature3", "severity": "warning"},
+                {
+                    "type": "regex",
+                    "column": "feature3",
+                    "pattern": "^[a-h]$",
+                    "severity": "warning",
+                },
+            ],
+        )
+
+        validation_results = result["validation_results"]
+        assert validation_results["is_valid"] is False
+        assert validation_results["checks"]["data_size"]["rows"] == len(sample_data_with_issues)
+        assert mock_s3_for_validation.get_object.call_count == 1
+
+        rules = validation_results["checks"]["rules"]
+        assert rules["scan_method"] == "arrow_stream"
+        assert (rules["passed"], rules["failed"]) == (2, 2)
+        by_name = {rule["name"]: rule for rule in rules["results"]}
+        assert by_name["range:feature1"]["violations"] == 2
+        assert by_name["range:feature1"]["samples"][0] == {"row": 8, "values": {"feature1": 9}}
+        assert by_name["regex:feature3"]["violations"] == 2
+        assert any("range:feature1" in e for e in validation_results["errors"])
+        assert any("regex:feature3" in w for w in validation_results["warnings"])
+
+    def test_validate_data_rules_scan_methods_same_dtypes(self):
+        """
+        ルールの評価でArrowのストリーミング・pandasのチャンクのどちらで走査しても、
+        日付の列を含むデータ型のチェックがpandasで全体を読み込んだ場合と同じになることを確認
+        """
+        rows = b"".join(f"{i},2024-01-{i % 28 + 1:02d},{i}\n".encode() for i in range(300_000))
+        contents = {
+            "arrow_stream": b"id,day,value\n" + rows[:1000],
+            # 最初のブロックから推定した型（整数）に変換できない値でpandasのチャンクで走査し直す
+            "pandas_chunks": b"id,day,value\n" + rows + b"300000,2024-02-01,0.5\n",
+        }
+
+        data_types = {}
+        for scan_method, content in contents.items():
+            with patch("boto3.client") as mock_client:
+                mock_s3 = Mock()
+                mock_s3.get_object.side_effect = lambda **kwargs: {"Body": io.BytesIO(content)}
+                mock_client.return_value = mock_s3
+                result = validate_data(
+                    s3_uri="s3://test-bucket/data.csv",
+                    rules=[{"type": "not_null", "column": "day"}],
+                )
+            checks = result["validation_results"]["checks"]
+            assert checks["rules"]["scan_method"] == scan_method
+            data_types[scan_method] = checks["data_types"]
+
+        expected = pd.read_csv(io.BytesIO(contents["pandas_chunks"]))
+        object_columns = [col for col, dtype in expected.dtypes.items() if dtype == "object"]
+        assert object_columns == ["day"]
+        assert data_types["arrow_stream"] == data_types["pandas_chunks"]
+        assert data_types["arrow_stream"]["object_columns"] == object_columns
+
+    def test_validate_data_invalid_rule(self, mock_s3_for_validation):
+        """
+        不正なルールはデータセットを読み込む前にエラーになることを確認
+        """
+        with pytest.raises(ValueError, match="Unsupported rule type"):
+            validate_data(s3_uri="s3://test-bucket/data.csv", rules=[{"type": "unknown"}])
+
+        mock_s3_for_validation.get_object.assert_not_called()
+
     def test_validate_data_empty_dataset(self):
         """
         空データセット（0行）のエラーテスト
@@ -326,6 +479,141 @@ class TestPreprocessSupervised:
             # 欠損値を含む行が削除されるので、9サンプルになる
             assert preprocessing_results["num_samples"] == 9
 
+    def test_preprocess_supervised_encoded_output(self):
+        """
+        補完・エンコードした値がpandas・LabelEncoderと同じ値で保存されることを確認
+        """
+        data = pd.DataFrame(
+            {
+                "size": [1.0, None, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0],
+                "color": ["red", "blue", None, "red", "blue", "red", "red", "blue", "red", "red"],
+                "target": ["yes", "no"] * 5,
+            }
+        )
+
+        with patch("boto3.client") as mock_client:
+            mock_s3 = Mock()
+            mock_s3.get_object.return_value = {
+                "Body": io.BytesIO(data.to_csv(index=False).encode("utf-8")),
+            }
+            mock_s3.put_object.return_value = {}
+            mock_client.return_value = mock_s3
+
+            result = preprocess_supervised(
+                s3_uri="s3://test-bucket/train.csv",
+                target_column="target",
+                handle_missing="mean",
+                normalize=False,
+                output_s3_uri="s3://test-bucket/processed/",
+            )
+
+        saved = {
+            call.kwargs["Key"]: pd.read_csv(io.BytesIO(call.kwargs["Body"]))
+            for call in mock_s3.put_object.call_args_list
+        }
+        combined = pd.concat(saved.values()).sort_values("size", ignore_index=True)
+
+        preprocessing_results = result["preprocessing_results"]
+        assert preprocessing_results["target_classes"] == ["no", "yes"]
+        assert preprocessing_results["categorical_columns"] == ["color"]
+        # 数値の欠損は平均値、文字列の欠損は "nan" というクラス
+        filled = data.assign(
+            size=data["size"].fillna(data["size"].mean()), color=data["color"].fillna("nan")
+        )
+        filled["color"] = LabelEncoder().fit_transform(filled["color"])
+        expected = filled.sort_values("size", ignore_index=True)
+        # 正規化しない場合はエンコードした列も整数のまま保存される
+        pd.testing.assert_frame_equal(combined[["size", "color"]], expected[["size", "color"]])
+
+    def test_preprocess_supervised_column_types_and_targets(self):
+        """
+        正規化しない場合は整数の列が "3.0" ではなく "3" のまま保存され、ターゲットが
+        欠損している行は件数を返して除外され、日付の列・ターゲットはpandasで読み込んだ
+        場合と同じ文字列でエンコードされることを確認
+        """
+        csv_bytes = (
+            b"count,ratio,label,day\n"
+            b"1,0.5,a,2024-01-01\n"
+            b"2,1.5,,2024-01-02\n"
+            b"3,2.5,b,2024-01-03\n"
+            b"4,3.5,a,2024-01-04\n"
+            b"5,4.5,b,2024-01-05\n"
+        )
+        expected = pd.read_csv(io.BytesIO(csv_bytes))
+
+        def run(mock_s3, target_column):
+            mock_s3.put_object.reset_mock()
+            result = preprocess_supervised(
+                s3_uri="s3://test-bucket/train.csv",
+                target_column=target_column,
+                handle_missing="mean",
+                normalize=False,
+                output_s3_uri="s3://test-bucket/processed/",
+            )
+            saved = pd.concat(
+                pd.read_csv(io.BytesIO(call.kwargs["Body"]), dtype=str)
+                for call in mock_s3.put_object.call_args_list
+            )
+            return result["preprocessing_results"], saved.sort_values("count")
+
+        with patch("boto3.client") as mock_client:
+            mock_s3 = Mock()
+            mock_s3.get_object.side_effect = lambda **kwargs: {"Body": io.BytesIO(csv_bytes)}
+            mock_s3.put_object.return_value = {}
+            mock_client.return_value = mock_s3
+
+            results, saved = run(mock_s3, "label")
+            assert results["num_samples"] == 4
+            assert results["dropped_missing_target_rows"] == 1
+            assert results["target_classes"] == ["a", "b"]
+            assert results["categorical_columns"] == ["day"]
+            assert saved["count"].tolist() == ["1", "3", "4", "5"]
+            assert saved["label"].tolist() == ["0", "1", "0", "1"]
+            # 日付の列はpandasで読み込んだ文字列と同じクラスでエンコードされる
+            kept = expected.dropna(subset=["label"])
+            codes = LabelEncoder().fit_transform(kept["day"].astype(str))
+            assert saved["day"].tolist() == [str(code) for code in codes]
+
+            results, saved = run(mock_s3, "day")
+            assert results["num_samples"] == 5
+            assert results["dropped_missing_target_rows"] == 0
+            assert results["target_classes"] == expected["day"].tolist()
+
+    def test_preprocess_supervised_sharded_prefix(self, sample_training_data):
+        """
+        プレフィックスを指定した場合は全パートを連結して前処理し、隣のプレフィックスに保存されることを確認
+        """
+        shards = {
+            f"data/shards/part-{index}.csv": sample_training_data.iloc[index::2]
+            .to_csv(index=False)
+            .encode("utf-8")
+            for index in range(2)
+        }
+
+        with patch("boto3.client") as mock_client:
+            mock_s3 = Mock()
+            mock_s3.list_objects_v2.return_value = {
+                "Contents": [{"Key": key, "Size": len(body)} for key, body in shards.items()]
+                + [{"Key": "data/shards/_SUCCESS", "Size": 0}],
+                "IsTruncated": False,
+            }
+            mock_s3.get_object.side_effect = lambda **kwargs: {
+                "Body": io.BytesIO(shards[kwargs["Key"]])
+            }
+            mock_s3.put_object.return_value = {}
+            mock_client.return_value = mock_s3
+
+            result = preprocess_supervised(
+                s3_uri="s3://test-bucket/data/shards/",
+                target_column="target",
+            )
+
+        preprocessing_results = result["preprocessing_results"]
+        assert preprocessing_results["num_samples"] == 10
+        assert preprocessing_results["output_s3_uri"] == "s3://test-bucket/data/shards-processed/"
+        saved = sorted(call.kwargs["Key"] for call in mock_s3.put_object.call_args_list)
+        assert saved == ["data/shards-processed/test.csv", "data/shards-processed/train.csv"]
+
     def test_preprocess_supervised_no_normalization(self, mock_s3_for_preprocessing):
         """
         正規化なしの前処理テスト
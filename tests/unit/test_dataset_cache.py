@@ -0,0 +1,101 @@
+"""
+Dataset Cache Unit Tests
+
+解析済みのデータセットのキャッシュのユニットテスト
+"""
+
+import os
+import sys
+
+import numpy as np
+import pyarrow as pa
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common.dataset_cache import DatasetCache
+
+OPTIONS = {"format": "csv", "columns": None, "filters": None}
+
+
+def _table(rows: int = 1000) -> pa.Table:
+    return pa.table({"x": np.arange(rows, dtype=np.float64), "y": np.arange(rows)})
+
+
+class TestDatasetCache:
+    """
+    DatasetCacheのテスト
+    """
+
+    def test_store_and_open(self, tmp_path):
+        """
+        保存したテーブルがETag・読み込み条件ごとにmmapで開けることを確認
+        """
+        cache = DatasetCache(str(tmp_path), max_bytes=1024 * 1024)
+        table = _table()
+
+        assert cache.store("bucket", "train.csv", '"v1"', OPTIONS, table)
+        opened = cache.open("bucket", "train.csv", '"v1"', OPTIONS)
+
+        assert opened.equals(table)
+        assert cache.open("bucket", "train.csv", '"v2"', OPTIONS) is None
+        assert cache.open("bucket", "train.csv", '"v1"', {**OPTIONS, "columns": ["x"]}) is None
+        stats = cache.stats()
+        assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 2)
+        assert stats["bytes_mapped"] > table.nbytes
+
+    def test_zero_copy_numpy_view(self, tmp_path):
+        """
+        開いたテーブルの数値の列がファイルのmmapをコピーせずに参照することを確認
+        """
+        cache = DatasetCache(str(tmp_path), max_bytes=1024 * 1024)
+        cache.store("bucket", "train.csv", '"v1"', OPTIONS, _table())
+
+        opened = cache.open("bucket", "train.csv", '"v1"', OPTIONS)
+        values = opened.column("x").chunk(0).to_numpy()
+
+        # mmapしたページは読み取り専用
+        assert not values.flags.writeable
+        assert values[-1] == 999.0
+
+    def test_unknown_etag_or_too_large_not_stored(self, tmp_path):
+        """
+        ETagが不明なテーブル・上限を超えるテーブルは保存されないことを確認
+        """
+        cache = DatasetCache(str(tmp_path), max_bytes=1000)
+
+        assert not cache.store("bucket", "a.csv", None, OPTIONS, _table(10))
+        assert not cache.store("bucket", "b.csv", '"v1"', OPTIONS, _table(1000))
+        assert cache.stats()["entries"] == 0
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """
+        上限を超えた場合は最終アクセス日時が古いものから削除されることを確認
+        """
+        table = _table(100)
+        probe = DatasetCache(str(tmp_path / "probe"), max_bytes=1024 * 1024)
+        probe.store("bucket", "probe.csv", '"v1"', OPTIONS, table)
+        file_size = probe.stats()["bytes"]
+        cache = DatasetCache(str(tmp_path / "cache"), max_bytes=file_size * 2)
+
+        cache.store("bucket", "a.csv", '"v1"', OPTIONS, table)
+        cache.store("bucket", "b.csv", '"v1"', OPTIONS, table)
+        a_path = cache._path("bucket", "a.csv", '"v1"', OPTIONS)
+        os.utime(a_path, (1, 1))
+        cache.store("bucket", "c.csv", '"v1"', OPTIONS, table)
+
+        assert cache.open("bucket", "a.csv", '"v1"', OPTIONS) is None
+        assert cache.open("bucket", "c.csv", '"v1"', OPTIONS) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_corrupted_file_removed(self, tmp_path):
+        """
+        壊れたファイルはミスとして扱われ、削除されることを確認
+        """
+        cache = DatasetCache(str(tmp_path), max_bytes=1024 * 1024)
+        cache.store("bucket", "train.csv", '"v1"', OPTIONS, _table())
+        path = cache._path("bucket", "train.csv", '"v1"', OPTIONS)
+        path.write_bytes(b"not an arrow file")
+
+        assert cache.open("bucket", "train.csv", '"v1"', OPTIONS) is None
+        assert not path.exists()
@@ -0,0 +1,128 @@
+"""
+Dataset Profile Unit Tests
+
+データセットのプロファイル（チャンクごとの集計）のユニットテスト
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add mcp_server to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "mcp_server"))
+
+from capabilities.data_preparation.tools.dataset_profile import (
+    DatasetProfile,
+    merge_dtypes,
+    pandas_dtype,
+)
+
+
+def _sample_frame(rows: int = 1000) -> pd.DataFrame:
+    """欠損を含む整数・浮動小数点・文字列（日本語を含む）・真偽値の列"""
+    index = np.arange(rows)
+    return pd.DataFrame(
+        {
+            "count": pd.array(np.where(index % 9 == 0, None, index), dtype="Int64"),
+            "ratio": np.where(index % 7 == 0, np.nan, index / 3),
+            "city": np.where(index % 5 == 0, None, np.where(index % 2 == 0, "東京", "osaka")),
+            "flag": index % 2 == 0,
+        }
+    )
+
+
+class TestDatasetProfile:
+    """
+    DatasetProfileの集計結果がDataFrame全体から求めた値と一致することのテスト
+    """
+
+    def test_batches_match_full_frame(self):
+        """
+        レコードバッチごとの集計が、pandasで全体を読み込んだ場合の型・欠損値の数と一致し、
+        メモリ使用量の推定値が近いことを確認
+        """
+        # pandasのメタデータ（Int64等の型）は持たない、ファイルから読み込んだ場合と同じテーブル
+        table = pa.Table.from_pandas(_sample_frame(), preserve_index=False)
+        table = table.replace_schema_metadata(None)
+        expected = table.to_pandas()
+
+        profile = DatasetProfile()
+        for batch in table.to_batches(max_chunksize=64):
+            profile.add_batch(batch)
+        info = profile.to_dict()
+
+        assert info["rows"] == len(expected)
+        assert info["column_names"] == expected.columns.tolist()
+        assert info["dtypes"] == {col: str(dtype) for col, dtype in expected.dtypes.items()}
+        assert info["missing_values"] == expected.isnull().sum().to_dict()
+        actual_bytes = expected.memory_usage(index=False, deep=True).sum()
+        assert abs(profile.memory_bytes - actual_bytes) / actual_bytes < 0.1
+
+    def test_batches_merge_dtypes(self):
+        """
+        バッチごとに型が異なる列が、全体を読み込んだ場合と同じ型にまとめられることを確認
+        """
+        batches = [
+            pa.RecordBatch.from_pydict({"a": [1, 2], "b": ["x", "y"], "c": [True, False]}),
+            pa.RecordBatch.from_pydict({"a": [3.5, None], "b": [1, 2], "c": [True, None]}),
+        ]
+
+        profile = DatasetProfile()
+        for batch in batches:
+            profile.add_batch(batch)
+
+        assert profile.dtypes == {"a": "float64", "b": "object", "c": "object"}
+        assert profile.missing_values == {"a": 1, "b": 0, "c": 1}
+        assert profile.rows == 4
+
+    def test_parquet_footer(self):
+        """
+        Parquetのフッターの行数・null数から、データページを読まずに集計されることを確認
+        """
+        df = _sample_frame()
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, row_group_size=300)
+        metadata = pq.ParquetFile(io.BytesIO(buffer.getvalue())).metadata
+        expected = pd.read_parquet(io.BytesIO(buffer.getvalue()))
+
+        profile = DatasetProfile()
+        assert profile.add_parquet_metadata(metadata, columns=["city", "count"])
+        info = profile.to_dict()
+
+        assert info["rows"] == len(df)
+        assert info["column_names"] == ["city", "count"]
+        assert info["dtypes"] == {"city": "object", "count": "float64"}
+        assert info["missing_values"] == {
+            "city": int(expected["city"].isnull().sum()),
+            "count": int(expected["count"].isnull().sum()),
+        }
+
+    def test_parquet_footer_without_statistics(self):
+        """
+        null数の統計情報がないParquetは集計されない（データの走査が必要）ことを確認
+        """
+        buffer = io.BytesIO()
+        pq.write_table(pa.table({"a": [1, None]}), buffer, write_statistics=False)
+
+        profile = DatasetProfile()
+
+        assert not profile.add_parquet_metadata(pq.ParquetFile(buffer).metadata)
+        assert profile.rows == 0
+
+    def test_pandas_dtype_names(self):
+        """
+        Arrowの型がpandasに変換した場合の型名になることを確認
+        """
+        assert pandas_dtype(pa.int32(), has_nulls=False) == "int32"
+        assert pandas_dtype(pa.int64(), has_nulls=True) == "float64"
+        assert pandas_dtype(pa.bool_(), has_nulls=True) == "object"
+        assert pandas_dtype(pa.string(), has_nulls=False) == "object"
+        assert pandas_dtype(pa.null(), has_nulls=True) == "float64"
+        assert pandas_dtype(pa.timestamp("ns"), has_nulls=False) == "datetime64[ns]"
+        assert merge_dtypes("int64", "float32") == "float64"
+        assert merge_dtypes("datetime64[ns]", "float64") == "object"
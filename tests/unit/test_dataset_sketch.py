@@ -0,0 +1,321 @@
+"""
+Dataset Sketch Unit Tests
+
+マージ可能なスケッチ（異なり数・分位点・ヒストグラム）とprofile_datasetツールのユニットテスト
+"""
+
+import io
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from botocore.exceptions import ClientError
+
+# Add mcp_server to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "mcp_server"))
+
+from capabilities.data_preparation.tools.dataset_sketch import (
+    DatasetSketch,
+    FixedBinHistogram,
+    HyperLogLog,
+    sketch_artifact_key,
+)
+from capabilities.data_preparation.tools.profile_dataset import profile_dataset
+
+
+def _sample_frame(rows: int = 20_000, seed: int = 0) -> pd.DataFrame:
+    """偏った分布の数値・欠損を含む整数・文字列の列"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "amount": rng.lognormal(3, 1, rows),
+            "user_id": pd.array(
+                np.where(rng.random(rows) < 0.1, None, rng.integers(0, 5000, rows)), dtype="Int64"
+            ),
+            "city": rng.choice(["東京", "osaka", "nagoya", "fukuoka"], rows),
+        }
+    )
+
+
+def _sketch(df: pd.DataFrame, batch_rows: int = 3000, **kwargs) -> DatasetSketch:
+    sketch = DatasetSketch(**kwargs)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for batch in table.to_batches(max_chunksize=batch_rows):
+        sketch.add_batch(batch)
+    return sketch
+
+
+class TestDatasetSketch:
+    """
+    DatasetSketchの集計・マージ・アーティファクトのテスト
+    """
+
+    def test_estimates_match_exact_values(self):
+        """
+        異なり数・分位点が正確な値に近く、件数・欠損値の数・平均・標準偏差・
+        ヒストグラムの度数は正確な値と一致することを確認
+        """
+        df = _sample_frame()
+        summary = _sketch(df).summary()
+
+        assert summary["rows"] == len(df)
+        for name in df.columns:
+            column = summary["columns"][name]
+            assert column["count"] == df[name].count()
+            assert column["missing"] == df[name].isnull().sum()
+            assert column["distinct_count"] == pytest.approx(df[name].nunique(), rel=0.05)
+
+        amount = summary["columns"]["amount"]
+        assert amount["mean"] == pytest.approx(df.amount.mean())
+        assert amount["std"] == pytest.approx(df.amount.std())
+        assert (amount["min"], amount["max"]) == (df.amount.min(), df.amount.max())
+        for label, value in amount["quantiles"].items():
+            # 推定値の順位（分位）の誤差が1%未満
+            assert (df.amount <= value).mean() == pytest.approx(int(label[1:]) / 100, abs=0.01)
+        counts, _ = np.histogram(df.amount, bins=amount["histogram"]["edges"])
+        assert amount["histogram"]["counts"] == counts.tolist()
+
+        # 文字列の列は異なり数のみ
+        assert "quantiles" not in summary["columns"]["city"]
+
+    def test_merge_equals_single_pass(self):
+        """
+        パートごとに作成してマージしたスケッチが、全体を1回で集計したものと一致することを確認
+        """
+        df = _sample_frame()
+        whole = _sketch(df)
+        merged = _sketch(df.iloc[:5000], batch_rows=700)
+        for part in (df.iloc[5000:12000], df.iloc[12000:]):
+            merged.merge(_sketch(part, batch_rows=2000))
+
+        assert merged.rows == whole.rows
+        for name, column in whole.columns.items():
+            other = merged.columns[name]
+            assert np.array_equal(other.distinct.registers, column.distinct.registers)
+            assert (other.count, other.missing, other.dtype) == (
+                column.count,
+                column.missing,
+                column.dtype,
+            )
+        assert (
+            merged.summary()["columns"]["amount"]["histogram"]
+            == whole.summary()["columns"]["amount"]["histogram"]
+        )
+
+    def test_merge_integer_and_float_parts(self):
+        """
+        パートごとに型が異なる列（整数・浮動小数点）は同じ値を同じ値として数えることを確認
+        """
+        merged = _sketch(pd.DataFrame({"x": [1, 2, 3]}))
+        merged.merge(_sketch(pd.DataFrame({"x": [2.0, 3.0, 4.5]})))
+
+        column = merged.summary()["columns"]["x"]
+        assert column["distinct_count"] == 4
+        assert column["dtype"] == "float64"
+
+    def test_large_integer_ids(self):
+        """
+        2**53を超える整数のIDがfloat64に丸められずに区別されることを確認
+        """
+        ids = pa.array(2**60 + np.arange(5000, dtype=np.int64), pa.int64())
+        sketch = DatasetSketch()
+        sketch.add_batch(pa.RecordBatch.from_pydict({"id": ids}))
+
+        column = sketch.summary()["columns"]["id"]
+        assert column["distinct_count"] == pytest.approx(5000, rel=0.05)
+        assert column["dtype"] == "int64"
+
+    def test_date_column_dtype(self):
+        """
+        CSVの日付の列の型が、pandasで読み込んだ場合と同じobjectになることを確認
+        """
+        content = b"day,x\n2024-01-01,1\n2024-01-02,2\n2024-01-02,3\n"
+        s3 = MemoryS3Client({"data.csv": content})
+
+        with patch("boto3.client", return_value=s3):
+            result = profile_dataset(s3_uri="s3://bucket/data.csv", save=False)
+
+        expected = pd.read_csv(io.BytesIO(content)).dtypes
+        assert {name: column["dtype"] for name, column in result["columns"].items()} == {
+            name: str(dtype) for name, dtype in expected.items()
+        }
+        assert result["columns"]["day"]["distinct_count"] == 2
+
+    def test_artifact_round_trip(self):
+        """
+        アーティファクト（gzip圧縮したJSON）から同じ要約が復元されることを確認
+        """
+        sketch = _sketch(_sample_frame())
+        content = sketch.to_bytes()
+        restored = DatasetSketch.from_bytes(content)
+
+        assert restored.summary() == sketch.summary()
+        # 2万行・3列でも固定サイズ
+        assert len(content) < 30_000
+
+        with pytest.raises(ValueError, match="Invalid dataset sketch"):
+            DatasetSketch.from_bytes(b"not gzip")
+
+    def test_merge_different_parameters(self):
+        """
+        パラメーターが異なるスケッチのマージ・不正なパラメーターはValueErrorになることを確認
+        """
+        with pytest.raises(ValueError, match="different parameters"):
+            DatasetSketch(histogram_bins=16).merge(DatasetSketch(histogram_bins=32))
+        with pytest.raises(ValueError, match="histogram bins"):
+            DatasetSketch(histogram_bins=1)
+
+
+class TestSketchComponents:
+    """
+    HyperLogLog・固定ビンのヒストグラムのテスト
+    """
+
+    def test_hyperloglog_accuracy(self):
+        """
+        異なり数の推定誤差が小さい場合も大きい場合も数%以内であることを確認
+        """
+        rng = np.random.default_rng(1)
+        for distinct in (10, 1000, 200_000):
+            hll = HyperLogLog()
+            values = rng.random(distinct)
+            # 重複した値は異なり数に影響しない
+            hll.add_hashes(pd.util.hash_array(np.concatenate([values, values[: distinct // 2]])))
+            assert hll.estimate() == pytest.approx(distinct, rel=0.05)
+
+    def test_histogram_widens_and_merges_exactly(self):
+        """
+        範囲が広がると幅が2のべき乗で広がり、範囲の異なるヒストグラムのマージも
+        同じ境界での正確な度数になることを確認
+        """
+        left, right = FixedBinHistogram(8), FixedBinHistogram(8)
+        left.add(np.array([0.1, 0.2, 0.7]))
+        right.add(np.array([-3.0, 40.0, 41.0]))
+        left.merge(right)
+
+        result = left.to_dict()
+        widths = np.diff(result["edges"])
+        assert np.all(widths == widths[0]) and np.log2(widths[0]).is_integer()
+        assert len(result["counts"]) <= 8
+        counts, _ = np.histogram([0.1, 0.2, 0.7, -3.0, 40.0, 41.0], bins=result["edges"])
+        assert result["counts"] == counts.tolist()
+
+    def test_artifact_key(self):
+        """
+        アーティファクトが"_"で始まる名前でデータセットの隣に置かれることを確認
+        """
+        assert sketch_artifact_key("data/train.csv") == "data/_train.csv.sketch.json.gz"
+        assert sketch_artifact_key("train.csv") == "_train.csv.sketch.json.gz"
+        assert sketch_artifact_key("data/shards/") == "data/shards/_sketch.json.gz"
+
+
+class MemoryS3Client:
+    """head_object・get_object（範囲指定）・put_object・list_objects_v2に応答するS3のスタブ"""
+
+    def __init__(self, objects: dict):
+        self.objects = dict(objects)
+        self.gets = []
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError(
+                {"Error": {"Code": "404", "Message": "Not Found"}, "ResponseMetadata": {}},
+                "HeadObject",
+            )
+        content = self.objects[Key]
+        return {"ETag": f'"{hash(content)}"', "ContentLength": len(content)}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self.gets.append(Key)
+        content = self.objects[Key]
+        response = {"ETag": self.head_object(Bucket, Key)["ETag"]}
+        if Range is not None:
+            first, last = (int(value) for value in Range[len("bytes=") :].split("-"))
+            end = min(last, len(content) - 1)
+            response["ContentRange"] = f"bytes {first}-{end}/{len(content)}"
+            content = content[first : end + 1]
+        return {**response, "Body": io.BytesIO(content), "ContentLength": len(content)}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        return {
+            "Contents": [{"Key": key, "Size": len(self.objects[key])} for key in keys],
+            "IsTruncated": False,
+        }
+
+
+class TestProfileDataset:
+    """
+    profile_datasetツールのテスト
+    """
+
+    @staticmethod
+    def _csv(df: pd.DataFrame) -> bytes:
+        return df.to_csv(index=False).encode("utf-8")
+
+    def test_build_save_and_reuse(self):
+        """
+        作成したスケッチがデータセットの隣に保存され、次の呼び出しでは再走査せずに
+        使用され、データセットが変更されると作り直されることを確認
+        """
+        df = _sample_frame(2000)
+        s3 = MemoryS3Client({"data/train.csv": self._csv(df)})
+
+        with patch("boto3.client", return_value=s3):
+            first = profile_dataset(s3_uri="s3://bucket/data/train.csv")
+            assert first["reused_sketch"] is False
+            assert first["sketch_uri"] == "s3://bucket/data/_train.csv.sketch.json.gz"
+            assert first["rows"] == len(df)
+            assert first["columns"]["city"]["distinct_count"] == 4
+
+            s3.gets.clear()
+            second = profile_dataset(s3_uri="s3://bucket/data/train.csv", columns=["amount"])
+            assert second["reused_sketch"] is True
+            assert "data/train.csv" not in s3.gets
+            assert list(second["columns"]) == ["amount"]
+            assert second["columns"]["amount"] == first["columns"]["amount"]
+
+            s3.objects["data/train.csv"] = self._csv(df.iloc[:1000])
+            third = profile_dataset(s3_uri="s3://bucket/data/train.csv")
+            assert third["reused_sketch"] is False
+            assert third["rows"] == 1000
+
+    def test_sharded_dataset(self):
+        """
+        プレフィックスのパートごとのスケッチがマージされ、アーティファクトはパートとして
+        扱われないことを確認
+        """
+        df = _sample_frame(3000)
+        s3 = MemoryS3Client(
+            {
+                f"data/shards/part-{index}.csv": self._csv(
+                    df.iloc[index * 1000 : (index + 1) * 1000]
+                )
+                for index in range(3)
+            }
+        )
+
+        with patch("boto3.client", return_value=s3):
+            result = profile_dataset(s3_uri="s3://bucket/data/shards/", histogram_bins=16)
+            assert "data/shards/_sketch.json.gz" in s3.objects
+            reused = profile_dataset(s3_uri="s3://bucket/data/shards/", histogram_bins=16)
+
+        assert result["rows"] == len(df)
+        assert result["columns"]["amount"]["mean"] == pytest.approx(df.amount.mean())
+        assert reused["reused_sketch"] is True
+        assert reused["rows"] == len(df)
+
+    def test_invalid_s3_uri(self):
+        """
+        無効なS3 URIのエラーハンドリングテスト
+        """
+        with pytest.raises(ValueError, match="Invalid S3 URI"):
+            profile_dataset(s3_uri="invalid://bucket/data.csv")
@@ -0,0 +1,258 @@
+"""
+Metrics Unit Tests
+
+ツール呼び出しメトリクスのプロセス内集計のユニットテスト
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common.metrics import (
+    PUT_METRIC_DATA_BATCH_LIMIT,
+    Histogram,
+    MetricsPublisher,
+    ToolMetrics,
+)
+
+
+class TestHistogram:
+    """
+    Histogramのユニットテスト
+    """
+
+    def test_quantiles_interpolated_within_buckets(self):
+        """
+        分位点がバケット内の線形補間で推定されることを確認
+        """
+        histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+        for value in [0.5] * 50 + [1.5] * 45 + [3.0] * 5:
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == pytest.approx(1.0)
+        assert histogram.quantile(0.95) == pytest.approx(2.0)
+        assert histogram.quantile(0.99) == pytest.approx(2.0 + 2.0 * 4 / 5)
+        assert histogram.count == 100
+        assert histogram.sum == pytest.approx(25 + 67.5 + 15)
+
+    def test_empty_and_overflow(self):
+        """
+        観測がない場合はNone、上限を超えた観測は最大の上限で代表されることを確認
+        """
+        histogram = Histogram(buckets=(1.0, 2.0))
+        assert histogram.quantile(0.5) is None
+
+        histogram.observe(10.0)
+
+        assert histogram.quantile(0.99) == 2.0
+        assert histogram.cumulative_counts() == [("1.0", 0), ("2.0", 0), ("+Inf", 1)]
+
+
+class TestToolMetrics:
+    """
+    ToolMetricsのユニットテスト
+    """
+
+    @pytest.fixture
+    def metrics(self):
+        """2回の呼び出し（成功・失敗）とS3転送を記録した集計"""
+        metrics = ToolMetrics(buckets=(0.1, 1.0))
+        metrics.call_started("data_preparation.load_dataset")
+        metrics.call_started("data_preparation.load_dataset")
+        metrics.record_queue_wait("data_preparation.load_dataset", 0.05)
+        metrics.record_s3_io("data_preparation.load_dataset", 2048, 0, 3, 1)
+        metrics.call_finished("data_preparation.load_dataset", 0.05, "success")
+        metrics.call_finished("data_preparation.load_dataset", 0.5, "error")
+        return metrics
+
+    def test_summary(self, metrics):
+        """
+        ツールごとの呼び出し数・エラー数・分位点・S3転送量が集計されることを確認
+        """
+        summary = metrics.summary()["data_preparation.load_dataset"]
+
+        assert summary["calls"] == 2
+        assert summary["errors"] == 1
+        assert summary["outcomes"] == {"success": 1, "error": 1}
+        assert summary["in_flight"] == 0
+        assert summary["latency_ms"]["p50"] == pytest.approx(100.0)
+        assert summary["queue_wait_ms"]["p99"] is not None
+        assert summary["s3_bytes_read"] == 2048
+        assert (summary["s3_cache_hits"], summary["s3_cache_misses"]) == (3, 1)
+        assert summary["s3_cache_hit_ratio"] == 0.75
+
+    def test_render_prometheus(self, metrics):
+        """
+        Prometheusのテキスト形式で出力されることを確認
+        """
+        text = metrics.render_prometheus()
+        lines = text.splitlines()
+        tool = 'tool="data_preparation.load_dataset"'
+
+        assert "# TYPE mlops_tool_call_duration_seconds histogram" in lines
+        assert f'mlops_tool_call_duration_seconds_bucket{{{tool},le="0.1"}} 1' in lines
+        assert f'mlops_tool_call_duration_seconds_bucket{{{tool},le="+Inf"}} 2' in lines
+        assert f"mlops_tool_call_duration_seconds_count{{{tool}}} 2" in lines
+        assert f'mlops_tool_calls_total{{{tool},outcome="error"}} 1' in lines
+        assert f"mlops_tool_calls_in_flight{{{tool}}} 0" in lines
+        assert f"mlops_s3_bytes_read_total{{{tool}}} 2048" in lines
+        assert f"mlops_s3_cache_hits_total{{{tool}}} 3" in lines
+        assert text.endswith("\n")
+
+    def test_label_escaping(self):
+        """
+        ラベル値のダブルクォート・バックスラッシュがエスケープされることを確認
+        """
+        metrics = ToolMetrics()
+        metrics.call_started('test."quoted\\')
+        metrics.call_finished('test."quoted\\', 0.01, "success")
+
+        assert 'tool="test.\\"quoted\\\\"' in metrics.render_prometheus()
+
+
+class TestMetricsPublisher:
+    """
+    MetricsPublisherのユニットテスト
+    """
+
+    @pytest.fixture
+    def cloudwatch(self):
+        """モックCloudWatchクライアント"""
+        with patch("boto3.client") as mock_client:
+            mock_cloudwatch = Mock()
+            mock_client.return_value = mock_cloudwatch
+            yield mock_cloudwatch
+
+    @pytest.fixture
+    def config(self):
+        return SimpleNamespace(aws_region="us-east-1")
+
+    def test_put_metric_does_not_call_api(self, cloudwatch, config):
+        """
+        put_metricの時点ではAPIを呼び出さず、flushで統計セットにまとめて送信することを確認
+        """
+        publisher = MetricsPublisher(config, flush_interval=60)
+        for duration in (10.0, 30.0, 20.0):
+            publisher.record_tool_execution("data_preparation.load_dataset", duration, True)
+        publisher.record_tool_execution("data_preparation.load_dataset", 5.0, False)
+
+        assert cloudwatch.put_metric_data.call_count == 0
+
+        publisher.close()
+
+        cloudwatch.put_metric_data.assert_called_once()
+        kwargs = cloudwatch.put_metric_data.call_args.kwargs
+        assert kwargs["Namespace"] == "MLOps/UnifiedMCPServer"
+        success, failure = kwargs["MetricData"]
+        assert success["MetricName"] == "ToolExecutionDuration"
+        assert success["Unit"] == "Milliseconds"
+        assert success["StatisticValues"] == {
+            "SampleCount": 3,
+            "Sum": 60.0,
+            "Minimum": 10.0,
+            "Maximum": 30.0,
+        }
+        assert success["Dimensions"] == [
+            {"Name": "ToolName", "Value": "data_preparation.load_dataset"},
+            {"Name": "Success", "Value": "True"},
+        ]
+        assert failure["StatisticValues"]["SampleCount"] == 1
+        assert publisher.stats()["published_points"] == 4
+
+    def test_size_trigger_flushes_in_batches(self, cloudwatch, config):
+        """
+        メトリクス数がAPIの上限に達すると、送信間隔を待たずに上限件数ごとに送信することを確認
+        """
+        sent = threading.Event()
+        cloudwatch.put_metric_data.side_effect = lambda **kwargs: sent.set()
+        publisher = MetricsPublisher(config, flush_interval=60)
+
+        for i in range(PUT_METRIC_DATA_BATCH_LIMIT):
+            publisher.put_metric(f"Metric{i}", 1.0)
+
+        assert sent.wait(timeout=5)
+        publisher.close()
+
+        batches = [c.kwargs["MetricData"] for c in cloudwatch.put_metric_data.call_args_list]
+        assert all(len(batch) <= PUT_METRIC_DATA_BATCH_LIMIT for batch in batches)
+        assert sum(len(batch) for batch in batches) == PUT_METRIC_DATA_BATCH_LIMIT
+
+    def test_time_trigger(self, cloudwatch, config):
+        """
+        送信間隔ごとにバックグラウンドで送信されることを確認
+        """
+        sent = threading.Event()
+        cloudwatch.put_metric_data.side_effect = lambda **kwargs: sent.set()
+        publisher = MetricsPublisher(config, flush_interval=0.05)
+
+        publisher.put_metric("TrainingJobDuration", 12.0, unit="Seconds")
+
+        assert sent.wait(timeout=5)
+        publisher.close()
+
+    def test_api_failure_drops_points(self, cloudwatch, config):
+        """
+        送信に失敗しても例外を送出せず、破棄したデータポイント数を記録することを確認
+        """
+        cloudwatch.put_metric_data.side_effect = RuntimeError("throttled")
+        publisher = MetricsPublisher(config, flush_interval=60)
+        publisher.put_metric("TrainingJobDuration", 12.0, unit="Seconds")
+
+        publisher.close()
+
+        assert publisher.stats()["dropped_points"] == 1
+        assert publisher.stats()["buffered_points"] == 0
+
+    def test_emf_mode(self, config):
+        """
+        EMFモードではAPIを呼び出さずにEmbedded Metric Formatのログ行を出力することを確認
+        """
+        output = io.StringIO()
+        with patch("boto3.client") as mock_client:
+            publisher = MetricsPublisher(config, mode="emf", emf_output=output)
+            publisher.record_tool_execution("ml_training.train_classification", 120.0, True)
+            publisher.record_tool_execution("ml_training.train_classification", 80.0, True)
+            publisher.record_training_job("supervised", 3.5)
+            publisher.close()
+
+        mock_client.assert_not_called()
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert len(records) == 2
+        tool_record = records[0]
+        directive = tool_record["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Namespace"] == "MLOps/UnifiedMCPServer"
+        assert directive["Dimensions"] == [["ToolName", "Success"]]
+        assert directive["Metrics"] == [{"Name": "ToolExecutionDuration", "Unit": "Milliseconds"}]
+        assert tool_record["ToolName"] == "ml_training.train_classification"
+        assert tool_record["Success"] == "True"
+        assert tool_record["ToolExecutionDuration"] == [120.0, 80.0]
+        assert records[1]["TrainingJobDuration"] == 3.5
+
+    def test_emf_values_split_across_lines(self, config):
+        """
+        EMFの1行あたりの値の上限を超える場合は複数行に分割されることを確認
+        """
+        output = io.StringIO()
+        publisher = MetricsPublisher(config, mode="emf", emf_output=output)
+        for i in range(150):
+            publisher.put_metric("Latency", float(i))
+        publisher.close()
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [len(r["Latency"]) for r in records] == [100, 50]
+
+    def test_invalid_mode(self, config):
+        """
+        未知の送信方法はエラーになることを確認
+        """
+        with pytest.raises(ValueError, match="Unknown metrics publish mode"):
+            MetricsPublisher(config, mode="statsd")
@@ -21,6 +21,8 @@ from capabilities.ml_evaluation.tools.evaluate_classification import evaluate_cl
 from capabilities.ml_evaluation.tools.evaluate_clustering import evaluate_clustering
 from capabilities.ml_evaluation.tools.evaluate_regression import evaluate_regression
 
+from mcp_server.common.tracing import run_with_trace
+
 
 class TestEvaluateClassification:
     """
@@ -65,7 +67,7 @@ class TestEvaluateClassification:
 
             mock_s3 = Mock()
 
-            def get_object_side_effect(Bucket, Key):
+            def get_object_side_effect(Bucket, Key, **kwargs):
                 if "model.pkl" in Key:
                     return {"Body": io.BytesIO(model_buffer.getvalue())}
                 else:
@@ -76,6 +78,36 @@ class TestEvaluateClassification:
 
             yield mock_s3
 
+    def test_evaluate_classification_traced_phases(self, mock_s3_classification):
+        """
+        分類モデル評価の処理段階がスパンとして記録されることを確認
+        """
+        result, spans = run_with_trace(
+            ("a" * 32, "b" * 16),
+            "tool.execute",
+            {},
+            lambda: evaluate_classification(
+                model_s3_uri="s3://test-bucket/model.pkl",
+                test_data_s3_uri="s3://test-bucket/test.csv",
+            ),
+        )
+
+        assert result["status"] == "success"
+        assert [s.name for s in spans] == [
+            "s3.download",
+            "joblib.load",
+            "pyarrow.read_csv",
+            "model.predict",
+            "metrics.accuracy",
+            "metrics.precision",
+            "metrics.recall",
+            "metrics.f1",
+            "metrics.confusion_matrix",
+            "metrics.classification_report",
+            "tool.execute",
+        ]
+        assert spans[2].attributes["mlops.rows"] == 10
+
     def test_evaluate_classification_success(self, mock_s3_classification):
         """
         分類モデル評価の成功テスト
@@ -177,7 +209,7 @@ class TestEvaluateRegression:
 
             mock_s3 = Mock()
 
-            def get_object_side_effect(Bucket, Key):
+            def get_object_side_effect(Bucket, Key, **kwargs):
                 if "model.pkl" in Key:
                     return {"Body": io.BytesIO(model_buffer.getvalue())}
                 else:
@@ -263,7 +295,7 @@ class TestEvaluateClustering:
 
             mock_s3 = Mock()
 
-            def get_object_side_effect(Bucket, Key):
+            def get_object_side_effect(Bucket, Key, **kwargs):
                 if "model.pkl" in Key:
                     return {"Body": io.BytesIO(model_buffer.getvalue())}
                 else:
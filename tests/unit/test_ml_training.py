@@ -11,14 +11,21 @@ from unittest.mock import Mock, patch
 
 import pandas as pd
 import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neural_network import MLPClassifier
 
 # Add mcp_server to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "mcp_server"))
 
+from capabilities.ml_training.tools.fit_utils import fit_with_checkpoints
 from capabilities.ml_training.tools.train_classification import train_classification
 from capabilities.ml_training.tools.train_clustering import train_clustering
 from capabilities.ml_training.tools.train_regression import train_regression
 
+from mcp_server.common.cancellation import CancellationToken, run_with_token
+from mcp_server.common.exceptions import ToolCancelledError
+
 
 class TestTrainClassification:
     """
@@ -300,3 +307,70 @@ class TestTrainClustering:
         assert result["status"] == "success"
         assert result["training_results"]["algorithm"] == "pca"
         assert result["training_results"]["n_clusters"] == 1
+
+
+class _CancelAfterChecks:
+    """指定回数の確認後にキャンセル状態になるEvent代替"""
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    def is_set(self):
+        self.checks -= 1
+        return self.checks < 0
+
+    def set(self):
+        self.checks = 0
+
+    def wait(self, timeout=None):
+        return self.is_set()
+
+
+class TestFitWithCheckpoints:
+    """
+    fit_with_checkpoints関数のユニットテスト
+    """
+
+    @pytest.fixture
+    def classification_data(self):
+        """学習用データ"""
+        return make_classification(n_samples=200, n_features=8, random_state=0)
+
+    def test_forest_matches_single_fit(self, classification_data):
+        """
+        分割して学習したフォレストが一括学習と同じ結果になることを確認
+        """
+        X, y = classification_data
+        expected = RandomForestClassifier(n_estimators=25, random_state=42).fit(X, y)
+
+        model = RandomForestClassifier(n_estimators=25, random_state=42)
+        run_with_token(CancellationToken(), lambda: fit_with_checkpoints(model, X, y))
+
+        assert len(model.estimators_) == 25
+        assert model.n_estimators == 25
+        assert model.warm_start is False
+        assert (model.predict_proba(X) == expected.predict_proba(X)).all()
+
+    def test_mlp_cancelled_between_epochs(self, classification_data):
+        """
+        ニューラルネットワークの学習がエポックの区切りで中断されることを確認
+        """
+        X, y = classification_data
+        model = MLPClassifier(max_iter=200, tol=0, n_iter_no_change=1000, random_state=0)
+        token = CancellationToken(event=_CancelAfterChecks(5))
+
+        with pytest.raises(ToolCancelledError):
+            run_with_token(token, lambda: fit_with_checkpoints(model, X, y))
+
+        assert model.n_iter_ < 200
+        # 一時的に差し込んだチェックポイントは残らない（モデルをpickleできる）
+        assert "_update_no_improvement_count" not in vars(model)
+
+    def test_fit_without_token(self, classification_data):
+        """
+        ツール呼び出し外（トークンなし）では通常どおり学習されることを確認
+        """
+        X, y = classification_data
+        model = fit_with_checkpoints(RandomForestClassifier(n_estimators=5), X, y)
+
+        assert len(model.estimators_) == 5
@@ -7,6 +7,8 @@ Model Deployment toolsのユニットテスト
 import json
 import os
 import sys
+import threading
+import time
 from datetime import datetime
 from unittest.mock import Mock, patch
 
@@ -26,6 +28,11 @@ from capabilities.model_deployment.tools import (
     update_endpoint_capacity,
     update_endpoint_traffic,
 )
+from capabilities.model_deployment.tools.deploy_to_sagemaker import _wait_for_endpoint
+
+from mcp_server.common.cancellation import CancellationToken, run_with_token
+from mcp_server.common.exceptions import DeadlineExceededError, ToolCancelledError
+from mcp_server.common.progress import ProgressReporter, run_with_progress
 
 
 class TestDeployToSageMaker:
@@ -165,6 +172,63 @@ class TestDeployToSageMaker:
             )
 
 
+class TestWaitForEndpoint:
+    """
+    _wait_for_endpoint関数（デプロイ完了待ち）のユニットテスト
+    """
+
+    @pytest.fixture
+    def creating_endpoint(self):
+        """作成中のまま変化しないエンドポイント"""
+        mock_sagemaker = Mock()
+        mock_sagemaker.describe_endpoint.return_value = {"EndpointStatus": "Creating"}
+        return mock_sagemaker
+
+    def test_polling_stops_when_cancelled(self, creating_endpoint):
+        """
+        キャンセルされるとポーリングの待機中でも速やかに中断されることを確認
+        """
+        token = CancellationToken()
+        threading.Timer(0.2, token.cancel).start()
+
+        start = time.monotonic()
+        with pytest.raises(ToolCancelledError):
+            run_with_token(token, lambda: _wait_for_endpoint(creating_endpoint, "test-endpoint"))
+
+        assert time.monotonic() - start < 5
+        assert creating_endpoint.describe_endpoint.call_count == 1
+
+    def test_polling_stops_at_deadline(self, creating_endpoint):
+        """
+        呼び出しの期限でポーリングが中断されることを確認
+        """
+        token = CancellationToken.with_timeout(0.2)
+
+        with pytest.raises(DeadlineExceededError):
+            run_with_token(token, lambda: _wait_for_endpoint(creating_endpoint, "test-endpoint"))
+
+    def test_status_transitions_reported(self):
+        """
+        エンドポイントの状態が遷移した時点でのみ進捗が報告されることを確認
+        """
+        mock_sagemaker = Mock()
+        mock_sagemaker.describe_endpoint.side_effect = [
+            {"EndpointStatus": "Creating"},
+            {"EndpointStatus": "Creating"},
+            {"EndpointStatus": "InService"},
+        ]
+        updates = []
+        reporter = ProgressReporter(updates.append, min_interval=0)
+
+        with patch("time.sleep"):
+            run_with_progress(reporter, lambda: _wait_for_endpoint(mock_sagemaker, "test-endpoint"))
+
+        assert [update["message"] for update in updates] == [
+            "Endpoint test-endpoint: Creating",
+            "Endpoint test-endpoint: InService",
+        ]
+
+
 class TestUpdateEndpointTraffic:
     """
     update_endpoint_traffic関数のユニットテスト
@@ -479,7 +543,7 @@ class TestMonitorEndpoint:
         """エンドポイント監視用モッククライアント"""
         with patch("boto3.client") as mock_client:
 
-            def client_factory(service_name):
+            def client_factory(service_name, **kwargs):
                 if service_name == "sagemaker":
                     mock_sagemaker = Mock()
                     mock_sagemaker.describe_endpoint.return_value = {
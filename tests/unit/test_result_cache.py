@@ -0,0 +1,205 @@
+"""
+Result Cache Unit Tests
+
+ツール結果キャッシュとS3読み込み追跡のユニットテスト
+"""
+
+import io
+import os
+import sys
+
+import boto3
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common.s3_utils import call_with_s3_tracking, install_s3_read_hooks
+from mcp_server.result_cache import ResultCache
+
+OBJECTS = [("bucket", "data.csv", '"v1"')]
+
+
+def _always_unchanged(objects):
+    return True
+
+
+def _always_changed(objects):
+    return False
+
+
+@pytest.fixture
+def s3_client():
+    """S3読み込み追跡フックを登録したスタブ付きS3クライアント"""
+    install_s3_read_hooks()
+    client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    with Stubber(client) as stubber:
+        yield client, stubber
+        stubber.assert_no_pending_responses()
+
+
+class TestResultCache:
+    """
+    ResultCacheのテスト
+    """
+
+    def test_put_and_lookup(self):
+        """
+        保存した結果がETag確認後に返されることを確認
+        """
+        cache = ResultCache(max_bytes=1024)
+        cache.put("tool\nargs", {"rows": 3}, OBJECTS)
+
+        checked = []
+        hit, result = cache.lookup("tool\nargs", lambda objects: checked.append(objects) or True)
+
+        assert hit is True
+        assert result == {"rows": 3}
+        assert checked == [OBJECTS]
+        assert cache.stats()["hits"] == 1
+
+    def test_lookup_returns_independent_copies(self):
+        """
+        返された結果を変更してもキャッシュに影響しないことを確認
+        """
+        cache = ResultCache(max_bytes=1024)
+        cache.put("key", {"columns": ["a"]}, OBJECTS)
+
+        _, first = cache.lookup("key", _always_unchanged)
+        first["columns"].append("b")
+        _, second = cache.lookup("key", _always_unchanged)
+
+        assert second == {"columns": ["a"]}
+
+    def test_stale_entry_is_invalidated(self):
+        """
+        S3オブジェクトが変更された場合はミスとして扱い、エントリを削除することを確認
+        """
+        cache = ResultCache(max_bytes=1024)
+        cache.put("key", {"rows": 3}, OBJECTS)
+
+        hit, _ = cache.lookup("key", _always_changed)
+        stats = cache.stats()
+
+        assert hit is False
+        assert stats["stale"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 0
+
+    def test_eviction_bounded_by_size(self):
+        """
+        上限サイズを超えると古いエントリから追い出されることを確認
+        """
+        cache = ResultCache(max_bytes=100)
+        for i in range(5):
+            cache.put(f"key{i}", {"value": "x" * 20}, OBJECTS)
+        stats = cache.stats()
+
+        assert stats["bytes"] <= 100
+        assert stats["evictions"] == 5 - stats["entries"]
+        assert cache.lookup("key0", _always_unchanged)[0] is False
+        assert cache.lookup("key4", _always_unchanged)[0] is True
+
+    def test_uncacheable_result(self):
+        """
+        JSONにできない結果は保存しないことを確認
+        """
+        cache = ResultCache(max_bytes=1024)
+
+        assert cache.put("key", {"value": object()}, OBJECTS) is False
+        assert cache.stats()["entries"] == 0
+
+    def test_disk_tier(self, tmp_path):
+        """
+        メモリから追い出されたエントリがディスクから返されることを確認
+        """
+        cache = ResultCache(max_bytes=40, disk_dir=str(tmp_path), disk_max_bytes=10_000)
+        cache.put("key0", {"value": "x" * 20}, OBJECTS)
+        cache.put("key1", {"value": "y" * 20}, OBJECTS)
+
+        assert cache.stats()["disk_entries"] == 1
+
+        hit, result = cache.lookup("key0", _always_unchanged)
+
+        assert hit is True
+        assert result == {"value": "x" * 20}
+        assert cache.stats()["disk_hits"] == 1
+
+        # 再起動後もディスク上のエントリを利用できる
+        restarted = ResultCache(max_bytes=40, disk_dir=str(tmp_path), disk_max_bytes=10_000)
+        assert restarted.lookup("key1", _always_unchanged) == (True, {"value": "y" * 20})
+
+    def test_disk_tier_bounded_by_size(self, tmp_path):
+        """
+        ディスク上のキャッシュも上限サイズを超えると追い出されることを確認
+        """
+        cache = ResultCache(max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=500)
+        for i in range(10):
+            cache.put(f"key{i}", {"value": "x" * 50}, OBJECTS)
+        stats = cache.stats()
+
+        assert stats["disk_bytes"] <= 500
+        assert stats["disk_evictions"] > 0
+        assert len(list(tmp_path.glob("*.json"))) == stats["disk_entries"]
+
+
+class TestS3ReadTracking:
+    """
+    S3読み込み追跡のテスト
+    """
+
+    def test_records_etags_and_missing_objects(self, s3_client):
+        """
+        GetObjectのETagと、存在しないオブジェクトが記録されることを確認
+        """
+        client, stubber = s3_client
+        stubber.add_response(
+            "get_object",
+            {"ETag": '"v1"', "Body": StreamingBody(io.BytesIO(b"a,b\n1,2\n"), 8)},
+            {"Bucket": "bucket", "Key": "data.csv"},
+        )
+        stubber.add_client_error(
+            "head_object",
+            "404",
+            http_status_code=404,
+            expected_params={"Bucket": "bucket", "Key": "missing.json"},
+        )
+
+        def tool():
+            client.get_object(Bucket="bucket", Key="data.csv")["Body"].read()
+            try:
+                client.head_object(Bucket="bucket", Key="missing.json")
+            except client.exceptions.ClientError:
+                pass
+            return "done"
+
+        result, objects = call_with_s3_tracking(tool, {})
+
+        assert result == "done"
+        assert objects == [("bucket", "data.csv", '"v1"'), ("bucket", "missing.json", None)]
+
+    def test_listing_is_not_trackable(self, s3_client):
+        """
+        HEADで検証できない操作（ListObjects等）があった場合は追跡不能となることを確認
+        """
+        client, stubber = s3_client
+        stubber.add_response("list_objects_v2", {"Contents": []}, {"Bucket": "bucket"})
+
+        _, objects = call_with_s3_tracking(lambda: client.list_objects_v2(Bucket="bucket"), {})
+
+        assert objects is None
+
+    def test_untracked_outside_context(self, s3_client):
+        """
+        S3を読まない関数は追跡結果がNoneとなることを確認
+        """
+        _, objects = call_with_s3_tracking(lambda value: value, {"value": 1})
+
+        assert objects is None
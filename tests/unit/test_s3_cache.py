@@ -0,0 +1,109 @@
+"""
+S3 Object Cache Unit Tests
+
+S3オブジェクトのディスクキャッシュのユニットテスト
+"""
+
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common.s3_cache import S3ObjectCache
+
+
+def _store(cache: S3ObjectCache, key: str, content: bytes, etag: str = '"v1"') -> bool:
+    writer = cache.writer("bucket", key, etag, "text/csv", len(content))
+    if writer is None:
+        return False
+    writer.write(content)
+    return writer.commit()
+
+
+def _cached_path(cache: S3ObjectCache, key: str):
+    entry = cache.lookup("bucket", key)
+    entry.file.close()
+    return entry.path
+
+
+class TestS3ObjectCache:
+    """
+    S3ObjectCacheのテスト
+    """
+
+    def test_store_and_lookup(self, tmp_path):
+        """
+        保存したオブジェクトがETag・内容とともに読み出せることを確認
+        """
+        cache = S3ObjectCache(str(tmp_path), max_bytes=1024)
+        assert cache.lookup("bucket", "data.csv") is None
+        assert _store(cache, "data.csv", b"a,b\n1,2\n") is True
+
+        entry = cache.lookup("bucket", "data.csv")
+        assert (entry.etag, entry.content_type, entry.size) == ('"v1"', "text/csv", 8)
+        with cache.record_hit(entry) as f:
+            assert f.read() == b"a,b\n1,2\n"
+
+        cache.record_miss()
+        stats = cache.stats()
+        assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+        assert stats["hit_ratio"] == 0.5
+        assert stats["bytes_served"] == 8
+
+    def test_replaced_by_new_version(self, tmp_path):
+        """
+        同じキーの新しい版で置き換えられることを確認
+        """
+        cache = S3ObjectCache(str(tmp_path), max_bytes=1024)
+        _store(cache, "data.csv", b"old")
+        _store(cache, "data.csv", b"new!", etag='"v2"')
+
+        entry = cache.lookup("bucket", "data.csv")
+        with entry.file as f:
+            assert (entry.etag, f.read()) == ('"v2"', b"new!")
+        assert cache.stats()["entries"] == 1
+
+    def test_lru_eviction(self, tmp_path):
+        """
+        上限サイズを超えると最終アクセスが古いものから削除されることを確認
+        """
+        cache = S3ObjectCache(str(tmp_path), max_bytes=400)
+        for index, key in enumerate(("a.csv", "b.csv")):
+            _store(cache, key, b"x" * 100)
+            path = _cached_path(cache, key)
+            os.utime(path, (1000 + index, 1000 + index))
+
+        # a.csvを読むとb.csvの方が古くなる
+        entry = cache.lookup("bucket", "a.csv")
+        cache.record_hit(entry).close()
+        _store(cache, "c.csv", b"x" * 100)
+
+        assert cache.lookup("bucket", "b.csv") is None
+        assert _cached_path(cache, "a.csv") != _cached_path(cache, "c.csv")
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_and_incomplete_not_stored(self, tmp_path):
+        """
+        上限を超えるオブジェクトと途中までしか書き込んでいないオブジェクトは保存されないことを確認
+        """
+        cache = S3ObjectCache(str(tmp_path), max_bytes=10)
+        assert cache.writer("bucket", "big.csv", '"v1"', None, 11) is None
+        assert cache.writer("bucket", "no-etag.csv", None, None, 5) is None
+
+        writer = cache.writer("bucket", "partial.csv", '"v1"', None, 5)
+        writer.write(b"abc")
+        assert writer.commit() is False
+        assert cache.lookup("bucket", "partial.csv") is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_corrupted_file_ignored(self, tmp_path):
+        """
+        壊れたキャッシュファイルはミスとして扱われることを確認
+        """
+        cache = S3ObjectCache(str(tmp_path), max_bytes=1024)
+        _store(cache, "data.csv", b"a,b\n1,2\n")
+        path = _cached_path(cache, "data.csv")
+        path.write_bytes(b"not json\n")
+
+        assert cache.lookup("bucket", "data.csv") is None
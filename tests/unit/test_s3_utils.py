@@ -0,0 +1,1242 @@
+"""
+S3 Utils Unit Tests
+
+共有AWSクライアントとS3読み書きのユニットテスト
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common import s3_utils
+from mcp_server.common.cancellation import (
+    CancellationToken,
+    check_cancelled,
+    current_token,
+    run_with_token,
+)
+from mcp_server.common.exceptions import ToolCancelledError
+from mcp_server.common.progress import ProgressReporter, run_with_progress
+from mcp_server.common.s3_utils import (
+    MIN_UPLOAD_PART_BYTES,
+    TAIL_BYTES,
+    S3MultipartWriter,
+    S3RangeReader,
+    aws_client_info,
+    call_with_s3_io_counting,
+    configure_aws_clients,
+    dataset_cache_info,
+    download_object,
+    download_to_file,
+    get_client,
+    iter_batches,
+    list_dataset_parts,
+    load_from_s3,
+    read_dataset,
+    read_parquet_metadata,
+    read_table,
+    s3_cache_info,
+    save_to_s3,
+    track_s3_reads,
+    upload_parallel,
+)
+from mcp_server.common.tracing import run_with_trace
+from mcp_server.config import Config
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    """ダミーの認証情報（実際のAWSには接続しない）"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+class TestGetClient:
+    """
+    get_client（共有AWSクライアント）のテスト
+    """
+
+    def test_client_reused(self):
+        """
+        同じサービス・リージョンのクライアントは1度だけ作成されることを確認
+        """
+        with patch("boto3.client") as mock_client:
+            mock_client.side_effect = lambda service_name, **kwargs: Mock(name=service_name)
+            first = get_client("s3")
+            second = get_client("s3")
+            other_service = get_client("sagemaker")
+            other_region = get_client("s3", region_name="eu-west-1")
+
+        assert first is second
+        assert other_service is not first
+        assert other_region is not first
+        assert mock_client.call_count == 3
+
+    def test_concurrent_creation(self):
+        """
+        複数スレッドから同時に要求してもクライアントは1つだけ作成されることを確認
+        """
+
+        def slow_client(service_name, **kwargs):
+            time.sleep(0.05)
+            return Mock()
+
+        clients = []
+        with patch("boto3.client", side_effect=slow_client) as mock_client:
+            threads = [
+                threading.Thread(target=lambda: clients.append(get_client("s3"))) for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_client.call_count == 1
+        assert len({id(client) for client in clients}) == 1
+
+    def test_connection_settings_from_config(self, aws_credentials):
+        """
+        サーバー設定の接続プール・キープアライブ・リトライ設定が適用されることを確認
+        """
+        config = Config(
+            aws_region="ap-northeast-1",
+            s3_bucket="test-bucket",
+            aws_max_pool_connections=64,
+            aws_retry_mode="adaptive",
+            aws_max_attempts=7,
+        )
+        try:
+            configure_aws_clients(config)
+            client = get_client("s3")
+
+            assert client.meta.region_name == "ap-northeast-1"
+            assert client.meta.config.max_pool_connections == 64
+            assert client.meta.config.tcp_keepalive is True
+            assert client.meta.config.retries == {"mode": "adaptive", "total_max_attempts": 7}
+            assert aws_client_info()["clients"] == ["s3@ap-northeast-1"]
+        finally:
+            configure_aws_clients(Config(aws_region=None, s3_bucket="test-bucket"))
+
+    def test_configure_discards_clients(self):
+        """
+        設定を変更すると作成済みのクライアントが作成し直されることを確認
+        """
+        with patch("boto3.client", side_effect=lambda *args, **kwargs: Mock()):
+            before = get_client("s3")
+            configure_aws_clients(Config(aws_region=None, s3_bucket="test-bucket"))
+            after = get_client("s3")
+
+        assert before is not after
+
+    def test_s3_io_hooks_applied(self, aws_credentials):
+        """
+        共有クライアントのS3転送量がツール実行ごとに数えられることを確認
+        """
+        client = get_client("s3")
+        content = b"a,b\n1,2\n"
+
+        def copy_object():
+            body = load_from_s3("b", "in.csv")["body"]
+            return save_to_s3("b", "out.csv", body * 2)
+
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                "get_object",
+                {
+                    "Body": StreamingBody(io.BytesIO(content), len(content)),
+                    "ContentLength": len(content),
+                    "ETag": '"v1"',
+                },
+                {"Bucket": "b", "Key": "in.csv", "Range": "bytes=0-8388607"},
+            )
+            stubber.add_response(
+                "put_object", {}, {"Bucket": "b", "Key": "out.csv", "Body": content * 2}
+            )
+            result, io_stats = call_with_s3_io_counting(copy_object)
+
+        assert result is True
+        assert io_stats.bytes_read == len(content)
+        assert io_stats.bytes_written == len(content) * 2
+
+
+class RangeS3Client:
+    """範囲指定GET（Range, IfMatch）に応答するS3クライアントのスタブ"""
+
+    def __init__(self, content: bytes, etag: str = '"v1"'):
+        self.content = content
+        self.etag = etag
+        self.calls = []
+        self.bytes_sent = 0
+        self.not_modified = 0
+        self.heads = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        with self._lock:
+            self.heads += 1
+        return {"ETag": self.etag, "ContentLength": len(self.content)}
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None, IfNoneMatch=None):
+        with self._lock:
+            self.calls.append((Range, IfMatch))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            if IfNoneMatch is not None and IfNoneMatch == self.etag:
+                self.not_modified += 1
+                raise ClientError(
+                    {"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject"
+                )
+            if IfMatch is not None and IfMatch != self.etag:
+                raise ClientError(
+                    {"Error": {"Code": "PreconditionFailed", "Message": "At least one"}},
+                    "GetObject",
+                )
+            if Range is None:
+                return {"Body": io.BytesIO(self.content), "ETag": self.etag}
+            first, last = Range[len("bytes=") :].split("-")
+            if first:
+                start, end = int(first), int(last)
+            else:
+                # 末尾からのバイト数（bytes=-N）
+                start, end = max(0, len(self.content) - int(last)), len(self.content) - 1
+            if start >= len(self.content):
+                raise ClientError(
+                    {"Error": {"Code": "InvalidRange", "Message": "Not satisfiable"}},
+                    "GetObject",
+                )
+            end = min(end, len(self.content) - 1)
+            with self._lock:
+                self.bytes_sent += end - start + 1
+            return {
+                "Body": io.BytesIO(self.content[start : end + 1]),
+                "ContentLength": end - start + 1,
+                "ContentRange": f"bytes {start}-{end}/{len(self.content)}",
+                "ETag": self.etag,
+            }
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestRangedDownload:
+    """
+    範囲指定GETによる並列ダウンロードのテスト
+    """
+
+    def test_parts_fetched_concurrently(self):
+        """
+        パートサイズを超えるオブジェクトが並列に取得され、順番どおりに連結されることを確認
+        """
+        content = os.urandom(10 * 1000 + 7)
+        s3 = RangeS3Client(content)
+
+        data = download_object(s3, "bucket", "model.pkl", part_bytes=1000, concurrency=4)
+
+        assert data == content
+        assert len(s3.calls) == 11
+        assert s3.calls[0] == ("bytes=0-999", None)
+        # 2番目以降のパートは最初のパートと同じ版のみを取得
+        assert all(if_match == '"v1"' for _, if_match in s3.calls[1:])
+        assert 1 < s3.max_in_flight <= 4
+
+    def test_small_object_single_request(self):
+        """
+        パートサイズ以下のオブジェクトは1回のGETで取得されることを確認
+        """
+        s3 = RangeS3Client(b"small")
+
+        assert download_object(s3, "bucket", "key", part_bytes=1000) == b"small"
+        assert s3.calls == [("bytes=0-999", None)]
+
+    def test_empty_object(self):
+        """
+        空のオブジェクト（範囲指定不可）は範囲指定なしで取得されることを確認
+        """
+        s3 = RangeS3Client(b"")
+
+        assert download_object(s3, "bucket", "key", part_bytes=1000) == b""
+        assert s3.calls == [("bytes=0-999", None), (None, None)]
+
+    def test_object_changed_during_download(self):
+        """
+        ダウンロード中にオブジェクトが更新された場合は異なる版を混ぜずにエラーになることを確認
+        """
+        s3 = RangeS3Client(os.urandom(3000))
+        original_get = s3.get_object
+
+        def get_then_update(**kwargs):
+            response = original_get(**kwargs)
+            s3.etag = '"v2"'
+            return response
+
+        s3.get_object = get_then_update
+
+        with pytest.raises(ClientError, match="PreconditionFailed"):
+            download_object(s3, "bucket", "key", part_bytes=1000, concurrency=2)
+
+    def test_download_to_file(self, tmp_path):
+        """
+        ファイルにパートが順番どおりに書き込まれることを確認
+        """
+        content = os.urandom(5000)
+        s3 = RangeS3Client(content)
+        path = tmp_path / "package.tar.gz"
+
+        with open(path, "wb") as f:
+            written = download_to_file(s3, "bucket", "key", f, part_bytes=1000, concurrency=3)
+
+        assert written == 5000
+        assert path.read_bytes() == content
+
+    def test_context_propagated_to_part_threads(self, aws_credentials):
+        """
+        パートを取得するスレッドでもS3転送量・読み込み・スパンが記録されることを確認
+        """
+        client = get_client("s3")
+        content = b"0123456789" * 3
+
+        with Stubber(client) as stubber:
+            for start in range(0, 30, 10):
+                part = content[start : start + 10]
+                expected = {"Bucket": "b", "Key": "k", "Range": f"bytes={start}-{start + 9}"}
+                if start:
+                    expected["IfMatch"] = '"v1"'
+                stubber.add_response(
+                    "get_object",
+                    {
+                        "Body": StreamingBody(io.BytesIO(part), len(part)),
+                        "ContentLength": len(part),
+                        "ContentRange": f"bytes {start}-{start + 9}/30",
+                        "ETag": '"v1"',
+                    },
+                    expected,
+                )
+
+            def download():
+                with track_s3_reads() as tracker:
+                    data = download_object(client, "b", "k", part_bytes=10, concurrency=1)
+                return data, tracker.snapshot()
+
+            result, spans = run_with_trace(
+                ("a" * 32, "b" * 16), "tool.execute", {}, lambda: call_with_s3_io_counting(download)
+            )
+
+        (data, objects), io_stats = result
+        assert data == content
+        assert objects == [("b", "k", '"v1"')]
+        assert io_stats.bytes_read == 30
+        download_span = next(s for s in spans if s.name == "s3.download")
+        part_spans = [s for s in spans if s.name == "S3.GetObject"]
+        assert len(part_spans) == 3
+        assert all(s.parent_span_id == download_span.span_id for s in part_spans)
+        assert download_span.attributes["mlops.parts"] == 3
+
+
+class TestObjectCache:
+    """
+    S3オブジェクトのディスクキャッシュを使ったダウンロードのテスト
+    """
+
+    @pytest.fixture(autouse=True)
+    def object_cache(self, tmp_path):
+        configure_aws_clients(
+            Config(aws_region=None, s3_bucket="test-bucket", s3_cache_dir=str(tmp_path))
+        )
+        yield
+        configure_aws_clients(Config(aws_region=None, s3_bucket="test-bucket"))
+
+    def test_repeated_download_from_cache(self):
+        """
+        2回目以降のダウンロードは条件付きGETで再検証され、ローカルから読み込まれることを確認
+        """
+        content = os.urandom(3000)
+        s3 = RangeS3Client(content)
+
+        def download():
+            return download_object(s3, "bucket", "model.pkl", part_bytes=1000)
+
+        first, first_stats = call_with_s3_io_counting(download)
+        calls = len(s3.calls)
+        second, second_stats = call_with_s3_io_counting(download)
+
+        assert first == second == content
+        assert len(s3.calls) == calls + 1
+        assert s3.not_modified == 1
+        assert (first_stats.cache_hits, first_stats.cache_misses) == (0, 1)
+        assert (second_stats.cache_hits, second_stats.cache_misses) == (1, 0)
+        info = s3_cache_info()
+        assert (info["entries"], info["hits"], info["misses"]) == (1, 1, 1)
+        assert info["hit_ratio"] == 0.5
+
+    def test_changed_object_downloaded_again(self):
+        """
+        キャッシュ後に更新されたオブジェクトはダウンロードし直され、キャッシュも更新されることを確認
+        """
+        s3 = RangeS3Client(b"version 1")
+        assert download_object(s3, "bucket", "data.csv") == b"version 1"
+
+        s3.content, s3.etag = b"version 2", '"v2"'
+        assert download_object(s3, "bucket", "data.csv") == b"version 2"
+        assert download_object(s3, "bucket", "data.csv") == b"version 2"
+
+        assert s3.not_modified == 1
+        info = s3_cache_info()
+        assert (info["hits"], info["misses"], info["stale"]) == (1, 2, 1)
+
+    def test_partial_read_not_cached(self):
+        """
+        最後まで読み込まなかったオブジェクトはキャッシュされないことを確認
+        """
+        s3 = RangeS3Client(os.urandom(3000))
+
+        with S3RangeReader(s3, "bucket", "data.csv", part_bytes=1000) as reader:
+            reader.read(10)
+
+        assert s3_cache_info()["entries"] == 0
+        assert download_object(s3, "bucket", "data.csv", part_bytes=1000) == s3.content
+        assert s3_cache_info()["entries"] == 1
+
+    def test_not_modified_tracked(self, aws_credentials):
+        """
+        キャッシュの再検証（304）で読み込んだオブジェクトもETagとともに記録されることを確認
+        """
+        client = get_client("s3")
+        content = b"a,b\n1,2\n"
+        expected = {"Bucket": "b", "Key": "k", "Range": "bytes=0-8388607"}
+
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                "get_object",
+                {
+                    "Body": StreamingBody(io.BytesIO(content), len(content)),
+                    "ContentLength": len(content),
+                    "ContentRange": f"bytes 0-{len(content) - 1}/{len(content)}",
+                    "ETag": '"v1"',
+                },
+                expected,
+            )
+            stubber.add_client_error(
+                "get_object",
+                service_error_code="304",
+                http_status_code=304,
+                expected_params={**expected, "IfNoneMatch": '"v1"'},
+            )
+            download_object(client, "b", "k")
+            with track_s3_reads() as tracker:
+                data = download_object(client, "b", "k")
+
+        assert data == content
+        assert tracker.snapshot() == [("b", "k", '"v1"')]
+
+
+class MultipartS3Client:
+    """マルチパートアップロードに応答するS3クライアントのスタブ"""
+
+    def __init__(self, fail_part: int = None):
+        self.fail_part = fail_part
+        self.objects = {}
+        self.parts = {}
+        self.aborted = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = bytes(Body)
+        return {"ETag": '"put"'}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            if PartNumber == self.fail_part:
+                raise ClientError(
+                    {"Error": {"Code": "InternalError", "Message": "x"}}, "UploadPart"
+                )
+            self.parts[PartNumber] = bytes(Body)
+            return {"ETag": f'"part-{PartNumber}"'}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert [part["ETag"] for part in MultipartUpload["Parts"]] == [
+            f'"part-{number}"' for number in numbers
+        ]
+        self.objects[(Bucket, Key)] = b"".join(self.parts[number] for number in numbers)
+        return {"ETag": '"multipart"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+
+
+class TestMultipartUpload:
+    """
+    S3MultipartWriter・upload_parallelのテスト
+    """
+
+    def test_parts_uploaded_concurrently(self):
+        """
+        パートが並列にアップロードされ、書き込んだ順に結合されることを確認
+        """
+        s3 = MultipartS3Client()
+        content = os.urandom(MIN_UPLOAD_PART_BYTES * 3 + 100)
+
+        with S3MultipartWriter(
+            s3, "b", "k", part_bytes=MIN_UPLOAD_PART_BYTES, concurrency=2
+        ) as writer:
+            for start in range(0, len(content), 1024 * 1024):
+                writer.write(content[start : start + 1024 * 1024])
+
+        assert s3.objects[("b", "k")] == content
+        assert writer.parts == 4
+        assert writer.bytes_written == len(content)
+        assert 1 < s3.max_in_flight <= 2
+
+    def test_small_output_single_put(self):
+        """
+        パートサイズ未満の出力はマルチパートを使わずに1回のPutObjectで保存されることを確認
+        """
+        s3 = Mock()
+        with S3MultipartWriter(s3, "b", "out.csv", ContentType="text/csv") as writer:
+            pd.DataFrame({"a": [1, 2], "b": ["x", "é"]}).to_csv(writer, index=False)
+
+        s3.put_object.assert_called_once_with(
+            Bucket="b",
+            Key="out.csv",
+            Body="a,b\n1,x\n2,é\n".encode("utf-8"),
+            ContentType="text/csv",
+        )
+        s3.create_multipart_upload.assert_not_called()
+
+    def test_aborted_on_exception(self):
+        """
+        withブロックが例外で終了した場合はアップロードが中止されることを確認
+        """
+        s3 = MultipartS3Client()
+
+        with pytest.raises(RuntimeError):
+            with S3MultipartWriter(s3, "b", "k", part_bytes=MIN_UPLOAD_PART_BYTES) as writer:
+                writer.write(b"x" * (MIN_UPLOAD_PART_BYTES + 1))
+                raise RuntimeError("serialization failed")
+
+        assert s3.aborted == ["upload-1"]
+        assert s3.objects == {}
+
+    def test_failed_part_aborts_upload(self):
+        """
+        パートのアップロードに失敗した場合はエラーになり、アップロードが中止されることを確認
+        """
+        s3 = MultipartS3Client(fail_part=2)
+
+        with pytest.raises(ClientError):
+            with S3MultipartWriter(s3, "b", "k", part_bytes=MIN_UPLOAD_PART_BYTES) as writer:
+                writer.write(b"x" * (MIN_UPLOAD_PART_BYTES * 3))
+
+        assert s3.aborted == ["upload-1"]
+        assert s3.objects == {}
+
+    def test_part_size_minimum(self):
+        """
+        S3の最小パートサイズ（5MiB）未満は指定できないことを確認
+        """
+        with pytest.raises(ValueError, match="part_bytes"):
+            S3MultipartWriter(Mock(), "b", "k", part_bytes=1024)
+
+    def test_upload_parallel_context(self):
+        """
+        並列のアップロード処理に呼び出し元のキャンセルが引き継がれることを確認
+        """
+        assert upload_parallel([lambda: "train", lambda: "test"]) == ["train", "test"]
+
+        def upload():
+            check_cancelled()
+            return "uploaded"
+
+        token = CancellationToken()
+        token.cancel()
+        with pytest.raises(ToolCancelledError):
+            run_with_token(token, lambda: upload_parallel([upload, upload]))
+
+
+class TestSaveToS3:
+    """
+    save_to_s3のテスト
+    """
+
+    def test_json_serialized(self):
+        """
+        bytes・文字列以外のデータはJSONとして保存されることを確認
+        """
+        with patch("boto3.client") as mock_client:
+            s3 = Mock()
+            mock_client.return_value = s3
+            assert save_to_s3("bucket", "meta.json", {"name": "モデル"}) is True
+
+        body = s3.put_object.call_args.kwargs["Body"]
+        assert body == '{"name": "モデル"}'.encode("utf-8")
+
+
+class TestParquetPushdown:
+    """
+    Parquetの列・行グループの絞り込み（必要な範囲のみの取得）のテスト
+    """
+
+    @pytest.fixture
+    def wide_parquet(self):
+        """40列×10行グループ（1行グループ=1日）のParquet"""
+        rows = 20000
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({f"f{i}": rng.random(rows) for i in range(40)})
+        data["day"] = pd.date_range("2024-01-01", periods=10).repeat(rows // 10)
+        data["f0"] = range(rows)
+        buffer = io.BytesIO()
+        data.to_parquet(buffer, row_group_size=rows // 10)
+        return data, buffer.getvalue()
+
+    def test_column_projection(self, wide_parquet):
+        """
+        指定した列のみが指定した順に読み込まれ、他の列のバイト範囲は取得されないことを確認
+        """
+        data, content = wide_parquet
+        s3 = RangeS3Client(content)
+
+        df = read_dataset(s3, "bucket", "wide.parquet", "parquet", columns=["f3", "f0"])
+
+        pd.testing.assert_frame_equal(df, data[["f3", "f0"]])
+        assert s3.bytes_sent < len(content) / 5
+        # 2番目以降のGETは最初のGETと同じ版のみを取得
+        assert s3.calls[0] == ("bytes=-65536", None)
+        assert all(if_match == '"v1"' for _, if_match in s3.calls[1:])
+
+    def test_row_group_filters(self, wide_parquet):
+        """
+        フッターの統計情報で条件に合わない行グループが読み飛ばされることを確認
+        """
+        data, content = wide_parquet
+        projected = RangeS3Client(content)
+        read_dataset(projected, "bucket", "wide.parquet", "parquet", columns=["f0", "day"])
+        s3 = RangeS3Client(content)
+
+        df = read_dataset(
+            s3,
+            "bucket",
+            "wide.parquet",
+            "parquet",
+            columns=["f0", "day"],
+            filters=[["day", ">=", "2024-01-09"], ["f0", "<", 19000]],
+        )
+
+        expected = data[(data["day"] >= "2024-01-09") & (data["f0"] < 19000)][["f0", "day"]]
+        pd.testing.assert_frame_equal(df, expected.reset_index(drop=True))
+        # フッターを含む末尾の取得量は同じため、それ以降の取得量で比較
+        assert s3.bytes_sent - TAIL_BYTES < (projected.bytes_sent - TAIL_BYTES) / 3
+
+    def test_filters_chunks(self, wide_parquet):
+        """
+        チャンク指定時も条件に合う行のみがチャンク単位で返されることを確認
+        """
+        data, content = wide_parquet
+        s3 = RangeS3Client(content)
+
+        chunks = read_dataset(
+            s3,
+            "bucket",
+            "wide.parquet",
+            "parquet",
+            chunksize=1500,
+            filters=[[["day", "in", ["2024-01-01"]]], [["day", "==", "2024-01-10"]]],
+        )
+
+        lengths = [len(chunk) for chunk in chunks]
+        assert sum(lengths) == 4000
+        assert max(lengths) <= 1500
+
+    def test_context_in_reader_threads(self, wide_parquet):
+        """
+        pyarrowのI/Oスレッドからの取得にも呼び出し元のコンテキストが引き継がれることを確認
+        """
+        _, content = wide_parquet
+        s3 = RangeS3Client(content)
+        tokens = []
+        original_get = s3.get_object
+
+        def get_object(**kwargs):
+            tokens.append(current_token())
+            return original_get(**kwargs)
+
+        s3.get_object = get_object
+        token = CancellationToken()
+        run_with_token(
+            token, lambda: read_dataset(s3, "bucket", "wide.parquet", "parquet", columns=["f1"])
+        )
+
+        assert len(tokens) > 1
+        assert all(t is token for t in tokens)
+
+    def test_invalid_arguments(self, wide_parquet):
+        """
+        存在しない列・Parquet以外でのfiltersはエラーになることを確認
+        """
+        _, content = wide_parquet
+        with pytest.raises(ValueError, match="missing"):
+            read_dataset(RangeS3Client(content), "b", "k", "parquet", columns=["missing"])
+        with pytest.raises(ValueError, match="only supported for parquet"):
+            read_dataset(RangeS3Client(b"a\n1\n"), "b", "k", "csv", filters=[["a", "==", 1]])
+
+    def test_csv_columns(self):
+        """
+        CSVでも指定した列のみが指定した順に読み込まれることを確認
+        """
+        s3 = RangeS3Client(b"a,b,c\n1,2,3\n4,5,6\n")
+
+        df = read_dataset(s3, "bucket", "data.csv", "csv", columns=["c", "a"])
+
+        assert df.columns.tolist() == ["c", "a"]
+        assert df["c"].tolist() == [3, 6]
+
+
+class CountingBody(io.BytesIO):
+    """読み込んだバイト数を記録するGetObjectのBody"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class TestReadDataset:
+    """
+    read_dataset（ダウンロードしながらの解析）のテスト
+    """
+
+    @pytest.fixture
+    def sample_data(self):
+        return pd.DataFrame({"x": range(1000), "label": ["a", "b"] * 500})
+
+    @staticmethod
+    def _s3_client(content: bytes):
+        s3 = Mock()
+        s3.body = CountingBody(content)
+        s3.get_object.return_value = {"Body": s3.body, "ContentLength": len(content)}
+        return s3
+
+    def test_csv(self, sample_data):
+        """
+        CSVがDataFrameとして読み込まれることを確認
+        """
+        s3 = self._s3_client(sample_data.to_csv(index=False).encode("utf-8"))
+
+        df = read_dataset(s3, "bucket", "data.csv", "csv")
+
+        pd.testing.assert_frame_equal(df, sample_data)
+        s3.get_object.assert_called_once_with(
+            Bucket="bucket", Key="data.csv", Range="bytes=0-8388607"
+        )
+
+    def test_csv_chunks_streamed(self):
+        """
+        チャンク指定時は、最初のチャンクがファイル全体のダウンロード前に返されることを確認
+        """
+        data = pd.DataFrame({"x": range(200000), "y": [0.5] * 200000})
+        content = data.to_csv(index=False).encode("utf-8")
+        s3 = self._s3_client(content)
+
+        chunks = read_dataset(s3, "bucket", "data.csv", "csv", chunksize=1000)
+        first = next(chunks)
+
+        assert len(first) == 1000
+        assert s3.body.bytes_read < len(content)
+        rest = list(chunks)
+        assert sum(len(chunk) for chunk in rest) == 199000
+        assert s3.body.bytes_read == len(content)
+
+    def test_jsonl_chunks(self, sample_data):
+        """
+        JSON Linesがチャンク単位で読み込まれることを確認
+        """
+        content = sample_data.to_json(orient="records", lines=True).encode("utf-8")
+        s3 = self._s3_client(content)
+
+        chunks = list(read_dataset(s3, "bucket", "data.jsonl", "jsonl", chunksize=300))
+
+        assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), sample_data)
+
+    def test_parquet_chunks(self, sample_data):
+        """
+        Parquetがチャンク単位で読み込まれることを確認
+        """
+        buffer = io.BytesIO()
+        sample_data.to_parquet(buffer)
+        s3 = self._s3_client(buffer.getvalue())
+
+        chunks = list(read_dataset(s3, "bucket", "data.parquet", "parquet", chunksize=400))
+
+        assert [len(chunk) for chunk in chunks] == [400, 400, 200]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), sample_data)
+
+    def test_unsupported_format(self):
+        """
+        呼び出し元が対応しないフォーマットはダウンロード前にエラーになることを確認
+        """
+        s3 = self._s3_client(b"{}")
+
+        with pytest.raises(ValueError, match="Unsupported file format: json"):
+            read_dataset(s3, "bucket", "data.json", "json", formats=("csv", "parquet"))
+        s3.get_object.assert_not_called()
+
+    def test_cancelled_while_streaming(self):
+        """
+        キャンセルされたツール呼び出しでは読み込みが中断されることを確認
+        """
+        s3 = self._s3_client(b"x\n" + b"1\n" * 100)
+        token = CancellationToken()
+        token.cancel()
+
+        with pytest.raises(ToolCancelledError):
+            run_with_token(token, lambda: read_dataset(s3, "bucket", "data.csv", "csv"))
+        assert s3.body.bytes_read == 0
+
+
+class TestReadTable:
+    """
+    read_table（pyarrowのリーダーによるArrowテーブルの読み込み）のテスト
+    """
+
+    @staticmethod
+    def _s3_client(content: bytes):
+        s3 = Mock()
+        s3.body = CountingBody(content)
+        s3.get_object.return_value = {"Body": s3.body, "ContentLength": len(content)}
+        return s3
+
+    def test_csv_types(self):
+        """
+        CSVの列の型が推定され、空文字列は文字列の列でも欠損になり、日付の列は
+        pandasと同じく文字列のまま読み込まれることを確認
+        """
+        s3 = self._s3_client(b"x,name,day\n1,a,2024-01-01\n2,,2024-01-02\n")
+
+        table = read_table(s3, "bucket", "data.csv", "csv")
+
+        assert table.column_names == ["x", "name", "day"]
+        assert str(table.schema.field("x").type) == "int64"
+        assert str(table.schema.field("day").type) == "string"
+        assert table.column("day").to_pylist() == ["2024-01-01", "2024-01-02"]
+        assert table.column("name").to_pylist() == ["a", None]
+
+    def test_csv_columns(self):
+        """
+        指定した列のみが指定した順に読み込まれ、存在しない列はエラーになることを確認
+        """
+        content = b"a,b,c\n1,2,3\n4,5,6\n"
+
+        table = read_table(
+            self._s3_client(content), "bucket", "data.csv", "csv", columns=["c", "a"]
+        )
+
+        assert table.column_names == ["c", "a"]
+        assert table.column("c").to_pylist() == [3, 6]
+        with pytest.raises(ValueError, match="not found"):
+            read_table(self._s3_client(content), "bucket", "data.csv", "csv", columns=["z"])
+
+    def test_json_formats(self):
+        """
+        JSON Lines・JSONドキュメントがArrowテーブルとして読み込まれることを確認
+        """
+        data = pd.DataFrame({"x": [1, 2, 3], "label": ["a", "b", "a"]})
+        jsonl = data.to_json(orient="records", lines=True).encode("utf-8")
+        document = data.to_json(orient="records").encode("utf-8")
+
+        from_jsonl = read_table(self._s3_client(jsonl), "bucket", "data.jsonl", "jsonl")
+        from_json = read_table(self._s3_client(document), "bucket", "data.json", "json")
+
+        pd.testing.assert_frame_equal(from_jsonl.to_pandas(), data)
+        pd.testing.assert_frame_equal(from_json.to_pandas(), data)
+
+    def test_parquet(self):
+        """
+        Parquetは全体・必要な範囲のみのどちらでも読み込めることを確認
+        """
+        data = pd.DataFrame({"x": range(1000), "y": np.arange(1000) * 0.5})
+        buffer = io.BytesIO()
+        data.to_parquet(buffer, row_group_size=100)
+        content = buffer.getvalue()
+
+        table = read_table(RangeS3Client(content), "bucket", "data.parquet", "parquet")
+        filtered = read_table(
+            RangeS3Client(content),
+            "bucket",
+            "data.parquet",
+            "parquet",
+            columns=["y"],
+            filters=[["x", ">=", 900]],
+        )
+
+        pd.testing.assert_frame_equal(table.to_pandas(), data)
+        assert filtered.column_names == ["y"]
+        assert filtered.column("y").to_pylist() == list(np.arange(900, 1000) * 0.5)
+
+    def test_cancelled_in_reader_threads(self):
+        """
+        pyarrowのI/Oスレッドからの読み込みでも呼び出し元のキャンセルが確認されることを確認
+        """
+        s3 = self._s3_client(b"x\n" + b"1\n" * 100)
+        token = CancellationToken()
+        response = s3.get_object.return_value
+
+        def get_object(**kwargs):
+            # ストリームを開いた後（解析の開始前）にキャンセル
+            token.cancel()
+            return response
+
+        s3.get_object.side_effect = get_object
+
+        with pytest.raises(ToolCancelledError):
+            run_with_token(token, lambda: read_table(s3, "bucket", "data.csv", "csv"))
+        assert s3.body.bytes_read == 0
+
+
+class TestDatasetCache:
+    """
+    解析済みのデータセットのキャッシュ（Arrow IPCファイル）を使った読み込みのテスト
+    """
+
+    @pytest.fixture(autouse=True)
+    def dataset_cache(self, tmp_path):
+        configure_aws_clients(
+            Config(aws_region=None, s3_bucket="test-bucket", dataset_cache_dir=str(tmp_path))
+        )
+        yield
+        configure_aws_clients(Config(aws_region=None, s3_bucket="test-bucket"))
+
+    def test_repeated_read_memory_mapped(self):
+        """
+        2回目以降の読み込みはHEADでの確認のみで、保存済みのファイルから返されることを確認
+        """
+        s3 = RangeS3Client(b"x,label\n" + b"1,a\n2,b\n" * 1000)
+
+        first = read_table(s3, "bucket", "train.csv", "csv")
+        calls = len(s3.calls)
+        second = read_table(s3, "bucket", "train.csv", "csv")
+
+        assert second.equals(first)
+        assert len(s3.calls) == calls
+        assert s3.heads == 2
+        info = dataset_cache_info()
+        assert (info["entries"], info["hits"], info["misses"]) == (1, 1, 1)
+
+    def test_changed_object_or_options_read_again(self):
+        """
+        オブジェクトが更新された場合・読み込み条件が異なる場合は読み込み直すことを確認
+        """
+        s3 = RangeS3Client(b"a,b\n1,2\n")
+        read_table(s3, "bucket", "train.csv", "csv")
+
+        projected = read_table(s3, "bucket", "train.csv", "csv", columns=["b"])
+        s3.content, s3.etag = b"a,b\n3,4\n", '"v2"'
+        updated = read_table(s3, "bucket", "train.csv", "csv")
+
+        assert projected.column_names == ["b"]
+        assert updated.column("a").to_pylist() == [3]
+        info = dataset_cache_info()
+        assert (info["entries"], info["hits"], info["misses"]) == (3, 0, 3)
+
+
+class ShardedS3Client:
+    """複数のオブジェクトとlist_objects_v2（ページング）に応答するS3クライアントのスタブ"""
+
+    def __init__(self, objects: dict, page_size: int = 2):
+        self.objects = {key: RangeS3Client(content) for key, content in objects.items()}
+        self.page_size = page_size
+        self.list_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        self.list_calls += 1
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start : start + self.page_size]
+        response = {
+            "Contents": [{"Key": key, "Size": len(self.objects[key].content)} for key in page],
+            "IsTruncated": start + self.page_size < len(keys),
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = str(start + self.page_size)
+        return response
+
+    def head_object(self, Bucket, Key):
+        return self.objects[Key].head_object(Bucket=Bucket, Key=Key)
+
+    def get_object(self, Bucket, Key, **kwargs):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": Key}}, "GetObject")
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return self.objects[Key].get_object(Bucket=Bucket, Key=Key, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestShardedDataset:
+    """
+    プレフィックス・マニフェストで指定したシャード化されたデータセットの読み込みのテスト
+    """
+
+    @staticmethod
+    def _parts(count: int) -> dict:
+        return {
+            f"data/part-{index:04d}.csv": f"x,label\n{index},a\n{index},b\n".encode("utf-8")
+            for index in range(count)
+        }
+
+    def test_prefix_parts(self):
+        """
+        プレフィックス配下のデータファイルのみがキーの順に一覧され、1つのテーブルに連結されることを確認
+        """
+        objects = {
+            **self._parts(3),
+            "data/_SUCCESS": b"",
+            "data/.part-0000.csv.crc": b"crc",
+            "data/_temporary/part-0009.csv": b"x,label\n9,z\n",
+            "data/empty.csv": b"",
+            "data/subdir/": b"",
+            "data/manifest": b"[]",
+            "other/part-0000.csv": b"x,label\n-1,z\n",
+        }
+        s3 = ShardedS3Client(objects)
+
+        parts = list_dataset_parts(s3, "bucket", "data/")
+        table = read_table(s3, "bucket", "data/", "csv")
+
+        assert parts == [("bucket", f"data/part-{index:04d}.csv") for index in range(3)]
+        assert s3.list_calls > 1
+        assert table.column("x").to_pylist() == [0, 0, 1, 1, 2, 2]
+        assert table.column("label").to_pylist() == ["a", "b"] * 3
+
+    def test_manifest_formats(self):
+        """
+        Redshift・SageMaker・URIのリストの各形式のマニフェストからパートが読み込まれることを確認
+        """
+        objects = self._parts(2)
+        uris = [f"s3://bucket/{key}" for key in objects]
+        manifests = {
+            "redshift.manifest": {"entries": [{"url": uri, "mandatory": True} for uri in uris]},
+            "sagemaker.manifest": [{"prefix": "s3://bucket/data/"}, *[key[5:] for key in objects]],
+            "uris/manifest.json": uris,
+        }
+        s3 = ShardedS3Client(
+            {**objects, **{key: json.dumps(value).encode() for key, value in manifests.items()}}
+        )
+
+        for key in manifests:
+            df = read_dataset(s3, "bucket", key, "csv")
+
+            assert df["x"].tolist() == [0, 0, 1, 1]
+
+    def test_invalid_manifest_or_empty_prefix(self):
+        """
+        不正なマニフェスト・パートのないプレフィックスはValueErrorになることを確認
+        """
+        s3 = ShardedS3Client(
+            {
+                "bad.manifest": b"{not json",
+                "object.manifest": b'{"files": []}',
+                "relative.manifest": b'["part-0000.csv"]',
+                "empty/_SUCCESS": b"",
+            }
+        )
+
+        for key in ("bad.manifest", "object.manifest", "relative.manifest", "empty/"):
+            with pytest.raises(ValueError):
+                read_table(s3, "bucket", key, "csv")
+
+    def test_parts_read_concurrently_with_bound(self, monkeypatch):
+        """
+        パートが設定した並列数までのスレッドで並列に読み込まれ、パートの順に連結されることを確認
+        """
+        monkeypatch.setitem(s3_utils._transfer_settings, "dataset_part_concurrency", 3)
+        s3 = ShardedS3Client(self._parts(8))
+        updates = []
+        reporter = ProgressReporter(updates.append, min_interval=0)
+
+        table = run_with_progress(reporter, lambda: read_table(s3, "bucket", "data/", "csv"))
+
+        assert s3.max_in_flight == 3
+        assert table.column("x").to_pylist() == [index for index in range(8) for _ in range(2)]
+        # パート内の進捗は報告せず、読み込んだパート数のみを報告する
+        assert [(u["stage"], u["current"], u["total"]) for u in updates] == [
+            ("download", done, 8) for done in range(1, 9)
+        ]
+
+    def test_schema_promoted_without_copy(self):
+        """
+        パート間で型が異なる列（全て欠損の列）が共通の型に揃い、データはコピーされないことを確認
+        """
+        s3 = ShardedS3Client(
+            {"data/part-0.csv": b"x,y\n1,\n2,\n", "data/part-1.csv": b"x,y\n3,1.5\n"}
+        )
+
+        table = read_table(s3, "bucket", "data/", "csv")
+
+        assert table.schema.field("y").type == pa.float64()
+        assert table.column("y").to_pylist() == [None, None, 1.5]
+        assert table.column("x").num_chunks == 2
+
+    def test_failed_part_raises(self):
+        """
+        いずれかのパートの読み込みに失敗した場合は例外が送出されることを確認
+        """
+        objects = self._parts(3)
+        uris = [f"s3://bucket/{key}" for key in objects] + ["s3://bucket/missing.csv"]
+        s3 = ShardedS3Client({**objects, "list.manifest": json.dumps(uris).encode()})
+
+        with pytest.raises(ClientError):
+            read_table(s3, "bucket", "list.manifest", "csv")
+
+    def test_chunks_over_parts(self):
+        """
+        chunksize指定時はパートを順に読み込みながらチャンクが返されることを確認
+        """
+        s3 = ShardedS3Client(self._parts(3))
+
+        chunks = list(read_dataset(s3, "bucket", "data/", "csv", chunksize=1, dtype={"x": float}))
+
+        assert len(chunks) == 6
+        assert pd.concat(chunks)["x"].tolist() == [0.0, 0.0, 1.0, 1.0, 2.0, 2.0]
+        with pytest.raises(ValueError, match="read_options"):
+            read_dataset(s3, "bucket", "data/", "csv", dtype={"x": float})
+
+
+class TestIterBatches:
+    """
+    レコードバッチごとの読み込み（iter_batches）とParquetのフッターの読み込みのテスト
+    """
+
+    def test_csv_streamed_in_blocks(self):
+        """
+        CSVが複数のバッチに分けて解析され、全体を解析した場合と同じ値になることを確認
+        """
+        content = b"x,label\n" + b"".join(f"{i},n{i % 3}\n".encode() for i in range(300_000))
+        s3 = RangeS3Client(content)
+
+        batches = list(iter_batches(s3, "bucket", "data.csv", "csv", columns=["label", "x"]))
+
+        assert len(batches) > 1
+        table = pa.Table.from_batches(batches)
+        assert table.column_names == ["label", "x"]
+        assert table.column("x").to_pylist() == list(range(300_000))
+
+    def test_formats_and_shards(self):
+        """
+        JSON Lines・JSON・シャード化されたデータセットのバッチが読み込まれることを確認
+        """
+        df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", None, "z"]})
+        s3 = ShardedS3Client(
+            {
+                "data.jsonl": df.to_json(orient="records", lines=True).encode(),
+                "data.json": df.to_json(orient="records").encode(),
+                "shards/part-0.csv": b"a,b\n1,x\n",
+                "shards/part-1.csv": b"a,b\n2,\n3,z\n",
+            }
+        )
+
+        for key, fmt in (("data.jsonl", "jsonl"), ("data.json", "json"), ("shards/", "csv")):
+            table = pa.Table.from_batches(list(iter_batches(s3, "bucket", key, fmt)))
+
+            assert table.column("a").to_pylist() == [1, 2, 3]
+            assert table.column("b").to_pylist() == ["x", None, "z"]
+
+    def test_jsonl_blocks_without_open_json(self, monkeypatch):
+        """
+        pyarrow.json.open_json のないpyarrow（19未満）では、行の区切りでブロックごとに
+        解析して同じバッチが読み込まれ、後のブロックの型の変換エラーは ArrowInvalid に
+        なることを確認
+        """
+        import pyarrow.json as pa_json
+
+        monkeypatch.delattr(pa_json, "open_json", raising=False)
+        content = b"".join(f'{{"a": {i}, "b": "x{i}"}}\n'.encode() for i in range(100_000))
+
+        batches = list(iter_batches(RangeS3Client(content), "bucket", "data.jsonl", "jsonl"))
+
+        assert len(batches) > 1
+        table = pa.Table.from_batches(batches)
+        assert table.column("a").to_pylist() == list(range(100_000))
+        with pytest.raises(pa.ArrowInvalid):
+            list(
+                iter_batches(RangeS3Client(content + b'{"a": 0.5}\n'), "bucket", "d.jsonl", "jsonl")
+            )
+
+    def test_dates_read_as_pandas_types(self):
+        """
+        pyarrowが推定する日付・時刻・日時の列が、pandasで読み込んだ場合と同じく文字列
+        （JSON Linesの日時らしい名前の列のみ datetime64[ns]）として元の表記のまま読み込まれることを確認
+        """
+        csv = b"day,at,clock,x\n2024-01-01,2024-01-01 10:00:00,10:00:00,1\n2024-02-01,,11:30:00,2\n"
+        jsonl = (
+            b'{"day": "2024-01-01", "created_at": "2024-01-01T10:00:00", "x": 1}\n'
+            b'{"day": "2024-02-01", "created_at": "2024-01-02T11:00:00", "x": 2}\n'
+        )
+
+        for content, fmt, expected in (
+            (csv, "csv", pd.read_csv(io.BytesIO(csv))),
+            (jsonl, "jsonl", pd.read_json(io.BytesIO(jsonl), lines=True)),
+        ):
+            batches = list(iter_batches(RangeS3Client(content), "bucket", f"data.{fmt}", fmt))
+            df = pa.Table.from_batches(batches).to_pandas()
+
+            assert df.dtypes.to_dict() == expected.dtypes.to_dict()
+            assert df["day"].tolist() == ["2024-01-01", "2024-02-01"]
+
+    def test_parquet_footer_only(self):
+        """
+        Parquetのフッターの読み込みでは末尾の1回のGETのみでデータページを読まないことを確認
+        """
+        rows = 100_000
+        data = pd.DataFrame({"a": np.arange(rows), "b": np.random.default_rng(0).random(rows)})
+        buffer = io.BytesIO()
+        data.to_parquet(buffer, row_group_size=rows // 4)
+        s3 = RangeS3Client(buffer.getvalue())
+
+        (metadata,) = read_parquet_metadata(s3, "bucket", "data.parquet")
+
+        assert (metadata.num_rows, metadata.num_row_groups) == (rows, 4)
+        assert len(s3.calls) == 1
+        assert s3.bytes_sent <= TAIL_BYTES < len(buffer.getvalue())
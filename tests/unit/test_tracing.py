@@ -0,0 +1,283 @@
+"""
+Tracing Unit Tests
+
+ツール実行のトレース（スパン）のユニットテスト
+"""
+
+import io
+import json
+import os
+import sys
+
+import boto3
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from mcp_server.common.tracing import (
+    SPAN_KIND_CLIENT,
+    STATUS_ERROR,
+    STATUS_UNSET,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Tracer,
+    install_aws_tracing_hooks,
+    is_recording,
+    run_with_trace,
+    span,
+    trace_breakdown,
+)
+
+
+class TestSpan:
+    """
+    span() とTracerのユニットテスト
+    """
+
+    def test_noop_outside_trace(self):
+        """
+        トレース対象外では何も記録せずにブロックを実行することを確認
+        """
+        assert is_recording() is False
+        with span("phase", {"key": "value"}) as current:
+            current.set_attribute("rows", 10)
+            value = 1 + 1
+
+        assert value == 2
+
+    def test_nested_spans(self):
+        """
+        入れ子のスパンが同じトレースの親子として記録されることを確認
+        """
+        collector = InMemorySpanExporter()
+        tracer = Tracer([collector])
+
+        with tracer.start_span("root", {"gen_ai.tool.name": "test.tool"}):
+            with span("load") as load:
+                load.set_attribute("mlops.rows", 3)
+                with span("parse"):
+                    pass
+            with span("predict"):
+                pass
+
+        spans = {s.name: s for s in collector.get_finished_spans()}
+        root = spans["root"]
+        assert root.parent_span_id is None
+        assert spans["load"].parent_span_id == root.span_id
+        assert spans["parse"].parent_span_id == spans["load"].span_id
+        assert spans["predict"].parent_span_id == root.span_id
+        assert {s.trace_id for s in spans.values()} == {root.trace_id}
+        assert spans["load"].attributes == {"mlops.rows": 3}
+
+        rows = trace_breakdown(collector.get_finished_spans(root.trace_id))
+        assert [(row["name"], row["depth"]) for row in rows] == [
+            ("root", 0),
+            ("load", 1),
+            ("parse", 2),
+            ("predict", 1),
+        ]
+        assert rows[0]["start_offset_ms"] == 0
+        assert all(row["duration_ms"] >= 0 for row in rows)
+
+    def test_exception_recorded(self):
+        """
+        ブロック内の例外がスパンに記録され、そのまま送出されることを確認
+        """
+        collector = InMemorySpanExporter()
+        tracer = Tracer([collector])
+
+        with pytest.raises(ValueError, match="bad data"):
+            with tracer.start_span("root"):
+                with span("parse"):
+                    raise ValueError("bad data")
+
+        for finished in collector.get_finished_spans():
+            assert finished.status_code == STATUS_ERROR
+            assert finished.status_message == "bad data"
+            assert finished.events[0]["attributes"]["exception.type"] == "ValueError"
+
+    def test_disabled_tracer(self):
+        """
+        無効なTracerではスパンを記録しないことを確認
+        """
+        collector = InMemorySpanExporter()
+        tracer = Tracer([collector], enabled=False)
+
+        with tracer.start_span("root"):
+            assert is_recording() is False
+            with span("phase"):
+                pass
+
+        assert collector.get_finished_spans() == []
+
+    def test_in_memory_buffer_bounded(self):
+        """
+        保持数を超えたスパンは古いものから破棄されることを確認
+        """
+        collector = InMemorySpanExporter(max_spans=2)
+        tracer = Tracer([collector])
+
+        for name in ("first", "second", "third"):
+            with tracer.start_span(name):
+                pass
+
+        assert [s.name for s in collector.get_finished_spans()] == ["second", "third"]
+
+
+class TestRunWithTrace:
+    """
+    run_with_traceのユニットテスト
+    """
+
+    def test_returns_spans_with_result(self):
+        """
+        ワーカー側で記録したスパンが結果と一緒に返されることを確認
+        """
+
+        def work():
+            with span("phase"):
+                return "done"
+
+        result, spans = run_with_trace(("a" * 32, "b" * 16), "tool.execute", {"k": 1}, work)
+
+        assert result == "done"
+        assert [s.name for s in spans] == ["phase", "tool.execute"]
+        assert spans[1].parent_span_id == "b" * 16
+        assert spans[1].attributes == {"k": 1}
+        assert spans[0].parent_span_id == spans[1].span_id
+        assert {s.trace_id for s in spans} == {"a" * 32}
+        assert is_recording() is False
+
+    def test_spans_attached_to_exception(self):
+        """
+        関数が失敗した場合、記録したスパンが例外に格納されることを確認
+        """
+
+        def work():
+            with span("phase"):
+                raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError) as excinfo:
+            run_with_trace(("a" * 32, "b" * 16), "tool.execute", {}, work)
+
+        spans = excinfo.value.trace_spans
+        assert [s.name for s in spans] == ["phase", "tool.execute"]
+        assert all(s.status_code == STATUS_ERROR for s in spans)
+
+
+class TestAWSTracingHooks:
+    """
+    AWS API呼び出しのスパンのユニットテスト
+    """
+
+    @pytest.fixture
+    def s3_client(self):
+        install_aws_tracing_hooks()
+        return boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+
+    def test_api_call_span(self, s3_client):
+        """
+        S3のAPI呼び出しがクライアントスパンとして記録されることを確認
+        """
+        content = b"a,b\n1,2\n"
+
+        def get_object():
+            return s3_client.get_object(Bucket="bucket", Key="data.csv")["Body"].read()
+
+        with Stubber(s3_client) as stubber:
+            stubber.add_response(
+                "get_object",
+                {"Body": StreamingBody(io.BytesIO(content), len(content))},
+                {"Bucket": "bucket", "Key": "data.csv"},
+            )
+            result, spans = run_with_trace(("a" * 32, "b" * 16), "tool.execute", {}, get_object)
+
+        assert result == content
+        api_span = spans[0]
+        assert api_span.name == "S3.GetObject"
+        assert api_span.kind == SPAN_KIND_CLIENT
+        assert api_span.parent_span_id == spans[1].span_id
+        assert api_span.status_code == STATUS_UNSET
+        assert api_span.attributes["rpc.system"] == "aws-api"
+        assert api_span.attributes["aws.s3.bucket"] == "bucket"
+        assert api_span.attributes["aws.s3.key"] == "data.csv"
+        assert api_span.attributes["http.status_code"] == 200
+
+    def test_api_error_span(self, s3_client):
+        """
+        エラー応答のAPI呼び出しのスパンがエラー状態になることを確認
+        """
+
+        def head_object():
+            try:
+                s3_client.head_object(Bucket="bucket", Key="missing.csv")
+            except s3_client.exceptions.ClientError:
+                return "missing"
+
+        with Stubber(s3_client) as stubber:
+            stubber.add_client_error("head_object", "404", http_status_code=404)
+            result, spans = run_with_trace(("a" * 32, "b" * 16), "tool.execute", {}, head_object)
+
+        assert result == "missing"
+        assert spans[0].name == "S3.HeadObject"
+        assert spans[0].status_code == STATUS_ERROR
+        assert spans[0].attributes["http.status_code"] == 404
+
+    def test_no_span_outside_trace(self, s3_client):
+        """
+        トレース対象外のAPI呼び出しではスパンを作成しないことを確認
+        """
+        with Stubber(s3_client) as stubber:
+            stubber.add_response("list_buckets", {"Buckets": []})
+            response = s3_client.list_buckets()
+
+        assert response["Buckets"] == []
+
+
+class TestFileSpanExporter:
+    """
+    FileSpanExporterのユニットテスト
+    """
+
+    def test_otlp_json_lines(self, tmp_path):
+        """
+        スパンがOTLP/JSON形式で1出力1行として追記されることを確認
+        """
+        path = tmp_path / "traces.jsonl"
+        exporter = FileSpanExporter(str(path))
+        tracer = Tracer([exporter])
+
+        with tracer.start_span("root", {"rows": 3, "ratio": 0.5, "ok": True, "name": "x"}):
+            with span("child"):
+                pass
+        tracer.shutdown()
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        child, root = [json.loads(line) for line in lines]
+        resource_spans = root["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"] == [
+            {"key": "service.name", "value": {"stringValue": "mlops-mcp-server"}}
+        ]
+        otlp_root = resource_spans["scopeSpans"][0]["spans"][0]
+        otlp_child = child["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        assert otlp_root["name"] == "root"
+        assert "parentSpanId" not in otlp_root
+        assert otlp_child["parentSpanId"] == otlp_root["spanId"]
+        assert otlp_child["traceId"] == otlp_root["traceId"]
+        assert len(otlp_root["traceId"]) == 32 and len(otlp_root["spanId"]) == 16
+        assert int(otlp_root["endTimeUnixNano"]) >= int(otlp_root["startTimeUnixNano"])
+        assert otlp_root["attributes"] == [
+            {"key": "rows", "value": {"intValue": "3"}},
+            {"key": "ratio", "value": {"doubleValue": 0.5}},
+            {"key": "ok", "value": {"boolValue": True}},
+            {"key": "name", "value": {"stringValue": "x"}},
+        ]
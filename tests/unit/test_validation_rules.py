@@ -0,0 +1,180 @@
+"""
+Validation Rules Unit Tests
+
+宣言的なバリデーションルール（RuleEngine）のユニットテスト
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+# Add mcp_server to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "mcp_server"))
+
+from capabilities.data_preparation.tools.validation_rules import RuleEngine
+
+
+def _orders() -> pa.Table:
+    """注文データ（違反を含む）"""
+    return pa.table(
+        {
+            "order_id": [1, 2, 3, 3, 5, 6, 6, 6],
+            "age": [25, -1, 40, None, 130, 33, 18, 70],
+            "status": ["paid", "paid", "refunded", "lost", None, "paid", "PAID", "paid"],
+            "email": ["a@x.jp", "bad", "c@x.jp", "d@x.jp", "e@x.jp", None, "g@x", "h@x.jp"],
+            "start": pd.to_datetime(["2024-01-01"] * 8),
+            "end": pd.to_datetime(["2024-01-02"] * 6 + ["2023-12-31", None]),
+            "price": ["1.5", "2", "x", "1e3", None, "nan", "3.", "-"],
+        }
+    )
+
+
+def _evaluate(rules, table: pa.Table, max_chunksize: int = 3):
+    """バッチに分けて評価し、ルール名 → 結果の辞書を返す"""
+    engine = RuleEngine(rules)
+    for batch in table.to_batches(max_chunksize=max_chunksize):
+        engine.add_batch(batch)
+    return {result["name"]: result for result in engine.results()}
+
+
+class TestRuleEngine:
+    """
+    RuleEngineのルールごとの違反数・違反の例のテスト
+    """
+
+    def test_column_rules(self):
+        """
+        範囲・許可された値・正規表現・欠損・型変換のルールの違反数が、pandasで
+        数えた値と一致し、欠損値は違反とされないことを確認
+        """
+        table = _orders()
+        df = table.to_pandas()
+
+        results = _evaluate(
+            [
+                {"type": "range", "column": "age", "min": 0, "max": 120},
+                {"type": "allowed_values", "column": "status", "values": ["paid", "refunded"]},
+                {"type": "regex", "column": "email", "pattern": r"^[^@]+@[^@]+\.[a-z]+$"},
+                {"type": "not_null", "column": "age"},
+                {"type": "coercible", "column": "price", "dtype": "float"},
+            ],
+            table,
+        )
+
+        assert results["range:age"]["violations"] == ((df.age < 0) | (df.age > 120)).sum()
+        allowed = df.status.dropna().isin(["paid", "refunded"])
+        assert results["allowed_values:status"]["violations"] == (~allowed).sum()
+        matched = df.email.dropna().str.match(r"^[^@]+@[^@]+\.[a-z]+$")
+        assert results["regex:email"]["violations"] == (~matched).sum()
+        assert results["not_null:age"]["violations"] == df.age.isnull().sum()
+        coerced = pd.to_numeric(df.price, errors="coerce")
+        assert (
+            results["coercible:price"]["violations"]
+            == (coerced.isnull() & df.price.notnull() & (df.price != "nan")).sum()
+        )
+
+    def test_samples_across_batches(self):
+        """
+        違反の例に全体での行番号と値が記録され、件数が上限までであることを確認
+        """
+        engine = RuleEngine([{"type": "range", "column": "age", "min": 30}], max_samples=2)
+        for batch in _orders().to_batches(max_chunksize=3):
+            engine.add_batch(batch)
+
+        (result,) = engine.results()
+
+        assert result["violations"] == 3
+        assert result["violation_ratio"] == 0.375
+        assert result["samples"] == [
+            {"row": 0, "values": {"age": 25}},
+            {"row": 1, "values": {"age": -1}},
+        ]
+        assert not result["passed"]
+
+    def test_unique_across_batches(self):
+        """
+        バッチをまたいだ重複（2回目以降の出現）が数えられることを確認
+        """
+        results = _evaluate(
+            [
+                {"type": "unique", "column": "order_id"},
+                {"type": "unique", "columns": ["order_id", "status"], "name": "order_status"},
+            ],
+            _orders(),
+        )
+
+        assert results["unique:order_id"]["violations"] == 3
+        assert {"count": 3, "values": {"order_id": 6}} in results["unique:order_id"]["samples"]
+        # (6, "paid") のみが重複（大文字小文字は区別する）
+        assert results["order_status"]["violations"] == 1
+
+    def test_unique_keeps_distinct_keys_only(self):
+        """
+        バッチごとに重複を除いて数えるため、保持するキーは異なり数のみで、型の異なる
+        バッチ（pandasのチャンクの整数・浮動小数点）の同じ値は同じキーとして数えることを確認
+        """
+        engine = RuleEngine([{"type": "unique", "column": "id"}])
+        for _ in range(100):
+            engine.add_batch(pa.RecordBatch.from_pydict({"id": pa.array(range(10), pa.int64())}))
+        engine.add_batch(pa.RecordBatch.from_pydict({"id": pa.array([1.0, 2.0, None, 10.0])}))
+
+        result = engine.results()[0]
+        assert result["violations"] == 100 * 10 - 10 + 2
+        assert len(engine._keys[0]) == 11
+        assert result["samples"][0] == {"count": 100, "values": {"id": 0}}
+        assert result["samples"][1] == {"count": 101, "values": {"id": 1}}
+
+    def test_compare_columns(self):
+        """
+        列間の比較（日時）の違反が数えられ、例の日時が文字列で返されることを確認
+        """
+        results = _evaluate(
+            [{"type": "compare", "left": "start", "op": "<", "right": "end"}], _orders()
+        )
+
+        result = results["compare:start,end"]
+        assert result["violations"] == 1
+        assert result["samples"][0]["row"] == 6
+        assert result["samples"][0]["values"]["end"].startswith("2023-12-31")
+
+    def test_unknown_column_and_type_mismatch(self):
+        """
+        存在しない列・型が合わないルールは、他のルールの評価を止めずにエラーとして報告されることを確認
+        """
+        results = _evaluate(
+            [
+                {"type": "not_null", "column": "missing"},
+                {
+                    "type": "compare",
+                    "left": "order_id",
+                    "op": "<",
+                    "right": "email",
+                    "severity": "warning",
+                },
+                {"type": "not_null", "column": "order_id"},
+            ],
+            _orders(),
+        )
+
+        assert "Columns not found" in results["not_null:missing"]["error"]
+        assert "error" in results["compare:order_id,email"]
+        assert results["compare:order_id,email"]["severity"] == "warning"
+        assert results["not_null:order_id"]["passed"]
+
+    def test_invalid_rules(self):
+        """
+        不正なルールは走査の前にValueErrorになることを確認
+        """
+        for rule in (
+            {"type": "unknown", "column": "a"},
+            {"type": "range", "column": "a"},
+            {"type": "regex", "column": "a", "pattern": "("},
+            {"type": "compare", "left": "a", "op": "=>", "right": "b"},
+            {"type": "coercible", "column": "a", "dtype": "decimal"},
+            {"type": "not_null"},
+        ):
+            with pytest.raises(ValueError):
+                RuleEngine([rule])